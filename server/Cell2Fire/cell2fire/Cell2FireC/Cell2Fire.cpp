@@ -15,7 +15,9 @@ __maintainer__ = "Jaime Carrasco, Cristobal Pais, David Woodruff"
 #include "Lightning.h"
 
 // Include libraries
+#ifdef _OPENMP
 #include <omp.h>
+#endif
 #include <stdexcept>
 #include <stdio.h>
 #include <stdlib.h>
@@ -31,21 +33,25 @@ __maintainer__ = "Jaime Carrasco, Cristobal Pais, David Woodruff"
 #include <random>
 #include <algorithm> 
 #include <chrono>
+#include <sstream>
+#include <limits>
 
 using namespace std;
 
-// Global Variables (DFs with cells and weather info)
-inputs * df_ptr;
-weatherDF * wdf_ptr;
-weatherDF wdf[150];
-inputs df [1560000];
-std::unordered_map<int, std::vector<float>> BBOFactors;
-std::unordered_map<int, std::vector<int>> HarvestedCells;   
-std::vector<int> NFTypesCells;
+// Minimum number of weather periods allocated per instance
+const int MIN_WEATHER_PERIODS = 150;
 
 /******************************************************************************
 																Utils
 *******************************************************************************/
+// Print a whole message at once (replications may run on several threads sharing stdout)
+void printMessage(const std::string & message){
+	#pragma omp critical(cell2fire_output)
+	{
+		std::cout << message << std::flush;
+	}
+}
+
 void printSets(std::unordered_set<int> availCells, std::unordered_set<int> nonBurnableCells, 	
 					 std::unordered_set<int> burningCells, std::unordered_set<int> burntCells, std::unordered_set<int> harvestCells)
 {
@@ -176,7 +182,8 @@ Cell2Fire::Cell2Fire(arguments _args) : CSVWeather(_args.InFolder + "Weather.csv
 	std::cout << "Number of cells: " <<  this->nCells  << std::endl;
 	
 	// Create empty df with size of NCells
-	df_ptr = & df[0];
+	this->df = std::vector<inputs>(this->nCells);
+	inputs * df_ptr = & this->df[0];
 	
 	// Populate the df [nCells] objects
 	CSVParser.parseDF(df_ptr, DF, this->nCells);
@@ -242,20 +249,11 @@ Cell2Fire::Cell2Fire(arguments _args) : CSVWeather(_args.InFolder + "Weather.csv
 	}	
 	
 	/* Weather DataFrame */
-	this->WeatherDF = this->CSVWeather.getData();
 	std::cout << "\nWeather DataFrame from instance " << this->CSVWeather.fileName << std::endl;
-	
-	// Populate WDF 
-	int WPeriods = WeatherDF.size() - 1;  // -1 due to header
-	wdf_ptr = &wdf[0];
-	
-	// Populate the wdf objects
-	this->CSVWeather.parseWeatherDF(wdf_ptr, this->WeatherDF, WPeriods);
-	//DEBUGthis->CSVWeather.printData(this->WeatherDF);
+	this->setWeather(this->CSVWeather.getData());
 	
 	/*  Ignitions */
 	int IgnitionYears;
-	std::vector<int> IgnitionPoints;   
 	
 	if(this->args.Ignitions){
 		//DEBUGstd::cout << "\nWe have specific ignition points:" << std::endl;
@@ -270,96 +268,11 @@ Cell2Fire::Cell2Fire(arguments _args) : CSVWeather(_args.InFolder + "Weather.csv
 		//DEBUGstd::cout << "Ignition points from file " << ignitionFile << std::endl;
 		//DEBUGCSVIgnitions.printData(IgnitionsDF);
 		
-		// Total Years
-		IgnitionYears = IgnitionsDF.size() - 1;
-		//DEBUGstd::cout << "Ignition Years: " << IgnitionYears  << std::endl;
-		//DEBUGstd::cout << "Total Years: " << this->args.TotalYears  << std::endl;
-		args.TotalYears = std::min(args.TotalYears, IgnitionYears);
-		//DEBUGstd::cout << "Setting TotalYears to " << args.TotalYears << " for consistency with Ignitions file" << std::endl;
-		
 		// Ignition points 
-		this->IgnitionPoints = std::vector<int>(IgnitionYears, 0);
-		CSVIgnitions.parseIgnitionDF(this->IgnitionPoints, IgnitionsDF, IgnitionYears);
-		//this->IgnitionSets = std::vector<unordered_set<int>>(this->IgnitionPoints.size());
-		this->IgnitionSets = std::vector<std::vector<int>>(this->args.TotalYears);
-		
-		
-		// Ignition radius
-		if (this->args.IgnitionRadius > 0){
-			// Aux
-			int i, a, igVal;
-			//std::unordered_set<int> auxSet;
-			std::vector<int> auxSet;
-			int auxIg = 0;
-
-			// Debug
-			//for (i=0; i<this->args.TotalYears; i++)
-			//	std::cout << this->IgnitionPoints[i] <<	std::endl;
-			
-			// Loop
-			for (i=0; i<this->args.TotalYears; i++){
-				auxSet.clear();
-				igVal = this->IgnitionPoints[i];
-				
-				if (this->args.IgnitionRadius == 1){
-					for (auto & nb : adjCells[igVal-1]) {
-						if (nb.second != -1) {
-								//this->IgnitionSets[auxIg].insert(nb.second);
-								this->IgnitionSets[auxIg].push_back(nb.second);
-						}
-					}
-					//this->IgnitionSets[auxIg].insert(igVal);
-					this->IgnitionSets[auxIg].push_back(igVal);
-				}
-				
-				if (this->args.IgnitionRadius > 1){
-					// Initial ignition set (first year for 1 degree)
-					for (auto & nb : adjCells[igVal-1]) {
-						if (nb.second != -1) {
-								//this->IgnitionSets[auxIg].insert(nb.second);
-								this->IgnitionSets[auxIg].push_back(nb.second);
-						}
-					}
-					int auxR = 1;
-					//auxSet.insert(igVal);
-					auxSet.push_back(igVal);
-
-					// loop over radius of adjacents
-					while (auxR < args.IgnitionRadius){
-						//unordered_set<int> IgnitionSetsAux = this->IgnitionSets[auxIg];
-						std::vector<int> IgnitionSetsAux = this->IgnitionSets[auxIg];
-						
-						for (auto & c : IgnitionSetsAux) {
-							// Populate Aux Set
-							for (auto & na : adjCells[c - 1]) {
-								if (na.second != -1) {
-										//auxSet.insert(na.second);
-										auxSet.push_back(na.second);
-								}
-							}
-						}
-						// Save aux set as Ignition Set
-						this->IgnitionSets[auxIg] = auxSet;
-						auxR += 1;
-					}
-				}
-				// Next iteration (year)
-				auxIg++;
-			}
-		}
-		
-		// Clean vectors 
-		for (auto & v : this->IgnitionSets){
-			std::sort(v.begin(), v.end());
-			v.erase(std::unique(v.begin(), v.end()), v.end());
-		}
-		
-		// IgRadius Information 
-		if (this->args.verbose){
-			for (auto & nb : this->IgnitionSets[0]){
-				std::cout  << "Ignition sets[0] example:" <<  nb <<  std::endl;
-			}
-		}
+		IgnitionYears = IgnitionsDF.size() - 1;
+		std::vector<int> IgnitionPoints(IgnitionYears, 0);
+		CSVIgnitions.parseIgnitionDF(IgnitionPoints, IgnitionsDF, IgnitionYears);
+		this->setIgnitions(IgnitionPoints);
 	}
 	
 	/* BBO Tuning factors (only the ones present in the instances*/
@@ -399,6 +312,119 @@ Cell2Fire::Cell2Fire(arguments _args) : CSVWeather(_args.InFolder + "Weather.csv
 	this->noIgnition = true;  		//  None = -1
 	this->gridNumber = 0;
 	this->fire_period = vector<int>(this->args.TotalYears, 0);
+}
+
+
+
+// Ignition points (one per year) and their radius sets
+void Cell2Fire::setIgnitions(std::vector<int> IgnitionPoints){
+	// Total Years
+	int IgnitionYears = IgnitionPoints.size();
+	//DEBUGstd::cout << "Ignition Years: " << IgnitionYears  << std::endl;
+	//DEBUGstd::cout << "Total Years: " << this->args.TotalYears  << std::endl;
+	this->args.TotalYears = std::min(this->args.TotalYears, IgnitionYears);
+	//DEBUGstd::cout << "Setting TotalYears to " << args.TotalYears << " for consistency with Ignitions file" << std::endl;
+	
+	// Ignition points 
+	this->IgnitionPoints = IgnitionPoints;
+	//this->IgnitionSets = std::vector<unordered_set<int>>(this->IgnitionPoints.size());
+	this->IgnitionSets = std::vector<std::vector<int>>(this->args.TotalYears);
+	
+	
+	// Ignition radius
+	if (this->args.IgnitionRadius > 0){
+		// Aux
+		int i, a, igVal;
+		//std::unordered_set<int> auxSet;
+		std::vector<int> auxSet;
+		int auxIg = 0;
+
+		// Debug
+		//for (i=0; i<this->args.TotalYears; i++)
+		//	std::cout << this->IgnitionPoints[i] <<	std::endl;
+		
+		// Loop
+		for (i=0; i<this->args.TotalYears; i++){
+			auxSet.clear();
+			igVal = this->IgnitionPoints[i];
+			
+			if (this->args.IgnitionRadius == 1){
+				for (auto & nb : adjCells[igVal-1]) {
+					if (nb.second != -1) {
+							//this->IgnitionSets[auxIg].insert(nb.second);
+							this->IgnitionSets[auxIg].push_back(nb.second);
+					}
+				}
+				//this->IgnitionSets[auxIg].insert(igVal);
+				this->IgnitionSets[auxIg].push_back(igVal);
+			}
+			
+			if (this->args.IgnitionRadius > 1){
+				// Initial ignition set (first year for 1 degree)
+				for (auto & nb : adjCells[igVal-1]) {
+					if (nb.second != -1) {
+							//this->IgnitionSets[auxIg].insert(nb.second);
+							this->IgnitionSets[auxIg].push_back(nb.second);
+					}
+				}
+				int auxR = 1;
+				//auxSet.insert(igVal);
+				auxSet.push_back(igVal);
+
+				// loop over radius of adjacents
+				while (auxR < this->args.IgnitionRadius){
+					//unordered_set<int> IgnitionSetsAux = this->IgnitionSets[auxIg];
+					std::vector<int> IgnitionSetsAux = this->IgnitionSets[auxIg];
+					
+					for (auto & c : IgnitionSetsAux) {
+						// Populate Aux Set
+						for (auto & na : adjCells[c - 1]) {
+							if (na.second != -1) {
+									//auxSet.insert(na.second);
+									auxSet.push_back(na.second);
+							}
+						}
+					}
+					// Save aux set as Ignition Set
+					this->IgnitionSets[auxIg] = auxSet;
+					auxR += 1;
+				}
+			}
+			// Next iteration (year)
+			auxIg++;
+		}
+	}
+	
+	// Clean vectors 
+	for (auto & v : this->IgnitionSets){
+		std::sort(v.begin(), v.end());
+		v.erase(std::unique(v.begin(), v.end()), v.end());
+	}
+	
+	// IgRadius Information 
+	if (this->args.verbose){
+		for (auto & nb : this->IgnitionSets[0]){
+			std::cout  << "Ignition sets[0] example:" <<  nb <<  std::endl;
+		}
+	}
+	
+	// Fire periods per year
+	this->fire_period = vector<int>(this->args.TotalYears, 0);
+}
+
+
+// Weather periods (rows of a Weather.csv, header included)
+void Cell2Fire::setWeather(std::vector<std::vector<std::string>> WeatherDF){
+	this->WeatherDF = WeatherDF;
+	
+	// Populate WDF 
+	int WPeriods = this->WeatherDF.size() - 1;  // -1 due to header
+	this->wdf = std::vector<weatherDF>(std::max(WPeriods, MIN_WEATHER_PERIODS));
+	weatherDF * wdf_ptr = &this->wdf[0];
+	
+	// Populate the wdf objects
+	this->CSVWeather.parseWeatherDF(wdf_ptr, this->WeatherDF, WPeriods);
+	//DEBUGthis->CSVWeather.printData(this->WeatherDF);
 	
 	// Check maxFirePeriods and Weather File consistency
 	if(this->args.WeatherOpt.compare("rows") == 0 || this->args.WeatherOpt.compare("random") == 0) {
@@ -413,6 +439,14 @@ Cell2Fire::Cell2Fire(arguments _args) : CSVWeather(_args.InFolder + "Weather.csv
 }
 
 
+// Copy constructor: independent instance for replications running on another thread
+Cell2Fire::Cell2Fire(const Cell2Fire & other) : CSVWeather(other.CSVWeather), CSVForest(other.CSVForest) {
+	*this = other;
+	
+	// Pointers must refer to the copy's own members
+	this->args_ptr = &this->args;
+	this->coef_ptr = &this->coefs[0];
+}
 
 /******************************************************************************
 																Methods
@@ -439,7 +473,7 @@ void Cell2Fire::InitCell(int id){
 
 
 // Resets the instance/object
-void Cell2Fire::reset(int rnumber, double rnumber2){
+void Cell2Fire::reset(int rnumber, double rnumber2, int simExt){
 	// Reset info
 	//DEBUGstd::cout  << "--------------------- Reseting environment -----------------------" << std::endl;
 	
@@ -447,6 +481,7 @@ void Cell2Fire::reset(int rnumber, double rnumber2){
 	int i;
 	
 	// Reset global parameters for the simulation
+	this->sim = simExt;
 	this->year = 1;
 	this->weatherPeriod = 0;
 	this->noIgnition = true;  		//  None = -1
@@ -471,6 +506,18 @@ void Cell2Fire::reset(int rnumber, double rnumber2){
 		CSVFolder.MakeDir(this->messagesFolder);
 		this->messagesFolder = this->args.OutFolder + "/Messages/";
 	}
+	
+	// Arrival Folder (file written by outputArrival at the end of the simulation)
+	if(this->args.OutArrival){
+		CSVWriter CSVFolder("","");
+		CSVFolder.MakeDir("mkdir -p " + this->args.OutFolder + "/CellArrival/");
+		if (this->sim < 10){
+			this->arrivalFile = this->args.OutFolder + "/CellArrival/CellArrival0" + std::to_string(this->sim) + ".npy";
+		}
+		else {
+			this->arrivalFile = this->args.OutFolder + "/CellArrival/CellArrival" + std::to_string(this->sim) + ".npy";
+		}
+	}
 		
 	// Random Weather 
 	/*std::cout << "Weather Option:" << this->args.WeatherOpt << std::endl;
@@ -490,11 +537,12 @@ void Cell2Fire::reset(int rnumber, double rnumber2){
       std::abort();
     }
 
-		std::cout  << "Weather file selected: " <<  this->CSVWeather.fileName  << std::endl;
+		printMessage("Weather file selected: " + this->CSVWeather.fileName + "\n");
 		
 		// Populate WDF 
 		int WPeriods = this->WeatherDF.size() - 1;  // -1 due to header
-		wdf_ptr = &wdf[0];
+		if (WPeriods > (int) this->wdf.size()) this->wdf.resize(WPeriods);
+		weatherDF * wdf_ptr = &this->wdf[0];
 		
 		// Populate the wdf objects
 		this->CSVWeather.parseWeatherDF(wdf_ptr, this->WeatherDF, WPeriods);
@@ -504,8 +552,9 @@ void Cell2Fire::reset(int rnumber, double rnumber2){
 	this->ROSRV = std::abs(rnumber2);
 	//std::cout << "ROSRV: " << this->ROSRV << std::endl;
 	
-	// Cells dictionary
-	this->Cells_Obj.clear(); 
+	// Cells dictionary (new containers instead of clear(): iteration order, and therefore the order of the
+	// output messages, must not depend on the previous replications simulated by this instance)
+	this->Cells_Obj = std::unordered_map<int, CellsFBP>(); 
 	
 	// Declare an iterator to unordered_map
 	std::unordered_map<int, CellsFBP>::iterator it;
@@ -531,11 +580,11 @@ void Cell2Fire::reset(int rnumber, double rnumber2){
 	}
 	   
 	// Relevant sets: Initialization
-	this->availCells.clear();
-	this->nonBurnableCells.clear();
-	this->burningCells.clear();
-	this->burntCells.clear();
-	this->harvestCells.clear();
+	this->availCells = std::unordered_set<int>();
+	this->nonBurnableCells = std::unordered_set<int>();
+	this->burningCells = std::unordered_set<int>();
+	this->burntCells = std::unordered_set<int>();
+	this->harvestCells = std::unordered_set<int>();
 	
 	// Harvest Cells
 	for (auto it = HarvestedCells.begin(); it != HarvestedCells.end(); it++ ){
@@ -552,6 +601,24 @@ void Cell2Fire::reset(int rnumber, double rnumber2){
 		else if (this->statusCells[i] == 3)  this->harvestCells.insert(i+1);
 	}
 	
+	// Grids: harvested cells are fixed for the whole simulation, burnt cells are added by outputGrid
+	this->gridStatus = std::vector<int>(this->nCells, 0);
+	for (auto & hc : this->harvestCells){
+		this->gridStatus[hc-1] = -1;
+	}
+	this->gridChanges.clear();
+	
+	// Arrivals: nothing burnt yet (harvested cells are marked to rebuild the grids)
+	if (this->args.OutArrival){
+		this->arrivalPeriod = std::vector<int>(this->nCells, -1);
+		this->arrivalTime = std::vector<float>(this->nCells, std::numeric_limits<float>::infinity());
+		this->arrivalROS = std::vector<float>(this->nCells, 0);
+		for (auto & hc : this->harvestCells){
+			this->arrivalPeriod[hc-1] = -2;
+		}
+		this->arrivalMessages = 0;
+	}
+	
 	// Print-out sets information
 	if (this->args.verbose){
 		printSets(this->availCells, this->nonBurnableCells, this->burningCells, this->burntCells, this->harvestCells);
@@ -596,7 +663,7 @@ bool Cell2Fire::RunIgnition(std::default_random_engine generator){
 				}
 				
 				if (it->second.getStatus() == "Available" && it->second.fType != 0) {
-					std::cout << "\nSelected (Random) ignition point for Year " << this->year <<  ", sim " <<  this->sim << ": "<< aux;
+					printMessage("\nSelected (Random) ignition point for Year " + std::to_string(this->year) + ", sim " + std::to_string(this->sim) + ": " + std::to_string(aux));
 					std::vector<int> ignPts = {aux};
 					if (it->second.ignition(this->fire_period[year - 1], this->year, ignPts, & df[aux - 1], this->coef_ptr, this->args_ptr, & wdf[this->weatherPeriod])) {
 															
@@ -640,7 +707,7 @@ bool Cell2Fire::RunIgnition(std::default_random_engine generator){
             temp = this->IgnitionSets[this->year - 1][udistribution(generator)];          
 		}
 		
-		std::cout << "\nSelected ignition point for Year " << this->year <<  ", sim " <<  this->sim << ": "<< temp;
+		printMessage("\nSelected ignition point for Year " + std::to_string(this->year) + ", sim " + std::to_string(this->sim) + ": " + std::to_string(temp));
 	
 		// If cell is available 
 		if (this->burntCells.find(temp) == this->burntCells.end() && this->statusCells[temp - 1] < 3) {
@@ -677,7 +744,7 @@ bool Cell2Fire::RunIgnition(std::default_random_engine generator){
 
 		} else {
 			this->noIgnition = true;
-			std::cout  <<"Next year..." << std::endl;
+			printMessage("Next year...\n");
 			if (this->args.verbose){
 				std::cout << "No ignition during year " << this->year << ", Cell " << this->IgnitionPoints[this->year-1] << " is already burnt or non-burnable type" << std::endl;
 			}
@@ -699,6 +766,12 @@ bool Cell2Fire::RunIgnition(std::default_random_engine generator){
 		this->burntCells.insert(newId);
 		this->availCells.erase(newId);
 		
+		// Arrival of the ignition cell
+		if (this->args.OutArrival){
+			this->arrivalPeriod[newId-1] = this->fire_period[this->year-1];
+			this->arrivalTime[newId-1] = this->fire_period[this->year-1] * this->args.FirePeriodLen;
+		}
+		
 		// Print sets information
 		if (this->args.verbose){
 			printSets(this->availCells, this->nonBurnableCells, this->burningCells, this->burntCells, this->harvestCells);
@@ -975,7 +1048,7 @@ void Cell2Fire::GetMessages(std::unordered_map<int, std::vector<int>> sendMessag
 					
 				// Check if burnable, then check potential ignition
 				if (it->second.fType != 0) {
-					checkBurnt = it->second.get_burned(this->fire_period[this->year-1], 1, this->year, df, 
+					checkBurnt = it->second.get_burned(this->fire_period[this->year-1], 1, this->year, &df[0], 
 																			this->coef_ptr, this->args_ptr, &wdf[this->weatherPeriod]);
 
 				} else {
@@ -1008,6 +1081,11 @@ void Cell2Fire::GetMessages(std::unordered_map<int, std::vector<int>> sendMessag
 		}
 		
 	
+		// Arrivals of the cells ignited during this period
+		if (this->args.OutArrival){
+			this->updateArrival(burntList);
+		}
+	
 		// Update sets
 		for(auto &bc : burntList) {
 			this->burntCells.insert(bc);
@@ -1090,11 +1168,13 @@ void Cell2Fire::Results(){
 	float NBCells = this->nonBurnableCells.size();
 	float HCells = this->harvestCells.size();
 	
-	std::cout <<"\n----------------------------- Results -----------------------------" << std::endl;
-	std::cout << "Total Available Cells:    " << ACells << " - % of the Forest: " <<  ACells/nCells*100.0 << "%" << std::endl;
-	std::cout << "Total Burnt Cells:        " << BCells << " - % of the Forest: " <<  BCells/nCells*100.0 <<"%" << std::endl;
-	std::cout << "Total Non-Burnable Cells: " << NBCells << " - % of the Forest: " <<  NBCells/nCells*100.0 <<"%"<< std::endl;
-	std::cout << "Total Harvested Cells: " << HCells << " - % of the Forest: " <<  HCells/nCells*100.0 <<"%"<< std::endl;
+	std::ostringstream results;
+	results <<"\n----------------------------- Results -----------------------------" << std::endl;
+	results << "Total Available Cells:    " << ACells << " - % of the Forest: " <<  ACells/nCells*100.0 << "%" << std::endl;
+	results << "Total Burnt Cells:        " << BCells << " - % of the Forest: " <<  BCells/nCells*100.0 <<"%" << std::endl;
+	results << "Total Non-Burnable Cells: " << NBCells << " - % of the Forest: " <<  NBCells/nCells*100.0 <<"%"<< std::endl;
+	results << "Total Harvested Cells: " << HCells << " - % of the Forest: " <<  HCells/nCells*100.0 <<"%"<< std::endl;
+	printMessage(results.str());
 
 	// Final Grid 
 	if(this->args.FinalGrid){
@@ -1163,17 +1243,33 @@ void Cell2Fire::Results(){
 void Cell2Fire::outputGrid(){
 	// FileName
 	std::string gridName;
-	std::vector<int> statusCells2(this->nCells, 0); //(long int, int);
+	bool binary = this->args.GridsFormat == "binary";
 	
-	// Update status 
+	// Update status: cells never leave the burning/burnt sets during a simulation, so only the cells
+	// burnt since the previous grid are marked (harvested cells keep -1)
 	for (auto & bc : this->burningCells){
-			statusCells2[bc-1] = 1;
+		if (this->gridStatus[bc-1] == 0){
+			this->gridStatus[bc-1] = 1;
+			if (binary){
+				this->gridChanges.push_back(bc-1);
+				this->gridChanges.push_back(this->gridNumber);
+			}
+		}
 	}
 	for (auto & ac : this->burntCells){
-			statusCells2[ac-1] = 1;
+		if (this->gridStatus[ac-1] == 0){
+			this->gridStatus[ac-1] = 1;
+			if (binary){
+				this->gridChanges.push_back(ac-1);
+				this->gridChanges.push_back(this->gridNumber);
+			}
+		}
 	}
-	for (auto & hc : this->harvestCells){
-			statusCells2[hc-1] = -1;
+	
+	// Binary format: changes are written once at the end of the simulation (outputGridChanges)
+	if (binary){
+		this->gridNumber++;
+		return;
 	}
 		
 	if (this->gridNumber < 10){
@@ -1184,16 +1280,69 @@ void Cell2Fire::outputGrid(){
 			gridName = this->gridFolder+ "ForestGrid" + std::to_string(this->gridNumber) + ".csv";
 	}
 	
+	if (this->args.GridsFormat == "gzip"){
+		gridName += ".gz";
+	}
+	
 	if(this->args.verbose){
 		std::cout  << "We are plotting the current forest to a csv file " << gridName << std::endl;
 	}
 	
 	CSVWriter CSVPloter(gridName, ",");
-	CSVPloter.printCSV_V2(this->rows, this->cols, statusCells2);
+	CSVPloter.printGrid(this->rows, this->cols, this->gridStatus, this->args.GridsFormat == "gzip");
 	this->gridNumber++;
 }
 
 
+// Write the grid changes of the simulation (--grids-format binary) to ForestGrids.bin
+void Cell2Fire::outputGridChanges(){
+	std::vector<uint32_t> harvested;
+	for (auto & hc : this->harvestCells){
+		harvested.push_back(hc-1);
+	}
+	std::sort(harvested.begin(), harvested.end());
+	
+	std::string changesName = this->gridFolder + "ForestGrids.bin";
+	if(this->args.verbose){
+		std::cout  << "We are writing the grid changes to a binary file " << changesName << std::endl;
+	}
+	
+	CSVWriter CSVPloter(changesName, ",");
+	CSVPloter.printGridChanges(this->rows, this->cols, this->gridNumber, harvested, this->gridChanges);
+}
+
+
+// Record the arrival period, time and ROS of the cells ignited by the messages of the current period
+void Cell2Fire::updateArrival(const std::unordered_set<int> & burntList){
+	// Messages sent since the last update: (from, to, period, ros) entries of FSCell
+	for (size_t m = this->arrivalMessages; m + 3 < this->FSCell.size(); m += 4){
+		int target = (int) this->FSCell[m + 1];
+		if (this->arrivalPeriod[target-1] == -1 && burntList.find(target) != burntList.end()){
+			this->arrivalROS[target-1] = std::max(this->arrivalROS[target-1], (float) this->FSCell[m + 3]);
+		}
+	}
+	this->arrivalMessages = this->FSCell.size();
+	
+	for (auto & bc : burntList){
+		if (this->arrivalPeriod[bc-1] == -1){
+			this->arrivalPeriod[bc-1] = this->fire_period[this->year-1];
+			this->arrivalTime[bc-1] = this->fire_period[this->year-1] * this->args.FirePeriodLen;
+		}
+	}
+}
+
+
+// Write the arrivals of the simulation (--output-arrival) to CellArrivalNN.npy
+void Cell2Fire::outputArrival(){
+	if(this->args.verbose){
+		std::cout  << "We are writing the cells arrival to a npy file " << this->arrivalFile << std::endl;
+	}
+	
+	CSVWriter CSVPloter(this->arrivalFile, ",");
+	CSVPloter.printArrival(this->rows, this->cols, this->arrivalPeriod, this->arrivalTime, this->arrivalROS);
+}
+
+
 // Update hourly weather (and grid)
 void Cell2Fire::updateWeather(){
 	if (this->args.WeatherOpt != "constant" && this->fire_period[this->year - 1] * this->args.FirePeriodLen / this->args.MinutesPerWP > this->weatherPeriod + 1) {
@@ -1390,61 +1539,267 @@ std::vector<float> Cell2Fire::getFireProgressMatrix(){
 																Main Program	
 
 *******************************************************************************/
-int main(int argc, char * argv[]){
-	// Read Arguments
-	std::cout << "------ Command line values ------\n";
-	arguments args;
-	arguments * args_ptr = &args;
-	parseArgs(argc, argv, args_ptr);
-	//printArgs(args);
+// Attempts of a replication without any ignition (as the original episodes loop, TotalSims * 10)
+const int MAX_IGNITION_ATTEMPTS = 10;
+
+// One replication (episode) from a reset environment until the fire is done, true if any cell ignited
+bool runReplication(Cell2Fire & Forest, int sim, int rnumber, double rnumber2, std::default_random_engine generator){
+	int tstep = 0;
+	
+	// Reset
+	Forest.reset(rnumber, rnumber2, sim);
+	
+	// Time steps during horizon (or until we break it)
+	for (tstep = 0; tstep <= Forest.args.MaxFirePeriods * Forest.args.TotalYears ; tstep++){   
+		//DEBUGprintf("\n ---- tstep %d \n", tstep);
+		Forest.Step(generator);
+		//DEBUGprintf("\nDone: %d", Forest.done);
+		
+		if (Forest.done){
+			//DEBUGprintf("\n Done = True!, break \n");
+			break;
+		}
+	}
+	
+	// Binary grids: one file with all the grid changes of the replication
+	if (Forest.args.GridsFormat == "binary" && Forest.gridNumber > 0){
+		Forest.outputGridChanges();
+	}
+	
+	// Arrival of every cell
+	if (Forest.args.OutArrival){
+		Forest.outputArrival();
+	}
+	
+	return Forest.nIgnitions > 0;
+}
+
+
+// Replication that is re-run with new random numbers while no ignition occurs (ignition point
+// already burnt or non-burnable), at most MAX_IGNITION_ATTEMPTS times. Each attempt writes the
+// same sim number, so the last attempt's outputs are kept. Retry numbers come from a generator
+// seeded with (seed, sim, attempt): they do not depend on the number of threads or shards
+void runReplicationAttempts(Cell2Fire & Forest, int sim, int rnumber, double rnumber2, std::default_random_engine generator){
+	std::uniform_int_distribution<int> udistribution(1, Forest.args.NWeatherFiles);
+	std::normal_distribution<double> ndistribution(0.0,1.0);
+	
+	for (int attempt = 1; attempt <= MAX_IGNITION_ATTEMPTS; attempt++){
+		if (attempt > 1){
+			if (Forest.args.verbose){
+				std::cout << "No ignition in sim " << sim << ", attempt " << attempt << std::endl;
+			}
+			std::seed_seq retrySeed{Forest.args.seed, sim, attempt};
+			generator.seed(retrySeed);
+			rnumber = udistribution(generator);
+			rnumber2 = ndistribution(generator);
+		}
+		if (runReplication(Forest, sim, rnumber, rnumber2, generator)){
+			return;
+		}
+	}
+}
+
+
+// All replications of the current arguments (FirstSim .. FirstSim + TotalSims - 1)
+void runReplications(Cell2Fire & Forest){
+	arguments & args = Forest.args;
 	
 	// Random generator and distributions
 	std::default_random_engine generator (args.seed);
 	std::uniform_int_distribution<int> udistribution(1, args.NWeatherFiles);		// Get random weather
 	std::normal_distribution<double> ndistribution(0.0,1.0);  							// ROSRV
 	
-	// Random numbers (weather file and ROS-CV)
-	int rnumber;
-	double rnumber2;
-	
-	// Initialize Instance
-	Cell2Fire Forest(args);
-	
-	// Random ignition 
-	std::uniform_int_distribution<int> udistributionIgnition(1, Forest.nCells);		// Get random ignition point
+	// Random numbers (weather file and ROS-CV) and generator state of each replication,
+	// drawn in replication order so results do not depend on the number of threads.
+	// Replications before --first-sim are drawn and skipped (a shard of a larger run)
+	int firstSim = std::max(1, args.FirstSim);
+	for (int i = 1; i < firstSim; i++){
+		udistribution(generator);
+		ndistribution(generator);
+	}
+	std::vector<int> rnumbers(args.TotalSims);
+	std::vector<double> rnumbers2(args.TotalSims);
+	std::vector<std::default_random_engine> generators(args.TotalSims);
+	for (int i = 0; i < args.TotalSims; i++){
+		rnumbers[i] = udistribution(generator);
+		rnumbers2[i] = ndistribution(generator);
+		generators[i] = generator;
+	}
 	
-	// Episodes
-	int ep = 0;
-	int tstep = 0;
-		
 	// Episodes loop (episode = replication)
-	// CP: Modified to account the case when no ignition occurs and no grids are generated (currently we are not generating grid when no ignition happened, TODO)
-	for(ep = 1; ep <= args.TotalSims * 10; ep++){
-		// Reset environment (passing new random numbers)
-		rnumber = udistribution(generator);
-		rnumber2 = ndistribution(generator);
-		
-		// Reset
-    Forest.reset(rnumber, rnumber2);
-	
-		// Time steps during horizon (or until we break it)
-		for (tstep = 0; tstep <= Forest.args.MaxFirePeriods * Forest.args.TotalYears ; tstep++){   
-			//DEBUGprintf("\n ---- tstep %d \n", tstep);
-			Forest.Step(generator);
-			//DEBUGprintf("\nDone: %d", Forest.done);
+#ifdef _OPENMP
+	int nthreads = std::max(1, std::min(args.nthreads, args.TotalSims));
+	if (nthreads > 1){
+		#pragma omp parallel num_threads(nthreads)
+		{
+			// Each thread simulates on its own copy of the instance
+			Cell2Fire ThreadForest(Forest);
 			
-			if (Forest.done){
-				//DEBUGprintf("\n Done = True!, break \n");
-				break;
+			#pragma omp for schedule(dynamic, 1)
+			for (int ep = 1; ep <= args.TotalSims; ep++){
+				runReplicationAttempts(ThreadForest, firstSim + ep - 1, rnumbers[ep - 1], rnumbers2[ep - 1], generators[ep - 1]);
 			}
-		
 		}
-		// Enforces to satisfy the total number of simulations (if no ignition, find another cell until we obtain the TotalSim asked)
-		if (Forest.sim > args.TotalSims){
-			break;
+		return;
+	}
+#else
+	if (args.nthreads > 1){
+		std::cout << "Warning: compiled without OpenMP, running " << args.TotalSims << " replications on 1 thread" << std::endl;
+	}
+#endif
+	
+	for (int ep = 1; ep <= args.TotalSims; ep++){
+		runReplicationAttempts(Forest, firstSim + ep - 1, rnumbers[ep - 1], rnumbers2[ep - 1], generators[ep - 1]);
+	}
+}
+
+
+/******************************************************************************
+																Worker mode
+	
+	Keeps the instance loaded and runs scenarios read from stdin. A scenario is a
+	list of "option value" lines (options of the command line without "--") ended
+	by a "run" line; "quit" (or end of input) stops the worker:
+		output-folder /path/to/results/
+		nsims 10
+		seed 123
+		ROS-CV 0.5
+		ignitions 970          (ignition cell per year, comma separated)
+		weather /path/to/Weather.csv
+		run
+	Options not given keep the command line values. Replies are single lines starting
+	with WORKER_REPLY: "ready <nCells>", "done <nsims>" or "error <message>"; any other
+	output line is the usual simulation log.
+*******************************************************************************/
+const std::string WORKER_REPLY = "#cell2fire-worker ";
+
+void workerReply(const std::string & message){
+	printMessage(WORKER_REPLY + message + "\n");
+}
+
+
+// Scenario values in the same format as the command line echo (the log of each scenario starts with them)
+void printScenario(const arguments & args){
+	std::ostringstream scenario;
+	scenario << "------ Scenario values ------\n";
+	scenario << "InFolder: " << args.InFolder << " \n";
+	scenario << "OutFolder: " << args.OutFolder << " \n";
+	scenario << "Ignitions: " << args.Ignitions << " \n";
+	scenario << "TotalSims: " << args.TotalSims << " \n";
+	scenario << "FirePeriodLength: " << args.FirePeriodLen << " \n";
+	scenario << "ROS-CV: " << args.ROSCV << " \n";
+	scenario << "seed: " << args.seed << " \n";
+	scenario << "nthreads: " << args.nthreads << " \n";
+	scenario << "FirstSim: " << args.FirstSim << " \n";
+	printMessage(scenario.str());
+}
+
+
+// Apply one scenario on top of the command line arguments (returns an error message, empty if valid)
+std::string applyScenario(Cell2Fire & Forest, const arguments & baseArgs, 
+										const std::vector<std::vector<std::string>> & baseWeather, const std::vector<int> & baseIgnitions, 
+										const std::vector<std::pair<std::string, std::string>> & options){
+	arguments args = baseArgs;
+	std::vector<int> ignitions = baseIgnitions;
+	std::vector<std::vector<std::string>> weather;
+	
+	for (auto & option : options){
+		const std::string & key = option.first;
+		const std::string & value = option.second;
+		try {
+			if (key == "output-folder") args.OutFolder = value;
+			else if (key == "nsims") args.TotalSims = std::stoi(value);
+			else if (key == "seed") args.seed = std::stoi(value);
+			else if (key == "ROS-CV") args.ROSCV = std::stof(value);
+			else if (key == "first-sim") args.FirstSim = std::stoi(value);
+			else if (key == "nthreads") args.nthreads = std::stoi(value);
+			else if (key == "ignitions") {
+				ignitions.clear();
+				std::stringstream cells(value);
+				std::string cell;
+				while (std::getline(cells, cell, ',')) ignitions.push_back(std::stoi(cell));
+				args.Ignitions = true;
+			}
+			else if (key == "weather") {
+				CSVReader CSVScenarioWeather(value, ",");
+				weather = CSVScenarioWeather.getData();
+				if (weather.size() < 2) return "no weather periods in " + value;
+			}
+			else return "unknown option " + key;
+		}
+		catch (const std::exception & e) {
+			return "invalid " + key + ": " + value;
+		}
+	}
+	
+	// Checks
+	if (args.TotalSims < 1) return "nsims must be positive";
+	if (args.Ignitions) {
+		if (ignitions.empty()) return "no ignition points";
+		for (auto & cell : ignitions){
+			if (cell < 1 || cell > Forest.nCells) return "ignition cell " + std::to_string(cell) + " is outside the landscape";
+		}
+	}
+	
+	// Scenario on the loaded instance (forest, fuels and adjacency are kept)
+	Forest.args = args;
+	Forest.setWeather(weather.empty() ? baseWeather : weather);
+	if (args.Ignitions) Forest.setIgnitions(ignitions);
+	Forest.fire_period = vector<int>(Forest.args.TotalYears, 0);
+	return "";
+}
+
+
+// Scenario loop over stdin
+int runWorker(Cell2Fire & Forest, const arguments & baseArgs){
+	const std::vector<std::vector<std::string>> baseWeather = Forest.WeatherDF;
+	const std::vector<int> baseIgnitions = Forest.IgnitionPoints;
+	std::vector<std::pair<std::string, std::string>> options;
+	std::string line;
+	
+	workerReply("ready " + std::to_string(Forest.nCells));
+	while (std::getline(std::cin, line)){
+		if (!line.empty() && line.back() == '\r') line.pop_back();
+		if (line.empty()) continue;
+		if (line == "quit") break;
+		
+		if (line != "run"){
+			size_t split = line.find(' ');
+			if (split == std::string::npos) options.push_back(std::make_pair(line, std::string("")));
+			else options.push_back(std::make_pair(line.substr(0, split), line.substr(split + 1)));
+			continue;
 		}
 		
+		std::string error = applyScenario(Forest, baseArgs, baseWeather, baseIgnitions, options);
+		options.clear();
+		if (!error.empty()){
+			workerReply("error " + error);
+			continue;
+		}
+		printScenario(Forest.args);
+		runReplications(Forest);
+		workerReply("done " + std::to_string(Forest.args.TotalSims));
+	}
+	return 0;
+}
+
+
+int main(int argc, char * argv[]){
+	// Read Arguments
+	std::cout << "------ Command line values ------\n";
+	arguments args;
+	arguments * args_ptr = &args;
+	parseArgs(argc, argv, args_ptr);
+	//printArgs(args);
+	
+	// Initialize Instance
+	Cell2Fire Forest(args);
+	
+	// Long-lived worker (scenarios from stdin) or a single run
+	if (args.Worker){
+		return runWorker(Forest, args);
 	}
+	runReplications(Forest);
 	
 	return 0;
 }
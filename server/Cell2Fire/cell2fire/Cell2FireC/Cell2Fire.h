@@ -67,6 +67,7 @@ class Cell2Fire {
 		// Strings	
 		 string gridFolder;
 		 string messagesFolder;
+		 string arrivalFile;
 	
 		 // Vectors
 		 std::vector<int> fire_period;
@@ -82,6 +83,12 @@ class Cell2Fire {
 		 std::vector<double> FSCell;
 		 //std::vector<unordered_set<int>> IgnitionSets;
 		 std::vector<std::vector<int>> IgnitionSets;
+		 std::vector<int> gridStatus;   		// Grid values (1 burnt, -1 harvested), only new burnt cells are updated per grid
+		 std::vector<uint32_t> gridChanges;   // (cell, grid number) pairs for --grids-format binary
+		 std::vector<int> arrivalPeriod;   	// --output-arrival: fire period in which each cell ignited (-1 not burnt, -2 harvested)
+		 std::vector<float> arrivalTime;    	// minutes (period x FirePeriodLen, infinity if not burnt)
+		 std::vector<float> arrivalROS;     	// ROS (m/min) of the fastest message that ignited the cell
+		 size_t arrivalMessages = 0;        	// FSCell entries already checked for arrivals
 		 
 		 // Sets
 		 std::unordered_set<int> availCells;				
@@ -93,20 +100,33 @@ class Cell2Fire {
 		 // Cells Dictionary
 		 std::unordered_map<int, CellsFBP> Cells_Obj;
 		 
+		 // Cells and weather data (per instance: replications running on other threads use their own copy)
+		 std::vector<inputs> df;
+		 std::vector<weatherDF> wdf;
+		 std::unordered_map<int, std::vector<float>> BBOFactors;
+		 std::unordered_map<int, std::vector<int>> HarvestedCells;   
+		 std::vector<int> NFTypesCells;
+		 
 		 // Constructor
         Cell2Fire(arguments args);
+        Cell2Fire(const Cell2Fire & other);
 		
 		// Methods
 		void InitCell(int id);
-        void reset(int rnumber, double rnumber2);
+        void reset(int rnumber, double rnumber2, int simExt = 1);
 		bool RunIgnition(std::default_random_engine generator);
 		std::unordered_map<int, std::vector<int>> SendMessages();
 		void GetMessages(std::unordered_map<int, std::vector<int>> sendMessageList);
 		void Results();
 		void outputGrid();
+		void outputGridChanges();
+		void updateArrival(const std::unordered_set<int> & burntList);
+		void outputArrival();
 		void updateWeather();
 		void Step(std::default_random_engine generator);
 		void InitHarvested();
+		void setIgnitions(std::vector<int> IgnitionPoints);
+		void setWeather(std::vector<std::vector<std::string>> WeatherDF);
 		
 		// Utils
 		std::vector<float> getROSMatrix();
@@ -7,6 +7,7 @@
 #include <iterator>
 #include <string>
 #include <algorithm>
+#include <cstdlib>
 
 
 char* getCmdOption(char ** begin, char ** end, const std::string & option)
@@ -62,9 +63,17 @@ void parseArgs(int argc, char * argv[], arguments * args_ptr)
         printf("HarvestPlan: %s \n", input_hplan);
     }
 	else input_hplan = &empty;
+	
+	//--grids-format (csv, gzip: ForestGridNN.csv.gz, binary: one ForestGrids.bin with the changes per sim)
+	char * input_grids_format = getCmdOption(argv, argv + argc, "--grids-format");
+    if (input_grids_format){
+        printf("GridsFormat: %s \n", input_grids_format);
+    }
+	else input_grids_format = &empty;
 		
 	// Booleans
 	bool out_messages = false;
+	bool out_arrival = false;
 	bool out_trajectories = false;
 	bool no_output = false; 
 	bool verbose_input = false;
@@ -74,6 +83,7 @@ void parseArgs(int argc, char * argv[], arguments * args_ptr)
 	bool prom_tuned = false;
 	bool out_stats = false;	
 	bool bbo_tuning = false;
+	bool worker_mode = false;
 	
 	//--out-messages
     if(cmdOptionExists(argv, argv+argc, "--output-messages")){
@@ -81,6 +91,12 @@ void parseArgs(int argc, char * argv[], arguments * args_ptr)
         printf("OutMessages: %d \n", out_messages);
     }
 	
+	//--output-arrival (per sim CellArrivalNN.npy with the ignition period, time and ROS of every cell)
+    if(cmdOptionExists(argv, argv+argc, "--output-arrival")){
+        out_arrival = true;
+        printf("OutArrival: %d \n", out_arrival);
+    }
+	
 	//--trajectories
     if(cmdOptionExists(argv, argv+argc, "--trajectories")){
         out_trajectories = true;
@@ -134,6 +150,12 @@ void parseArgs(int argc, char * argv[], arguments * args_ptr)
         bbo_tuning = true;
 		printf("BBOTuning: %d \n", out_stats);
     }
+	
+	//--worker
+	if(cmdOptionExists(argv, argv+argc, "--worker")){
+        worker_mode = true;
+		printf("Worker: %d \n", worker_mode);
+    }
 
 	
 	// Floats and ints
@@ -144,6 +166,8 @@ void parseArgs(int argc, char * argv[], arguments * args_ptr)
 	int dweather_files = 1;
 	int dmax_fire_periods= 10000000;
 	int dseed = 123;
+	int dnthreads = 1;
+	int dfirst_sim = 1;
 	int diradius = 0;
 	float dROS_Threshold= 0.1;
 	float dHFI_Threshold= 0.1;
@@ -280,6 +304,22 @@ void parseArgs(int argc, char * argv[], arguments * args_ptr)
 		args_ptr->seed = std::stoi (seed ,&sz); 
     }
 	else args_ptr->seed = dseed;
+
+	//--nthreads  (int)
+	char * nthreads = getCmdOption(argv, argv + argc, "--nthreads");
+    if (nthreads){
+        printf("nthreads: %s \n", nthreads);
+		args_ptr->nthreads = std::stoi (nthreads ,&sz); 
+    }
+	else args_ptr->nthreads = dnthreads;
+
+	//--first-sim  (int)
+	char * first_sim = getCmdOption(argv, argv + argc, "--first-sim");
+    if (first_sim){
+        printf("FirstSim: %s \n", first_sim);
+		args_ptr->FirstSim = std::stoi (first_sim ,&sz); 
+    }
+	else args_ptr->FirstSim = dfirst_sim;
 	
 	// Populate structure
 	// Strings 
@@ -309,9 +349,20 @@ void parseArgs(int argc, char * argv[], arguments * args_ptr)
 		args_ptr->HarvestPlan = ""; 
 	}
 	else args_ptr->HarvestPlan = input_hplan; 
+	
+	if (input_grids_format == &empty){
+		args_ptr->GridsFormat = "csv";
+	}
+	else args_ptr->GridsFormat = input_grids_format;
+	
+	if (args_ptr->GridsFormat != "csv" && args_ptr->GridsFormat != "gzip" && args_ptr->GridsFormat != "binary"){
+		std::cerr << "--grids-format must be csv, gzip or binary (got " << args_ptr->GridsFormat << ")" << std::endl;
+		exit(EXIT_FAILURE);
+	}
 		
 	// booleans
 	args_ptr->OutMessages = out_messages;
+	args_ptr->OutArrival = out_arrival;
 	args_ptr->Trajectories = out_trajectories; 
 	args_ptr->NoOutput = no_output;
 	args_ptr->verbose = verbose_input; 
@@ -321,6 +372,7 @@ void parseArgs(int argc, char * argv[], arguments * args_ptr)
 	args_ptr->PromTuned = prom_tuned;
 	args_ptr->Stats = out_stats;   
 	args_ptr->BBOTuning = bbo_tuning;   
+	args_ptr->Worker = worker_mode;   
 	
 }
 
@@ -333,6 +385,7 @@ void printArgs(arguments args){
 	std::cout << "MinutesPerWP: " << args.MinutesPerWP << std::endl; 
 	std::cout << "MaxFirePeriods: " << args.MaxFirePeriods << std::endl; 
 	std::cout << "Messages: " << args.OutMessages << std::endl; 
+	std::cout << "Arrival: " << args.OutArrival << std::endl; 
 	std::cout << "HarvestPlan: " << args.HarvestPlan << std::endl; 
 	std::cout << "TotalYears: " << args.TotalYears << std::endl; 
 	std::cout << "TotalSims: " << args.TotalSims << std::endl; 
@@ -341,12 +394,15 @@ void printArgs(arguments args){
 	std::cout << "IgnitionRad: " << args.IgnitionRadius << std::endl; 
 	std::cout << "OutputGrid: " << args.OutputGrids << std::endl; 
 	std::cout << "FinalGrid: " << args.FinalGrid << std::endl; 
+	std::cout << "GridsFormat: " << args.GridsFormat << std::endl; 
 	std::cout << "PromTuned: " << args.PromTuned << std::endl; 
 	std::cout << "BBOTuning: " << args.BBOTuning << std::endl; 
 	std::cout << "Statistics: " << args.Stats << std::endl; 
 	std::cout << "noOutput: " << args.NoOutput << std::endl; 
 	std::cout << "verbose: " << args.verbose << std::endl; 
 	std::cout << "seed: " << args.seed << std::endl; 
+	std::cout << "nthreads: " << args.nthreads << std::endl; 
+	std::cout << "FirstSim: " << args.FirstSim << std::endl; 
 	
 	
 	
@@ -14,10 +14,10 @@
 *   Args structure
 */
 typedef struct{ 
-	std::string InFolder, OutFolder, WeatherOpt, HarvestPlan;
-	bool OutMessages, Trajectories, NoOutput, verbose, Ignitions, OutputGrids, FinalGrid, PromTuned, Stats, BBOTuning;
+	std::string InFolder, OutFolder, WeatherOpt, HarvestPlan, GridsFormat;
+	bool OutMessages, OutArrival, Trajectories, NoOutput, verbose, Ignitions, OutputGrids, FinalGrid, PromTuned, Stats, BBOTuning, Worker;
 	float ROSCV, ROSThreshold, HFIThreshold, HFactor, FFactor, BFactor, EFactor, FirePeriodLen;
-	int MinutesPerWP, MaxFirePeriods, TotalYears, TotalSims, NWeatherFiles, IgnitionRadius, seed;
+	int MinutesPerWP, MaxFirePeriods, TotalYears, TotalSims, NWeatherFiles, IgnitionRadius, seed, nthreads, FirstSim;
 	std::unordered_set<int>  HCells, BCells;
 } arguments;
 
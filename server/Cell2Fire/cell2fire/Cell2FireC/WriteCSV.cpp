@@ -11,6 +11,7 @@
 #include <unordered_set>
 #include <boost/algorithm/string.hpp>
 #include <set>
+#include <zlib.h>
  
 /*
  * Constructur
@@ -23,14 +24,10 @@ CSVWriter::CSVWriter(std::string filename, std::string delm){
  
  
 /*
-* Prints iterator into a row of a csv file 
+* Prints iterator into a row of a csv stream 
 */
 template<typename T>
-void CSVWriter::addDatainRow(T first, T last){
-	std::fstream file;
-	// Open the file in truncate mode if first line else in Append Mode
-	file.open(this->fileName, std::ios::out | (this->linesCount ? std::ios::app : std::ios::trunc));
- 
+void CSVWriter::addDatainRow(std::ostream & file, T first, T last){
 	// Iterate over the range and add each element to file seperated by delimeter.
 	for (; first != last; )
 	{
@@ -40,61 +37,121 @@ void CSVWriter::addDatainRow(T first, T last){
 	}
 	file << "\n";
 	this->linesCount++;
- 
-	// Close the file
-	file.close();
 }
 
 /*
 *     Creates CSV
 */
-void CSVWriter::printCSV(int rows, int cols, std::vector<int> statusCells)
+void CSVWriter::printCSV(int rows, int cols, const std::vector<int> & statusCells)
 {
-	// Create a rowVector for printing
-	std::vector<int> rowVector;
- 
-	// Adding vector to CSV File
-	int r, c;
+	// File is opened once (truncate mode) and rows are written through its buffer
+	std::ofstream file(this->fileName, std::ofstream::out | std::ofstream::trunc);
 	
 	// Printing rows (output)
-	for (r=0; r<rows; r++){
-		for (c=0; c < cols; c++){
-			
-			std::vector<int>::const_iterator first = statusCells.begin() + c+r*cols;
-			std::vector<int>::const_iterator last = statusCells.begin() + c+r*cols +cols;
-			std::vector<int> rowVector(first, last);
-						
-			this->addDatainRow(rowVector.begin(), rowVector.end());
-			c+=cols;
-		}
+	for (int r=0; r<rows; r++){
+		this->addDatainRow(file, statusCells.begin() + r*cols, statusCells.begin() + r*cols + cols);
 	}
 	
 }
 
-void CSVWriter::printCSV_V2(int rows, int cols, std::vector<int> statusCells)
+void CSVWriter::printCSV_V2(int rows, int cols, const std::vector<int> & statusCells)
 {
-	std::ofstream ofs(this->fileName, std::ofstream::out);
-	std::string toOut;
-	int r,c,i;
+	this->printGrid(rows, cols, statusCells);
+}
+
+
+/*
+*     Creates a grid file: the whole grid is formatted in one buffer and written at once
+*/
+void CSVWriter::printGrid(int rows, int cols, const std::vector<int> & statusCells, bool compress)
+{
+	std::string buffer;
+	buffer.reserve((size_t) rows * cols * 2 + rows);
+	int r, c, value;
 	
 	for (r = 0; r < rows; r++)
 	{
 		for (c = 0; c < cols; c++)
 		{
-			std::string toOut;
-			for (i = 0; i < cols; i ++){
-				if (i == cols - 1){
-					toOut += std::to_string(statusCells[c+r*cols + i]);
-				}
-				else{
-					toOut += std::to_string(statusCells[c+r*cols + i])  + this->delimeter;
-				}
-			}
-			ofs << toOut << "\n";
-			c+=cols;
+			// Status values are almost always 0, 1 or -1
+			value = statusCells[c + r*cols];
+			if (value == 0) buffer += '0';
+			else if (value == 1) buffer += '1';
+			else if (value == -1) buffer += "-1";
+			else buffer += std::to_string(value);
+			
+			if (c < cols - 1) buffer += this->delimeter;
 		}
+		buffer += '\n';
 	}
-	// Close file 
+	
+	if (compress){
+		gzFile gz = gzopen(this->fileName.c_str(), "wb");
+		if (gz == NULL){
+			std::cerr << "Could not open " << this->fileName << std::endl;
+			return;
+		}
+		gzwrite(gz, buffer.data(), buffer.size());
+		gzclose(gz);
+	}
+	else {
+		std::ofstream ofs(this->fileName, std::ofstream::out | std::ofstream::binary);
+		ofs.write(buffer.data(), buffer.size());
+		ofs.close();
+	}
+	this->linesCount += rows;
+}
+
+
+/*
+*     Creates the binary grid changes of one simulation (native byte order, little-endian on supported platforms):
+*         "C2FG", uint32 version, rows, cols, grids, nHarvested, nChanges
+*         uint32 harvested cell [nHarvested]
+*         (uint32 cell, uint32 grid) [nChanges]
+*     Cells are 0-based, a change means the cell is burnt from ForestGrid number grid on
+*/
+void CSVWriter::printGridChanges(int rows, int cols, int grids, const std::vector<uint32_t> & harvested, const std::vector<uint32_t> & changes)
+{
+	const uint32_t version = 1;
+	uint32_t header[6] = {version, (uint32_t) rows, (uint32_t) cols, (uint32_t) grids, (uint32_t) harvested.size(), (uint32_t) (changes.size() / 2)};
+	
+	std::ofstream ofs(this->fileName, std::ofstream::out | std::ofstream::binary);
+	ofs.write("C2FG", 4);
+	ofs.write(reinterpret_cast<const char *>(header), sizeof(header));
+	ofs.write(reinterpret_cast<const char *>(harvested.data()), harvested.size() * sizeof(uint32_t));
+	ofs.write(reinterpret_cast<const char *>(changes.data()), changes.size() * sizeof(uint32_t));
+	ofs.close();
+}
+
+
+/*
+*     Creates the arrival file of one simulation: NumPy .npy (format 1.0) with a rows x cols structured array
+*     of (int32 period, float32 time, float32 ros) records, little-endian, written with a single call
+*/
+void CSVWriter::printArrival(int rows, int cols, const std::vector<int> & period, const std::vector<float> & time, const std::vector<float> & ros)
+{
+	std::string header = "{'descr': [('period', '<i4'), ('time', '<f4'), ('ros', '<f4')], 'fortran_order': False, 'shape': (" 
+									+ std::to_string(rows) + ", " + std::to_string(cols) + "), }";
+	
+	// Magic, version and header length (10 bytes) + header ending in a newline, padded to a multiple of 64
+	size_t total = 10 + header.size() + 1;
+	header += std::string((64 - total % 64) % 64, ' ') + "\n";
+	uint16_t headerLen = (uint16_t) header.size();
+	
+	size_t nCells = (size_t) rows * cols;
+	std::string buffer("\x93NUMPY\x01\x00", 8);
+	buffer.append(reinterpret_cast<const char *>(&headerLen), 2);
+	buffer += header;
+	buffer.reserve(buffer.size() + nCells * 12);
+	for (size_t i = 0; i < nCells; i++){
+		int32_t p = period[i];
+		buffer.append(reinterpret_cast<const char *>(&p), 4);
+		buffer.append(reinterpret_cast<const char *>(&time[i]), 4);
+		buffer.append(reinterpret_cast<const char *>(&ros[i]), 4);
+	}
+	
+	std::ofstream ofs(this->fileName, std::ofstream::out | std::ofstream::binary);
+	ofs.write(buffer.data(), buffer.size());
 	ofs.close();
 }
 
@@ -102,25 +159,14 @@ void CSVWriter::printCSV_V2(int rows, int cols, std::vector<int> statusCells)
 /*
 *     Creates CSVDouble
 */
-void CSVWriter::printCSVDouble(int rows, int cols, std::vector<double> network)
+void CSVWriter::printCSVDouble(int rows, int cols, const std::vector<double> & network)
 {
-	// Create a rowVector for printing
-	std::vector<double> rowVector;
- 
-	// Adding vector to CSV File
-	int r, c;
+	// File is opened once (truncate mode) and rows are written through its buffer
+	std::ofstream file(this->fileName, std::ofstream::out | std::ofstream::trunc);
 	
 	// Printing rows (output)
-	for (r=0; r < rows; r++){
-		for (c=0; c < cols; c++){
-			
-			std::vector<double>::const_iterator first = network.begin() + c+r*cols;
-			std::vector<double>::const_iterator last = network.begin() + c+r*cols +cols;
-			std::vector<double> rowVector(first, last);
-						
-			this->addDatainRow(rowVector.begin(), rowVector.end());
-			c+=cols;
-		}
+	for (int r=0; r < rows; r++){
+		this->addDatainRow(file, network.begin() + r*cols, network.begin() + r*cols + cols);
 	}
 	
 }
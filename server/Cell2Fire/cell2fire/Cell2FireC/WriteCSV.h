@@ -11,6 +11,7 @@
 #include <unordered_map>
 #include <unordered_set>
 #include <set>
+#include <cstdint>
 
  /*
  * A class to read data from a csv file.
@@ -28,16 +29,25 @@ public:
 	// Constructor
 	CSVWriter(std::string filename, std::string delm = ",");
  
-	// Function to write data (row) to a CSV File
+	// Function to write data (row) to an open CSV stream
 	template<typename T>
-	void addDatainRow(T first, T last);
+	void addDatainRow(std::ostream & file, T first, T last);
 	
 	// Function to write the entire file 
-	void printCSV(int rows, int cols, std::vector<int> statusCells);
-	void printCSV_V2(int rows, int cols, std::vector<int> statusCells);
-	void printCSVDouble(int rows, int cols, std::vector<double> network);
+	void printCSV(int rows, int cols, const std::vector<int> & statusCells);
+	void printCSV_V2(int rows, int cols, const std::vector<int> & statusCells);
+	void printCSVDouble(int rows, int cols, const std::vector<double> & network);
 	void printCSVDouble_V2(int rows, int cols, std::vector<double> network);
 	
+	// Function to write a grid with a single write call (gzip compressed if compress)
+	void printGrid(int rows, int cols, const std::vector<int> & statusCells, bool compress = false);
+	
+	// Function to write the compact binary grid changes of one simulation
+	void printGridChanges(int rows, int cols, int grids, const std::vector<uint32_t> & harvested, const std::vector<uint32_t> & changes);
+	
+	// Function to write the arrival (period, time, ROS) of every cell as a structured NumPy .npy array
+	void printArrival(int rows, int cols, const std::vector<int> & period, const std::vector<float> & time, const std::vector<float> & ros);
+	
 	// Function to create a directory
 	void MakeDir(std::string pathPlot);
 };
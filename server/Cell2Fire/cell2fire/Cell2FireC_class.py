@@ -10,9 +10,13 @@ import shutil
 import signal
 import subprocess
 import sys
+import threading
+from collections import OrderedDict
 import cell2fire.utils.DataGeneratorC as DataGenerator
 import cell2fire.utils.ReadDataPrometheus as ReadDataPrometheus
 from cell2fire.utils.ParseInputs import InitCells
+from cell2fire.utils.Shards import RunShards
+from cell2fire.utils.GridChanges import ExpandGridChanges
 from cell2fire.utils.Stats import *
 from cell2fire.utils.Heuristics import *
 import cell2fire  # for path finding
@@ -21,6 +25,38 @@ l = p.find("'")
 r = p.find("'", l+1)
 cell2fire_path = p[l+1:r]
 
+
+# Command line of the C++ core (empty strings are ignored by the engine)
+# --grids-format and --nthreads are only passed when they differ from the defaults (csv, 1 thread),
+# so a core built before these options existed still runs the default command line
+def execArgs(args, OutFolder, HarvestPlanFile):
+    # old: execArray=[os.path.join(os.getcwd(),'Cell2FireC/Cell2Fire'), 
+    return [os.path.join(cell2fire_path,'Cell2FireC/Cell2Fire'), 
+            '--input-instance-folder', args.InFolder,
+            '--output-folder', OutFolder if (OutFolder is not None) else '',
+            '--ignitions' if (args.ignitions) else '',
+            '--sim-years', str(args.sim_years),
+            '--nsims', str(args.nsims),
+            '--grids' if (args.grids) else '', '--final-grid' if (args.finalGrid) else '',
+            '--grids-format' if (args.grids_format != 'csv') else '',
+            args.grids_format if (args.grids_format != 'csv') else '',
+            '--Fire-Period-Length', str(args.input_PeriodLen),
+            '--output-messages' if (args.OutMessages) else '',
+            '--output-arrival' if (args.OutArrival) else '',
+            '--weather', args.WeatherOpt,
+            '--nweathers', str(args.nweathers),
+            '--ROS-CV', str(args.ROS_CV),
+            '--IgnitionRad', str(args.IgRadius), 
+            '--seed', str(int(args.seed)),
+            '--nthreads' if (int(args.nthreads) != 1) else '',
+            str(int(args.nthreads)) if (int(args.nthreads) != 1) else '',
+            '--ROS-Threshold', str(args.ROS_Threshold),
+            '--HFI-Threshold', str(args.HFI_Threshold),
+            '--bbo' if (args.BBO) else '',
+            '--HarvestPlan', HarvestPlanFile if(HarvestPlanFile is not None) else '',
+            '--verbose' if (args.verbose) else '']
+
+
 class Cell2FireC:
     # Constructor and initial run
     def __init__(self, args):
@@ -54,26 +90,7 @@ class Cell2FireC:
     # Run C++ Sim 
     def run(self):
         # Parse args for calling C++ via subprocess        
-        # old: execArray=[os.path.join(os.getcwd(),'Cell2FireC/Cell2Fire'), 
-        execArray=[os.path.join(cell2fire_path,'Cell2FireC/Cell2Fire'), 
-                   '--input-instance-folder', self.args.InFolder,
-                   '--output-folder', self.args.OutFolder if (self.args.OutFolder is not None) else '',
-                   '--ignitions' if (self.args.ignitions) else '',
-                   '--sim-years', str(self.args.sim_years),
-                   '--nsims', str(self.args.nsims),
-                   '--grids' if (self.args.grids) else '', '--final-grid' if (self.args.finalGrid) else '',
-                   '--Fire-Period-Length', str(self.args.input_PeriodLen),
-                   '--output-messages' if (self.args.OutMessages) else '',
-                   '--weather', self.args.WeatherOpt,
-                   '--nweathers', str(self.args.nweathers),
-                   '--ROS-CV', str(self.args.ROS_CV),
-                   '--IgnitionRad', str(self.args.IgRadius), 
-                   '--seed', str(int(self.args.seed)),
-                   '--ROS-Threshold', str(self.args.ROS_Threshold),
-                   '--HFI-Threshold', str(self.args.HFI_Threshold),
-                   '--bbo' if (self.args.BBO) else '',
-                   '--HarvestPlan', self.args.HCells if(self.args.HCells is not None) else '',
-				   '--verbose' if (self.args.verbose) else '',]
+        execArray = execArgs(self.args, self.args.OutFolder, self.args.HCells)
         
         # Output log
         if self.args.OutFolder is not None:
@@ -83,11 +100,14 @@ class Cell2FireC:
         else:
             LogName = os.path.join(self.args.InFolder, "LogFile.txt")   
 
-        # Perform the call
-        with open(LogName, 'w') as output:
-            proc = subprocess.Popen(execArray, stdout=output)
-            proc.communicate()
-        return_code = proc.wait()
+        # Perform the call (several engine processes if sharded)
+        if self.args.nshards > 1 and self.args.OutFolder is not None:
+            return_code = RunShards(execArray, self.args.OutFolder, LogName, self.args.nsims, self.args.nshards)
+        else:
+            with open(LogName, 'w') as output:
+                proc = subprocess.Popen(execArray, stdout=output)
+                proc.communicate()
+            return_code = proc.wait()
         if (return_code != 0):
            raise RuntimeError(f'C++ returned {return_code}.\nTry looking at {LogName}.') 
         
@@ -98,25 +118,7 @@ class Cell2FireC:
     # Run C++ Sim with heuristic treatment 
     def run_Heur(self, OutFolder, HarvestPlanFile):
         # Parse args for calling C++ via subprocess        
-        execArray=[os.path.join(cell2fire_path,'Cell2FireC/Cell2Fire'), 
-                   '--input-instance-folder', self.args.InFolder,
-                   '--output-folder', OutFolder if (OutFolder is not None) else '',
-                   '--ignitions' if (self.args.ignitions) else '',
-                   '--sim-years', str(self.args.sim_years),
-                   '--nsims', str(self.args.nsims),
-                   '--grids' if (self.args.grids) else '', '--final-grid' if (self.args.finalGrid) else '',
-                   '--Fire-Period-Length', str(self.args.input_PeriodLen),
-                   '--output-messages' if (self.args.OutMessages) else '',
-                   '--weather', self.args.WeatherOpt,
-                   '--nweathers', str(self.args.nweathers),
-                   '--ROS-CV', str(self.args.ROS_CV),
-                   '--IgnitionRad', str(self.args.IgRadius), 
-                   '--seed', str(int(self.args.seed)),
-                   '--ROS-Threshold', str(self.args.ROS_Threshold),
-                   '--HFI-Threshold', str(self.args.HFI_Threshold),
-                   '--bbo' if (self.args.BBO) else '',
-                   '--HarvestPlan', HarvestPlanFile if(HarvestPlanFile is not None) else '',
-				   '--verbose' if (self.args.verbose) else '']
+        execArray = execArgs(self.args, OutFolder, HarvestPlanFile)
         
         # Output log
         if OutFolder is not None:
@@ -126,11 +128,14 @@ class Cell2FireC:
         else:
             LogName = os.path.join(self.args.InFolder, "LogFile.txt")   
          
-        # Perform the call
-        with open(LogName, 'w') as output:
-            proc = subprocess.Popen(execArray, stdout=output)
-            proc.communicate()
-        return_code = proc.wait()
+        # Perform the call (several engine processes if sharded)
+        if self.args.nshards > 1 and OutFolder is not None:
+            return_code = RunShards(execArray, OutFolder, LogName, self.args.nsims, self.args.nshards)
+        else:
+            with open(LogName, 'w') as output:
+                proc = subprocess.Popen(execArray, stdout=output)
+                proc.communicate()
+            return_code = proc.wait()
         
         # End of the replications
         if HarvestPlanFile is not None:
@@ -253,8 +258,12 @@ class Cell2FireC:
                                   tCorrected=False,
                                   pdfOutputs=self.args.pdfOutputs)
 
+        # Binary grids: expand them into the ForestGridNN.csv files read by the statistics
+        if self.args.grids_format == "binary":
+            ExpandGridChanges(os.path.join(self.args.OutFolder, "Grids"))
+
         # Hourly Stats
-        if self.args.grids:
+        if self.args.grids or self.args.OutArrival:
             print("Hourly stats...")
             StatsPrinter.HourlyStats()
 
@@ -365,8 +374,12 @@ class Cell2FireC:
         # Dummy msg if needed
         self.DummyMsg()
         
+        # Binary grids: expand them into the ForestGridNN.csv files read by the statistics
+        if self.args.grids_format == "binary":
+            ExpandGridChanges(os.path.join(OutFolder, "Grids"))
+        
         # Hourly Stats
-        if self.args.grids:
+        if self.args.grids or self.args.OutArrival:
             print("Hourly stats...")
             StatsPrinter.HourlyStats()
 
@@ -635,3 +648,165 @@ class Cell2FireC:
                                     os.path.join(csvPath, SelHeur + "_" +str(fr) + ".csv"))
                 else:
                     print("No evaluation is performed, TF:", fr)
+
+
+# Scenario options of the engine worker mode (taken from args at every run, the rest is fixed per worker)
+WORKER_SCENARIO_ARGS = ('--output-folder', '--nsims', '--seed', '--ROS-CV', '--nthreads')
+
+
+class Cell2FireWorker:
+    '''
+    Long-lived C++ core (--worker) with the landscape of args.InFolder loaded once.
+    Each run sends a scenario (output folder, nsims, seed, ROS-CV, ignition cells, weather file)
+    over stdin and waits for the engine reply; the simulation log is written to OutFolder/LogFile.txt
+    '''
+    # Prefix of the engine replies (see runWorker in Cell2Fire.cpp)
+    REPLY = "#cell2fire-worker "
+
+    def __init__(self, args):
+        self.args = args
+        self.lock = threading.Lock()
+        self.startupLog = []
+
+        # Data.csv is needed by the engine (same as Cell2FireC)
+        dataName = os.path.join(args.InFolder, "Data.csv")
+        if os.path.isfile(dataName) is False:
+            print("Generating Data.csv File...")
+            DataGenerator.GenDataFile(args.InFolder)
+
+        execArray = execArgs(args, args.OutFolder, args.HCells) + ['--worker']
+        self.proc = subprocess.Popen(execArray, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                     universal_newlines=True, bufsize=1)
+        reply, message = self._readReply(self.startupLog.append)
+        if reply != "ready":
+            self.close()
+            raise RuntimeError(f'C++ worker did not start ({reply} {message}).\n' + "".join(self.startupLog[-20:]))
+        self.nCells = int(message)
+
+    # Worker key: engine arguments that are fixed for the life of the worker and the landscape files version
+    @staticmethod
+    def key(args):
+        execArray = execArgs(args, args.OutFolder, args.HCells)
+        for option in WORKER_SCENARIO_ARGS:
+            if option in execArray:
+                i = execArray.index(option)
+                execArray[i] = execArray[i + 1] = ''
+        versions = []
+        for name in ("Data.csv", "Forest.asc", "Weather.csv", "Ignitions.csv"):
+            path = os.path.join(args.InFolder, name)
+            versions.append(os.stat(path).st_mtime_ns if os.path.exists(path) else 0)
+        return tuple(execArray) + tuple(versions)
+
+    def alive(self):
+        return self.proc.poll() is None
+
+    # Read engine output until a reply line, passing the other lines to output
+    def _readReply(self, output):
+        for line in self.proc.stdout:
+            if line.startswith(self.REPLY):
+                reply, _, message = line[len(self.REPLY):].rstrip("\n").partition(" ")
+                return reply, message
+            output(line)
+        return "exit", str(self.proc.wait())
+
+    # Run one scenario (ignitions: cell per year, weather: path of a Weather.csv) and return OutFolder
+    def run(self, OutFolder, nsims=None, seed=None, ROS_CV=None, ignitions=None, weather=None, nthreads=None):
+        options = [('output-folder', OutFolder),
+                   ('nsims', self.args.nsims if nsims is None else nsims),
+                   ('seed', int(self.args.seed if seed is None else seed)),
+                   ('ROS-CV', self.args.ROS_CV if ROS_CV is None else ROS_CV),
+                   ('nthreads', int(self.args.nthreads if nthreads is None else nthreads))]
+        if ignitions is not None:
+            options.append(('ignitions', ",".join(str(int(cell)) for cell in ignitions)))
+        if weather is not None:
+            options.append(('weather', weather))
+        request = ""
+        for option, value in options:
+            if "\n" in str(value):
+                raise ValueError(f"Invalid {option}: {value!r}")
+            request += f"{option} {value}\n"
+
+        if os.path.isdir(OutFolder) is False:
+            os.makedirs(OutFolder)
+        LogName = os.path.join(OutFolder, "LogFile.txt")
+        with self.lock, open(LogName, 'w') as output:
+            try:
+                self.proc.stdin.write(request + "run\n")
+                self.proc.stdin.flush()
+            except (BrokenPipeError, OSError):
+                pass
+            reply, message = self._readReply(output.write)
+        if reply == "error":
+            raise ValueError(message)
+        if reply != "done":
+            raise RuntimeError(f'C++ worker returned {message}.\nTry looking at {LogName}.')
+        return OutFolder
+
+    def close(self):
+        if self.alive():
+            try:
+                self.proc.stdin.write("quit\n")
+                self.proc.stdin.close()
+                self.proc.wait(timeout=10)
+            except (BrokenPipeError, OSError, subprocess.TimeoutExpired):
+                self.proc.kill()
+                self.proc.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Cell2FireWorkerPool:
+    '''
+    Idle Cell2FireWorker processes by landscape (worker key). A run takes an idle worker with the
+    same key (or starts one), and gives it back afterwards; at most maxIdle workers are kept,
+    the least recently used are closed first. Workers that died are discarded.
+    '''
+    def __init__(self, maxIdle=2):
+        self.maxIdle = maxIdle
+        self.lock = threading.Lock()
+        self.idle = OrderedDict()   # (key, id) -> worker
+        self.started = 0
+
+    def _checkout(self, args):
+        key = Cell2FireWorker.key(args)
+        with self.lock:
+            for idleKey in reversed(self.idle):
+                if idleKey[0] == key:
+                    return self.idle.pop(idleKey)
+        worker = Cell2FireWorker(args)
+        with self.lock:
+            self.started += 1
+        return worker
+
+    def _checkin(self, args, worker):
+        closing = []
+        with self.lock:
+            if worker.alive():
+                self.idle[(Cell2FireWorker.key(args), id(worker))] = worker
+            while len(self.idle) > self.maxIdle:
+                closing.append(self.idle.popitem(last=False)[1])
+        for old in closing:
+            old.close()
+
+    # Run a scenario on a worker for args (nsims, seed, ROS-CV and nthreads from args unless given)
+    def run(self, args, OutFolder, **scenario):
+        scenario.setdefault('nsims', args.nsims)
+        scenario.setdefault('seed', args.seed)
+        scenario.setdefault('ROS_CV', args.ROS_CV)
+        scenario.setdefault('nthreads', args.nthreads)
+        worker = self._checkout(args)
+        try:
+            return worker.run(OutFolder, **scenario)
+        finally:
+            self._checkin(args, worker)
+
+    def close(self):
+        with self.lock:
+            workers = list(self.idle.values())
+            self.idle.clear()
+        for worker in workers:
+            worker.close()
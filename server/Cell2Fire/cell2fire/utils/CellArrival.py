@@ -0,0 +1,64 @@
+# coding: utf-8
+# Per simulation arrival arrays written by the engine with --output-arrival: CellArrival/CellArrivalNN.npy,
+# a rows x cols structured array with the fire period, time (minutes) and ROS (m/min) in which every cell ignited.
+# Any ForestGrid snapshot can be rebuilt from it instead of reading the per period CSV grids.
+# The rebuilt grids match runs with --ignitions and --final-grid (the API jobs); with random ignitions the
+# engine also writes an empty ForestGrid00 before the ignition, so its files are shifted by one
+import os
+import re
+import math
+
+import numpy as np
+
+ARRIVAL_FOLDER = "CellArrival"
+ARRIVAL_FILE = re.compile(r"^CellArrival(\d+)\.npy$")
+
+# period values of the cells that did not ignite
+NOT_BURNT = -1
+HARVESTED = -2
+
+# The engine writes a grid every weather period (--weather-period-length, 60 minutes by default)
+GRID_MINUTES = 60
+
+
+# Arrival file of simulation sim (1-based, same numbering as MessagesFileNN.csv)
+def CellArrivalFile(OutFolder, sim):
+    return os.path.join(OutFolder, ARRIVAL_FOLDER, "CellArrival" + str(sim).zfill(2) + ".npy")
+
+
+# Simulations (sorted) with an arrival file in OutFolder
+def CellArrivalSims(OutFolder):
+    try:
+        names = os.listdir(os.path.join(OutFolder, ARRIVAL_FOLDER))
+    except FileNotFoundError:
+        return []
+    return sorted(int(match.group(1)) for match in map(ARRIVAL_FILE.match, names) if match is not None)
+
+
+# Structured array (rows x cols) with period, time and ros fields, memory mapped (read only)
+def ReadCellArrival(filename):
+    return np.load(filename, mmap_mode="r")
+
+
+# Number of grids covering the whole fire: times 0, GridMinutes, ... up to the last arrival
+def ArrivalSteps(arrival, GridMinutes=GRID_MINUTES):
+    burnt = arrival["period"] >= 0
+    if not burnt.any():
+        return 1
+    return int(math.ceil(float(arrival["time"][burnt].max()) / GridMinutes)) + 1
+
+
+# Status grid (rows x cols, 1 burnt, -1 harvested, 0 otherwise) at time minutes (None: end of the fire)
+def ArrivalGrid(arrival, minutes=None):
+    burnt = arrival["period"] >= 0
+    if minutes is not None:
+        burnt &= arrival["time"] <= minutes
+    status = burnt.astype(np.int8)
+    status[arrival["period"] == HARVESTED] = -1
+    return status
+
+
+# ForestGrid snapshots in order (grid k holds the cells ignited up to k * GridMinutes), built lazily
+def ArrivalGrids(arrival, GridMinutes=GRID_MINUTES):
+    for step in range(ArrivalSteps(arrival, GridMinutes)):
+        yield ArrivalGrid(arrival, step * GridMinutes)
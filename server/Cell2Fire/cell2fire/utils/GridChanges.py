@@ -0,0 +1,84 @@
+# coding: utf-8
+# Reader of the compact binary grids (--grids-format binary): one Grids/GridsN/ForestGrids.bin per simulation
+# holding the (cell, grid number) changes instead of one ForestGridNN.csv per grid
+import os
+import re
+
+import numpy as np
+
+GRID_CHANGES_FILE = "ForestGrids.bin"
+GRID_CHANGES_MAGIC = b"C2FG"
+GRID_CHANGES_VERSION = 1
+GRIDS_FOLDER = re.compile(r"^Grids(\d+)$")
+
+# Header after the magic: version, rows, cols, grids, number of harvested cells, number of changes
+HEADER = np.dtype(("<u4", (6,)))
+
+
+# Read a ForestGrids.bin file: dict with rows, cols, grids (number of ForestGrid snapshots),
+# harvested (0-based cells, -1 in every grid) and cells/grid (cell burnt from that snapshot on)
+def ReadGridChanges(filename):
+    with open(filename, "rb") as f:
+        data = f.read()
+    if data[:4] != GRID_CHANGES_MAGIC:
+        raise ValueError(f"{filename} is not a Cell2Fire grid changes file")
+
+    version, rows, cols, grids, nHarvested, nChanges = np.frombuffer(data, dtype=HEADER, count=1, offset=4)[0]
+    if version != GRID_CHANGES_VERSION:
+        raise ValueError(f"{filename}: unsupported grid changes version {version}")
+
+    offset = 4 + HEADER.itemsize
+    harvested = np.frombuffer(data, dtype="<u4", count=nHarvested, offset=offset)
+    offset += harvested.nbytes
+    changes = np.frombuffer(data, dtype="<u4", count=2 * nChanges, offset=offset).reshape(-1, 2)
+    return {
+        "rows": int(rows),
+        "cols": int(cols),
+        "grids": int(grids),
+        "harvested": harvested.astype(np.int64),
+        "cells": changes[:, 0].astype(np.int64),
+        "grid": changes[:, 1].astype(np.int64),
+    }
+
+
+# Status grid (rows x cols, 1 burnt, -1 harvested, 0 otherwise) of snapshot number grid (negative counts from the end)
+def GridFromChanges(changes, grid=-1):
+    if grid < 0:
+        grid += changes["grids"]
+    if not 0 <= grid < changes["grids"]:
+        raise IndexError(f"grid {grid} outside 0..{changes['grids'] - 1}")
+
+    status = np.zeros(changes["rows"] * changes["cols"], dtype=np.int8)
+    status[changes["cells"][changes["grid"] <= grid]] = 1
+    status[changes["harvested"]] = -1
+    return status.reshape(changes["rows"], changes["cols"])
+
+
+# Same text as the engine ForestGridNN.csv files
+def GridToCSV(status):
+    return "".join(",".join(map(str, row)) + "\n" for row in status.tolist())
+
+
+# Write ForestGrid00.csv ... for every snapshot of a ForestGrids.bin file (into its folder by default)
+def WriteCSVGrids(filename, OutFolder=None):
+    changes = ReadGridChanges(filename)
+    if OutFolder is None:
+        OutFolder = os.path.dirname(filename)
+    os.makedirs(OutFolder, exist_ok=True)
+    for grid in range(changes["grids"]):
+        with open(os.path.join(OutFolder, "ForestGrid" + str(grid).zfill(2) + ".csv"), "w") as f:
+            f.write(GridToCSV(GridFromChanges(changes, grid)))
+    return changes["grids"]
+
+
+# Expand the ForestGrids.bin file of every Grids/GridsN folder into the usual CSV grids (e.g. before Stats)
+def ExpandGridChanges(GridsPath):
+    expanded = 0
+    if not os.path.isdir(GridsPath):
+        return expanded
+    for name in sorted(os.listdir(GridsPath)):
+        filename = os.path.join(GridsPath, name, GRID_CHANGES_FILE)
+        if GRIDS_FOLDER.match(name) and os.path.isfile(filename):
+            WriteCSVGrids(filename)
+            expanded += 1
+    return expanded
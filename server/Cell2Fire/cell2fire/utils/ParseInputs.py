@@ -51,6 +51,11 @@ def make_parser():
                         dest="nthreads",
                         type=int,
                         default=1)
+    parser.add_argument("--nshards",
+                        help="Number of engine processes running the simulations concurrently (results are merged)",
+                        dest="nshards",
+                        type=int,
+                        default=1)
     parser.add_argument("--max-fire-periods",
                         help="Maximum fire periods per year (default 1000)",
                         dest="max_fire_periods",
@@ -189,6 +194,11 @@ def make_parser():
                         dest="grids",
                         default=False,
                         action='store_true')
+    parser.add_argument("--grids-format",
+                        help="Grids output: csv (default), gzip (ForestGridNN.csv.gz) or binary (one ForestGrids.bin with the changes per sim)",
+                        dest="grids_format",
+                        choices=["csv", "gzip", "binary"],
+                        default="csv")
     parser.add_argument("--simPlots",
                         help="generate simulation/replication plots",
                         dest="plots",
@@ -219,6 +229,11 @@ def make_parser():
                         dest="OutMessages",
                         default=False,
                         action='store_true')
+    parser.add_argument("--output-arrival",
+                        help="Generates CellArrival/CellArrivalNN.npy per sim with the ignition period, time and ROS of every cell (grids are rebuilt from it)",
+                        dest="OutArrival",
+                        default=False,
+                        action='store_true')
     parser.add_argument("--Prometheus-tuned",
                         help="Activates the predefined tuning parameters based on Prometheus",
                         dest="PromTuning",
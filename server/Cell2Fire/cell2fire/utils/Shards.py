@@ -0,0 +1,93 @@
+# coding: utf-8
+# Split one Cell2Fire run into several engine processes (shards) and merge their outputs
+import os
+import re
+import shutil
+import subprocess
+
+# Shard outputs live inside the output folder until they are merged
+SHARDS_FOLDER = ".shards"
+SIM_NUMBER = re.compile(r"^(Grids|MessagesFile|CellArrival)(\d+)(\.csv|\.npy)?$")
+
+
+# Contiguous (first sim, number of sims) ranges, sizes differ by at most one
+def ShardRanges(nsims, nshards):
+    nshards = max(1, min(nshards, nsims))
+    ranges = []
+    first = 1
+    for k in range(nshards):
+        size = nsims // nshards + (1 if k < nsims % nshards else 0)
+        ranges.append((first, size))
+        first += size
+    return ranges
+
+
+# Engine arguments of one shard: its own output folder and replications first..first+nsims-1
+def ShardArgs(execArray, ShardFolder, first, nsims):
+    shardArray = list(execArray)
+    shardArray[shardArray.index('--output-folder') + 1] = ShardFolder
+    shardArray[shardArray.index('--nsims') + 1] = str(nsims)
+    return shardArray + ['--first-sim', str(first)]
+
+
+# Run the shards concurrently, then merge them into OutFolder and LogName (returns the first non-zero return code)
+def RunShards(execArray, OutFolder, LogName, nsims, nshards):
+    ShardsPath = os.path.join(OutFolder, SHARDS_FOLDER)
+    if os.path.isdir(ShardsPath):
+        shutil.rmtree(ShardsPath)
+
+    shards = []
+    for k, (first, size) in enumerate(ShardRanges(nsims, nshards)):
+        ShardFolder = os.path.join(ShardsPath, "shard" + str(k + 1))
+        os.makedirs(ShardFolder)
+        output = open(os.path.join(ShardFolder, "LogFile.txt"), 'w')
+        proc = subprocess.Popen(ShardArgs(execArray, ShardFolder + os.sep, first, size), stdout=output)
+        shards.append((ShardFolder, first, size, proc, output))
+
+    return_code = 0
+    for ShardFolder, first, size, proc, output in shards:
+        code = proc.wait()
+        output.close()
+        if code != 0 and return_code == 0:
+            return_code = code
+
+    # Logs in replication order (also kept when a shard failed)
+    with open(LogName, 'w') as log:
+        for ShardFolder, first, size, proc, output in shards:
+            with open(os.path.join(ShardFolder, "LogFile.txt")) as shardLog:
+                shutil.copyfileobj(shardLog, log)
+
+    if return_code == 0:
+        MergeShards(OutFolder, [(ShardFolder, first, size) for ShardFolder, first, size, proc, output in shards])
+        shutil.rmtree(ShardsPath)
+    return return_code
+
+
+# Move GridsN folders, MessagesFileNN and CellArrivalNN files of every shard into the usual OutFolder layout
+def MergeShards(OutFolder, shards):
+    for ShardFolder, first, size in shards:
+        for subFolder in ("Grids", "Messages", "CellArrival"):
+            source = os.path.join(ShardFolder, subFolder)
+            if not os.path.isdir(source):
+                continue
+            target = os.path.join(OutFolder, subFolder)
+            os.makedirs(target, exist_ok=True)
+            for name in sorted(os.listdir(source)):
+                match = SIM_NUMBER.match(name)
+                if match is None:
+                    continue
+                sim = int(match.group(2))
+                if not first <= sim < first + size:
+                    raise ValueError(f"{name} in {ShardFolder} is outside sims {first}..{first + size - 1}")
+
+                # Same names as a single engine run (MessagesFile01 ... MessagesFile09, MessagesFile10 ...)
+                if match.group(1) == "Grids":
+                    merged = "Grids" + str(sim)
+                elif match.group(1) == "CellArrival":
+                    merged = "CellArrival" + str(sim).zfill(2) + ".npy"
+                else:
+                    merged = "MessagesFile" + str(sim).zfill(2) + ".csv"
+                mergedPath = os.path.join(target, merged)
+                if os.path.isdir(mergedPath):
+                    shutil.rmtree(mergedPath)
+                os.replace(os.path.join(source, name), mergedPath)
@@ -37,6 +37,7 @@ from cell2fire.utils.coord_xy import *  # TBD: drop import *
 from tqdm import tqdm
 import networkx as nx
 from shutil import copy2
+from cell2fire.utils.CellArrival import CellArrivalFile, ReadCellArrival, ArrivalGrid, ArrivalGrids, GRID_MINUTES
 
 # Cell2Fire
 ### import cell2fire.utils.ReadDataPrometheus as ReadDataPrometheus
@@ -61,7 +62,8 @@ class Statistics(object):
                  verbose=False,
                  GGraph=None,
                  tCorrected=False,
-                 pdfOutputs=False):
+                 pdfOutputs=False,
+                 GridMinutes=GRID_MINUTES):
     
         # Containers
         self._OutFolder = OutFolder
@@ -80,6 +82,7 @@ class Statistics(object):
         self._GGraph = GGraph
         self._tCorrected = tCorrected
         self._pdfOutputs = pdfOutputs
+        self._GridMinutes = GridMinutes
 
         # Create Stats path (if needed)
         if StatsFolder != "":
@@ -107,9 +110,32 @@ class Statistics(object):
             return int(re.compile(r'(\d+)$').search(parts[0]).group(1))
 
         GridPath = os.path.join(self._OutFolder, "Grids", "Grids"+str(SimNum+1))
-        GridFiles = os.listdir(GridPath)
+        # Only the ForestGridNN.csv (or .csv.gz) snapshots, not the binary grid changes
+        GridFiles = [f for f in os.listdir(GridPath) if f.split(".")[1:2] == ["csv"]]
         GridFiles.sort(key=fnum)
         return GridPath, GridFiles
+
+    def _SimGrids(self, SimNum, last=False):
+        """ Status grids of one simulation, rebuilt from CellArrival/CellArrivalNN.npy when the
+            engine wrote it (--output-arrival) and read from the ForestGridNN.csv files otherwise.
+        Args:
+            SimNum (int): simulation number (zero based)
+            last (bool): only the final grid
+        
+        Returns:
+            list of int64 arrays (Rows x Cols) in grid order
+        """
+        ArrivalFile = CellArrivalFile(self._OutFolder, SimNum + 1)
+        if os.path.isfile(ArrivalFile):
+            arrival = ReadCellArrival(ArrivalFile)
+            if last:
+                return [ArrivalGrid(arrival).astype(np.int64)]
+            return [grid.astype(np.int64) for grid in ArrivalGrids(arrival, self._GridMinutes)]
+
+        GridPath, GridFiles = self._GridDir(SimNum)
+        if last:
+            GridFiles = GridFiles[-1:]
+        return [pd.read_csv(GridPath +"/"+ f, delimiter=',', header=None).values for f in GridFiles]
             
     ####################################
     #                                  #
@@ -1043,10 +1069,9 @@ class Statistics(object):
 
         # Stats per simulation
         for i in range(self._nSims):
-            GridPath, GridFiles = self._GridDir(i)
-            #print(GridPath, GridFiles)
-            if len(GridFiles) > 0: 
-                a = pd.read_csv(GridPath +"/"+ GridFiles[-1], delimiter=',', header=None).values
+            Grids = self._SimGrids(i, last=True)
+            if len(Grids) > 0: 
+                a = Grids[-1]
                 b.append(a)
                 statDict[i] = {"ID": i+1,
                                "NonBurned": len(a[(a == 0) | (a == 2)]),
@@ -1159,10 +1184,10 @@ class Statistics(object):
         statDicth = {}
         statDFh = pd.DataFrame(columns=[["ID", "NonBurned", "Burned", "Harvested"]])
         for i in range(self._nSims):
-            GridPath, GridFiles = self._GridDir(i)
-            if len(GridFiles) > 0:
-                for j in range(len(GridFiles)):
-                    ah = pd.read_csv(GridPath +"/"+ GridFiles[j], delimiter=',', header=None).values
+            Grids = self._SimGrids(i)
+            if len(Grids) > 0:
+                for j in range(len(Grids)):
+                    ah = Grids[j]
                     bh[(i,j)] = ah
                     statDicth[(i,j)] = {"ID": i+1,
                                        "NonBurned": len(ah[(ah == 0) | (ah == 2)]),
@@ -0,0 +1,88 @@
+# test the ForestGrid snapshots rebuilt from the engine arrival arrays (--output-arrival)
+"""
+- ArrivalSteps / ArrivalGrids on a hand-written arrival array (with a harvested cell)
+- Sub40x40 run with ignition points, --grids, --final-grid and --output-arrival (as the API jobs run it):
+  for every sim, ArrivalSteps is the number of ForestGridNN.csv files and ArrivalGrids gives the same status grids
+The engine part needs the C++ core built in cell2fire/Cell2FireC (make).
+"""
+import unittest
+import os
+import glob
+import shutil
+import tempfile
+import subprocess
+import numpy as np
+import cell2fire  # for path finding
+from cell2fire.utils.CellArrival import (HARVESTED, NOT_BURNT, ArrivalGrid, ArrivalGrids, ArrivalSteps,
+                                         CellArrivalFile, CellArrivalSims, ReadCellArrival)
+
+
+p = str(cell2fire.__path__)
+l = p.find("'")
+r = p.find("'", l+1)
+cell2fire_path = p[l+1:r]
+engine_path = os.path.join(cell2fire_path, "Cell2FireC", "Cell2Fire")
+data_path = os.path.join(cell2fire_path, "..", "data", "Sub40x40")
+
+NSIMS = 4
+ARRIVAL = np.dtype([("period", "<i4"), ("time", "<f4"), ("ros", "<f4")])
+
+
+class TestArrivalGrids(unittest.TestCase):
+
+    def test_hand_written_arrival(self):
+        # 2x2 grid: ignition at 0 minutes, one cell at 60 (still in grid 1), one at 61, one harvested
+        arrival = np.zeros((2, 2), dtype=ARRIVAL)
+        arrival[0, 0] = (1, 0.0, 0.0)
+        arrival[0, 1] = (1, 60.0, 2.0)
+        arrival[1, 0] = (2, 61.0, 2.0)
+        arrival[1, 1] = (HARVESTED, 0.0, 0.0)
+
+        self.assertEqual(ArrivalSteps(arrival), 3)
+        grids = list(ArrivalGrids(arrival))
+        np.testing.assert_array_equal(grids[0], [[1, 0], [0, -1]])
+        np.testing.assert_array_equal(grids[1], [[1, 1], [0, -1]])
+        np.testing.assert_array_equal(grids[2], [[1, 1], [1, -1]])
+        np.testing.assert_array_equal(ArrivalGrid(arrival), grids[-1])
+        self.assertEqual(ArrivalSteps(arrival, 30), 4)
+
+    def test_no_fire(self):
+        arrival = np.zeros((2, 2), dtype=ARRIVAL)
+        arrival["period"] = NOT_BURNT
+        self.assertEqual(ArrivalSteps(arrival), 1)
+        self.assertFalse(ArrivalGrid(arrival).any())
+
+
+@unittest.skipUnless(os.path.isfile(engine_path), "C++ core not built")
+class TestEngineArrival(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.workdir = tempfile.mkdtemp(prefix="c2f-arrival-")
+        cls.outfolder = os.path.join(cls.workdir, "out")
+        subprocess.run([engine_path,
+                        "--input-instance-folder", os.path.abspath(data_path) + os.sep,
+                        "--output-folder", cls.outfolder + os.sep,
+                        "--sim-years", "1", "--nsims", str(NSIMS),
+                        "--weather", "rows", "--nweathers", "1", "--Fire-Period-Length", "1.0",
+                        "--ROS-CV", "0.5", "--seed", "11", "--ignitions", "--IgnitionRad", "2",
+                        "--grids", "--final-grid", "--output-arrival"],
+                       stdout=subprocess.DEVNULL, check=True)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.workdir, ignore_errors=True)
+
+    def test_grids_match_forest_grids(self):
+        self.assertEqual(CellArrivalSims(self.outfolder), list(range(1, NSIMS + 1)))
+        for sim in range(1, NSIMS + 1):
+            files = sorted(glob.glob(os.path.join(self.outfolder, "Grids", "Grids" + str(sim), "ForestGrid*.csv")))
+            arrival = ReadCellArrival(CellArrivalFile(self.outfolder, sim))
+            self.assertEqual(ArrivalSteps(arrival), len(files), sim)
+            for step, (filename, grid) in enumerate(zip(files, ArrivalGrids(arrival))):
+                with self.subTest(sim=sim, step=step):
+                    np.testing.assert_array_equal(grid, np.loadtxt(filename, delimiter=",", dtype=np.int8))
+
+
+if __name__ == '__main__':
+    unittest.main()
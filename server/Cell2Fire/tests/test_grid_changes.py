@@ -0,0 +1,107 @@
+# test the compact binary grids (--grids-format binary) expanded back to ForestGridNN.csv
+"""
+- a hand-written C2FG file (with a harvested cell) gives the expected status grids
+- Sub40x40 run twice with the same seed, once with CSV grids and once with binary grids:
+  ExpandGridChanges must write the same ForestGridNN.csv files byte for byte
+The engine part needs the C++ core built in cell2fire/Cell2FireC (make).
+"""
+import unittest
+import os
+import shutil
+import tempfile
+import subprocess
+import numpy as np
+import cell2fire  # for path finding
+from cell2fire.utils.GridChanges import (GRID_CHANGES_FILE, GRID_CHANGES_MAGIC, GRID_CHANGES_VERSION,
+                                         ExpandGridChanges, GridFromChanges, ReadGridChanges, WriteCSVGrids)
+
+
+p = str(cell2fire.__path__)
+l = p.find("'")
+r = p.find("'", l+1)
+cell2fire_path = p[l+1:r]
+engine_path = os.path.join(cell2fire_path, "Cell2FireC", "Cell2Fire")
+data_path = os.path.join(cell2fire_path, "..", "data", "Sub40x40")
+
+NSIMS = 3
+
+
+class TestGridChangesFile(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp(prefix="c2f-gridchanges-")
+
+    def tearDown(self):
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def test_hand_written_file(self):
+        # 2x3 grid, 3 snapshots: cell 4 burns at 0, cells 1 and 5 at 1, cell 0 at 2, cell 3 harvested
+        filename = os.path.join(self.workdir, GRID_CHANGES_FILE)
+        with open(filename, "wb") as f:
+            f.write(GRID_CHANGES_MAGIC)
+            f.write(np.array([GRID_CHANGES_VERSION, 2, 3, 3, 1, 4], dtype="<u4").tobytes())
+            f.write(np.array([3], dtype="<u4").tobytes())
+            f.write(np.array([[4, 0], [1, 1], [5, 1], [0, 2]], dtype="<u4").tobytes())
+
+        changes = ReadGridChanges(filename)
+        self.assertEqual((changes["rows"], changes["cols"], changes["grids"]), (2, 3, 3))
+        np.testing.assert_array_equal(GridFromChanges(changes, 0), [[0, 0, 0], [-1, 1, 0]])
+        np.testing.assert_array_equal(GridFromChanges(changes, 1), [[0, 1, 0], [-1, 1, 1]])
+        np.testing.assert_array_equal(GridFromChanges(changes, -1), [[1, 1, 0], [-1, 1, 1]])
+        with self.assertRaises(IndexError):
+            GridFromChanges(changes, 3)
+
+        self.assertEqual(WriteCSVGrids(filename), 3)
+        with open(os.path.join(self.workdir, "ForestGrid02.csv")) as f:
+            self.assertEqual(f.read(), "1,1,0\n-1,1,1\n")
+
+    def test_not_a_grid_changes_file(self):
+        filename = os.path.join(self.workdir, GRID_CHANGES_FILE)
+        with open(filename, "wb") as f:
+            f.write(b"0,0,1\n")
+        with self.assertRaises(ValueError):
+            ReadGridChanges(filename)
+
+
+@unittest.skipUnless(os.path.isfile(engine_path), "C++ core not built")
+class TestBinaryGridsRoundTrip(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.workdir = tempfile.mkdtemp(prefix="c2f-gridchanges-")
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.workdir, ignore_errors=True)
+
+    def _run(self, name, gridsFormat):
+        outfolder = os.path.join(self.workdir, name)
+        subprocess.run([engine_path,
+                        "--input-instance-folder", os.path.abspath(data_path) + os.sep,
+                        "--output-folder", outfolder + os.sep,
+                        "--sim-years", "1", "--nsims", str(NSIMS),
+                        "--weather", "rows", "--nweathers", "1", "--Fire-Period-Length", "1.0",
+                        "--ROS-CV", "0.5", "--seed", "5", "--grids", "--grids-format", gridsFormat],
+                       stdout=subprocess.DEVNULL, check=True)
+        return os.path.join(outfolder, "Grids")
+
+    def test_binary_matches_csv(self):
+        csvGrids = self._run("csv", "csv")
+        binaryGrids = self._run("binary", "binary")
+        for sim in range(1, NSIMS + 1):
+            self.assertEqual(os.listdir(os.path.join(binaryGrids, "Grids" + str(sim))), [GRID_CHANGES_FILE])
+
+        self.assertEqual(ExpandGridChanges(binaryGrids), NSIMS)
+        for sim in range(1, NSIMS + 1):
+            folder = "Grids" + str(sim)
+            expected = sorted(os.listdir(os.path.join(csvGrids, folder)))
+            self.assertGreater(len(expected), 1)
+            self.assertEqual(sorted(os.listdir(os.path.join(binaryGrids, folder))), sorted(expected + [GRID_CHANGES_FILE]))
+            for name in expected:
+                with open(os.path.join(csvGrids, folder, name), "rb") as f, \
+                        open(os.path.join(binaryGrids, folder, name), "rb") as g:
+                    self.assertEqual(g.read(), f.read(), os.path.join(folder, name))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+# test replications without ignition (non-burnable ignition cell)
+"""
+A 3x3 C-1 landscape whose centre cell (5) is non-fuel, ignited at cell 5.
+- IgnitionRad 0: no replication can ignite; every sim still gets its Grids/MessagesFile outputs
+- IgnitionRad 1: replications that draw cell 5 are re-run with new random numbers, so every
+  sim burns, and the outputs do not depend on --nthreads
+Needs the C++ core built in cell2fire/Cell2FireC (make).
+"""
+import unittest
+import os
+import glob
+import shutil
+import tempfile
+import subprocess
+import numpy as np
+import cell2fire  # for path finding
+import cell2fire.utils.DataGeneratorC as DataGenerator
+
+
+p = str(cell2fire.__path__)
+l = p.find("'")
+r = p.find("'", l+1)
+cell2fire_path = p[l+1:r]
+engine_path = os.path.join(cell2fire_path, "Cell2FireC", "Cell2Fire")
+data_path = os.path.join(cell2fire_path, "..", "data", "9cellsC1")
+
+FOREST = """ncols 3
+nrows 3
+xllcorner 457900
+yllcorner 5716800
+cellsize 100
+NODATA_value -9999
+1 1 1
+1 101 1
+1 1 1
+"""
+
+
+@unittest.skipUnless(os.path.isfile(engine_path), "C++ core not built")
+class TestIgnitionRetry(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.workdir = tempfile.mkdtemp(prefix="c2f-ignition-")
+        cls.infolder = os.path.join(cls.workdir, "nonburnable")
+        shutil.copytree(data_path, cls.infolder, ignore=shutil.ignore_patterns("LogFile.txt", "Data.*"))
+        with open(os.path.join(cls.infolder, "Forest.asc"), "w") as f:
+            f.write(FOREST)
+        with open(os.path.join(cls.infolder, "IgnitionPoints.csv"), "w") as f:
+            f.write("Year,Ncell\n1,5\n")
+        DataGenerator.GenDataFile(cls.infolder + os.sep)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.workdir, ignore_errors=True)
+
+    def _run(self, name, nsims, radius, nthreads=1):
+        outfolder = os.path.join(self.workdir, name)
+        subprocess.run([engine_path,
+                        "--input-instance-folder", self.infolder + os.sep,
+                        "--output-folder", outfolder + os.sep,
+                        "--ignitions", "--sim-years", "1", "--nsims", str(nsims),
+                        "--weather", "rows", "--nweathers", "1", "--Fire-Period-Length", "1.0",
+                        "--ROS-CV", "0.5", "--seed", "3", "--IgnitionRad", str(radius),
+                        "--nthreads", str(nthreads), "--grids", "--output-messages"],
+                       stdout=subprocess.DEVNULL, check=True)
+        return outfolder
+
+    def _sims(self, outfolder):
+        grids = sorted(int(os.path.basename(g)[len("Grids"):]) for g in glob.glob(os.path.join(outfolder, "Grids", "Grids*")))
+        messages = sorted(glob.glob(os.path.join(outfolder, "Messages", "MessagesFile*.csv")))
+        return grids, messages
+
+    def _burned(self, outfolder, sim):
+        files = sorted(glob.glob(os.path.join(outfolder, "Grids", "Grids" + str(sim), "ForestGrid*.csv")))
+        return [int(np.loadtxt(f, delimiter=",").sum()) for f in files]
+
+    def test_no_ignition_keeps_every_sim(self):
+        outfolder = self._run("radius0", 3, 0)
+        grids, messages = self._sims(outfolder)
+        self.assertEqual(grids, [1, 2, 3])
+        self.assertEqual(len(messages), 3)
+        for sim in grids:
+            self.assertEqual(max(self._burned(outfolder, sim)), 0)
+
+    def test_retry_until_ignition(self):
+        nsims = 40
+        outfolder = self._run("radius1", nsims, 1)
+        grids, messages = self._sims(outfolder)
+        self.assertEqual(grids, list(range(1, nsims + 1)))
+        self.assertEqual(len(messages), nsims)
+        for path in messages:
+            self.assertGreater(os.path.getsize(path), 0, path)
+        for sim in grids:
+            # a retry overwrites the grids of the attempt without ignition
+            burned = self._burned(outfolder, sim)
+            self.assertGreater(burned[-1], 0)
+            self.assertEqual(burned, sorted(burned))
+
+        threaded = self._run("radius1_threads", nsims, 1, nthreads=4)
+        for path in messages:
+            with open(path) as f, open(os.path.join(threaded, "Messages", os.path.basename(path))) as g:
+                self.assertEqual(f.read(), g.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
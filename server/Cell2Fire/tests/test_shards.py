@@ -0,0 +1,93 @@
+# test sharded runs (--nshards): the merged outputs are byte-identical to one engine run
+"""
+Sub40x40, 7 sims with random ignitions and ROS-CV split into 3 shards (sims 1-3, 4-5, 6-7).
+Every Grids, Messages and CellArrival file of the merged output must match the unsharded run.
+Needs the C++ core built in cell2fire/Cell2FireC (make).
+"""
+import unittest
+import os
+import shutil
+import tempfile
+import subprocess
+import cell2fire  # for path finding
+from cell2fire.utils.Shards import RunShards, ShardArgs, ShardRanges
+
+
+p = str(cell2fire.__path__)
+l = p.find("'")
+r = p.find("'", l+1)
+cell2fire_path = p[l+1:r]
+engine_path = os.path.join(cell2fire_path, "Cell2FireC", "Cell2Fire")
+data_path = os.path.join(cell2fire_path, "..", "data", "Sub40x40")
+
+NSIMS = 7
+
+
+class TestShardRanges(unittest.TestCase):
+
+    def test_ranges(self):
+        self.assertEqual(ShardRanges(7, 3), [(1, 3), (4, 2), (6, 2)])
+        self.assertEqual(ShardRanges(2, 4), [(1, 1), (2, 1)])
+        self.assertEqual(ShardRanges(5, 1), [(1, 5)])
+
+    def test_args(self):
+        execArray = ["Cell2Fire", "--output-folder", "out/", "--nsims", "7", "--seed", "3"]
+        self.assertEqual(ShardArgs(execArray, "out/.shards/shard2/", 4, 2),
+                         ["Cell2Fire", "--output-folder", "out/.shards/shard2/", "--nsims", "2", "--seed", "3",
+                          "--first-sim", "4"])
+        self.assertEqual(execArray[2], "out/")
+
+
+@unittest.skipUnless(os.path.isfile(engine_path), "C++ core not built")
+class TestShardedRun(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.workdir = tempfile.mkdtemp(prefix="c2f-shards-")
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.workdir, ignore_errors=True)
+
+    def _command(self, outfolder):
+        return [engine_path,
+                "--input-instance-folder", os.path.abspath(data_path) + os.sep,
+                "--output-folder", outfolder + os.sep,
+                "--sim-years", "1", "--nsims", str(NSIMS),
+                "--weather", "rows", "--nweathers", "1", "--Fire-Period-Length", "1.0",
+                "--ROS-CV", "0.5", "--seed", "9",
+                "--grids", "--output-messages", "--output-arrival"]
+
+    def _files(self, outfolder):
+        files = {}
+        for root, dirs, names in os.walk(outfolder):
+            for name in names:
+                if name == "LogFile.txt":
+                    continue
+                path = os.path.join(root, name)
+                with open(path, "rb") as f:
+                    files[os.path.relpath(path, outfolder)] = f.read()
+        return files
+
+    def test_sharded_matches_single_run(self):
+        single = os.path.join(self.workdir, "single")
+        subprocess.run(self._command(single), stdout=subprocess.DEVNULL, check=True)
+
+        sharded = os.path.join(self.workdir, "sharded")
+        os.makedirs(sharded)
+        LogName = os.path.join(sharded, "LogFile.txt")
+        self.assertEqual(RunShards(self._command(sharded), sharded, LogName, NSIMS, 3), 0)
+        self.assertFalse(os.path.exists(os.path.join(sharded, ".shards")))
+
+        expected = self._files(single)
+        self.assertEqual(sorted(name for name in expected if name.startswith("Messages")),
+                         [os.path.join("Messages", "MessagesFile%02d.csv" % sim) for sim in range(1, NSIMS + 1)])
+        self.assertIn(os.path.join("CellArrival", "CellArrival07.npy"), expected)
+        merged = self._files(sharded)
+        self.assertEqual(sorted(merged), sorted(expected))
+        for name in expected:
+            self.assertEqual(merged[name], expected[name], name)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,163 @@
+"""
+취약 사용자 알림 매칭
+
+사용자 위치를 격자 셀에 한 번만 맞춰(snap) 두고, 연소 마스크나 도달 시간 래스터와의
+비교를 사용자 수만큼의 벡터 연산 한 번으로 끝냅니다.
+
+- 셀 맞춤: georeference로 계산한 (행, 열) 버킷과 주변 3x3 셀 중 Data.csv 좌표가 가장 가까운 셀
+- 마스크 매칭: mask.ravel()[user_cells]
+- 타임라인 매칭: 사용자별 도달 시간을 정렬해 두고, 시간이 진행될 때 새로 위협받는 구간만 반환
+"""
+import threading
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from .coordinates import CoordinateIndex
+
+OUTSIDE_GRID = -1  # 격자 밖 사용자 셀 번호
+_UNSNAPPED = -2    # 아직 셀을 맞추지 않은 사용자
+
+
+def snap_to_cells(index: CoordinateIndex, lat: np.ndarray, lon: np.ndarray,
+                  max_distance_cells: float = 0.75) -> np.ndarray:
+    """위경도 배열을 0-based 셀 번호 배열로 변환 (격자 밖이면 OUTSIDE_GRID)
+
+    규칙 격자 georeference로 버킷(행, 열)을 바로 계산한 뒤, 주변 3x3 셀의 실제
+    Data.csv 좌표와 거리를 비교해 가장 가까운 셀을 고릅니다. 셀 간격의 max_distance_cells배
+    보다 멀면 격자 밖으로 처리합니다.
+    """
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    geo = index.georeference()
+    lat_step = geo["lat_step"] or 1.0
+    lon_step = geo["lon_step"] or 1.0
+
+    # 버킷: georeference 기준 가장 가까운 (행, 열)
+    bucket_row = np.rint((lat - geo["lat_origin"]) / lat_step).astype(np.int64)
+    bucket_col = np.rint((lon - geo["lon_origin"]) / lon_step).astype(np.int64)
+
+    best_cell = np.full(lat.shape, OUTSIDE_GRID, dtype=np.int64)
+    best_distance = np.full(lat.shape, np.inf)
+    for dr in (-1, 0, 1):
+        for dc in (-1, 0, 1):
+            row = bucket_row + dr
+            col = bucket_col + dc
+            inside = (row >= 0) & (row < index.rows) & (col >= 0) & (col < index.cols)
+            cell = np.where(inside, row * index.cols + col, 0)
+            # 셀 간격 단위 거리 (위도/경도 간격이 달라도 같은 기준)
+            distance = np.hypot((index.lat[cell] - lat) / lat_step, (index.lon[cell] - lon) / lon_step)
+            better = inside & (distance < best_distance)
+            best_cell[better] = cell[better]
+            best_distance[better] = distance[better]
+
+    best_cell[best_distance > max_distance_cells] = OUTSIDE_GRID
+    return best_cell
+
+
+class UserStore:
+    """메모리 사용자 저장소 (사용자 ID, 위경도)
+
+    위치는 연속 배열로 보관하고, 데이터셋 격자별 셀 번호는 처음 필요할 때 계산해
+    이후에는 새로 추가된 사용자만 맞춥니다.
+    """
+
+    def __init__(self):
+        self._ids: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._lat = np.empty(0, dtype=np.float64)
+        self._lon = np.empty(0, dtype=np.float64)
+        self._cells: Dict[str, np.ndarray] = {}  # 데이터셋 -> 사용자별 셀 번호
+        self.version = 0  # 등록/이동 시 증가 (매칭 결과 캐시 버전)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add_users(self, user_ids: Sequence[str], lat: Sequence[float], lon: Sequence[float]) -> None:
+        """사용자 등록 (이미 있는 ID는 위치만 갱신)"""
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        with self._lock:
+            new_ids, new_rows = [], []
+            for i, user_id in enumerate(user_ids):
+                position = self._positions.get(user_id)
+                if position is None:
+                    self._positions[user_id] = len(self._ids) + len(new_ids)
+                    new_ids.append(user_id)
+                    new_rows.append(i)
+                else:
+                    self._lat[position] = lat[i]
+                    self._lon[position] = lon[i]
+                    # 위치가 바뀐 사용자는 모든 격자에서 다시 맞춤
+                    for dataset_cells in self._cells.values():
+                        if position < len(dataset_cells):
+                            dataset_cells[position] = _UNSNAPPED
+            self._ids.extend(new_ids)
+            self._lat = np.concatenate((self._lat, lat[new_rows]))
+            self._lon = np.concatenate((self._lon, lon[new_rows]))
+            self.version += 1
+
+    def user_ids(self, positions: np.ndarray) -> List[str]:
+        """저장소 위치 배열을 사용자 ID 목록으로 변환"""
+        return [self._ids[i] for i in positions.tolist()]
+
+    def location(self, positions: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """저장소 위치 배열의 위경도"""
+        return self._lat[positions], self._lon[positions]
+
+    def cells_for(self, dataset: str, index: CoordinateIndex) -> np.ndarray:
+        """데이터셋 격자 기준 사용자별 셀 번호 (새로 추가되거나 이동한 사용자만 계산)"""
+        with self._lock:
+            cells = self._cells.get(dataset, np.empty(0, dtype=np.int64))
+            if len(cells) < len(self._ids):
+                cells = np.concatenate((cells, np.full(len(self._ids) - len(cells), _UNSNAPPED, dtype=np.int64)))
+            stale = np.flatnonzero(cells == _UNSNAPPED)
+            if len(stale):
+                cells[stale] = snap_to_cells(index, self._lat[stale], self._lon[stale])
+            self._cells[dataset] = cells
+            return cells
+
+
+def match_mask(user_cells: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """연소 마스크 안에 있는 사용자 위치 배열"""
+    inside = user_cells >= 0
+    threatened = np.zeros(len(user_cells), dtype=bool)
+    threatened[inside] = np.asarray(mask).ravel()[user_cells[inside]]
+    return np.flatnonzero(threatened)
+
+
+class ArrivalTimeline:
+    """도달 시간 래스터 기준 사용자 타임라인
+
+    사용자별 도달 시간을 한 번 계산해 정렬해 두므로, between(start, end)는 구간 안에
+    새로 위협받는 사용자만 이진 탐색 두 번으로 잘라 반환합니다. 캐시에서 여러 요청이 함께
+    쓰므로 상태(직전 시각)는 두지 않고 호출하는 쪽이 구간을 넘깁니다.
+    """
+
+    def __init__(self, user_cells: np.ndarray, arrival: np.ndarray):
+        flat = np.asarray(arrival).ravel()
+        user_arrival = np.full(len(user_cells), np.inf, dtype=np.float64)
+        inside = user_cells >= 0
+        user_arrival[inside] = flat[user_cells[inside]]
+        self.user_arrival = user_arrival
+        self.order = np.argsort(user_arrival, kind="stable")
+        self.sorted_arrival = user_arrival[self.order]
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.user_arrival.nbytes + self.order.nbytes + self.sorted_arrival.nbytes)
+
+    def between(self, start: float, end: float) -> np.ndarray:
+        """도달 시간이 (start, end] 구간인 사용자 위치 배열"""
+        lo = np.searchsorted(self.sorted_arrival, start, side="right")
+        hi = np.searchsorted(self.sorted_arrival, end, side="right")
+        return self.order[lo:hi]
+
+    def arrival_of(self, positions: np.ndarray) -> np.ndarray:
+        """사용자 위치 배열의 도달 시간"""
+        return self.user_arrival[positions]
+
+
+# 프로세스 전역 사용자 저장소
+user_store = UserStore()
@@ -0,0 +1,312 @@
+"""
+화재 도달 시간(arrival time) 래스터 생성
+
+Cell2Fire의 MessagesFileNN.csv는 확산 간선 (i, j, 화재 기간, ROS)을 기록합니다.
+이를 셀별 최초 도달 시간(분) float32 배열로 변환해 시뮬레이션마다 .npy 하나로 저장하면,
+임의 시간 t의 연소 마스크는 `arrival <= t` 한 번으로 계산됩니다.
+엔진을 --output-arrival로 실행하면 CellArrival/CellArrivalNN.npy(셀별 period/time/ros 구조 배열)를
+직접 쓰므로, 그 파일이 있으면 MessagesFile이나 스냅샷 대신 그대로 사용합니다.
+
+사용 예:
+    python -m api.arrival Korean40x40
+"""
+import os
+import re
+import sys
+import glob
+from typing import Dict, List, Optional
+
+import numpy as np
+
+ARRIVAL_FOLDER = "Arrival"
+ENGINE_ARRIVAL_FOLDER = "CellArrival"  # 엔진 --output-arrival 출력
+UNBURNED = np.float32(np.inf)  # 도달하지 않은 셀
+
+_IGNITION_PATTERN = re.compile(r"Selected (?:\(Random\) )?ignition point for Year \d+, sim (\d+): (\d+)")
+_PERIOD_LEN_PATTERN = re.compile(r"FirePeriodLength:\s*([\d.]+)")
+_IN_FOLDER_PATTERN = re.compile(r"^InFolder:\s*(.+?)\s*$")
+_MESSAGES_PATTERN = re.compile(r"MessagesFile(\d+)\.csv$")
+_GRIDS_PATTERN = re.compile(r"Grids(\d+)$")
+_ENGINE_ARRIVAL_PATTERN = re.compile(r"^CellArrival(\d+)\.npy$")
+
+
+def arrival_file_name(simulation: int) -> str:
+    """시뮬레이션별 도달 시간 래스터 파일 이름"""
+    return f"ArrivalTimes{simulation:02d}.npy"
+
+
+def messages_file_path(result_path: str, simulation: int) -> str:
+    """시뮬레이션별 MessagesFile 경로 (엔진과 같은 두 자리 번호)"""
+    return os.path.join(result_path, "Messages", f"MessagesFile{simulation:02d}.csv")
+
+
+def arrival_file_path(result_path: str, simulation: int) -> str:
+    """시뮬레이션별 도달 시간 래스터 경로"""
+    return os.path.join(result_path, ARRIVAL_FOLDER, arrival_file_name(simulation))
+
+
+def engine_arrival_file_path(result_path: str, simulation: int) -> str:
+    """엔진이 쓴 시뮬레이션별 도달 기록(CellArrivalNN.npy) 경로"""
+    return os.path.join(result_path, ENGINE_ARRIVAL_FOLDER, f"CellArrival{simulation:02d}.npy")
+
+
+def engine_arrival_simulations(result_path: str) -> List[int]:
+    """CellArrivalNN.npy가 있는 시뮬레이션 번호 (정렬)"""
+    try:
+        names = os.listdir(os.path.join(result_path, ENGINE_ARRIVAL_FOLDER))
+    except FileNotFoundError:
+        return []
+    return sorted(int(match.group(1)) for match in map(_ENGINE_ARRIVAL_PATTERN.match, names) if match is not None)
+
+
+def result_simulations(result_path: str) -> List[int]:
+    """GridsN 폴더 또는 CellArrivalNN.npy가 있는 시뮬레이션 번호 (정렬)"""
+    simulations = set(engine_arrival_simulations(result_path))
+    try:
+        names = os.listdir(os.path.join(result_path, "Grids"))
+    except FileNotFoundError:
+        names = []
+    simulations.update(int(match.group(1)) for match in map(_GRIDS_PATTERN.match, names) if match is not None)
+    return sorted(simulations)
+
+
+def read_engine_arrival(file_path: str) -> np.ndarray:
+    """CellArrivalNN.npy의 도달 시간(분)을 rows x cols float32 래스터로 (연소하지 않은 셀은 inf)"""
+    cells = np.load(file_path, mmap_mode="r")
+    return np.where(cells["period"] >= 0, cells["time"], UNBURNED).astype(np.float32)
+
+
+def arrival_steps(arrival: np.ndarray, grid_interval_minutes: float = 60.0) -> int:
+    """마지막 도달 시각까지 덮는 ForestGrid 단계 수 (0, grid_interval_minutes, ...)"""
+    burned = np.isfinite(arrival)
+    if not burned.any():
+        return 1
+    return int(np.ceil(arrival[burned].max() / grid_interval_minutes)) + 1
+
+
+def arrival_snapshots(arrival: np.ndarray, grid_interval_minutes: float = 60.0) -> List[np.ndarray]:
+    """도달 시간으로 ForestGrid 스냅샷 재구성 (k번째 = k * grid_interval_minutes까지 연소, 1차원 마스크)
+
+    엔진의 ForestGrid 단계와 같은 규칙입니다.
+    """
+    arrival = arrival.ravel()
+    return [arrival <= step * grid_interval_minutes for step in range(arrival_steps(arrival, grid_interval_minutes))]
+
+
+def read_log_info(log_path: str) -> Dict[str, object]:
+    """LogFile.txt에서 입력 폴더, 화재 기간 길이(분), 시뮬레이션별 점화 셀(1-based)을 읽기"""
+    info = {"in_folder": None, "period_minutes": 1.0, "ignitions": {}}
+    if not os.path.exists(log_path):
+        return info
+    with open(log_path, "r", errors="ignore") as f:
+        for line in f:
+            match = _IN_FOLDER_PATTERN.match(line)
+            if match:
+                info["in_folder"] = match.group(1)
+                continue
+            match = _PERIOD_LEN_PATTERN.search(line)
+            if match:
+                info["period_minutes"] = float(match.group(1))
+                continue
+            match = _IGNITION_PATTERN.search(line)
+            if match:
+                # 시뮬레이션당 첫 번째 점화 셀만 사용
+                info["ignitions"].setdefault(int(match.group(1)), int(match.group(2)))
+    return info
+
+
+def read_messages(messages_path: str) -> np.ndarray:
+    """MessagesFile을 (N, 4) 배열 [i, j, period, ros]로 읽기 (빈 파일은 0행)"""
+    if os.path.getsize(messages_path) == 0:
+        return np.empty((0, 4))
+    messages = np.loadtxt(messages_path, delimiter=",", ndmin=2)
+    if messages.size == 0:
+        return np.empty((0, 4))
+    return messages
+
+
+def read_snapshots(grids_folder: str) -> List[np.ndarray]:
+    """GridsN 폴더의 ForestGrid 스냅샷들을 순서대로 연소 마스크(1차원)로 읽기"""
+    snapshots = []
+    for grid_path in sorted(glob.glob(os.path.join(grids_folder, "ForestGrid*.csv"))):
+        grid = np.loadtxt(grid_path, delimiter=",", dtype=np.int8, ndmin=2)
+        snapshots.append(grid.ravel() == 1)
+    return snapshots
+
+
+def build_arrival_times(messages: np.ndarray, ncells: int, ignition_cell: Optional[int] = None,
+                        period_minutes: float = 1.0, snapshots: Optional[List[np.ndarray]] = None,
+                        grid_interval_minutes: float = 60.0) -> np.ndarray:
+    """확산 간선에서 셀별 최초 도달 시간(분) 계산
+
+    ignition_cell은 1-based 셀 번호이며, 주어지지 않으면 메시지를 보내기만 하고
+    받지 않은 셀을 점화 셀로 간주합니다. 반환값은 길이 ncells의 float32 배열입니다.
+
+    엔진은 MessagesFile을 (연소 셀 수 - 점화 수) 행으로 잘라 쓰고, 점화에 실패한 셀로
+    보낸 메시지도 기록합니다. ForestGrid 스냅샷이 주어지면 k번째 스냅샷에서 처음 보인 셀의
+    도달 시간을 k * grid_interval_minutes 이하로 맞추고, 마지막 스냅샷에서 연소되지 않은
+    셀은 도달하지 않은 것으로 처리해 스냅샷과 일치시킵니다.
+    """
+    arrival = np.full(ncells, UNBURNED, dtype=np.float32)
+    if len(messages):
+        sources = messages[:, 0].astype(np.int64) - 1
+        targets = messages[:, 1].astype(np.int64) - 1
+        times = (messages[:, 2] * period_minutes).astype(np.float32)
+        np.minimum.at(arrival, targets, times)
+        if ignition_cell is None:
+            origins = np.setdiff1d(sources, targets)
+            arrival[origins] = 0.0
+    if ignition_cell is not None:
+        arrival[ignition_cell - 1] = 0.0
+
+    if snapshots:
+        first_seen = np.full(ncells, UNBURNED, dtype=np.float32)
+        for step, snapshot in enumerate(snapshots):
+            first_seen[snapshot & np.isinf(first_seen)] = step * grid_interval_minutes
+        np.minimum(arrival, first_seen, out=arrival)
+        arrival[~snapshots[-1]] = UNBURNED
+    return arrival
+
+
+def build_simulation_arrival(result_path: str, simulation: int, ncells: int,
+                             grid_interval_minutes: float = 60.0,
+                             log_info: Optional[Dict[str, object]] = None) -> np.ndarray:
+    """시뮬레이션 하나의 도달 시간 계산 (파일로 저장하지 않음)
+
+    엔진이 쓴 CellArrivalNN.npy가 있으면 그대로 읽고, 없으면 MessagesFile과 스냅샷으로 계산합니다.
+    """
+    engine_path = engine_arrival_file_path(result_path, simulation)
+    if os.path.exists(engine_path):
+        return read_engine_arrival(engine_path).ravel()
+    if log_info is None:
+        log_info = read_log_info(os.path.join(result_path, "LogFile.txt"))
+    snapshots = read_snapshots(os.path.join(result_path, "Grids", f"Grids{simulation}"))
+    return build_arrival_times(read_messages(messages_file_path(result_path, simulation)), ncells,
+                               log_info["ignitions"].get(simulation), log_info["period_minutes"],
+                               snapshots, grid_interval_minutes)
+
+
+def build_dataset_arrivals(result_path: str, rows: int, cols: int,
+                           grid_interval_minutes: float = 60.0) -> int:
+    """결과 폴더의 모든 MessagesFile/CellArrivalNN.npy를 도달 시간 래스터(.npy)로 변환, 생성한 파일 수 반환"""
+    log_info = read_log_info(os.path.join(result_path, "LogFile.txt"))
+    out_folder = os.path.join(result_path, ARRIVAL_FOLDER)
+    os.makedirs(out_folder, exist_ok=True)
+
+    simulations = set(engine_arrival_simulations(result_path))
+    simulations.update(
+        int(_MESSAGES_PATTERN.search(messages_path).group(1))
+        for messages_path in glob.glob(os.path.join(result_path, "Messages", "MessagesFile*.csv"))
+    )
+    written = 0
+    for simulation in sorted(simulations):
+        arrival = build_simulation_arrival(result_path, simulation, rows * cols, grid_interval_minutes, log_info)
+        out_path = arrival_file_path(result_path, simulation)
+        # 원자적 교체: 서버가 쓰는 도중의 파일을 읽지 않도록
+        tmp_path = out_path + ".tmp.npy"
+        np.save(tmp_path, arrival.reshape(rows, cols))
+        os.replace(tmp_path, out_path)
+        written += 1
+    return written
+
+
+def load_arrival_raster(file_path: str) -> np.ndarray:
+    """도달 시간 래스터를 읽기 전용 memmap으로 로드 (rows x cols float32, 워커 간 페이지 공유)"""
+    return np.load(file_path, mmap_mode="r")
+
+
+def snapshot_arrival_times(snapshots: List[np.ndarray], ncells: int,
+                           grid_interval_minutes: float = 60.0) -> np.ndarray:
+    """MessagesFile 없이 스냅샷만으로 셀별 도달 시간 계산 (처음 보인 스냅샷 시각)"""
+    arrival = np.full(ncells, UNBURNED, dtype=np.float32)
+    for step, snapshot in enumerate(snapshots):
+        arrival[snapshot & np.isinf(arrival)] = step * grid_interval_minutes
+    return arrival
+
+
+def ensemble_sources(result_path: str, simulation: int) -> List[str]:
+    """시뮬레이션 하나의 앙상블 행을 만드는 원본 파일 (build_ensemble_stack과 같은 우선순위)"""
+    for path in (arrival_file_path(result_path, simulation), engine_arrival_file_path(result_path, simulation)):
+        if os.path.exists(path):
+            return [path]
+    snapshots = sorted(glob.glob(os.path.join(result_path, "Grids", f"Grids{simulation}", "ForestGrid*.csv")))
+    messages_path = messages_file_path(result_path, simulation)
+    if os.path.exists(messages_path):
+        # 점화 셀과 화재 기간 길이는 LogFile에서 읽음
+        return [messages_path, os.path.join(result_path, "LogFile.txt")] + snapshots
+    return snapshots
+
+
+def ensemble_source_version(result_path: str) -> tuple:
+    """앙상블 스택 원본 버전: 시뮬레이션별 원본 파일의 (상대 경로, mtime, 크기)
+
+    같은 nsims로 결과를 다시 만들어도 파일 mtime/크기가 바뀌므로 스택을 다시 만듭니다.
+    """
+    version = []
+    for simulation in result_simulations(result_path):
+        for path in ensemble_sources(result_path, simulation):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            version.append((os.path.relpath(path, result_path), stat.st_mtime_ns, stat.st_size))
+    return tuple(version)
+
+
+def build_ensemble_stack(result_path: str, rows: int, cols: int, out_path: str,
+                         grid_interval_minutes: float = 60.0) -> int:
+    """모든 시뮬레이션의 도달 시간을 (nsims x cells) float32 스택 .npy 하나(out_path)로 저장, 시뮬레이션 수 반환
+
+    시뮬레이션별 도달 시간 래스터가 있으면 그대로 쓰고, 없으면 엔진의 CellArrivalNN.npy나
+    MessagesFile, 그것도 없으면 ForestGrid 스냅샷으로 계산합니다.
+    행 단위로 memmap에 바로 써서 전체 스택을 메모리에 올리지 않습니다.
+    """
+    grids_root = os.path.join(result_path, "Grids")
+    simulations = result_simulations(result_path)
+    stack = np.lib.format.open_memmap(out_path, mode="w+", dtype=np.float32,
+                                      shape=(len(simulations), rows * cols))
+    for row, simulation in enumerate(simulations):
+        raster_path = arrival_file_path(result_path, simulation)
+        if os.path.exists(raster_path):
+            stack[row] = load_arrival_raster(raster_path).ravel()
+        elif (os.path.exists(engine_arrival_file_path(result_path, simulation))
+              or os.path.exists(messages_file_path(result_path, simulation))):
+            stack[row] = build_simulation_arrival(result_path, simulation, rows * cols, grid_interval_minutes)
+        else:
+            snapshots = read_snapshots(os.path.join(grids_root, f"Grids{simulation}"))
+            stack[row] = snapshot_arrival_times(snapshots, rows * cols, grid_interval_minutes)
+    stack.flush()
+    del stack
+    return len(simulations)
+
+
+def burn_probability(stack: np.ndarray, time_minutes: float, chunk_sims: int = 64) -> np.ndarray:
+    """시각 time_minutes까지 연소된 시뮬레이션 비율 (셀별)
+
+    시뮬레이션 축을 chunk_sims 단위로 나눠 비교/합산하므로 임시 bool 배열이 작게 유지됩니다.
+    """
+    nsims, ncells = stack.shape
+    counts = np.zeros(ncells, dtype=np.int32)
+    for start in range(0, nsims, chunk_sims):
+        counts += np.count_nonzero(stack[start:start + chunk_sims] <= time_minutes, axis=0)
+    return counts / max(nsims, 1)
+
+
+if __name__ == "__main__":
+    from .data_handler import DataHandler, RESULTS_BASE_PATH, GRID_INTERVAL_MINUTES
+
+    if len(sys.argv) < 2:
+        print("사용법: python -m api.arrival <dataset> [<dataset> ...]")
+        sys.exit(1)
+
+    for dataset in sys.argv[1:]:
+        index = DataHandler.get_coordinate_index(dataset)
+        if index is None:
+            print(f"{dataset}: 좌표 데이터를 찾을 수 없습니다")
+            continue
+        result_path = os.path.join(RESULTS_BASE_PATH, dataset)
+        count = build_dataset_arrivals(result_path, index.rows, index.cols, GRID_INTERVAL_MINUTES)
+        print(f"{dataset}: 도달 시간 래스터 {count}개 생성")
+        # 앙상블 스택은 결과 폴더가 아니라 공유 캐시 폴더에 생성
+        stack = DataHandler.load_ensemble_stack(dataset)
+        print(f"{dataset}: 앙상블 스택 ({stack.shape[0]} x {stack.shape[1]}) 생성")
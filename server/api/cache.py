@@ -0,0 +1,217 @@
+"""
+파싱된 격자 데이터 캐시
+"""
+import os
+import sys
+import time
+import weakref
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+
+# 기본 설정
+GRID_CACHE_MAX_BYTES = 64 * 1024 * 1024  # 캐시 전체 바이트 한도 (64MB)
+GRID_CACHE_REVALIDATE_SECONDS = 2.0      # mtime 재확인 간격 (이 시간 안에는 디스크를 보지 않음)
+GRID_CACHE_MAX_ENTRIES = 4096            # 항목 수 한도 (크기 0으로 계산되는 memmap 매핑 수 제한)
+_SIZEOF_MAX_DEPTH = 4                    # nbytes가 없는 항목의 크기를 계산할 때 따라가는 최대 깊이
+
+
+def _sizeof(value: Any, depth: int = 0) -> int:
+    """캐시 항목의 바이트 크기 계산
+
+    nbytes가 없는 값은 0으로 두지 않고 객체 자체 크기와 속성 값 크기의 합으로 계산해서
+    파생 결과도 바이트 한도에 포함되도록 합니다 (순환 참조 대비 _SIZEOF_MAX_DEPTH 단계까지).
+    """
+    if isinstance(value, np.memmap):
+        return 0  # 페이지는 OS 페이지 캐시가 관리
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (bytes, bytearray, str)):
+        return sys.getsizeof(value)
+    nbytes = getattr(value, "nbytes", None)
+    if nbytes is not None:
+        return int(nbytes)
+    size = sys.getsizeof(value)
+    if depth >= _SIZEOF_MAX_DEPTH:
+        return size
+    if isinstance(value, (tuple, list, set, frozenset)):
+        return size + sum(_sizeof(item, depth + 1) for item in value)
+    if isinstance(value, dict):
+        return size + sum(_sizeof(k, depth + 1) + _sizeof(v, depth + 1) for k, v in value.items())
+    attributes = getattr(value, "__dict__", None)
+    if attributes is not None:
+        size += _sizeof(attributes, depth + 1)
+    return size
+
+
+def mask_version(mask: np.ndarray) -> str:
+    """연소 마스크 내용 해시 (마스크에서 파생된 결과의 캐시 버전으로 사용)"""
+    bits = np.packbits(np.ascontiguousarray(mask, dtype=bool).ravel())
+    return hashlib.blake2b(bits.tobytes(), digest_size=16).hexdigest()
+
+
+# id(배열) -> (약한 참조, 내용 해시): 살아 있는 같은 배열 객체는 해시를 한 번만 계산
+_array_versions: Dict[int, Tuple[weakref.ref, str]] = {}
+_array_versions_lock = threading.RLock()
+
+
+def array_version(array: np.ndarray) -> str:
+    """배열 내용 해시 (도달 시간 등 배열에서 파생된 결과의 캐시 버전으로 사용)
+
+    id()는 객체가 사라지면 재사용될 수 있으므로 버전으로 쓰지 않고, 약한 참조로 같은 객체인지
+    확인한 경우에만 이전 해시를 재사용합니다.
+    """
+    key = id(array)
+    with _array_versions_lock:
+        entry = _array_versions.get(key)
+        if entry is not None and entry[0]() is array:
+            return entry[1]
+
+    data = np.ascontiguousarray(array)
+    digest = hashlib.blake2b(f"{data.dtype.str}{data.shape}".encode("utf-8"), digest_size=16)
+    digest.update(data.data)
+    version = digest.hexdigest()
+
+    def forget(_, key=key):
+        with _array_versions_lock:
+            entry = _array_versions.get(key)
+            if entry is not None and entry[0]() is None:
+                del _array_versions[key]
+
+    with _array_versions_lock:
+        _array_versions[key] = (weakref.ref(array, forget), version)
+    return version
+
+
+class _Entry:
+    """캐시 항목 (값, 원본 버전(mtime 또는 해시), 크기, 마지막 확인 시각)"""
+    __slots__ = ("value", "mtime_ns", "nbytes", "checked_at")
+
+    def __init__(self, value: Any, mtime_ns: Hashable, nbytes: int, checked_at: float):
+        self.value = value
+        self.mtime_ns = mtime_ns
+        self.nbytes = nbytes
+        self.checked_at = checked_at
+
+
+class GridCache:
+    """바이트 한도와 mtime 무효화를 지원하는 LRU 캐시
+
+    키는 (dataset, simulation, step) 같은 튜플이고, 값은 원본 파일에서
+    로드한 NumPy 배열입니다. 원본 파일의 mtime이 바뀌면 다시 로드합니다.
+    """
+
+    def __init__(self, max_bytes: int = GRID_CACHE_MAX_BYTES,
+                 revalidate_seconds: float = GRID_CACHE_REVALIDATE_SECONDS,
+                 max_entries: int = GRID_CACHE_MAX_ENTRIES):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.revalidate_seconds = revalidate_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, path: str, loader: Callable[[str], Any]) -> Any:
+        """캐시에서 값을 반환하고, 없거나 원본이 바뀌었으면 loader(path)로 로드
+
+        원본 파일이 없으면 FileNotFoundError를 발생시킵니다.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry.checked_at < self.revalidate_seconds:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.value
+
+        # 재확인 간격이 지났거나 캐시에 없는 경우에만 디스크 확인
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            self.invalidate(key)
+            raise
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.mtime_ns == mtime_ns:
+                entry.checked_at = now
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.value
+            self.misses += 1
+
+        value = loader(path)
+        self._put(key, _Entry(value, mtime_ns, _sizeof(value), now))
+        return value
+
+    def get_derived(self, key: Hashable, version: Hashable, builder: Callable[[], Any]) -> Any:
+        """원본 파일 대신 버전 값으로 유효성을 판단하는 파생 결과 캐시
+
+        저장된 버전과 다르면 builder()로 다시 만듭니다.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.mtime_ns == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.value
+            self.misses += 1
+
+        value = builder()
+        self._put(key, _Entry(value, version, _sizeof(value), time.monotonic()))
+        return value
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """디스크 확인 없이 캐시된 값만 반환 (없으면 None)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry.value if entry is not None else None
+
+    def invalidate(self, key: Hashable) -> None:
+        """특정 키 제거"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._total_bytes -= entry.nbytes
+
+    def clear(self) -> None:
+        """캐시 전체 비우기"""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> dict:
+        """캐시 상태 정보"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def _put(self, key: Hashable, entry: _Entry) -> None:
+        """항목 저장 후 바이트 한도를 넘으면 오래된 항목부터 제거"""
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._total_bytes -= old.nbytes
+            # 한도보다 큰 단일 항목은 캐시하지 않음
+            if entry.nbytes > self.max_bytes:
+                return
+            self._entries[key] = entry
+            self._total_bytes += entry.nbytes
+            while self._entries and (self._total_bytes > self.max_bytes or len(self._entries) > self.max_entries):
+                _, evicted = self._entries.popitem(last=False)
+                self._total_bytes -= evicted.nbytes
+
+
+# 프로세스 전역 캐시 인스턴스
+grid_cache = GridCache()
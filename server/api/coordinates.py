@@ -0,0 +1,154 @@
+"""
+데이터셋별 셀 좌표 인덱스
+"""
+import os
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .models import BurnedPixel, BurnProbabilityPixel
+
+# 좌표 인덱스를 만드는 입력 파일 (하나라도 바뀌면 다시 생성)
+COORDINATE_SOURCES = ("Data.csv", "Forest.asc", "IgnitionPoints.csv")
+
+
+def coordinate_source_version(data_folder: str) -> tuple:
+    """좌표 인덱스 원본 버전: 입력 파일별 (이름, mtime, 크기)
+
+    Data.csv가 없으면 FileNotFoundError, Forest.asc/IgnitionPoints.csv는 없으면 (이름, None, None)입니다.
+    """
+    os.stat(os.path.join(data_folder, COORDINATE_SOURCES[0]))
+    version = []
+    for name in COORDINATE_SOURCES:
+        try:
+            stat = os.stat(os.path.join(data_folder, name))
+        except FileNotFoundError:
+            version.append((name, None, None))
+            continue
+        version.append((name, stat.st_mtime_ns, stat.st_size))
+    return tuple(version)
+
+
+class CoordinateIndex:
+    """셀 번호(0-based)로 위경도를 바로 찾는 좌표 인덱스
+
+    Data.csv의 lat/lon 열을 연속된 float64 배열로 보관하므로
+    연소 픽셀 좌표 조회가 한 번의 fancy indexing으로 끝납니다.
+    """
+
+    def __init__(self, rows: int, cols: int, lat: np.ndarray, lon: np.ndarray,
+                 ignition_cell: Optional[int] = None):
+        self.rows = rows
+        self.cols = cols
+        self.lat = np.ascontiguousarray(lat, dtype=np.float64)
+        self.lon = np.ascontiguousarray(lon, dtype=np.float64)
+        self.ignition_cell = ignition_cell  # 0-based 셀 번호
+
+    @property
+    def ncells(self) -> int:
+        return self.rows * self.cols
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.lat.nbytes + self.lon.nbytes)
+
+    @property
+    def grid_size(self) -> str:
+        return f"{self.rows}x{self.cols}"
+
+    @classmethod
+    def from_dataset_folder(cls, data_folder: str) -> "CoordinateIndex":
+        """데이터셋 폴더(Data.csv, Forest.asc, IgnitionPoints.csv)에서 인덱스 생성"""
+        df = pd.read_csv(os.path.join(data_folder, "Data.csv"), usecols=lambda c: c in ("lat", "lon"))
+        total_cells = len(df)
+        lat = df["lat"].to_numpy(dtype=np.float64, na_value=0.0) if "lat" in df else np.zeros(total_cells)
+        lon = df["lon"].to_numpy(dtype=np.float64, na_value=0.0) if "lon" in df else np.zeros(total_cells)
+
+        rows, cols = cls._read_shape(os.path.join(data_folder, "Forest.asc"), total_cells)
+        ignition_cell = cls._read_ignition_cell(os.path.join(data_folder, "IgnitionPoints.csv"))
+        return cls(rows, cols, lat, lon, ignition_cell)
+
+    def to_array(self) -> np.ndarray:
+        """(2, rows, cols) 위도/경도 배열 (공유 캐시 저장용)"""
+        return np.stack((self.lat, self.lon)).reshape(2, self.rows, self.cols)
+
+    @classmethod
+    def from_array(cls, coordinates: np.ndarray, data_folder: str) -> "CoordinateIndex":
+        """to_array 결과(memmap 가능)와 IgnitionPoints.csv로 인덱스 생성 (복사 없음)"""
+        _, rows, cols = coordinates.shape
+        ignition_cell = cls._read_ignition_cell(os.path.join(data_folder, "IgnitionPoints.csv"))
+        return cls(rows, cols, coordinates[0].reshape(-1), coordinates[1].reshape(-1), ignition_cell)
+
+    @staticmethod
+    def _read_shape(forest_path: str, total_cells: int):
+        """Forest.asc 헤더에서 격자 크기를 읽고, 없으면 정사각형으로 가정"""
+        try:
+            header = {}
+            with open(forest_path, "r") as f:
+                for _ in range(2):
+                    key, value = f.readline().split()[:2]
+                    header[key.lower()] = int(value)
+            rows, cols = header["nrows"], header["ncols"]
+            if rows * cols == total_cells:
+                return rows, cols
+        except (OSError, ValueError, KeyError):
+            pass
+        grid_size = int(np.sqrt(total_cells))
+        return grid_size, grid_size
+
+    @staticmethod
+    def _read_ignition_cell(ignition_path: str) -> Optional[int]:
+        """IgnitionPoints.csv의 첫 번째 점화 셀(1-based Ncell)을 0-based로 반환"""
+        if not os.path.exists(ignition_path):
+            return None
+        try:
+            ignition_df = pd.read_csv(ignition_path, index_col=False)  # 행 끝 쉼표 허용
+            if ignition_df.empty:
+                return None
+            return int(ignition_df.iloc[0]["Ncell"]) - 1
+        except Exception as e:
+            print(f"Ignition point error: {e}")
+            return None
+
+    def pixels(self, cell_ids: np.ndarray) -> List[BurnedPixel]:
+        """0-based 셀 번호 배열을 BurnedPixel 목록으로 변환"""
+        cell_ids = np.asarray(cell_ids, dtype=np.int64)
+        rows, cols = np.divmod(cell_ids, self.cols)
+        lats = self.lat[cell_ids].tolist()
+        lons = self.lon[cell_ids].tolist()
+        # 값은 이미 검증된 숫자이므로 검증 없이 생성
+        return [
+            BurnedPixel.model_construct(row=r, col=c, lat=la, lon=lo)
+            for r, c, la, lo in zip(rows.tolist(), cols.tolist(), lats, lons)
+        ]
+
+    def mask_pixels(self, mask: np.ndarray) -> List[BurnedPixel]:
+        """연소 마스크(rows x cols)를 BurnedPixel 목록으로 변환"""
+        return self.pixels(np.flatnonzero(mask))
+
+    def probability_pixels(self, probability: np.ndarray) -> List[BurnProbabilityPixel]:
+        """셀별 확률 배열에서 0보다 큰 셀만 BurnProbabilityPixel 목록으로 변환"""
+        flat = np.asarray(probability).ravel()
+        cell_ids = np.flatnonzero(flat > 0)
+        rows, cols = np.divmod(cell_ids, self.cols)
+        return [
+            BurnProbabilityPixel.model_construct(row=r, col=c, lat=la, lon=lo, probability=p)
+            for r, c, la, lo, p in zip(rows.tolist(), cols.tolist(), self.lat[cell_ids].tolist(),
+                                       self.lon[cell_ids].tolist(), flat[cell_ids].tolist())
+        ]
+
+    def georeference(self) -> dict:
+        """첫 셀 중심 위경도와 행/열 간격 (규칙 격자 가정)"""
+        lat_step = (self.lat[(self.rows - 1) * self.cols] - self.lat[0]) / (self.rows - 1) if self.rows > 1 else 0.0
+        lon_step = (self.lon[self.cols - 1] - self.lon[0]) / (self.cols - 1) if self.cols > 1 else 0.0
+        return {
+            "lat_origin": float(self.lat[0]),
+            "lon_origin": float(self.lon[0]),
+            "lat_step": float(lat_step),
+            "lon_step": float(lon_step),
+        }
+
+    def point(self, cell_id: int) -> dict:
+        """0-based 셀 번호의 위경도"""
+        return {"lat": float(self.lat[cell_id]), "lon": float(self.lon[cell_id])}
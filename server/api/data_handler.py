@@ -2,11 +2,22 @@
 데이터 처리 로직
 """
 import os
+import time
+import threading
 import pandas as pd
 import numpy as np
-import csv
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Hashable, Tuple, Optional
 from .models import BurnedPixel
+from .cache import grid_cache
+from .shared_cache import shared_arrays
+from .coordinates import CoordinateIndex, coordinate_source_version
+from .manifest import ResultsManifest, step_minutes_for
+from .store import ResultsStore, default_db_path
+from .arrival import (arrival_file_name, arrival_file_path, load_arrival_raster, messages_file_path,
+                      build_simulation_arrival, build_ensemble_stack, ensemble_source_version,
+                      read_snapshots, snapshot_arrival_times,
+                      engine_arrival_file_path, read_engine_arrival)
+from .jobs import SimulationJobQueue, parse_job_dataset, job_base_dataset
 
 # 기본 설정
 # 현재 파일의 위치를 기준으로 동적으로 경로 설정
@@ -16,152 +27,347 @@ CELL2FIRE_DIR = os.path.join(SERVER_DIR, "Cell2Fire")
 
 RESULTS_BASE_PATH = os.path.join(CELL2FIRE_DIR, "results")
 DATA_BASE_PATH = os.path.join(CELL2FIRE_DIR, "data")
+SIMULATION_JOBS_PATH = os.path.join(CELL2FIRE_DIR, "jobs")
+
+# 엔진이 ForestGrid 스냅샷을 기록하는 간격 (기본 weather period, 분)
+GRID_INTERVAL_MINUTES = 60
+
+
+def _input_dataset_name(dataset: str) -> str:
+    """결과 폴더 이름에 대응하는 입력 데이터셋 이름 (LogFile이 없을 때 manifest가 사용)"""
+    return job_base_dataset(dataset) or dataset.replace("_full", "")
+
+
+# 앙상블 스택 생성은 데이터셋당 한 번만 (동시 요청이 같은 파일을 쓰지 않도록)
+_ensemble_build_lock = threading.Lock()
+# 데이터셋 -> (확인 시각, 앙상블 원본 버전), grid_cache 재확인 간격 동안 디스크를 다시 보지 않음
+_ensemble_versions: Dict[str, Tuple[float, Hashable]] = {}
+# 입력 폴더 -> (확인 시각, 좌표 인덱스 원본 버전)
+_coordinate_versions: Dict[str, Tuple[float, Hashable]] = {}
+
+# 결과 저장소, 결과 목록, 작업 큐는 처음 사용할 때 생성 (import만으로 SQLite 파일이나 폴더를 건드리지 않음)
+_results_store: Optional[ResultsStore] = None
+_results_manifest: Optional[ResultsManifest] = None
+_simulation_jobs: Optional[SimulationJobQueue] = None
+_globals_lock = threading.RLock()
+
+
+def get_results_store() -> ResultsStore:
+    """결과 저장소 (적재된 데이터셋은 CSV 대신 SQLite에서 읽음)"""
+    global _results_store
+    with _globals_lock:
+        if _results_store is None:
+            _results_store = ResultsStore(default_db_path(RESULTS_BASE_PATH))
+        return _results_store
+
+
+def get_results_manifest() -> ResultsManifest:
+    """결과 목록 (서버 시작 시 스캔, 이후 감시자가 갱신)"""
+    global _results_manifest
+    with _globals_lock:
+        if _results_manifest is None:
+            _results_manifest = ResultsManifest(RESULTS_BASE_PATH, DATA_BASE_PATH, input_names=_input_dataset_name,
+                                                store=get_results_store())
+        return _results_manifest
+
+
+def get_simulation_jobs() -> SimulationJobQueue:
+    """온디맨드 시뮬레이션 작업 큐 (작업 프로세스가 결과를 저장소에 적재, 완료되면 결과 목록 다시 스캔)"""
+    global _simulation_jobs
+    with _globals_lock:
+        if _simulation_jobs is None:
+            _simulation_jobs = SimulationJobQueue(DATA_BASE_PATH, RESULTS_BASE_PATH, SIMULATION_JOBS_PATH,
+                                                  CELL2FIRE_DIR, on_complete=get_results_manifest().refresh,
+                                                  results_db=get_results_store().db_path)
+        return _simulation_jobs
+
+
+def shutdown() -> None:
+    """작업 프로세스와 결과 목록 감시자 종료 (만들지 않았으면 건너뜀)"""
+    with _globals_lock:
+        jobs, manifest = _simulation_jobs, _results_manifest
+    if jobs is not None:
+        jobs.shutdown()
+    if manifest is not None:
+        manifest.stop()
+
 
 class DataHandler:
     """Cell2Fire 데이터 처리 클래스"""
     
     @staticmethod
-    def get_coordinates_from_data_csv(dataset_name: str) -> Tuple[Dict[str, Dict[str, float]], int]:
-        """Data.csv에서 각 셀의 실제 좌표를 가져오기"""
+    def get_available_simulations() -> List[str]:
+        """그리드 결과가 있는 데이터셋 목록 반환"""
+        return get_results_manifest().dataset_names()
+
+    @staticmethod
+    def get_data_folder(dataset: str) -> str:
+        """결과 데이터셋에 대응하는 입력 데이터 폴더 (온디맨드 작업은 작업별 입력 폴더)"""
+        job_id = parse_job_dataset(dataset)
+        if job_id is not None:
+            return get_simulation_jobs().input_folder(job_id)
+        return os.path.join(DATA_BASE_PATH, _input_dataset_name(dataset))
+
+    @staticmethod
+    def coordinate_version(data_folder: str) -> Hashable:
+        """좌표 인덱스 원본 버전 (Data.csv, Forest.asc, IgnitionPoints.csv의 mtime과 크기)"""
+        now = time.monotonic()
+        checked = _coordinate_versions.get(data_folder)
+        if checked is not None and now - checked[0] < grid_cache.revalidate_seconds:
+            return checked[1]
+        version = coordinate_source_version(data_folder)
+        _coordinate_versions[data_folder] = (now, version)
+        return version
+
+    @staticmethod
+    def get_coordinate_index(dataset: str) -> Optional[CoordinateIndex]:
+        """데이터셋 좌표 인덱스를 캐시를 통해 반환 (Data.csv, Forest.asc, IgnitionPoints.csv 중 하나라도 바뀌면 다시 생성)"""
+        data_folder = DataHandler.get_data_folder(dataset)
         try:
-            data_path = os.path.join(DATA_BASE_PATH, dataset_name, "Data.csv")
-            df = pd.read_csv(data_path)
-            
-            # 격자 크기 계산 (3x3, 20x20, 40x40 등)
-            total_cells = len(df)
-            grid_size = int(np.sqrt(total_cells))
-            
-            coordinates = {}
-            for idx, row in df.iterrows():
-                grid_row = idx // grid_size
-                grid_col = idx % grid_size
-                coordinates[f"{grid_row},{grid_col}"] = {
-                    "lat": float(row.get("lat", 0)) if pd.notna(row.get("lat")) else 0.0,
-                    "lon": float(row.get("lon", 0)) if pd.notna(row.get("lon")) else 0.0
-                }
-            
-            return coordinates, grid_size
+            version = DataHandler.coordinate_version(data_folder)
+            return grid_cache.get_derived(
+                ("coordinates", data_folder), version,
+                lambda: CoordinateIndex.from_array(
+                    shared_arrays.load("coordinates", data_folder,
+                                       lambda: CoordinateIndex.from_dataset_folder(data_folder).to_array(), version),
+                    data_folder))
         except Exception as e:
             print(f"좌표 데이터 로드 오류: {e}")
-            return {}, 0
+            return None
 
     @staticmethod
-    def parse_grid_csv(file_path: str, coordinates_map: dict, grid_size: int) -> List[BurnedPixel]:
-        """ForestGrid CSV 파일을 파싱해서 연소된 픽셀 좌표 반환"""
-        burned_pixels = []
-        
-        try:
-            with open(file_path, 'r') as f:
-                csv_reader = csv.reader(f)
-                for row_idx, row in enumerate(csv_reader):
-                    if not row:  # 빈 행 건너뛰기
-                        continue
-                    for col_idx, cell_value in enumerate(row):
-                        if cell_value.strip() == '1':  # 연소된 셀
-                            coord_key = f"{row_idx},{col_idx}"
-                            coord_info = coordinates_map.get(coord_key, {"lat": 0, "lon": 0})
-                            
-                            burned_pixels.append(BurnedPixel(
-                                row=row_idx,
-                                col=col_idx,
-                                lat=coord_info["lat"],
-                                lon=coord_info["lon"]
-                            ))
-        except Exception as e:
-            print(f"그리드 파일 파싱 오류: {e}")
-        
-        return burned_pixels
+    def read_grid_mask(file_path: str) -> np.ndarray:
+        """ForestGrid CSV 파일을 읽어 연소 여부 bool 배열(rows x cols)로 반환"""
+        grid = pd.read_csv(file_path, header=None, dtype=np.int8).to_numpy()
+        return np.ascontiguousarray(grid == 1)
+
+    @staticmethod
+    def load_burned_mask(dataset: str, simulation: int, time_step: int) -> np.ndarray:
+        """(dataset, simulation, step) 연소 마스크를 캐시를 통해 반환
+
+        엔진 도달 기록(CellArrivalNN.npy)이 있으면 ForestGrid CSV 대신 도달 시간으로 계산합니다.
+        파일이 없으면 FileNotFoundError를 발생시킵니다.
+        """
+        entry = get_results_manifest().get(dataset)
+        if entry is not None and entry.stored:
+            return grid_cache.get_derived(
+                ("store-mask", dataset, simulation, time_step), entry.store_version,
+                lambda: get_results_store().load_mask(dataset, simulation, time_step, entry.rows, entry.cols))
+        if entry is not None and entry.has_engine_arrival(simulation):
+            return DataHandler.load_engine_arrival(dataset, simulation) <= time_step * GRID_INTERVAL_MINUTES
+        grid_file_path = DataHandler.get_grid_file_path_for_step(dataset, simulation, time_step)
+        return grid_cache.get((dataset, simulation, time_step), grid_file_path, DataHandler.read_shared_grid_mask)
 
     @staticmethod
-    def get_ignition_point(dataset: str) -> Optional[Dict[str, float]]:
-        """점화 지점 좌표를 IgnitionPoints.csv에서 직접 읽어 반환"""
-        ignition_file_path = os.path.join(DATA_BASE_PATH, dataset, "IgnitionPoints.csv")
-        if not os.path.exists(ignition_file_path):
+    def read_shared_grid_mask(file_path: str) -> np.ndarray:
+        """파싱한 연소 마스크를 공유 캐시(memmap)로 반환 (다른 워커가 이미 파싱했으면 매핑만)"""
+        return shared_arrays.load("mask", file_path, lambda: DataHandler.read_grid_mask(file_path))
+
+    @staticmethod
+    def load_arrival_times(dataset: str, simulation: int) -> Optional[np.ndarray]:
+        """도달 시간 래스터(rows x cols, 엔진 분)를 캐시를 통해 반환
+
+        ArrivalTimesNN.npy가 없으면 결과 저장소에 적재한 도달 시간을, 적재되지 않았으면 엔진 도달 기록
+        (CellArrivalNN.npy)을, 그것도 없으면 MessagesFile의 확산 간선으로 처음 한 번 계산해 공유 캐시에
+        두고, 모두 없으면 None을 반환합니다.
+        """
+        entry = get_results_manifest().get(dataset)
+        if entry is not None and not entry.has_arrival(simulation):
+            if entry.stored:
+                if not entry.has_store_arrival(simulation):
+                    return None
+                return DataHandler.load_store_arrival(dataset, simulation)
+            if entry.has_engine_arrival(simulation):
+                return DataHandler.load_engine_arrival(dataset, simulation)
+            if entry.has_messages(simulation):
+                return DataHandler.load_messages_arrival(dataset, simulation)
+            return None
+        file_path = arrival_file_path(os.path.join(RESULTS_BASE_PATH, dataset), simulation)
+        try:
+            return grid_cache.get(("arrival", dataset, simulation), file_path, load_arrival_raster)
+        except FileNotFoundError:
             return None
 
+    @staticmethod
+    def load_engine_arrival(dataset: str, simulation: int) -> np.ndarray:
+        """엔진 도달 기록(CellArrivalNN.npy)의 도달 시간 래스터 (rows x cols, 엔진 분)
+
+        파일이 없으면 FileNotFoundError를 발생시킵니다.
+        """
+        file_path = engine_arrival_file_path(os.path.join(RESULTS_BASE_PATH, dataset), simulation)
+        return grid_cache.get(
+            ("engine-arrival", dataset, simulation), file_path,
+            lambda path: shared_arrays.load("engine-arrival", path, lambda: read_engine_arrival(path))
+        )
+
+    @staticmethod
+    def load_store_arrival(dataset: str, simulation: int) -> Optional[np.ndarray]:
+        """결과 저장소에 적재한 도달 시간 래스터 (적재 버전이 바뀌면 다시 읽음)"""
+        entry = get_results_manifest().get(dataset)
+        return grid_cache.get_derived(
+            ("store-arrival", dataset, simulation), entry.store_version,
+            lambda: get_results_store().load_arrival(dataset, simulation, entry.rows, entry.cols))
+
+    @staticmethod
+    def load_messages_arrival(dataset: str, simulation: int) -> Optional[np.ndarray]:
+        """MessagesFile로 계산한 도달 시간 래스터 (MessagesFile이 바뀌면 다시 계산)"""
+        index = DataHandler.get_coordinate_index(dataset)
+        if index is None:
+            return None
+        result_path = os.path.join(RESULTS_BASE_PATH, dataset)
         try:
-            ignition_df = pd.read_csv(ignition_file_path)
-            if ignition_df.empty:
-                return None
-            
-            # 첫 번째 점화 지점 사용
-            ncell_val = ignition_df.iloc[0]['Ncell']
-            
-            _, grid_size = DataHandler.get_coordinates_from_data_csv(dataset)
-            if grid_size == 0:
-                return None
-
-            # Ncell (1-based) to 0-based index
-            zero_based_index = int(ncell_val) - 1
-            row_idx = zero_based_index // grid_size
-            col_idx = zero_based_index % grid_size
-            coord_key = f"{row_idx},{col_idx}"
-
-            # 좌표 가져오기
-            coordinates_map, _ = DataHandler.get_coordinates_from_data_csv(dataset)
-            
-            return coordinates_map.get(coord_key)
+            return grid_cache.get(
+                ("messages-arrival", dataset, simulation), messages_file_path(result_path, simulation),
+                lambda path: shared_arrays.load(
+                    "messages-arrival", path,
+                    lambda: build_simulation_arrival(result_path, simulation, index.ncells,
+                                                     GRID_INTERVAL_MINUTES).reshape(index.rows, index.cols))
+            )
+        except FileNotFoundError:
+            return None
 
-        except Exception as e:
-            print(f"Ignition point error: {e}")
+    @staticmethod
+    def arrival_source_name(dataset: str, simulation: int) -> str:
+        """도달 시간 출처 파일 이름 (응답 메타데이터용)"""
+        entry = get_results_manifest().get(dataset)
+        if entry is not None and not entry.has_arrival(simulation):
+            # 저장소도 적재할 때 CellArrival을 MessagesFile보다 먼저 사용
+            if entry.has_engine_arrival(simulation):
+                return f"CellArrival{simulation:02d}.npy"
+            return f"MessagesFile{simulation:02d}.csv"
+        return arrival_file_name(simulation)
+
+    @staticmethod
+    def load_arrival_mask(dataset: str, simulation: int, time_minutes: int) -> Optional[np.ndarray]:
+        """도달 시간 래스터로 임의 시간의 연소 마스크 계산 (래스터가 없으면 None)"""
+        arrival = DataHandler.load_arrival_times(dataset, simulation)
+        if arrival is None:
             return None
+        return arrival <= DataHandler.to_simulation_minutes(dataset, time_minutes)
 
     @staticmethod
-    def get_ignition_pixel(dataset: str) -> Optional[BurnedPixel]:
-        """점화 지점 정보를 BurnedPixel 객체로 반환"""
-        ignition_file_path = os.path.join(DATA_BASE_PATH, dataset, "IgnitionPoints.csv")
-        if not os.path.exists(ignition_file_path):
+    def load_simulation_arrival(dataset: str, simulation: int) -> np.ndarray:
+        """도달 시간 래스터(엔진 분), 없으면 ForestGrid 스냅샷으로 계산해 캐시
+
+        Grids 폴더가 없으면 FileNotFoundError를 발생시킵니다.
+        """
+        arrival = DataHandler.load_arrival_times(dataset, simulation)
+        if arrival is not None:
+            return arrival
+        index = DataHandler.get_coordinate_index(dataset)
+        if index is None:
+            raise FileNotFoundError(f"좌표 데이터를 찾을 수 없습니다: {dataset}")
+        grids_folder = os.path.join(RESULTS_BASE_PATH, dataset, "Grids", f"Grids{simulation}")
+        return grid_cache.get(
+            ("snapshot-arrival", dataset, simulation), grids_folder,
+            lambda path: shared_arrays.load(
+                "snapshot-arrival", path,
+                lambda: snapshot_arrival_times(read_snapshots(path), index.ncells,
+                                               GRID_INTERVAL_MINUTES).reshape(index.rows, index.cols))
+        )
+
+    @staticmethod
+    def ensemble_version(dataset: str) -> Hashable:
+        """앙상블 스택 원본 버전 (시뮬레이션별 원본 파일의 mtime과 크기)"""
+        now = time.monotonic()
+        checked = _ensemble_versions.get(dataset)
+        if checked is not None and now - checked[0] < grid_cache.revalidate_seconds:
+            return checked[1]
+        version = ensemble_source_version(os.path.join(RESULTS_BASE_PATH, dataset))
+        _ensemble_versions[dataset] = (now, version)
+        return version
+
+    @staticmethod
+    def load_ensemble_stack(dataset: str) -> np.ndarray:
+        """모든 시뮬레이션의 (nsims x cells) 도달 시간 스택을 memmap으로 반환
+
+        스택은 결과 폴더가 아니라 공유 캐시 폴더에 원본 버전별로 만들고, 원본 파일이 바뀌면
+        (같은 nsims로 다시 생성한 경우 포함) 새로 만듭니다.
+        """
+        result_path = os.path.join(RESULTS_BASE_PATH, dataset)
+        version = DataHandler.ensemble_version(dataset)
+
+        def build():
+            index = DataHandler.get_coordinate_index(dataset)
+            if index is None:
+                raise FileNotFoundError(f"좌표 데이터를 찾을 수 없습니다: {dataset}")
+            with _ensemble_build_lock:
+                return shared_arrays.load_file(
+                    "ensemble", result_path,
+                    lambda path: build_ensemble_stack(result_path, index.rows, index.cols, path,
+                                                      GRID_INTERVAL_MINUTES),
+                    version)
+
+        return grid_cache.get_derived(("ensemble", dataset), version, build)
+
+    @staticmethod
+    def get_ignition_cell(dataset: str, simulation: int = 1) -> Optional[int]:
+        """0-based 점화 셀 (manifest의 LogFile 값, 없으면 IgnitionPoints.csv), 격자 밖이면 None"""
+        entry = get_results_manifest().get(dataset)
+        ignition_cell = entry.ignition_cell(simulation) if entry is not None else None
+        index = DataHandler.get_coordinate_index(dataset)
+        if index is None:
+            return None
+        if ignition_cell is None:
+            ignition_cell = index.ignition_cell
+        if ignition_cell is None or not 0 <= ignition_cell < index.ncells:
             return None
+        return ignition_cell
 
-        try:
-            ignition_df = pd.read_csv(ignition_file_path)
-            if ignition_df.empty:
-                return None
-            
-            ncell_val = ignition_df.iloc[0]['Ncell']
-            
-            _, grid_size = DataHandler.get_coordinates_from_data_csv(dataset)
-            if grid_size == 0:
-                return None
-
-            # Ncell (1-based) to 0-based index
-            zero_based_index = int(ncell_val) - 1
-            row_idx = zero_based_index // grid_size
-            col_idx = zero_based_index % grid_size
-            coord_key = f"{row_idx},{col_idx}"
-
-            coordinates_map, _ = DataHandler.get_coordinates_from_data_csv(dataset)
-            coord_info = coordinates_map.get(coord_key)
-
-            if coord_info:
-                return BurnedPixel(
-                    row=row_idx,
-                    col=col_idx,
-                    lat=coord_info["lat"],
-                    lon=coord_info["lon"]
-                )
+    @staticmethod
+    def get_ignition_point(dataset: str, simulation: int = 1) -> Optional[Dict[str, float]]:
+        """점화 지점 좌표 반환"""
+        ignition_cell = DataHandler.get_ignition_cell(dataset, simulation)
+        if ignition_cell is None:
             return None
+        return DataHandler.get_coordinate_index(dataset).point(ignition_cell)
 
-        except Exception as e:
-            print(f"Ignition pixel error: {e}")
+    @staticmethod
+    def get_ignition_pixel(dataset: str, simulation: int = 1) -> Optional[BurnedPixel]:
+        """점화 지점 정보를 BurnedPixel 객체로 반환"""
+        ignition_cell = DataHandler.get_ignition_cell(dataset, simulation)
+        if ignition_cell is None:
             return None
+        return DataHandler.get_coordinate_index(dataset).pixels([ignition_cell])[0]
 
     @staticmethod
     def get_grid_file_path(dataset: str, simulation: int, time_minutes: int) -> str:
         """그리드 파일 경로 생성"""
         time_step = DataHandler.calculate_time_step(dataset, time_minutes)
+        return DataHandler.get_grid_file_path_for_step(dataset, simulation, time_step)
+
+    @staticmethod
+    def get_grid_file_path_for_step(dataset: str, simulation: int, time_step: int) -> str:
+        """시간 단계 번호로 그리드 파일 경로 생성"""
         grid_file = f"ForestGrid{time_step:02d}.csv"
         return os.path.join(RESULTS_BASE_PATH, dataset, "Grids", f"Grids{simulation}", grid_file)
 
+    @staticmethod
+    def calculate_step_minutes(dataset: str) -> int:
+        """API에서 ForestGrid 한 단계를 몇 분으로 표시하는지 반환 (manifest 기준)"""
+        entry = get_results_manifest().get(dataset)
+        if entry is not None:
+            return entry.step_minutes
+        return step_minutes_for(_input_dataset_name(dataset))
+
     @staticmethod
     def calculate_time_step(dataset: str, time_minutes: int) -> int:
         """시간(분)을 기반으로 시뮬레이션 시간 단계 계산"""
         if time_minutes == 0:
             return 0
-        
-        # 9cellsC1 예제는 10분 간격
-        if dataset.startswith("9cellsC1"):
-            return time_minutes // 10
-        
-        # 기본값은 30분 간격
-        return time_minutes // 30
+        return time_minutes // DataHandler.calculate_step_minutes(dataset)
+
+    @staticmethod
+    def to_simulation_minutes(dataset: str, time_minutes: float) -> float:
+        """API 시간(분)을 엔진 시간(분)으로 변환
+
+        ForestGrid 스냅샷은 엔진 시간 GRID_INTERVAL_MINUTES마다 기록되지만 API는
+        calculate_step_minutes 간격으로 표시하므로, 같은 비율로 변환해야
+        도달 시간 마스크와 스냅샷이 일치합니다.
+        """
+        return time_minutes * GRID_INTERVAL_MINUTES / DataHandler.calculate_step_minutes(dataset)
+
+    @staticmethod
+    def to_api_minutes(dataset: str, simulation_minutes):
+        """엔진 시간(분)을 API 시간(분)으로 변환 (to_simulation_minutes의 역변환)"""
+        return simulation_minutes * DataHandler.calculate_step_minutes(dataset) / GRID_INTERVAL_MINUTES
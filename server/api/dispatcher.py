@@ -0,0 +1,207 @@
+"""
+비동기 알림 발송기
+
+화재 확산 파이프라인(격자 기록 → 사용자 매칭)에서 나온 알림을 요청 경로와 분리해서 보냅니다.
+
+- 크기가 제한된 asyncio.Queue (가득 차면 버리고 dropped로 집계)
+- 수신자별 중복 제거 (같은 사건의 같은 수신자는 dedupe_seconds 동안 한 번만)
+- 배치 창: 첫 알림 후 batch_window_seconds 동안 또는 max_batch개까지 모아서 한 번에 전송
+- 교체 가능한 싱크: LogSink(표준 출력), FileSink(JSON Lines 파일)
+- 지표: 큐 길이, 전송/중복/버림 수, 격자 기록 → 전송까지 지연 시간
+"""
+import os
+import json
+import time
+import asyncio
+from collections import deque
+from typing import Deque, Dict, Hashable, List, Optional
+
+ALERT_QUEUE_SIZE = 10000
+ALERT_BATCH_WINDOW_SECONDS = 0.5
+ALERT_MAX_BATCH = 500
+ALERT_DEDUPE_SECONDS = 6 * 60 * 60
+ALERT_LOG_PATH = os.environ.get("ALERT_LOG_PATH")  # 설정하면 FileSink 사용
+_LATENCY_SAMPLES = 1000
+
+
+class AlertEvent:
+    """알림 한 건"""
+    __slots__ = ("recipient", "dataset", "simulation", "arrival_minutes", "source_time", "payload")
+
+    def __init__(self, recipient: str, dataset: str, simulation: int, arrival_minutes: float,
+                 source_time: float, payload: Optional[dict] = None):
+        self.recipient = recipient
+        self.dataset = dataset
+        self.simulation = simulation
+        self.arrival_minutes = arrival_minutes
+        self.source_time = source_time  # 원인 격자가 기록된 시각 (time.time())
+        self.payload = payload or {}
+
+    @property
+    def dedupe_key(self) -> Hashable:
+        """같은 사건(데이터셋)의 같은 수신자는 한 번만"""
+        return (self.recipient, self.dataset)
+
+    def to_dict(self) -> dict:
+        return {
+            "recipient": self.recipient,
+            "dataset": self.dataset,
+            "simulation": self.simulation,
+            "arrival_minutes": self.arrival_minutes,
+            "source_time": self.source_time,
+            **self.payload,
+        }
+
+
+class LogSink:
+    """표준 출력으로 알림을 남기는 싱크 (개발/테스트용)"""
+
+    async def send_batch(self, alerts: List[AlertEvent]) -> None:
+        for alert in alerts:
+            print(f"[알림] {alert.recipient}: {alert.dataset} 화재 도달 예상 {alert.arrival_minutes:.0f}분")
+
+
+class FileSink:
+    """알림을 JSON Lines 파일에 추가하는 싱크 (배치마다 한 번 쓰기)"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def _write(self, lines: List[str]) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(lines))
+
+    async def send_batch(self, alerts: List[AlertEvent]) -> None:
+        sent_at = time.time()
+        lines = [json.dumps({**alert.to_dict(), "sent_at": sent_at}, ensure_ascii=False) + "\n" for alert in alerts]
+        await asyncio.get_running_loop().run_in_executor(None, self._write, lines)
+
+
+def default_sink():
+    """ALERT_LOG_PATH가 있으면 FileSink, 없으면 LogSink"""
+    return FileSink(ALERT_LOG_PATH) if ALERT_LOG_PATH else LogSink()
+
+
+class AlertDispatcher:
+    """배치/중복 제거를 하는 비동기 알림 발송기"""
+
+    def __init__(self, sink=None, queue_size: int = ALERT_QUEUE_SIZE,
+                 batch_window_seconds: float = ALERT_BATCH_WINDOW_SECONDS, max_batch: int = ALERT_MAX_BATCH,
+                 dedupe_seconds: float = ALERT_DEDUPE_SECONDS):
+        self.sink = sink or default_sink()
+        self.queue_size = queue_size
+        self.batch_window_seconds = batch_window_seconds
+        self.max_batch = max_batch
+        self.dedupe_seconds = dedupe_seconds
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._recent: Dict[Hashable, float] = {}
+        self._latencies: Deque[float] = deque(maxlen=_LATENCY_SAMPLES)
+        self.enqueued = 0
+        self.deduplicated = 0
+        self.dropped = 0
+        self.sent = 0
+        self.batches = 0
+        self.failed = 0
+
+    async def start(self) -> None:
+        """이벤트 루프에서 발송 작업 시작"""
+        if self._worker is None:
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """남은 알림을 보내고 발송 작업 종료"""
+        if self._worker is None:
+            return
+        await self._queue.join()
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+    def submit(self, event: AlertEvent) -> bool:
+        """알림 등록 (중복이거나 큐가 가득 차면 False, 블로킹 없음)"""
+        now = time.time()
+        last = self._recent.get(event.dedupe_key)
+        if last is not None and now - last < self.dedupe_seconds:
+            self.deduplicated += 1
+            return False
+        if self._queue is None:
+            self.dropped += 1
+            return False
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+        self._recent[event.dedupe_key] = now
+        self.enqueued += 1
+        return True
+
+    async def _next_batch(self) -> List[AlertEvent]:
+        """첫 알림을 기다린 뒤 배치 창 동안 더 모으기"""
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.batch_window_seconds
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self.sink.send_batch(batch)
+                sent_at = time.time()
+                self.sent += len(batch)
+                self.batches += 1
+                self._latencies.extend(sent_at - alert.source_time for alert in batch)
+            except Exception as e:
+                self.failed += len(batch)
+                print(f"알림 전송 오류: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            self._expire_recent()
+
+    def _expire_recent(self) -> None:
+        """중복 제거 기록 중 오래된 항목 정리"""
+        if len(self._recent) < self.queue_size:
+            return
+        cutoff = time.time() - self.dedupe_seconds
+        self._recent = {key: at for key, at in self._recent.items() if at >= cutoff}
+
+    def metrics(self) -> dict:
+        """큐 길이, 처리 건수, 격자 기록 → 전송 지연 (최근 표본 기준, 초)"""
+        latencies = sorted(self._latencies)
+
+        def percentile(p: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "queue_size": self.queue_size,
+            "enqueued": self.enqueued,
+            "deduplicated": self.deduplicated,
+            "dropped": self.dropped,
+            "sent": self.sent,
+            "failed": self.failed,
+            "batches": self.batches,
+            "latency_p50_seconds": percentile(0.5),
+            "latency_p95_seconds": percentile(0.95),
+            "latency_max_seconds": latencies[-1] if latencies else None,
+        }
+
+
+# 프로세스 전역 발송기 (서버 시작 시 start)
+alert_dispatcher = AlertDispatcher()
@@ -0,0 +1,161 @@
+"""
+연소 마스크 압축 표현 (비트마스크 / 런렝스)
+
+BurnedPixel 목록 대신 격자 전체를 한 번에 보내는 표현입니다. 좌표는 격자
+georeference(첫 셀 중심 위경도와 행/열 간격)로 한 번만 보내고, 셀 상태는
+
+- bitmask: np.packbits로 행 우선(row-major) 비트 배열 (셀당 1비트)
+- rle: 행 우선으로 펼친 마스크의 교대 런 길이 (미연소 런부터 시작, uint32)
+
+로 인코딩합니다.
+
+application/octet-stream 응답의 바이너리 레이아웃 (little-endian):
+
+    offset  type      field
+    0       4s        magic "C2FM"
+    4       u8        version (1)
+    5       u8        encoding (0 = bitmask, 1 = rle)
+    6       u16       reserved
+    8       u32       rows
+    12      u32       cols
+    16      u32       time_minutes
+    20      u32       total_burned_pixels
+    24      f64 x 4   lat_origin, lon_origin, lat_step, lon_step
+    56      ...       payload (bitmask 바이트 또는 uint32 런 길이)
+"""
+import base64
+import struct
+from typing import Dict
+
+import numpy as np
+
+MASK_JSON_MEDIA_TYPE = "application/vnd.cell2fire.mask+json"
+MASK_BINARY_MEDIA_TYPE = "application/octet-stream"
+
+ENCODINGS = ("bitmask", "rle")
+
+_MAGIC = b"C2FM"
+_VERSION = 1
+_HEADER = struct.Struct("<4sBBHIIII4d")
+
+
+def parse_accept(accept: str) -> Dict[str, float]:
+    """Accept 헤더의 미디어 범위별 q 값 (같은 범위가 여러 번 나오면 큰 값)"""
+    ranges: Dict[str, float] = {}
+    for part in (accept or "").lower().split(","):
+        media_range, *params = [item.strip() for item in part.split(";")]
+        if not media_range:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = min(max(float(value), 0.0), 1.0)
+                except ValueError:
+                    q = 0.0
+        ranges[media_range] = max(q, ranges.get(media_range, 0.0))
+    return ranges
+
+
+def negotiate_mask_format(accept: str):
+    """Accept 헤더에서 압축 표현 미디어 타입 선택 (해당 없으면 None → 기존 JSON)
+
+    압축 표현은 미디어 타입을 직접 적은 경우에만 고르고, 기존 JSON(application/json)은
+    와일드카드로도 받을 수 있습니다. q=0은 제외하고 q가 가장 큰 표현을 고르며, 같으면
+    압축 JSON, 바이너리, 기존 JSON 순입니다.
+    """
+    ranges = parse_accept(accept)
+    json_q = next((ranges[r] for r in ("application/json", "application/*", "*/*") if r in ranges), 0.0)
+    offers = (
+        (ranges.get(MASK_JSON_MEDIA_TYPE, 0.0), MASK_JSON_MEDIA_TYPE),
+        (ranges.get(MASK_BINARY_MEDIA_TYPE, 0.0), MASK_BINARY_MEDIA_TYPE),
+        (json_q, None),
+    )
+    q, media_type = max(offers, key=lambda offer: offer[0])  # 같은 q는 앞쪽 표현
+    return media_type if q > 0 else None
+
+
+def encode_bitmask(mask: np.ndarray) -> bytes:
+    """마스크를 행 우선 비트 배열로 압축"""
+    return np.packbits(np.ascontiguousarray(mask, dtype=bool).ravel()).tobytes()
+
+
+def decode_bitmask(payload: bytes, rows: int, cols: int) -> np.ndarray:
+    """encode_bitmask의 역변환"""
+    bits = np.unpackbits(np.frombuffer(payload, dtype=np.uint8), count=rows * cols)
+    return bits.astype(bool).reshape(rows, cols)
+
+
+def encode_rle(mask: np.ndarray) -> bytes:
+    """마스크를 교대 런 길이(uint32)로 압축, 첫 런은 미연소 셀"""
+    flat = np.ascontiguousarray(mask, dtype=bool).ravel()
+    if flat.size == 0:
+        return b""
+    # 값이 바뀌는 위치로 런 경계 계산
+    boundaries = np.flatnonzero(flat[1:] != flat[:-1]) + 1
+    edges = np.concatenate(([0], boundaries, [flat.size]))
+    runs = np.diff(edges)
+    if flat[0]:
+        runs = np.concatenate(([0], runs))
+    return runs.astype("<u4").tobytes()
+
+
+def decode_rle(payload: bytes, rows: int, cols: int) -> np.ndarray:
+    """encode_rle의 역변환"""
+    runs = np.frombuffer(payload, dtype="<u4")
+    values = np.arange(len(runs)) % 2 == 1
+    return np.repeat(values, runs).reshape(rows, cols)
+
+
+def encode_mask(mask: np.ndarray, encoding: str) -> bytes:
+    """인코딩 이름으로 마스크 압축"""
+    if encoding == "rle":
+        return encode_rle(mask)
+    return encode_bitmask(mask)
+
+
+def decode_mask(payload: bytes, encoding: str, rows: int, cols: int) -> np.ndarray:
+    """인코딩 이름으로 마스크 복원"""
+    if encoding == "rle":
+        return decode_rle(payload, rows, cols)
+    return decode_bitmask(payload, rows, cols)
+
+
+def encode_base64(payload: bytes) -> str:
+    return base64.b64encode(payload).decode("ascii")
+
+
+def pack_binary(mask: np.ndarray, encoding: str, time_minutes: int, georeference: Dict[str, float]) -> bytes:
+    """헤더 + 압축 마스크로 바이너리 응답 본문 생성"""
+    rows, cols = mask.shape
+    header = _HEADER.pack(
+        _MAGIC, _VERSION, ENCODINGS.index(encoding), 0,
+        rows, cols, time_minutes, int(np.count_nonzero(mask)),
+        georeference["lat_origin"], georeference["lon_origin"],
+        georeference["lat_step"], georeference["lon_step"],
+    )
+    return header + encode_mask(mask, encoding)
+
+
+def unpack_binary(body: bytes):
+    """pack_binary의 역변환: (헤더 dict, 마스크)"""
+    (magic, version, encoding_id, _, rows, cols, time_minutes, burned,
+     lat_origin, lon_origin, lat_step, lon_step) = _HEADER.unpack_from(body)
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError("지원하지 않는 마스크 형식입니다")
+    encoding = ENCODINGS[encoding_id]
+    header = {
+        "encoding": encoding,
+        "rows": rows,
+        "cols": cols,
+        "time_minutes": time_minutes,
+        "total_burned_pixels": burned,
+        "georeference": {
+            "lat_origin": lat_origin,
+            "lon_origin": lon_origin,
+            "lat_step": lat_step,
+            "lon_step": lon_step,
+        },
+    }
+    return header, decode_mask(body[_HEADER.size:], encoding, rows, cols)
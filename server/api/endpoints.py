@@ -2,9 +2,48 @@
 API 엔드포인트 정의
 """
 import os
-from fastapi import HTTPException
-from .models import FireSpreadResponse, AvailableSimulations, ServerStatus
-from .data_handler import DataHandler, RESULTS_BASE_PATH
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+import numpy as np
+from fastapi import HTTPException, Request
+from fastapi.responses import Response
+from .models import (FireSpreadResponse, FireSpreadMaskResponse, FireSpreadDeltaResponse,
+                     BurnProbabilityResponse, AvailableSimulations, DatasetManifest, ServerStatus, SimulationRequest,
+                     SimulationJobResponse, AlertUserRegistration, AlertUserRegistrationResponse,
+                     AlertMatchResponse, ThreatenedUser, ShelterRegistration, ShelterRegistrationResponse,
+                     NearestShelterResponse)
+from .data_handler import DataHandler, RESULTS_BASE_PATH, DATA_BASE_PATH, get_results_manifest, get_simulation_jobs
+from .jobs import JobQueueFullError
+from .alerts import ArrivalTimeline, match_mask, snap_to_cells, user_store
+from .dispatcher import AlertEvent, alert_dispatcher
+from .shelters import WALKING_SPEED_M_PER_MIN, build_shelter_routes, shelter_store
+from .progress import SSE_KEEPALIVE_SECONDS, SSE_POLL_SECONDS, GridProgressWatcher, format_sse
+from .cache import grid_cache, mask_version, array_version
+from .http_cache import CachedBody, cached_response, etag_matches, response_flights
+from .arrival import burn_probability
+from .encoding import (ENCODINGS, MASK_BINARY_MEDIA_TYPE, encode_base64, encode_mask,
+                       pack_binary)
+from .perimeter import GEOJSON_MEDIA_TYPE, dumps_geojson, polygonize
+from .timeline import (TIMELINE_FORMATS, TIMELINE_MAX_STEPS, arrival_lines, delta_line, dumps_line,
+                       timeline_times)
+from .tiles import (BURN_PALETTE, PNG_MEDIA_TYPE, PROBABILITY_PALETTE, mask_palette_indices,
+                    probability_palette_indices, raster_version, render_tile, tile_cache, valid_tile)
+
+# 디스크/파싱 작업용 스레드 풀 (이벤트 루프를 막지 않도록 분리)
+IO_WORKERS = min(8, (os.cpu_count() or 1) + 2)
+_io_executor = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="fire-io")
+
+# 실행 중인 백그라운드 작업 (가비지 컬렉션으로 취소되지 않도록 참조 유지)
+_background_tasks = set()
+
+
+async def run_blocking(func, *args):
+    """블로킹 함수를 I/O 스레드 풀에서 실행"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_io_executor, functools.partial(func, *args))
+
 
 class FireSpreadAPI:
     """화재 확산 API 엔드포인트 클래스"""
@@ -17,17 +56,26 @@ class FireSpreadAPI:
             status="running",
             version="1.0.0",
             korean_forest_data="Korean40x40 dataset available (2km x 2km, 50m resolution)",
-            time_intervals="30분 간격 (0분 ~ 210분)",
+            time_intervals="임의의 분 (도달 시간 기준, 스냅샷은 30분 간격 0분 ~ 210분)",
             endpoints=[
                 "/simulations - 사용 가능한 시뮬레이션 목록",
-                "/korean-fire-spread/0 - 한국 산림 발화 시점",
-                "/korean-fire-spread/30 - 한국 산림 30분 후",
-                "/korean-fire-spread/60 - 한국 산림 1시간 후", 
-                "/korean-fire-spread/90 - 한국 산림 1시간 30분 후",
-                "/korean-fire-spread/120 - 한국 산림 2시간 후",
-                "/korean-fire-spread/150 - 한국 산림 2시간 30분 후",
-                "/korean-fire-spread/180 - 한국 산림 3시간 후",
-                "/korean-fire-spread/210 - 한국 산림 3시간 30분 후"
+                "POST /simulations - 점화 셀/기상 조건으로 시뮬레이션 실행 (작업 ID 반환)",
+                "/simulations/{job_id} - 시뮬레이션 작업 상태 조회",
+                "/simulations/{job_id}/events - 엔진이 기록하는 격자를 SSE로 실시간 전송",
+                "/fire-spread/{dataset}/{simulation}/{minutes} - 데이터셋/시뮬레이션/시간별 화재 확산",
+                "/fire-spread/{dataset}/{simulation}/delta?from=&to= - 두 시점 사이에 새로 연소된 셀",
+                "/fire-spread/{dataset}/{simulation}/timeline?format=delta|arrival&step=&until= - 전체 타임라인 NDJSON 스트림",
+                "/fire-spread/{dataset}/{simulation}/{minutes}/perimeter?simplify= - 화재 경계 GeoJSON 폴리곤",
+                "/fire-spread/{dataset}/probability/{minutes}?contour=0.5 - 전체 시뮬레이션 앙상블 셀별 연소 확률",
+                "/tiles/{dataset}/{simulation}/{minutes}/{z}/{x}/{y}.png - 지도 오버레이용 연소 영역 XYZ 타일",
+                "/tiles/{dataset}/probability/{minutes}/{z}/{x}/{y}.png - 지도 오버레이용 연소 확률 XYZ 타일",
+                "Accept: application/vnd.cell2fire.mask+json 또는 application/octet-stream - 압축 마스크 응답 (?encoding=bitmask|rle)",
+                "POST /alerts/users - 알림 대상 사용자 위치 등록",
+                "/alerts/{dataset}/{simulation}?from=&to= - 구간 사이에 화재 도달이 예상되는 사용자",
+                "/alerts/metrics - 알림 발송 큐 길이/지연 시간 지표 (POST /simulations 작업이 격자를 쓰면 자동 발송)",
+                "POST /shelters - 대피소 위치 등록",
+                "/shelters/{dataset}/{simulation}/nearest?lat=&lon=&minutes= - 불이 닿기 전에 갈 수 있는 가장 가까운 대피소",
+                "/korean-fire-spread/{minutes} - 한국 산림 화재 확산 (임의의 분, 스냅샷 사이는 MessagesFile 도달 시간으로 계산)"
             ]
         )
 
@@ -38,67 +86,783 @@ class FireSpreadAPI:
         
         return AvailableSimulations(
             simulations=simulations,
+            datasets=[DatasetManifest(**entry.to_dict()) for entry in get_results_manifest().entries()],
             description="Cell2Fire로 실행된 시뮬레이션 결과들"
         )
 
+    @staticmethod
+    def build_job_response(job, cached: bool = False) -> SimulationJobResponse:
+        """작업 상태 응답 생성"""
+        return SimulationJobResponse(
+            job_id=job.job_id,
+            status=job.status,
+            cached=job.cached or cached,
+            dataset=job.dataset,
+            result_dataset=job.result_dataset,
+            nsims=job.nsims,
+            error=job.error,
+            submitted_at=job.submitted_at,
+            finished_at=job.finished_at,
+            result_url=f"/fire-spread/{job.result_dataset}/1/0" if job.status == "done" else None
+        )
+
+    @staticmethod
+    async def submit_simulation(request: SimulationRequest) -> SimulationJobResponse:
+        """시뮬레이션 작업 등록 (같은 입력은 기존 작업/결과 재사용)"""
+        if not os.path.isdir(os.path.join(DATA_BASE_PATH, request.dataset)):
+            raise HTTPException(
+                status_code=404,
+                detail=f"입력 데이터셋을 찾을 수 없습니다: {request.dataset}"
+            )
+        index = FireSpreadAPI.require_coordinate_index(request.dataset)
+        if request.ignition_cell > index.ncells:
+            raise HTTPException(
+                status_code=400,
+                detail=f"점화 셀 번호가 격자 범위를 벗어났습니다: {request.ignition_cell} (최대 {index.ncells})"
+            )
+
+        spec = request.model_dump(exclude={"dataset"})
+        try:
+            job, created = await run_blocking(get_simulation_jobs().submit, request.dataset, spec)
+        except JobQueueFullError as e:
+            raise HTTPException(
+                status_code=503,
+                detail=f"시뮬레이션 대기열이 가득 찼습니다: {e}"
+            )
+        if created:
+            task = asyncio.create_task(FireSpreadAPI.dispatch_job_alerts(job, index))
+            _background_tasks.add(task)
+            task.add_done_callback(_background_tasks.discard)
+        return FireSpreadAPI.build_job_response(job, cached=not created)
+
+    @staticmethod
+    async def dispatch_job_alerts(job, index) -> None:
+        """작업이 격자를 기록할 때마다 새로 연소 영역에 들어온 사용자를 알림 발송기로 전달"""
+        step_minutes = DataHandler.calculate_step_minutes(job.result_dataset)
+        watcher = GridProgressWatcher(
+            [get_simulation_jobs().output_folder(job.job_id), os.path.join(RESULTS_BASE_PATH, job.result_dataset)],
+            index.rows, index.cols
+        )
+        try:
+            while True:
+                finished = not job.is_active
+                for simulation, step, mask, written_at in await run_blocking(watcher.poll):
+                    if len(user_store) == 0:
+                        continue
+                    user_cells = await run_blocking(user_store.cells_for, job.dataset, index)
+                    for user_id in user_store.user_ids(match_mask(user_cells, mask)):
+                        alert_dispatcher.submit(AlertEvent(user_id, job.result_dataset, simulation,
+                                                           step * step_minutes, written_at,
+                                                           {"job_id": job.job_id}))
+                if finished:
+                    return
+                await asyncio.sleep(SSE_POLL_SECONDS)
+        except Exception as e:
+            print(f"알림 파이프라인 오류 ({job.job_id}): {e}")
+
+    @staticmethod
+    async def get_alert_metrics() -> dict:
+        """알림 발송기 지표 (큐 길이, 처리 건수, 지연 시간)"""
+        return alert_dispatcher.metrics()
+
+    @staticmethod
+    async def get_simulation_job(job_id: str) -> SimulationJobResponse:
+        """시뮬레이션 작업 상태 조회"""
+        return FireSpreadAPI.build_job_response(FireSpreadAPI.require_job(job_id))
+
+    @staticmethod
+    def require_job(job_id: str):
+        """시뮬레이션 작업, 없으면 404"""
+        job = get_simulation_jobs().get(job_id)
+        if job is None:
+            raise HTTPException(
+                status_code=404,
+                detail=f"시뮬레이션 작업을 찾을 수 없습니다: {job_id}"
+            )
+        return job
+
+    @staticmethod
+    def open_progress_stream(job_id: str):
+        """작업 진행 SSE 스트림 (격자가 기록될 때마다 grid 이벤트, 끝나면 status 이벤트)"""
+        job = FireSpreadAPI.require_job(job_id)
+        # 작업 입력 폴더는 작업 프로세스가 만드므로 격자 크기는 원본 데이터셋 기준
+        index = FireSpreadAPI.require_coordinate_index(job.dataset)
+        step_minutes = DataHandler.calculate_step_minutes(job.result_dataset)
+        watcher = GridProgressWatcher(
+            [get_simulation_jobs().output_folder(job_id), os.path.join(RESULTS_BASE_PATH, job.result_dataset)],
+            index.rows, index.cols
+        )
+
+        async def events():
+            yield format_sse("status", FireSpreadAPI.build_job_response(job).model_dump())
+            idle = 0.0
+            while True:
+                # 상태를 먼저 읽어야 완료 직후 기록된 격자를 놓치지 않음
+                finished = not job.is_active
+                for simulation, step, mask, _ in await run_blocking(watcher.poll):
+                    idle = 0.0
+                    yield format_sse("grid", {
+                        "simulation": simulation,
+                        "step": step,
+                        "time_minutes": step * step_minutes,
+                        "total_burned_pixels": int(np.count_nonzero(mask)),
+                        "rows": index.rows,
+                        "cols": index.cols,
+                        "encoding": "bitmask",
+                        "data": encode_base64(encode_mask(mask, "bitmask")),
+                    }, event_id=f"{simulation}:{step}")
+                if finished:
+                    yield format_sse("status", FireSpreadAPI.build_job_response(job).model_dump())
+                    return
+                if idle >= SSE_KEEPALIVE_SECONDS:
+                    idle = 0.0
+                    yield ": keepalive\n\n"
+                await asyncio.sleep(SSE_POLL_SECONDS)
+                idle += SSE_POLL_SECONDS
+
+        return events()
+
+    @staticmethod
+    def validate_dataset(dataset: str, simulation: int) -> None:
+        """manifest 기준으로 데이터셋/시뮬레이션 존재 여부 확인"""
+        entry = get_results_manifest().get(dataset)
+        if entry is None:
+            raise HTTPException(
+                status_code=404,
+                detail=f"데이터셋을 찾을 수 없습니다: {dataset}"
+            )
+        if not entry.has_simulation(simulation):
+            raise HTTPException(
+                status_code=404,
+                detail=f"시뮬레이션 결과를 찾을 수 없습니다: {dataset}/Grids{simulation}"
+            )
+
+    @staticmethod
+    async def preload() -> None:
+        """서버 시작 시 manifest 스캔, 좌표 인덱스 미리 로드, 알림 발송기 시작"""
+        await alert_dispatcher.start()
+        await run_blocking(get_results_manifest().refresh)
+        get_results_manifest().watch()
+        for dataset in get_results_manifest().dataset_names():
+            await run_blocking(DataHandler.get_coordinate_index, dataset)
+
     @staticmethod
     async def get_fire_spread_data(dataset: str, simulation: int, time_minutes: int) -> FireSpreadResponse:
         """특정 시간대의 산불 확산 데이터 반환"""
-        
-        # 결과 폴더 경로 구성
-        result_path = os.path.join(RESULTS_BASE_PATH, dataset)
-        grid_path = os.path.join(result_path, "Grids", f"Grids{simulation}")
-        
-        # 폴더 존재 확인
-        if not os.path.exists(grid_path):
+        FireSpreadAPI.validate_dataset(dataset, simulation)
+        return await run_blocking(FireSpreadAPI.build_fire_spread_response, dataset, simulation, time_minutes)
+
+    @staticmethod
+    def load_snapshot_mask(dataset: str, simulation: int, time_minutes: int, time_step: int):
+        """ForestGrid 스냅샷 마스크 (단계 존재 여부는 manifest로 확인, 0분은 파일이 없어도 None)"""
+        entry = get_results_manifest().get(dataset)
+        if entry is None or not entry.has_simulation(simulation):
             raise HTTPException(
-                status_code=404, 
+                status_code=404,
                 detail=f"시뮬레이션 결과를 찾을 수 없습니다: {dataset}/Grids{simulation}"
             )
-        
-        # 그리드 파일 경로 생성
-        grid_file_path = DataHandler.get_grid_file_path(dataset, simulation, time_minutes)
-        
-        # 0분일 경우, 점화점만 반환
-        if time_minutes == 0:
-            ignition_pixel = DataHandler.get_ignition_pixel(dataset)
-            burned_pixels = [ignition_pixel] if ignition_pixel else []
-        
-        elif not os.path.exists(grid_file_path):
-            time_step = DataHandler.calculate_time_step(dataset, time_minutes)
-            grid_file = f"ForestGrid{time_step:02d}.csv"
+        if entry.has_step(simulation, time_step):
+            try:
+                return DataHandler.load_burned_mask(dataset, simulation, time_step)
+            except FileNotFoundError:
+                pass  # manifest 갱신 전에 삭제된 파일
+        if time_minutes > 0:
             raise HTTPException(
                 status_code=404,
-                detail=f"해당 시간대 데이터가 없습니다: {grid_file}"
-            )
-        else:
-            # 좌표 매핑 정보 가져오기
-            base_dataset = dataset.replace("_full", "")  # 9cellsC1_full -> 9cellsC1
-            coordinates_map, grid_size = DataHandler.get_coordinates_from_data_csv(base_dataset)
-            
-            # 그리드 파일 파싱
-            burned_pixels = DataHandler.parse_grid_csv(grid_file_path, coordinates_map, grid_size)
-        
-        # 점화점 정보
-        ignition_point = DataHandler.get_ignition_point(dataset)
-        
-        # 메타데이터
+                detail=f"해당 시간대 데이터가 없습니다: ForestGrid{time_step:02d}.csv"
+            )
+        return None
+
+    @staticmethod
+    def resolve_mask(dataset: str, simulation: int, time_minutes: int):
+        """시간(분)에 해당하는 연소 마스크와 마스크를 계산한 출처 파일 이름 반환
+
+        도달 시간(ArrivalTimesNN.npy 또는 MessagesFile로 계산)이 있으면 임의의 분을 임계값
+        비교로 계산하고, 없으면 ForestGrid 스냅샷 단위로 내림합니다.
+        0분이고 ForestGrid00도 없으면 마스크는 None입니다.
+        """
+        mask = DataHandler.load_arrival_mask(dataset, simulation, time_minutes)
+        if mask is not None:
+            return mask, DataHandler.arrival_source_name(dataset, simulation)
         time_step = DataHandler.calculate_time_step(dataset, time_minutes)
-        grid_file = f"ForestGrid{time_step:02d}.csv" if time_minutes > 0 else "IgnitionPoint"
-        
-        metadata = {
+        mask = FireSpreadAPI.load_snapshot_mask(dataset, simulation, time_minutes, time_step)
+        return mask, f"ForestGrid{time_step:02d}.csv"
+
+    @staticmethod
+    def require_coordinate_index(dataset: str):
+        """좌표 인덱스 (데이터셋당 한 번 생성되어 캐시됨), 없으면 404"""
+        index = DataHandler.get_coordinate_index(dataset)
+        if index is None:
+            raise HTTPException(
+                status_code=404,
+                detail=f"좌표 데이터를 찾을 수 없습니다: {dataset}"
+            )
+        return index
+
+    @staticmethod
+    def resolve_response_mask(dataset: str, simulation: int, time_minutes: int, index):
+        """응답에 쓸 연소 마스크와 출처 (0분은 점화점만 표시)"""
+        mask, source = FireSpreadAPI.resolve_mask(dataset, simulation, time_minutes)
+        if time_minutes == 0:
+            mask = np.zeros((index.rows, index.cols), dtype=bool)
+            ignition_cell = DataHandler.get_ignition_cell(dataset, simulation)
+            if ignition_cell is not None:
+                mask.flat[ignition_cell] = True
+            source = "IgnitionPoint"
+        return mask, source
+
+    @staticmethod
+    def snapshot_file_name(dataset: str, time_minutes: int) -> str:
+        """시간(분)을 내림한 ForestGrid 스냅샷 이름 (도달 시간으로 계산해도 응답의 grid_file은 이 이름)"""
+        return f"ForestGrid{DataHandler.calculate_time_step(dataset, time_minutes):02d}.csv"
+
+    @staticmethod
+    def build_metadata(dataset: str, simulation: int, index, time_minutes: int, source: str) -> dict:
+        """응답 메타데이터 (grid_file: 시간대의 스냅샷 이름, source: 마스크를 실제로 계산한 파일)"""
+        return {
             "dataset": dataset,
             "simulation_number": simulation,
-            "grid_size": f"{DataHandler.get_coordinates_from_data_csv(dataset)[1]}x{DataHandler.get_coordinates_from_data_csv(dataset)[1]}",
-            "grid_file": grid_file,
+            "grid_size": index.grid_size,
+            "grid_file": FireSpreadAPI.snapshot_file_name(dataset, time_minutes) if time_minutes > 0 else "IgnitionPoint",
+            "source": source,
             "data_source": "Cell2Fire simulation results"
         }
-        
+
+    @staticmethod
+    async def get_fire_spread_body(request: Request, dataset: str, simulation: int, time_minutes: int) -> Response:
+        """산불 확산 JSON 응답 (동시 요청은 한 번만 계산, ETag/gzip 지원)"""
+        FireSpreadAPI.validate_dataset(dataset, simulation)
+        cached = await response_flights.do(
+            ("fire-spread", dataset, simulation, time_minutes),
+            lambda: run_blocking(FireSpreadAPI.build_fire_spread_body, dataset, simulation, time_minutes)
+        )
+        return cached_response(request, cached, "application/json")
+
+    @staticmethod
+    def build_fire_spread_body(dataset: str, simulation: int, time_minutes: int) -> CachedBody:
+        """직렬화된 산불 확산 응답 (마스크 내용 버전별 캐시, 블로킹)"""
+        index = FireSpreadAPI.require_coordinate_index(dataset)
+        mask, source = FireSpreadAPI.resolve_response_mask(dataset, simulation, time_minutes, index)
+        return grid_cache.get_derived(
+            ("fire-spread-body", dataset, simulation, time_minutes), (mask_version(mask), source),
+            lambda: CachedBody(FireSpreadAPI.fire_spread_response(
+                dataset, simulation, time_minutes, index, mask, source).model_dump_json().encode("utf-8"))
+        )
+
+    @staticmethod
+    def build_fire_spread_response(dataset: str, simulation: int, time_minutes: int) -> FireSpreadResponse:
+        """산불 확산 응답 생성 (블로킹, I/O 스레드 풀에서 실행)"""
+        index = FireSpreadAPI.require_coordinate_index(dataset)
+        mask, source = FireSpreadAPI.resolve_response_mask(dataset, simulation, time_minutes, index)
+        return FireSpreadAPI.fire_spread_response(dataset, simulation, time_minutes, index, mask, source)
+
+    @staticmethod
+    def fire_spread_response(dataset: str, simulation: int, time_minutes: int, index, mask,
+                             source: str) -> FireSpreadResponse:
+        """마스크로 산불 확산 응답 모델 생성"""
+        # 캐시된 마스크에서 연소 픽셀 추출
+        burned_pixels = index.mask_pixels(mask)
+
         return FireSpreadResponse(
             time_minutes=time_minutes,
             total_burned_pixels=len(burned_pixels),
             burned_coordinates=burned_pixels,
-            ignition_point=ignition_point,
+            ignition_point=DataHandler.get_ignition_point(dataset, simulation),
+            metadata=FireSpreadAPI.build_metadata(dataset, simulation, index, time_minutes, source)
+        )
+
+    @staticmethod
+    async def get_fire_spread_mask(request: Request, dataset: str, simulation: int, time_minutes: int,
+                                   media_type: str, encoding: str) -> Response:
+        """압축 마스크 표현으로 산불 확산 데이터 반환 (Accept 헤더로 선택, ETag/gzip 지원)"""
+        FireSpreadAPI.validate_dataset(dataset, simulation)
+        if encoding not in ENCODINGS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"지원하지 않는 인코딩입니다: {encoding} (가능: {', '.join(ENCODINGS)})"
+            )
+        cached = await response_flights.do(
+            ("fire-spread-mask", dataset, simulation, time_minutes, media_type, encoding),
+            lambda: run_blocking(FireSpreadAPI.build_fire_spread_mask_body, dataset, simulation,
+                                 time_minutes, media_type, encoding)
+        )
+        return cached_response(request, cached, media_type)
+
+    @staticmethod
+    def build_fire_spread_mask_body(dataset: str, simulation: int, time_minutes: int,
+                                    media_type: str, encoding: str) -> CachedBody:
+        """직렬화된 압축 마스크 응답 (마스크 내용 버전별 캐시, 블로킹)"""
+        index = FireSpreadAPI.require_coordinate_index(dataset)
+        mask, source = FireSpreadAPI.resolve_response_mask(dataset, simulation, time_minutes, index)
+        return grid_cache.get_derived(
+            ("fire-spread-mask-body", dataset, simulation, time_minutes, media_type, encoding),
+            (mask_version(mask), source),
+            lambda: CachedBody(FireSpreadAPI.build_fire_spread_mask(
+                dataset, simulation, time_minutes, media_type, encoding, index, mask, source))
+        )
+
+    @staticmethod
+    def build_fire_spread_mask(dataset: str, simulation: int, time_minutes: int,
+                               media_type: str, encoding: str, index, mask, source: str) -> bytes:
+        """압축 마스크 응답 본문 생성"""
+        georeference = index.georeference()
+
+        if media_type == MASK_BINARY_MEDIA_TYPE:
+            return pack_binary(mask, encoding, time_minutes, georeference)
+
+        response = FireSpreadMaskResponse(
+            time_minutes=time_minutes,
+            total_burned_pixels=int(np.count_nonzero(mask)),
+            rows=index.rows,
+            cols=index.cols,
+            encoding=encoding,
+            data=encode_base64(encode_mask(mask, encoding)),
+            georeference=georeference,
+            ignition_point=DataHandler.get_ignition_point(dataset, simulation),
+            metadata=FireSpreadAPI.build_metadata(dataset, simulation, index, time_minutes, source)
+        )
+        return response.model_dump_json().encode("utf-8")
+
+    @staticmethod
+    async def get_fire_spread_delta(dataset: str, simulation: int, from_minutes: int, to_minutes: int) -> FireSpreadDeltaResponse:
+        """두 시점 사이에 상태가 바뀐 셀만 반환"""
+        FireSpreadAPI.validate_dataset(dataset, simulation)
+        return await run_blocking(FireSpreadAPI.build_fire_spread_delta, dataset, simulation, from_minutes, to_minutes)
+
+    @staticmethod
+    def build_fire_spread_delta(dataset: str, simulation: int, from_minutes: int, to_minutes: int) -> FireSpreadDeltaResponse:
+        """캐시된 두 마스크의 XOR로 변경 셀 계산 (블로킹)"""
+        index = FireSpreadAPI.require_coordinate_index(dataset)
+        from_mask, from_source = FireSpreadAPI.resolve_mask(dataset, simulation, from_minutes)
+        to_mask, to_source = FireSpreadAPI.resolve_mask(dataset, simulation, to_minutes)
+        if from_mask is None:
+            from_mask = np.zeros((index.rows, index.cols), dtype=bool)
+        if to_mask is None:
+            to_mask = np.zeros((index.rows, index.cols), dtype=bool)
+
+        changed = from_mask ^ to_mask
+        added = index.mask_pixels(changed & to_mask)
+        removed = index.mask_pixels(changed & from_mask)
+
+        return FireSpreadDeltaResponse(
+            from_minutes=from_minutes,
+            to_minutes=to_minutes,
+            total_changed_pixels=len(added) + len(removed),
+            added_coordinates=added,
+            removed_coordinates=removed,
+            metadata={
+                "dataset": dataset,
+                "simulation_number": simulation,
+                "grid_size": index.grid_size,
+                "from_grid_file": FireSpreadAPI.snapshot_file_name(dataset, from_minutes),
+                "to_grid_file": FireSpreadAPI.snapshot_file_name(dataset, to_minutes),
+                "from_source": from_source,
+                "to_source": to_source,
+                "data_source": "Cell2Fire simulation results"
+            }
+        )
+
+    @staticmethod
+    def check_timeline_sources(dataset: str, simulation: int, timeline_format: str, times: List[int]):
+        """스트림 시작 전에 모든 단계의 출처 확인 (블로킹)
+
+        arrival 형식은 도달 시간 래스터를 읽어 반환하고, delta 형식은 도달 시간이 없으면
+        단계마다 ForestGrid 스냅샷이 있는지 manifest로 확인합니다. 없으면 404입니다.
+        """
+        if timeline_format == "arrival":
+            try:
+                return DataHandler.load_simulation_arrival(dataset, simulation)
+            except FileNotFoundError:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"시뮬레이션 결과를 찾을 수 없습니다: {dataset}/Grids{simulation}"
+                )
+        if DataHandler.load_arrival_times(dataset, simulation) is not None:
+            return None
+        entry = get_results_manifest().get(dataset)
+        for time_minutes in times:
+            time_step = DataHandler.calculate_time_step(dataset, time_minutes)
+            if time_minutes > 0 and not entry.has_step(simulation, time_step):
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"해당 시간대 데이터가 없습니다: ForestGrid{time_step:02d}.csv ({time_minutes}분)"
+                )
+        return None
+
+    @staticmethod
+    async def open_fire_spread_timeline(dataset: str, simulation: int, timeline_format: str,
+                                        step_minutes: Optional[int], until_minutes: Optional[int]):
+        """시뮬레이션 전체 타임라인 NDJSON 스트림 (header 한 줄 + 단계별 delta 또는 도달 시간)
+
+        출처가 없는 단계는 스트림을 시작하기 전에 404로 응답합니다. 스트림 도중 파일이 사라지면
+        {"type": "error"} 줄을 보내고 end 줄 없이 끝냅니다.
+        """
+        FireSpreadAPI.validate_dataset(dataset, simulation)
+        if timeline_format not in TIMELINE_FORMATS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"지원하지 않는 타임라인 형식입니다: {timeline_format} (가능: {', '.join(TIMELINE_FORMATS)})"
+            )
+        index = FireSpreadAPI.require_coordinate_index(dataset)
+        entry = get_results_manifest().get(dataset)
+        snapshot_minutes = DataHandler.calculate_step_minutes(dataset)
+        step_minutes = step_minutes or snapshot_minutes
+        if until_minutes is None:
+            until_minutes = max(entry.steps.get(simulation) or (0,)) * snapshot_minutes
+        times = timeline_times(until_minutes, step_minutes)
+        if len(times) > TIMELINE_MAX_STEPS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"시간 단계가 너무 많습니다: {len(times)}개 (최대 {TIMELINE_MAX_STEPS}개, step을 늘려 주세요)"
+            )
+        arrival = await run_blocking(FireSpreadAPI.check_timeline_sources, dataset, simulation,
+                                     timeline_format, times)
+        header = {
+            "type": "header",
+            "dataset": dataset,
+            "simulation_number": simulation,
+            "format": timeline_format,
+            "rows": index.rows,
+            "cols": index.cols,
+            "georeference": index.georeference(),
+            "ignition_point": DataHandler.get_ignition_point(dataset, simulation),
+            "ignition_cell": DataHandler.get_ignition_cell(dataset, simulation),
+            "step_minutes": step_minutes,
+            "times": times,
+        }
+
+        async def lines():
+            yield dumps_line(header)
+            if arrival is not None:
+                for line in arrival_lines(DataHandler.to_api_minutes(dataset, np.asarray(arrival, dtype=np.float64))):
+                    yield line
+            else:
+                previous = np.zeros((index.rows, index.cols), dtype=bool)
+                for time_minutes in times:
+                    try:
+                        mask, _ = await run_blocking(FireSpreadAPI.resolve_response_mask, dataset, simulation,
+                                                     time_minutes, index)
+                    except HTTPException as e:
+                        # 상태 코드와 헤더는 이미 보냈으므로 오류 줄로 알림
+                        yield dumps_line({"type": "error", "time_minutes": time_minutes,
+                                          "status_code": e.status_code, "detail": e.detail})
+                        return
+                    yield delta_line(time_minutes, previous, mask)
+                    previous = mask
+            yield dumps_line({"type": "end", "steps": len(times)})
+
+        return lines()
+
+    @staticmethod
+    async def get_fire_spread_perimeter(dataset: str, simulation: int, time_minutes: int,
+                                        simplify: float) -> Response:
+        """화재 경계를 GeoJSON 폴리곤으로 반환"""
+        FireSpreadAPI.validate_dataset(dataset, simulation)
+        body = await run_blocking(FireSpreadAPI.build_fire_spread_perimeter, dataset, simulation,
+                                  time_minutes, simplify)
+        return Response(content=body, media_type=GEOJSON_MEDIA_TYPE)
+
+    @staticmethod
+    def build_fire_spread_perimeter(dataset: str, simulation: int, time_minutes: int, simplify: float) -> bytes:
+        """연소 마스크를 폴리곤화한 GeoJSON 본문 (블로킹)
+
+        스냅샷 단위(ForestGrid 파일 또는 도달 시간 임계값)로 캐시하며,
+        마스크 내용 해시가 바뀌면 다시 계산합니다.
+        """
+        index = FireSpreadAPI.require_coordinate_index(dataset)
+        mask, source = FireSpreadAPI.resolve_response_mask(dataset, simulation, time_minutes, index)
+        snapshot = source if source.startswith("ForestGrid") else f"{source}@{time_minutes}"
+
+        def build() -> bytes:
+            collection = polygonize(mask, index.georeference(), simplify, properties={
+                "time_minutes": time_minutes,
+                "total_burned_pixels": int(np.count_nonzero(mask)),
+                **FireSpreadAPI.build_metadata(dataset, simulation, index, time_minutes, source),
+            })
+            return dumps_geojson(collection)
+
+        return grid_cache.get_derived(("perimeter", dataset, simulation, snapshot, simplify),
+                                      mask_version(mask), build)
+
+    @staticmethod
+    async def get_burn_probability(dataset: str, time_minutes: int, contours: List[float]) -> BurnProbabilityResponse:
+        """모든 GridsN 앙상블의 셀별 연소 확률"""
+        if get_results_manifest().get(dataset) is None:
+            raise HTTPException(
+                status_code=404,
+                detail=f"데이터셋을 찾을 수 없습니다: {dataset}"
+            )
+        for threshold in contours:
+            if not 0 < threshold <= 1:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"확률 임계값은 0 초과 1 이하여야 합니다: {threshold}"
+                )
+        return await run_blocking(FireSpreadAPI.build_burn_probability, dataset, time_minutes, contours)
+
+    @staticmethod
+    def build_burn_probability(dataset: str, time_minutes: int, contours: List[float]) -> BurnProbabilityResponse:
+        """memmap 앙상블 스택 한 번의 비교/합산으로 확률 계산 (블로킹)"""
+        index = FireSpreadAPI.require_coordinate_index(dataset)
+        try:
+            stack = DataHandler.load_ensemble_stack(dataset)
+        except FileNotFoundError as e:
+            raise HTTPException(
+                status_code=404,
+                detail=f"앙상블 데이터를 만들 수 없습니다: {e}"
+            )
+        probability = burn_probability(stack, DataHandler.to_simulation_minutes(dataset, time_minutes))
+        probability = probability.reshape(index.rows, index.cols)
+
+        contour_collection = None
+        if contours:
+            features = []
+            georeference = index.georeference()
+            for threshold in sorted(set(contours)):
+                # 부동소수 오차로 경계 셀이 빠지지 않도록 약간의 여유
+                collection = polygonize(probability >= threshold - 1e-6, georeference)
+                for feature in collection["features"]:
+                    feature["properties"]["threshold"] = threshold
+                features.extend(collection["features"])
+            contour_collection = {"type": "FeatureCollection", "features": features}
+
+        cells = index.probability_pixels(probability)
+        return BurnProbabilityResponse(
+            time_minutes=time_minutes,
+            nsims=int(stack.shape[0]),
+            total_cells_with_probability=len(cells),
+            cells=cells,
+            contours=contour_collection,
+            metadata={
+                "dataset": dataset,
+                "grid_size": index.grid_size,
+                "data_source": "Cell2Fire simulation ensemble"
+            }
+        )
+
+    @staticmethod
+    def validate_tile(z: int, x: int, y: int) -> None:
+        """Web Mercator 타일 좌표 범위 확인"""
+        if not valid_tile(z, x, y):
+            raise HTTPException(
+                status_code=400,
+                detail=f"잘못된 타일 좌표입니다: {z}/{x}/{y}"
+            )
+
+    @staticmethod
+    def tile_response(request: Request, version: str, body: bytes) -> Response:
+        """PNG 타일 응답 (격자 버전이 같으면 304)"""
+        headers = {"ETag": f'W/"{version}"', "Cache-Control": "no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type=PNG_MEDIA_TYPE, headers=headers)
+
+    @staticmethod
+    async def get_fire_spread_tile(request: Request, dataset: str, simulation: int, time_minutes: int,
+                                   z: int, x: int, y: int) -> Response:
+        """연소 영역 XYZ 타일"""
+        FireSpreadAPI.validate_dataset(dataset, simulation)
+        FireSpreadAPI.validate_tile(z, x, y)
+        version, body = await run_blocking(FireSpreadAPI.build_fire_spread_tile, dataset, simulation,
+                                           time_minutes, z, x, y)
+        return FireSpreadAPI.tile_response(request, version, body)
+
+    @staticmethod
+    def build_fire_spread_tile(dataset: str, simulation: int, time_minutes: int, z: int, x: int, y: int):
+        """캐시된 연소 마스크로 타일 (격자 버전, PNG) 반환 (블로킹)"""
+        index = FireSpreadAPI.require_coordinate_index(dataset)
+        mask, _ = FireSpreadAPI.resolve_response_mask(dataset, simulation, time_minutes, index)
+        indices = mask_palette_indices(mask)
+        version = raster_version(indices)
+        return version, tile_cache.get_or_render(
+            "burn", dataset, version, z, x, y,
+            lambda: render_tile(indices, BURN_PALETTE, index.georeference(), z, x, y))
+
+    @staticmethod
+    async def get_burn_probability_tile(request: Request, dataset: str, time_minutes: int,
+                                        z: int, x: int, y: int) -> Response:
+        """연소 확률 XYZ 타일"""
+        if get_results_manifest().get(dataset) is None:
+            raise HTTPException(
+                status_code=404,
+                detail=f"데이터셋을 찾을 수 없습니다: {dataset}"
+            )
+        FireSpreadAPI.validate_tile(z, x, y)
+        version, body = await run_blocking(FireSpreadAPI.build_burn_probability_tile, dataset,
+                                           time_minutes, z, x, y)
+        return FireSpreadAPI.tile_response(request, version, body)
+
+    @staticmethod
+    def build_burn_probability_tile(dataset: str, time_minutes: int, z: int, x: int, y: int):
+        """연소 확률 래스터로 타일 (격자 버전, PNG) 반환 (블로킹)"""
+        index = FireSpreadAPI.require_coordinate_index(dataset)
+        indices, version = FireSpreadAPI.load_probability_indices(dataset, time_minutes, index)
+        return version, tile_cache.get_or_render(
+            "probability", dataset, version, z, x, y,
+            lambda: render_tile(indices, PROBABILITY_PALETTE, index.georeference(), z, x, y))
+
+    @staticmethod
+    def load_probability_indices(dataset: str, time_minutes: int, index):
+        """시각별 연소 확률 팔레트 번호 격자와 버전 (앙상블 원본 버전이 바뀌면 다시 계산)"""
+        try:
+            stack = DataHandler.load_ensemble_stack(dataset)
+        except FileNotFoundError as e:
+            raise HTTPException(
+                status_code=404,
+                detail=f"앙상블 데이터를 만들 수 없습니다: {e}"
+            )
+        simulation_minutes = DataHandler.to_simulation_minutes(dataset, time_minutes)
+
+        def build():
+            probability = burn_probability(stack, simulation_minutes).reshape(index.rows, index.cols)
+            indices = probability_palette_indices(probability)
+            return indices, raster_version(indices)
+
+        return grid_cache.get_derived(("probability-tile-raster", dataset, simulation_minutes),
+                                      DataHandler.ensemble_version(dataset), build)
+
+    @staticmethod
+    async def register_alert_users(registration: AlertUserRegistration) -> AlertUserRegistrationResponse:
+        """알림 대상 사용자 등록 (셀 맞춤은 데이터셋별로 처음 매칭할 때 한 번)"""
+        users = registration.users
+        await run_blocking(user_store.add_users, [u.user_id for u in users],
+                           [u.lat for u in users], [u.lon for u in users])
+        return AlertUserRegistrationResponse(registered=len(users), total_users=len(user_store))
+
+    @staticmethod
+    async def get_threatened_users(dataset: str, simulation: int, from_minutes, to_minutes: int) -> AlertMatchResponse:
+        """구간 (from, to] 사이에 화재가 도달하는 사용자 (from 생략 시 to까지 전체)"""
+        FireSpreadAPI.validate_dataset(dataset, simulation)
+        return await run_blocking(FireSpreadAPI.build_threatened_users, dataset, simulation, from_minutes, to_minutes)
+
+    @staticmethod
+    def build_threatened_users(dataset: str, simulation: int, from_minutes, to_minutes: int) -> AlertMatchResponse:
+        """사용자별 도달 시간 타임라인에서 구간을 잘라 응답 생성 (블로킹)"""
+        index = FireSpreadAPI.require_coordinate_index(dataset)
+        try:
+            arrival = DataHandler.load_simulation_arrival(dataset, simulation)
+        except FileNotFoundError:
+            raise HTTPException(
+                status_code=404,
+                detail=f"시뮬레이션 결과를 찾을 수 없습니다: {dataset}/Grids{simulation}"
+            )
+
+        # 사용자 목록이나 도달 시간이 바뀔 때만 타임라인을 다시 만듦
+        timeline = grid_cache.get_derived(
+            ("alert-timeline", dataset, simulation), (user_store.version, array_version(arrival)),
+            lambda: ArrivalTimeline(user_store.cells_for(dataset, index), arrival)
+        )
+        start = -np.inf if from_minutes is None else DataHandler.to_simulation_minutes(dataset, from_minutes)
+        positions = timeline.between(start, DataHandler.to_simulation_minutes(dataset, to_minutes))
+
+        cells = user_store.cells_for(dataset, index)[positions]
+        rows, cols = np.divmod(cells, index.cols)
+        lats, lons = user_store.location(positions)
+        arrival_minutes = DataHandler.to_api_minutes(dataset, timeline.arrival_of(positions))
+        users = [
+            ThreatenedUser.model_construct(user_id=u, lat=la, lon=lo, row=r, col=c, arrival_minutes=a)
+            for u, la, lo, r, c, a in zip(user_store.user_ids(positions), lats.tolist(), lons.tolist(),
+                                          rows.tolist(), cols.tolist(), arrival_minutes.tolist())
+        ]
+        return AlertMatchResponse(
+            from_minutes=from_minutes if from_minutes is not None else 0,
+            to_minutes=to_minutes,
+            total_threatened=len(users),
+            users=users,
+            metadata={
+                "dataset": dataset,
+                "simulation_number": simulation,
+                "grid_size": index.grid_size,
+                "total_users": len(user_store)
+            }
+        )
+
+    @staticmethod
+    async def register_shelters(registration: ShelterRegistration) -> ShelterRegistrationResponse:
+        """대피소 등록 (거리장은 다음 조회 때 다시 계산)"""
+        shelters = registration.shelters
+        await run_blocking(shelter_store.add_shelters, [s.shelter_id for s in shelters], [s.name for s in shelters],
+                           [s.lat for s in shelters], [s.lon for s in shelters])
+        return ShelterRegistrationResponse(registered=len(shelters), total_shelters=len(shelter_store))
+
+    @staticmethod
+    async def get_nearest_shelter(dataset: str, simulation: int, lat: float, lon: float,
+                                  time_minutes: int) -> NearestShelterResponse:
+        """출발 시각 기준 불이 닿기 전에 갈 수 있는 가장 가까운 대피소"""
+        FireSpreadAPI.validate_dataset(dataset, simulation)
+        if len(shelter_store) == 0:
+            raise HTTPException(
+                status_code=404,
+                detail="등록된 대피소가 없습니다"
+            )
+        return await run_blocking(FireSpreadAPI.build_nearest_shelter, dataset, simulation, lat, lon, time_minutes)
+
+    @staticmethod
+    def load_shelter_routes(dataset: str, simulation: int, index):
+        """(dataset, simulation) 대피소 경로와 단계별 거리장 조회 함수 (대피소 목록이나 도달 시간이 바뀔 때만 다시 계산)"""
+        try:
+            arrival = DataHandler.load_simulation_arrival(dataset, simulation)
+        except FileNotFoundError:
+            raise HTTPException(
+                status_code=404,
+                detail=f"시뮬레이션 결과를 찾을 수 없습니다: {dataset}/Grids{simulation}"
+            )
+
+        def build():
+            # 출발 시각: API 시간 단계마다, 마지막 도달 이후 한 단계까지
+            step_minutes = DataHandler.calculate_step_minutes(dataset)
+            burned = arrival[np.isfinite(arrival)]
+            last_minutes = DataHandler.to_api_minutes(dataset, float(burned.max())) if burned.size else 0.0
+            departures = np.arange(0, int(last_minutes // step_minutes) + 2) * step_minutes
+            return build_shelter_routes(index, arrival, shelter_store.cells_for(dataset, index),
+                                        DataHandler.to_simulation_minutes(dataset, departures))
+
+        version = (shelter_store.version, array_version(arrival))
+        routes = grid_cache.get_derived(("shelter-routes", dataset, simulation), version, build)
+
+        def field(step: int):
+            # 단계별 거리장은 처음 조회할 때만 계산
+            return grid_cache.get_derived(("shelter-field", dataset, simulation, step), version,
+                                          lambda: routes.field(step))
+
+        return routes, field
+
+    @staticmethod
+    def build_nearest_shelter(dataset: str, simulation: int, lat: float, lon: float,
+                              time_minutes: int) -> NearestShelterResponse:
+        """사용자 셀과 출발 단계로 거리장을 조회해 응답 생성 (블로킹)"""
+        index = FireSpreadAPI.require_coordinate_index(dataset)
+        routes, field = FireSpreadAPI.load_shelter_routes(dataset, simulation, index)
+        metadata = {
+            "dataset": dataset,
+            "simulation_number": simulation,
+            "grid_size": index.grid_size,
+            "walking_speed_m_per_min": WALKING_SPEED_M_PER_MIN
+        }
+
+        cell = int(snap_to_cells(index, [lat], [lon])[0])
+        if cell < 0:
+            raise HTTPException(
+                status_code=400,
+                detail=f"위치가 격자 범위를 벗어났습니다: ({lat}, {lon})"
+            )
+        row, col = divmod(cell, index.cols)
+        route = routes.lookup(cell, DataHandler.to_simulation_minutes(dataset, time_minutes), field)
+        if route is None:
+            return NearestShelterResponse(time_minutes=time_minutes, row=row, col=col, metadata=metadata)
+
+        position = np.array([route["shelter"]])
+        shelter_id = shelter_store.user_ids(position)[0]
+        shelter_lat, shelter_lon = shelter_store.location(position)
+        return NearestShelterResponse(
+            time_minutes=time_minutes,
+            row=row,
+            col=col,
+            shelter={"shelter_id": shelter_id, "name": shelter_store.names.get(shelter_id, ""),
+                     "lat": float(shelter_lat[0]), "lon": float(shelter_lon[0])},
+            distance_m=route["distance_m"],
+            eta_minutes=route["eta_minutes"],
+            reachable_before_fire=route["reachable_before_fire"],
             metadata=metadata
         )
 
@@ -108,6 +872,6 @@ class FireSpreadAPI:
         return await FireSpreadAPI.get_fire_spread_data(dataset, 1, time_minutes)
 
     @staticmethod
-    async def get_korean_fire_spread(time_minutes: int) -> FireSpreadResponse:
-        """한국 산림 전용 엔드포인트"""
-        return await FireSpreadAPI.get_fire_spread_data_simple("Korean40x40", time_minutes)
+    async def get_korean_fire_spread(request: Request, time_minutes: int) -> Response:
+        """한국 산림 전용 엔드포인트 (동시 요청 묶기, ETag/gzip)"""
+        return await FireSpreadAPI.get_fire_spread_body(request, "Korean40x40", 1, time_minutes)
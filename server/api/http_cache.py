@@ -0,0 +1,118 @@
+"""
+응답 단위 캐시: 동시 요청 묶기(single-flight), ETag, 미리 압축한 본문
+
+화재 알림이 나가면 수많은 클라이언트가 같은 1초 안에 같은 시간대를 요청합니다.
+
+- SingleFlight: 같은 키로 진행 중인 계산이 있으면 새로 계산하지 않고 그 결과를 함께 기다림
+- CachedBody: 직렬화한 JSON 본문과 gzip 본문, 본문 해시 ETag를 한 번만 만들어 격자 버전별로 캐시
+- cached_response: If-None-Match가 맞으면 304, Accept-Encoding에 gzip이 있으면 압축 본문 반환
+"""
+import gzip
+import asyncio
+import hashlib
+from typing import Awaitable, Callable, Dict, Hashable, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+GZIP_MIN_BYTES = 512  # 이보다 작은 본문은 압축하지 않음
+GZIP_LEVEL = 6
+
+
+class SingleFlight:
+    """같은 키의 동시 요청이 진행 중인 계산 하나를 함께 기다리도록 묶는 계층
+
+    계산은 shield로 감싸므로 먼저 요청한 클라이언트가 연결을 끊어도 나머지는 결과를 받습니다.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.leaders = 0    # 실제로 계산을 시작한 요청 수
+        self.followers = 0  # 진행 중인 계산에 합류한 요청 수
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable]):
+        """key로 진행 중인 계산이 있으면 합류, 없으면 func()를 실행"""
+        future = self._inflight.get(key)
+        if future is not None:
+            self.followers += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.ensure_future(func())
+        self._inflight[key] = future
+        self.leaders += 1
+
+        def done(finished: asyncio.Future) -> None:
+            if self._inflight.get(key) is finished:
+                del self._inflight[key]
+            if not finished.cancelled():
+                finished.exception()  # 모든 대기자가 끊긴 경우의 미확인 예외 경고 방지
+
+        future.add_done_callback(done)
+        return await asyncio.shield(future)
+
+    def stats(self) -> dict:
+        return {"inflight": len(self._inflight), "leaders": self.leaders, "followers": self.followers}
+
+
+class CachedBody:
+    """직렬화된 응답 본문 (원본, gzip, ETag)"""
+    __slots__ = ("body", "gzip_body", "etag")
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.gzip_body: Optional[bytes] = (
+            gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0) if len(body) >= GZIP_MIN_BYTES else None
+        )
+        # 인코딩(gzip 여부)과 관계없이 같은 내용이므로 약한 ETag 사용
+        self.etag = 'W/"%s"' % hashlib.blake2b(body, digest_size=16).hexdigest()
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.body) + len(self.gzip_body or b"")
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 헤더가 ETag와 맞는지 (약한 비교, 여러 값과 * 지원)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """Accept-Encoding에 gzip이 있고 q=0이 아닌지"""
+    for item in (accept_encoding or "").split(","):
+        name, _, params = item.strip().partition(";")
+        if name.strip().lower() not in ("gzip", "*"):
+            continue
+        params = params.replace(" ", "")
+        if params.startswith("q="):
+            try:
+                return float(params[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
+
+
+def cached_response(request: Request, cached: CachedBody, media_type: str) -> Response:
+    """조건부 요청(304)과 gzip 협상을 처리한 응답"""
+    headers = {"ETag": cached.etag, "Vary": "Accept, Accept-Encoding", "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), cached.etag):
+        return Response(status_code=304, headers=headers)
+    if cached.gzip_body is not None and accepts_gzip(request.headers.get("accept-encoding")):
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=cached.gzip_body, media_type=media_type, headers=headers)
+    return Response(content=cached.body, media_type=media_type, headers=headers)
+
+
+# 화재 확산 응답 생성용 (프로세스 전역)
+response_flights = SingleFlight()
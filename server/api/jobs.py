@@ -0,0 +1,298 @@
+"""
+온디맨드 시뮬레이션 작업 큐
+
+POST /simulations 요청(점화 셀, 기상 행, nsims)을 내용 해시로 식별하고,
+Cell2FireC.run을 크기가 제한된 ProcessPoolExecutor에서 실행합니다.
+
+- 같은 입력은 같은 작업 ID를 가지므로 실행 중이거나 끝난 작업을 그대로 반환 (재실행 없음)
+- 결과는 results/<dataset>_job_<id> 폴더로 원자적으로 옮겨져 기존 화재 확산 API로 조회
+- 입력 폴더는 jobs/<id>/input 에 만들어지고, 좌표/점화점 조회에 사용
+- 작업 프로세스마다 지형을 한 번 읽어 둔 엔진 워커(Cell2FireWorkerPool)를 유지하고, 점화 셀과
+  기상 파일만 시나리오로 보내서 프로세스 생성과 Data.csv/Forest.asc 파싱을 반복하지 않음
+- 엔진이 CellArrival/CellArrivalNN.npy(셀별 도달 시간)도 쓰므로 적재와 도달 시간/앙상블 조회에서
+  MessagesFile을 다시 계산하지 않음 (ForestGrid CSV는 진행 상황 이벤트용으로 계속 기록)
+"""
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import hashlib
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .store import ResultsStore
+
+# 작업 큐 설정
+SIMULATION_WORKERS = max(1, min(2, (os.cpu_count() or 1) // 2))  # 동시에 실행할 엔진 프로세스 수
+ENGINE_THREADS = max(1, (os.cpu_count() or 1) // SIMULATION_WORKERS)  # 엔진 프로세스당 OpenMP 스레드 수
+USE_ENGINE_WORKERS = os.environ.get("CELL2FIRE_ENGINE_WORKERS", "1") != "0"  # 0이면 작업마다 엔진 실행
+ENGINE_WORKERS_PER_PROCESS = 2                                  # 작업 프로세스당 유지할 엔진 워커 수
+MAX_PENDING_JOBS = 16                                          # 대기 + 실행 중 작업 상한
+
+JOB_ID_LENGTH = 16
+_JOB_DATASET_PATTERN = re.compile(r"^(?P<base>.+)_job_(?P<job_id>[0-9a-f]{%d})$" % JOB_ID_LENGTH)
+
+# Weather.csv 열 순서
+WEATHER_COLUMNS = ("Scenario", "datetime", "APCP", "TMP", "RH", "WS", "WD",
+                   "FFMC", "DMC", "DC", "ISI", "BUI", "FWI")
+
+
+class JobQueueFullError(Exception):
+    """대기 중인 작업이 상한에 도달함"""
+
+
+def job_dataset_name(dataset: str, job_id: str) -> str:
+    """작업 결과 데이터셋 이름 (results 폴더 이름)"""
+    return f"{dataset}_job_{job_id}"
+
+
+def parse_job_dataset(name: str) -> Optional[str]:
+    """작업 결과 데이터셋 이름에서 작업 ID 추출 (작업 결과가 아니면 None)"""
+    match = _JOB_DATASET_PATTERN.match(name)
+    return match.group("job_id") if match else None
+
+
+def job_base_dataset(name: str) -> Optional[str]:
+    """작업 결과 데이터셋 이름에서 입력 데이터셋 이름 추출 (작업 결과가 아니면 None)"""
+    match = _JOB_DATASET_PATTERN.match(name)
+    return match.group("base") if match else None
+
+
+def input_version(input_folder: str) -> List[Tuple[str, int, int]]:
+    """입력 폴더의 모든 파일 (상대 경로, mtime, 크기) 목록 (폴더가 없으면 빈 목록)"""
+    files = []
+    for root, dirs, names in os.walk(input_folder):
+        dirs.sort()
+        for name in sorted(names):
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            files.append((os.path.relpath(path, input_folder), stat.st_mtime_ns, stat.st_size))
+    return files
+
+
+def compute_job_id(spec: Dict, input_folder: str) -> str:
+    """요청 내용과 입력 데이터 버전(작업 폴더로 복사되는 모든 파일)으로 작업 ID(내용 해시) 계산"""
+    payload = json.dumps({"spec": spec, "data_version": input_version(input_folder)},
+                         sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:JOB_ID_LENGTH]
+
+
+def _write_job_inputs(base_folder: str, input_folder: str, spec: Dict) -> None:
+    """기본 데이터셋을 복사하고 점화 셀/기상 행을 요청 값으로 교체"""
+    if os.path.exists(input_folder):
+        shutil.rmtree(input_folder)
+    shutil.copytree(base_folder, input_folder)
+
+    # 엔진은 Ignitions.csv를, 좌표/점화점 조회는 IgnitionPoints.csv를 읽음
+    for name in ("IgnitionPoints.csv", "Ignitions.csv"):
+        with open(os.path.join(input_folder, name), "w") as f:
+            f.write("Year,Ncell\n")
+            f.write(f"1,{spec['ignition_cell']}\n")
+
+    if spec.get("weather"):
+        with open(os.path.join(input_folder, "Weather.csv"), "w") as f:
+            f.write(",".join(WEATHER_COLUMNS) + "\n")
+            for row in spec["weather"]:
+                f.write(",".join(str(row[column]) for column in WEATHER_COLUMNS) + "\n")
+
+
+# 작업 프로세스의 엔진 워커 풀 (처음 사용할 때 생성)
+_engine_workers = None
+
+
+def _engine_worker_pool():
+    global _engine_workers
+    if _engine_workers is None:
+        import atexit
+        from cell2fire.Cell2FireC_class import Cell2FireWorkerPool
+        _engine_workers = Cell2FireWorkerPool(maxIdle=ENGINE_WORKERS_PER_PROCESS)
+        atexit.register(_engine_workers.close)
+    return _engine_workers
+
+
+def run_simulation_job(cell2fire_dir: str, base_folder: str, job_folder: str, result_folder: str,
+                       spec: Dict, results_db: Optional[str] = None) -> str:
+    """작업 프로세스에서 엔진 실행 후 결과 폴더 경로 반환 (results_db가 있으면 결과 적재)"""
+    if cell2fire_dir not in sys.path:
+        sys.path.insert(0, cell2fire_dir)
+    from cell2fire.utils.ParseInputs import make_parser
+    from cell2fire.Cell2FireC_class import Cell2FireC
+
+    input_folder = os.path.join(job_folder, "input")
+    output_folder = os.path.join(job_folder, "output")  # SimulationJobQueue.output_folder
+    _write_job_inputs(base_folder, input_folder, spec)
+    if os.path.exists(output_folder):
+        shutil.rmtree(output_folder)
+
+    # 엔진은 폴더 경로 뒤에 파일 이름을 바로 붙이므로 구분자로 끝나야 함
+    # (워커는 기본 데이터셋을 읽어 두고 작업 입력 폴더의 점화 셀/기상만 시나리오로 받음)
+    args = make_parser().parse_args([
+        "--input-instance-folder", (base_folder if USE_ENGINE_WORKERS else input_folder) + os.sep,
+        "--output-folder", output_folder + os.sep,
+        "--ignitions",
+        "--sim-years", "1",
+        "--nsims", str(spec["nsims"]),
+        "--grids",
+        "--finalGrid",
+        "--weather", "rows",
+        "--nweathers", "1",
+        "--Fire-Period-Length", "1.0",
+        "--output-messages",
+        "--output-arrival",
+        "--ROS-CV", str(spec["ros_cv"]),
+        "--seed", str(spec["seed"]),
+        "--nthreads", str(ENGINE_THREADS),
+        "--IgnitionRad", "0",
+    ])
+    if USE_ENGINE_WORKERS:
+        _engine_worker_pool().run(args, output_folder + os.sep, ignitions=[spec["ignition_cell"]],
+                                  weather=os.path.join(input_folder, "Weather.csv"))
+    else:
+        Cell2FireC(args)
+
+    # 완성된 결과만 results 폴더에 보이도록 한 번에 이동
+    if os.path.exists(result_folder):
+        shutil.rmtree(result_folder)
+    os.replace(output_folder, result_folder)
+    if results_db is not None:
+        ResultsStore(results_db).ingest(os.path.basename(result_folder), result_folder,
+                                        os.path.basename(os.path.normpath(base_folder)))
+    return result_folder
+
+
+class SimulationJob:
+    """작업 하나의 상태"""
+
+    def __init__(self, job_id: str, dataset: str, result_dataset: str, nsims: int):
+        self.job_id = job_id
+        self.dataset = dataset
+        self.result_dataset = result_dataset
+        self.nsims = nsims
+        self.status = "queued"  # queued | running | done | failed
+        self.cached = False
+        self.error: Optional[str] = None
+        self.submitted_at = time.time()
+        self.finished_at: Optional[float] = None
+
+    @property
+    def is_active(self) -> bool:
+        return self.status in ("queued", "running")
+
+
+class SimulationJobQueue:
+    """내용 해시로 중복을 제거하는 시뮬레이션 작업 큐"""
+
+    def __init__(self, data_path: str, results_path: str, jobs_path: str, cell2fire_dir: str,
+                 on_complete: Optional[Callable[[], None]] = None, results_db: Optional[str] = None,
+                 max_workers: int = SIMULATION_WORKERS, max_pending: int = MAX_PENDING_JOBS):
+        self.data_path = data_path
+        self.results_path = results_path
+        self.jobs_path = jobs_path
+        self.cell2fire_dir = cell2fire_dir
+        self.on_complete = on_complete
+        self.results_db = results_db  # 작업 결과를 적재할 결과 저장소 경로
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._jobs: Dict[str, SimulationJob] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def input_folder(self, job_id: str) -> str:
+        """작업 입력 데이터 폴더"""
+        return os.path.join(self.jobs_path, job_id, "input")
+
+    def output_folder(self, job_id: str) -> str:
+        """실행 중인 작업의 엔진 출력 폴더 (완료 후 results 폴더로 이동)"""
+        return os.path.join(self.jobs_path, job_id, "output")
+
+    def submit(self, dataset: str, spec: Dict) -> Tuple[SimulationJob, bool]:
+        """작업 등록 후 (작업, 새로 실행하는지 여부) 반환
+
+        같은 입력의 작업이 있거나 결과가 디스크에 있으면 엔진을 다시 실행하지 않습니다.
+
+        대기 중인 작업이 상한이면 JobQueueFullError를 발생시킵니다.
+        """
+        base_folder = os.path.join(self.data_path, dataset)
+        job_id = compute_job_id({"dataset": dataset, **spec}, base_folder)
+        result_dataset = job_dataset_name(dataset, job_id)
+        result_folder = os.path.join(self.results_path, result_dataset)
+
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job.status != "failed":
+                return job, False
+
+            job = SimulationJob(job_id, dataset, result_dataset, spec["nsims"])
+            # 이전 실행 결과가 디스크에 남아 있으면 엔진을 다시 돌리지 않음
+            if os.path.isdir(os.path.join(result_folder, "Grids")):
+                job.status = "done"
+                job.cached = True
+                job.finished_at = job.submitted_at
+                self._jobs[job_id] = job
+                return job, False
+
+            active = sum(1 for other in self._jobs.values() if other.is_active)
+            if active >= self.max_pending:
+                raise JobQueueFullError(f"대기 중인 작업이 {active}개입니다")
+
+            if self._executor is None:
+                # fork는 서버의 스레드/잠금/SQLite 연결 상태를 복사하므로 spawn으로 새 프로세스 시작
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                     mp_context=multiprocessing.get_context("spawn"))
+            self._jobs[job_id] = job
+            future = self._executor.submit(run_simulation_job, self.cell2fire_dir, base_folder,
+                                           os.path.join(self.jobs_path, job_id), result_folder, spec,
+                                           self.results_db)
+
+        future.add_done_callback(lambda f: self._finish(job_id, f))
+        # 실행 시작 시점은 알 수 없으므로, 작업 프로세스가 비어 있으면 바로 실행 중으로 표시
+        with self._lock:
+            running = sum(1 for other in self._jobs.values() if other.status == "running")
+            if job.status == "queued" and running < self.max_workers:
+                job.status = "running"
+        return job, True
+
+    def _finish(self, job_id: str, future) -> None:
+        """작업 완료 콜백"""
+        error = RuntimeError("작업이 취소되었습니다") if future.cancelled() else future.exception()
+        with self._lock:
+            job = self._jobs[job_id]
+            job.finished_at = time.time()
+            if error is not None:
+                job.status = "failed"
+                job.error = str(error)
+            else:
+                job.status = "done"
+            # 다음 대기 작업을 실행 중으로 표시
+            for other in self._jobs.values():
+                if other.status == "queued":
+                    other.status = "running"
+                    break
+        if error is not None:
+            print(f"시뮬레이션 작업 오류 ({job_id}): {error}")
+        elif self.on_complete is not None:
+            self.on_complete()
+
+    def get(self, job_id: str) -> Optional[SimulationJob]:
+        """작업 상태 (없으면 None)"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self) -> List[SimulationJob]:
+        """등록된 작업 목록 (최근 순)"""
+        with self._lock:
+            return sorted(self._jobs.values(), key=lambda job: job.submitted_at, reverse=True)
+
+    def shutdown(self) -> None:
+        """작업 프로세스 종료 (실행 중 작업은 기다리지 않음)"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
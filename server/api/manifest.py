@@ -0,0 +1,291 @@
+"""
+시뮬레이션 결과 목록(manifest)
+
+서버 시작 시 results 폴더를 한 번 스캔해서 데이터셋마다 시뮬레이션 번호, 시뮬레이션별
+ForestGrid 단계(CellArrivalNN.npy만 있으면 도달 시간으로 계산), 단계 길이(분), 격자 크기, 점화 셀을 기록해 두고, 요청 경로에서는
+디스크를 확인하지 않고 이 목록만 조회합니다. 폴링 감시자가 폴더 mtime 서명이 바뀐
+데이터셋만 다시 스캔합니다. 결과 저장소(store.py)에 최신 상태로 적재된 데이터셋은
+GridsN 폴더를 돌지 않고 저장소 조회로 항목을 만듭니다.
+"""
+import os
+import re
+import threading
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from .arrival import (ARRIVAL_FOLDER, ENGINE_ARRIVAL_FOLDER, arrival_file_name, arrival_steps,
+                      engine_arrival_file_path, engine_arrival_simulations, messages_file_path,
+                      read_engine_arrival, read_log_info)
+
+_GRIDS_DIR_PATTERN = re.compile(r"^Grids(\d+)$")
+_GRID_FILE_PATTERN = re.compile(r"^ForestGrid(\d+)\.csv$")
+
+# API에서 ForestGrid 한 단계를 몇 분으로 표시하는지 (입력 데이터셋 기준)
+DEFAULT_STEP_MINUTES = 30
+STEP_MINUTES_BY_INPUT = {
+    "9cellsC1": 10,  # 9cellsC1 예제는 10분 간격
+}
+MANIFEST_POLL_SECONDS = 5.0  # 감시자 폴링 간격
+
+
+def step_minutes_for(input_dataset: str) -> int:
+    """입력 데이터셋의 API 단계 길이(분)"""
+    return STEP_MINUTES_BY_INPUT.get(input_dataset, DEFAULT_STEP_MINUTES)
+
+
+class DatasetEntry:
+    """데이터셋 하나의 결과 정보"""
+
+    def __init__(self, name: str, simulations: List[int], steps: Optional[Dict[int, Tuple[int, ...]]] = None,
+                 input_dataset: Optional[str] = None, rows: Optional[int] = None, cols: Optional[int] = None,
+                 ignition_cells: Optional[Dict[int, int]] = None, arrival_simulations=None,
+                 messages_simulations=None, store_version: Optional[int] = None,
+                 engine_arrival_simulations=None, store_arrival_simulations=None):
+        self.name = name
+        self.simulations = simulations
+        self.steps = steps or {}                    # 시뮬레이션 -> 정렬된 ForestGrid 단계 번호
+        self.input_dataset = input_dataset or name  # LogFile의 InFolder 이름
+        self.step_minutes = step_minutes_for(self.input_dataset)
+        self.rows = rows
+        self.cols = cols
+        self.ignition_cells = ignition_cells or {}  # 시뮬레이션 -> 0-based 점화 셀 (LogFile 기준)
+        self.arrival_simulations = arrival_simulations or set()  # 도달 시간 래스터가 있는 시뮬레이션
+        self.messages_simulations = messages_simulations or set()  # MessagesFile이 있는 시뮬레이션
+        self.store_version = store_version  # 결과 저장소 적재 버전 (적재되지 않았으면 None)
+        self.engine_arrival_simulations = engine_arrival_simulations or set()  # CellArrivalNN.npy가 있는 시뮬레이션
+        self.store_arrival_simulations = store_arrival_simulations or set()  # 결과 저장소에 도달 시간이 있는 시뮬레이션
+
+    @property
+    def stored(self) -> bool:
+        """결과 저장소에서 격자/도달 시간을 읽는지"""
+        return self.store_version is not None
+
+    def has_simulation(self, simulation: int) -> bool:
+        return simulation in self.simulations
+
+    def has_arrival(self, simulation: int) -> bool:
+        """도달 시간 래스터(ArrivalTimesNN.npy)가 있는지"""
+        return simulation in self.arrival_simulations
+
+    def has_engine_arrival(self, simulation: int) -> bool:
+        """엔진 도달 기록(CellArrivalNN.npy)이 있는지"""
+        return simulation in self.engine_arrival_simulations
+
+    def has_messages(self, simulation: int) -> bool:
+        """확산 간선 기록(MessagesFileNN.csv)이 있는지"""
+        return simulation in self.messages_simulations
+
+    def has_store_arrival(self, simulation: int) -> bool:
+        """결과 저장소에 도달 시간(CellArrival 또는 MessagesFile로 적재)이 있는지"""
+        return simulation in self.store_arrival_simulations
+
+    def has_step(self, simulation: int, step: int) -> bool:
+        """ForestGrid 단계 파일이 있는지"""
+        return step in self.steps.get(simulation, ())
+
+    def ignition_cell(self, simulation: int = 1) -> Optional[int]:
+        """시뮬레이션의 0-based 점화 셀 (없으면 첫 시뮬레이션 값)"""
+        if simulation in self.ignition_cells:
+            return self.ignition_cells[simulation]
+        return next(iter(self.ignition_cells.values()), None)
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "input_dataset": self.input_dataset,
+            "simulations": self.simulations,
+            "steps": {simulation: len(self.steps[simulation]) for simulation in self.simulations},
+            "step_minutes": self.step_minutes,
+            "rows": self.rows,
+            "cols": self.cols,
+            "ignition_cell": self.ignition_cell(),
+        }
+
+
+def _read_grid_shape(grid_path: str) -> Tuple[Optional[int], Optional[int]]:
+    """ForestGrid CSV의 (행, 열) 수 (한 번만 읽음)"""
+    try:
+        with open(grid_path) as f:
+            lines = [line for line in f.read().splitlines() if line.strip()]
+    except OSError:
+        return None, None
+    if not lines:
+        return None, None
+    return len(lines), lines[0].count(",") + 1
+
+
+def _messages_simulations(dataset_path: str, simulations) -> set:
+    """MessagesFile이 있는 시뮬레이션"""
+    return {simulation for simulation in simulations if os.path.exists(messages_file_path(dataset_path, simulation))}
+
+
+class ResultsManifest:
+    """results 폴더를 스캔해서 만든 데이터셋/시뮬레이션/단계 목록
+
+    요청마다 디스크를 확인하지 않고 이 목록으로 데이터셋, 시뮬레이션, 시간 단계를 검증합니다.
+    """
+
+    def __init__(self, results_path: str, data_path: Optional[str] = None, input_names=None, store=None):
+        self.results_path = results_path
+        self.data_path = data_path
+        self.store = store  # ResultsStore (None이면 폴더만 스캔)
+        # 결과 폴더 이름 -> 입력 데이터셋 이름 (LogFile이 없거나 InFolder가 작업 폴더일 때 사용)
+        self.input_names = input_names or (lambda name: name)
+        self._datasets: Dict[str, DatasetEntry] = {}
+        self._signatures: Dict[str, Hashable] = {}
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()  # 감시자와 작업 완료 콜백의 동시 스캔 방지
+        self._loaded = False
+        self._watcher: Optional[threading.Thread] = None
+        self._stop_watching = threading.Event()
+
+    def refresh(self) -> None:
+        """results 폴더를 다시 스캔 (서명이 같은 데이터셋은 기존 항목 재사용)"""
+        with self._refresh_lock:
+            try:
+                names = sorted(os.listdir(self.results_path))
+            except FileNotFoundError:
+                names = []
+            datasets, signatures = {}, {}
+            for name in names:
+                signature = self._signature(name)
+                if signature is None:
+                    continue
+                entry = self._datasets.get(name) if self._signatures.get(name) == signature else None
+                if entry is None:
+                    entry = self._scan_dataset(name)
+                if entry is not None:
+                    datasets[name] = entry
+                    signatures[name] = signature
+            with self._lock:
+                self._datasets = datasets
+                self._signatures = signatures
+                self._loaded = True
+
+    def _signature(self, name: str) -> Optional[Hashable]:
+        """결과 폴더 변경 감지용 서명 (Grids 폴더와 GridsN 폴더, Arrival/CellArrival/Messages 폴더, LogFile의 mtime)"""
+        dataset_path = os.path.join(self.results_path, name)
+        grids_path = os.path.join(dataset_path, "Grids")
+        try:
+            folders = os.listdir(grids_path)
+            signature = [os.stat(grids_path).st_mtime_ns]
+        except (FileNotFoundError, NotADirectoryError):
+            # --output-arrival만 쓴 결과는 CellArrival 폴더로 인식
+            if not os.path.isdir(os.path.join(dataset_path, ENGINE_ARRIVAL_FOLDER)):
+                return None
+            folders, signature = [], [None]
+        for folder in sorted(folders):
+            if _GRIDS_DIR_PATTERN.match(folder):
+                try:
+                    signature.append((folder, os.stat(os.path.join(grids_path, folder)).st_mtime_ns))
+                except FileNotFoundError:
+                    continue
+        for extra in (ARRIVAL_FOLDER, ENGINE_ARRIVAL_FOLDER, "Messages", "LogFile.txt"):
+            try:
+                signature.append((extra, os.stat(os.path.join(dataset_path, extra)).st_mtime_ns))
+            except FileNotFoundError:
+                continue
+        if self.store is not None:
+            # 서버 밖(CLI)에서 적재해도 다음 폴링에 반영
+            signature.append(("store", self.store.version(name)))
+        return tuple(signature)
+
+    def _scan_dataset(self, name: str) -> Optional[DatasetEntry]:
+        """결과 폴더 하나를 스캔 (Grids 폴더와 CellArrival 폴더가 모두 없으면 None)"""
+        dataset_path = os.path.join(self.results_path, name)
+        grids_path = os.path.join(dataset_path, "Grids")
+        engine_simulations = set(engine_arrival_simulations(dataset_path))
+        if not os.path.isdir(grids_path) and not engine_simulations:
+            return None
+        if self.store is not None and self.store.is_current(name, dataset_path):
+            info = self.store.dataset_info(name)
+            if info is not None:
+                return DatasetEntry(name, sorted(info["steps"]), info["steps"], info["input_dataset"],
+                                    info["rows"], info["cols"], info["ignition_cells"],
+                                    messages_simulations=_messages_simulations(dataset_path, info["steps"]),
+                                    store_version=info["version"],
+                                    engine_arrival_simulations=engine_simulations,
+                                    store_arrival_simulations=info["arrival_simulations"])
+        steps = {}
+        first_grid = None
+        for folder in (os.listdir(grids_path) if os.path.isdir(grids_path) else []):
+            match = _GRIDS_DIR_PATTERN.match(folder)
+            folder_path = os.path.join(grids_path, folder)
+            if not match or not os.path.isdir(folder_path):
+                continue
+            simulation_steps = []
+            for grid_file in os.listdir(folder_path):
+                grid_match = _GRID_FILE_PATTERN.match(grid_file)
+                if grid_match:
+                    simulation_steps.append(int(grid_match.group(1)))
+                    if first_grid is None:
+                        first_grid = os.path.join(folder_path, grid_file)
+            steps[int(match.group(1))] = tuple(sorted(simulation_steps))
+
+        rows, cols = _read_grid_shape(first_grid) if first_grid else (None, None)
+        # ForestGrid CSV가 없는 시뮬레이션은 도달 기록에서 단계 수를 계산
+        for simulation in sorted(engine_simulations):
+            if steps.get(simulation):
+                continue
+            arrival = read_engine_arrival(engine_arrival_file_path(dataset_path, simulation))
+            if rows is None:
+                rows, cols = arrival.shape
+            steps[simulation] = tuple(range(arrival_steps(arrival)))
+        log_info = read_log_info(os.path.join(dataset_path, "LogFile.txt"))
+        ignition_cells = {simulation: cell - 1 for simulation, cell in log_info["ignitions"].items()}
+        # InFolder가 data 폴더의 데이터셋이면 그 이름, 아니면(작업 입력 폴더 등) 결과 폴더 이름으로 추정
+        input_dataset = self.input_names(name)
+        if log_info["in_folder"] and self.data_path:
+            log_input = os.path.basename(os.path.normpath(log_info["in_folder"]))
+            if log_input and os.path.isdir(os.path.join(self.data_path, log_input)):
+                input_dataset = log_input
+        arrival_simulations = {simulation for simulation in steps if os.path.exists(
+            os.path.join(dataset_path, ARRIVAL_FOLDER, arrival_file_name(simulation)))}
+        return DatasetEntry(name, sorted(steps), steps, input_dataset, rows, cols, ignition_cells,
+                            arrival_simulations, _messages_simulations(dataset_path, steps),
+                            engine_arrival_simulations=engine_simulations)
+
+    def _ensure_loaded(self) -> None:
+        if not self._loaded:
+            self.refresh()
+
+    def get(self, dataset: str) -> Optional[DatasetEntry]:
+        """데이터셋 정보 (없으면 None)"""
+        self._ensure_loaded()
+        with self._lock:
+            return self._datasets.get(dataset)
+
+    def dataset_names(self) -> List[str]:
+        """등록된 데이터셋 이름 목록"""
+        self._ensure_loaded()
+        with self._lock:
+            return list(self._datasets)
+
+    def entries(self) -> List[DatasetEntry]:
+        """등록된 데이터셋 정보 목록"""
+        self._ensure_loaded()
+        with self._lock:
+            return list(self._datasets.values())
+
+    def watch(self, interval: float = MANIFEST_POLL_SECONDS) -> None:
+        """백그라운드 스레드에서 interval초마다 변경된 데이터셋만 다시 스캔"""
+        if self._watcher is not None:
+            return
+        self._stop_watching.clear()
+
+        def poll():
+            while not self._stop_watching.wait(interval):
+                try:
+                    self.refresh()
+                except Exception as e:
+                    print(f"결과 목록 갱신 오류: {e}")
+
+        self._watcher = threading.Thread(target=poll, name="results-manifest", daemon=True)
+        self._watcher.start()
+
+    def stop(self) -> None:
+        """감시 스레드 종료"""
+        if self._watcher is None:
+            return
+        self._stop_watching.set()
+        self._watcher.join()
+        self._watcher = None
@@ -1,7 +1,7 @@
 """
 데이터 모델 정의
 """
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 
 class BurnedPixel(BaseModel):
@@ -24,9 +24,163 @@ class FireSpreadResponse(BaseModel):
     ignition_point: IgnitionPoint
     metadata: Dict[str, Any]
 
+class GridGeoreference(BaseModel):
+    """격자 georeference (첫 셀 중심 좌표와 행/열 간격)"""
+    lat_origin: float
+    lon_origin: float
+    lat_step: float
+    lon_step: float
+
+class FireSpreadMaskResponse(BaseModel):
+    """압축 마스크 응답 모델 (셀 좌표 대신 격자 전체를 비트마스크/런렝스로 전송)"""
+    time_minutes: int
+    total_burned_pixels: int
+    rows: int
+    cols: int
+    encoding: str
+    data: str  # base64
+    georeference: GridGeoreference
+    ignition_point: IgnitionPoint
+    metadata: Dict[str, Any]
+
+class FireSpreadDeltaResponse(BaseModel):
+    """두 시점 사이에 상태가 바뀐 셀만 담은 응답 모델"""
+    from_minutes: int
+    to_minutes: int
+    total_changed_pixels: int
+    added_coordinates: List[BurnedPixel]
+    removed_coordinates: List[BurnedPixel]
+    metadata: Dict[str, Any]
+
+class WeatherRow(BaseModel):
+    """Weather.csv 한 행 (시간당 기상)"""
+    Scenario: str = "API"
+    datetime: str
+    APCP: float = 0.0
+    TMP: float
+    RH: float
+    WS: float
+    WD: float
+    FFMC: float
+    DMC: float
+    DC: float
+    ISI: float
+    BUI: float
+    FWI: float
+
+class SimulationRequest(BaseModel):
+    """온디맨드 시뮬레이션 요청 모델"""
+    dataset: str = "Korean40x40"
+    ignition_cell: int = Field(..., ge=1, description="점화 셀 번호 (1-based, IgnitionPoints.csv의 Ncell)")
+    weather: Optional[List[WeatherRow]] = Field(None, description="생략하면 데이터셋의 Weather.csv 사용")
+    nsims: int = Field(1, ge=1, le=100)
+    seed: int = 123
+    ros_cv: float = Field(0.0, ge=0.0)
+
+class SimulationJobResponse(BaseModel):
+    """시뮬레이션 작업 상태 모델"""
+    job_id: str
+    status: str
+    cached: bool
+    dataset: str
+    result_dataset: str
+    nsims: int
+    error: Optional[str] = None
+    submitted_at: float
+    finished_at: Optional[float] = None
+    result_url: Optional[str] = None
+
+class BurnProbabilityPixel(BaseModel):
+    """셀별 연소 확률 (앙상블 중 해당 시각까지 연소된 시뮬레이션 비율)"""
+    row: int
+    col: int
+    lat: Optional[float] = None
+    lon: Optional[float] = None
+    probability: float
+
+class BurnProbabilityResponse(BaseModel):
+    """앙상블 연소 확률 응답 모델"""
+    time_minutes: int
+    nsims: int
+    total_cells_with_probability: int
+    cells: List[BurnProbabilityPixel]
+    contours: Optional[Dict[str, Any]] = None  # 확률 임계값별 경계 GeoJSON FeatureCollection
+    metadata: Dict[str, Any]
+
+class AlertUser(BaseModel):
+    """알림 대상 사용자 위치"""
+    user_id: str
+    lat: float
+    lon: float
+
+class AlertUserRegistration(BaseModel):
+    """알림 대상 사용자 등록 요청"""
+    users: List[AlertUser]
+
+class AlertUserRegistrationResponse(BaseModel):
+    """사용자 등록 결과"""
+    registered: int
+    total_users: int
+
+class ThreatenedUser(BaseModel):
+    """화재 도달이 예상되는 사용자"""
+    user_id: str
+    lat: float
+    lon: float
+    row: int
+    col: int
+    arrival_minutes: float
+
+class AlertMatchResponse(BaseModel):
+    """구간 (from, to] 사이에 새로 위협받는 사용자 응답 모델"""
+    from_minutes: int
+    to_minutes: int
+    total_threatened: int
+    users: List[ThreatenedUser]
+    metadata: Dict[str, Any]
+
+class Shelter(BaseModel):
+    """대피소 위치"""
+    shelter_id: str
+    name: str = ""
+    lat: float
+    lon: float
+
+class ShelterRegistration(BaseModel):
+    """대피소 등록 요청"""
+    shelters: List[Shelter]
+
+class ShelterRegistrationResponse(BaseModel):
+    """대피소 등록 결과"""
+    registered: int
+    total_shelters: int
+
+class NearestShelterResponse(BaseModel):
+    """출발 시각 기준 가장 가까운 안전 대피소 응답 모델"""
+    time_minutes: int
+    row: Optional[int] = None
+    col: Optional[int] = None
+    shelter: Optional[Shelter] = None
+    distance_m: Optional[float] = None
+    eta_minutes: Optional[float] = None
+    reachable_before_fire: bool = False
+    metadata: Dict[str, Any]
+
+class DatasetManifest(BaseModel):
+    """결과 데이터셋 정보 (manifest)"""
+    name: str
+    input_dataset: str
+    simulations: List[int]
+    steps: Dict[int, int] = Field(..., description="시뮬레이션별 ForestGrid 단계 수")
+    step_minutes: int = Field(..., description="API에서 ForestGrid 한 단계를 표시하는 시간(분)")
+    rows: Optional[int] = None
+    cols: Optional[int] = None
+    ignition_cell: Optional[int] = Field(None, description="0-based 점화 셀 (LogFile 기준)")
+
 class AvailableSimulations(BaseModel):
     """사용 가능한 시뮬레이션 목록"""
     simulations: List[str]
+    datasets: List[DatasetManifest] = []
     description: str
 
 class ServerStatus(BaseModel):
@@ -0,0 +1,246 @@
+"""
+연소 마스크 → GeoJSON 화재 경계(perimeter) 폴리곤
+
+1. scipy.ndimage.label로 4-연결 성분 라벨링
+2. 각 연소 셀의 변 중 이웃이 미연소인 변(경계 변)을 방향을 갖게 모아 링으로 연결
+   (연소 영역이 항상 진행 방향 왼쪽, 대각선으로만 닿는 셀은 분리)
+3. 일직선 꼭짓점 제거, 선택적으로 Douglas-Peucker 단순화
+   (단순화한 링이 자기 자신이나 다른 링과 닿으면 그 링은 단순화하지 않은 링으로 되돌림)
+4. georeference로 격자 꼭짓점을 위경도로 변환
+
+결과 크기는 연소 면적이 아니라 경계 길이에 비례합니다.
+"""
+import json
+from typing import Dict, List, Tuple
+
+import numpy as np
+from scipy import ndimage
+
+GEOJSON_MEDIA_TYPE = "application/geo+json"
+COORDINATE_DECIMALS = 7  # 위경도 소수점 자리수 (약 1cm)
+
+# 진행 방향 (drow, dcol): 0=동(+col), 1=남(+row), 2=서(-col), 3=북(-row)
+_DIRECTIONS = ((0, 1), (1, 0), (0, -1), (-1, 0))
+
+
+def label_components(mask: np.ndarray) -> Tuple[np.ndarray, int]:
+    """4-연결 성분 라벨링 (0 = 미연소, 1..n = 성분 번호)"""
+    labels, count = ndimage.label(mask)  # 기본 구조 요소가 4-연결
+    return labels.astype(np.int32, copy=False), int(count)
+
+
+def _boundary_edges(mask: np.ndarray) -> Dict[Tuple[int, int], List[Tuple[int, int, int, int]]]:
+    """방향 있는 경계 변: 시작 꼭짓점 → [(방향, 끝 행, 끝 열, 소속 셀), ...]
+
+    꼭짓점 (r, c)는 셀 (r, c)의 왼쪽 위 모서리입니다. 연소 셀이 진행 방향 왼쪽에 오도록 합니다.
+    """
+    cols = mask.shape[1]
+    padded = np.pad(mask, 1)
+    inner = padded[1:-1, 1:-1]
+    edges: Dict[Tuple[int, int], List[Tuple[int, int, int, int]]] = {}
+
+    def add(cells, start_offset, direction):
+        dr, dc = _DIRECTIONS[direction]
+        rows_, cols_ = np.nonzero(cells)
+        for r, c in zip(rows_.tolist(), cols_.tolist()):
+            r0, c0 = r + start_offset[0], c + start_offset[1]
+            edges.setdefault((r0, c0), []).append((direction, r0 + dr, c0 + dc, r * cols + c))
+
+    # 위쪽 이웃이 미연소: 동→서 진행 (왼쪽 = 남 = 셀 내부)
+    add(inner & ~padded[:-2, 1:-1], (0, 1), 2)
+    # 아래쪽 이웃이 미연소: 서→동 진행
+    add(inner & ~padded[2:, 1:-1], (1, 0), 0)
+    # 왼쪽 이웃이 미연소: 북→남 진행
+    add(inner & ~padded[1:-1, :-2], (0, 0), 1)
+    # 오른쪽 이웃이 미연소: 남→북 진행
+    add(inner & ~padded[1:-1, 2:], (1, 1), 3)
+    return edges
+
+
+def _trace_rings(mask: np.ndarray) -> List[Tuple[int, List[Tuple[int, int]]]]:
+    """경계 변을 이어 닫힌 링 생성: [(소속 셀, 꼭짓점 목록)], 일직선 꼭짓점은 제거"""
+    edges = _boundary_edges(mask)
+    rings = []
+    while edges:
+        start = next(iter(edges))
+        first = edges[start].pop()
+        if not edges[start]:
+            del edges[start]
+        direction, r, c, cell = first
+        ring = [start]
+        vertex = (r, c)
+        while True:
+            candidates = list(edges.get(vertex, ()))
+            if vertex == start:
+                candidates.append(first)
+            # 안장점에서는 좌회전 > 직진 > 우회전 순으로 선택 (대각선으로만 닿는 셀 분리)
+            turn = {(direction + 3) % 4: 0, direction: 1, (direction + 1) % 4: 2}
+            chosen = min(candidates, key=lambda edge: turn.get(edge[0], 3))
+            if chosen is first:
+                if first[0] == direction:
+                    ring.pop(0)  # 시작점이 일직선 위에 있으면 제거
+                break
+            edges[vertex].remove(chosen)
+            if not edges[vertex]:
+                del edges[vertex]
+            if chosen[0] != direction:
+                ring.append(vertex)
+            direction = chosen[0]
+            vertex = (chosen[1], chosen[2])
+        ring.append(ring[0])
+        rings.append((cell, ring))
+    return rings
+
+
+def _signed_area(ring: np.ndarray) -> float:
+    x, y = ring[:, 0], ring[:, 1]
+    return 0.5 * float(np.dot(x[:-1], y[1:]) - np.dot(x[1:], y[:-1]))
+
+
+def _douglas_peucker(points: np.ndarray, tolerance: float) -> np.ndarray:
+    """닫힌 링 Douglas-Peucker 단순화 (첫/끝 점 유지)"""
+    keep = np.zeros(len(points), dtype=bool)
+    keep[0] = keep[-1] = True
+    # 닫힌 링은 첫 점과 가장 먼 점으로 나눠 두 구간을 단순화
+    far = int(np.argmax(np.hypot(*(points - points[0]).T)))
+    keep[far] = True
+    stack = [(0, far), (far, len(points) - 1)]
+    while stack:
+        i, j = stack.pop()
+        if j <= i + 1:
+            continue
+        segment = points[j] - points[i]
+        length = np.hypot(*segment)
+        offsets = points[i + 1:j] - points[i]
+        if length == 0:
+            distances = np.hypot(offsets[:, 0], offsets[:, 1])
+        else:
+            distances = np.abs(segment[0] * offsets[:, 1] - segment[1] * offsets[:, 0]) / length
+        k = int(np.argmax(distances))
+        if distances[k] > tolerance:
+            keep[i + 1 + k] = True
+            stack.append((i, i + 1 + k))
+            stack.append((i + 1 + k, j))
+    return points[keep]
+
+
+def _orientation(a: np.ndarray, b: np.ndarray, c: np.ndarray) -> np.ndarray:
+    """(b - a) x (c - a)의 부호 (격자 꼭짓점은 정수이므로 정확)"""
+    return np.sign((b[..., 0] - a[..., 0]) * (c[..., 1] - a[..., 1])
+                   - (b[..., 1] - a[..., 1]) * (c[..., 0] - a[..., 0]))
+
+
+def _on_segment(a: np.ndarray, b: np.ndarray, c: np.ndarray) -> np.ndarray:
+    """a, b, c가 한 직선 위일 때 c가 선분 ab 위(끝점 포함)인지"""
+    return ((np.minimum(a[..., 0], b[..., 0]) <= c[..., 0]) & (c[..., 0] <= np.maximum(a[..., 0], b[..., 0]))
+            & (np.minimum(a[..., 1], b[..., 1]) <= c[..., 1]) & (c[..., 1] <= np.maximum(a[..., 1], b[..., 1])))
+
+
+def _contacts(p1: np.ndarray, p2: np.ndarray, q1: np.ndarray, q2: np.ndarray) -> np.ndarray:
+    """선분 p(len(p1)개)와 선분 q(len(q1)개)가 교차하거나 닿는지 (len(p1) x len(q1) bool)"""
+    p1, p2 = p1[:, None, :], p2[:, None, :]
+    q1, q2 = q1[None, :, :], q2[None, :, :]
+    d1, d2 = _orientation(q1, q2, p1), _orientation(q1, q2, p2)
+    d3, d4 = _orientation(p1, p2, q1), _orientation(p1, p2, q2)
+    return (((d1 * d2 < 0) & (d3 * d4 < 0))
+            | ((d1 == 0) & _on_segment(q1, q2, p1)) | ((d2 == 0) & _on_segment(q1, q2, p2))
+            | ((d3 == 0) & _on_segment(p1, p2, q1)) | ((d4 == 0) & _on_segment(p1, p2, q2)))
+
+
+def _is_simple(ring: np.ndarray) -> bool:
+    """닫힌 링이 자기 자신과 닿지 않는지 (이웃 변은 공유 꼭짓점만 허용)"""
+    n = len(ring) - 1
+    if n < 3 or _signed_area(ring) == 0:
+        return False
+    p1, p2 = ring[:-1], ring[1:]
+    touching = _contacts(p1, p2, p1, p2)
+    i, j = np.triu_indices(n, 2)
+    non_adjacent = (i != 0) | (j != n - 1)
+    if touching[i[non_adjacent], j[non_adjacent]].any():
+        return False
+    # 이웃 변이 같은 직선 위에서 되돌아가는 경우 (겹침)
+    following = np.roll(p2, -1, axis=0)
+    backtrack = (_orientation(p1, p2, following) == 0) & (np.einsum("ij,ij->i", p2 - p1, following - p2) < 0)
+    return not backtrack.any()
+
+
+def _simplify_rings(rings: List[np.ndarray], tolerance: float) -> List[np.ndarray]:
+    """링별 Douglas-Peucker 단순화 후 위상 확인
+
+    단순화한 링이 자기 자신이나 다른 링(단순화 여부와 관계없이)과 닿으면 단순화하지 않은
+    링으로 되돌리고, 되돌린 링이 없을 때까지 반복합니다. 원래 링끼리는 겹치지 않으므로
+    성분과 구멍의 관계가 단순화 전과 같습니다.
+    """
+    current = []
+    for points in rings:
+        simplified = _douglas_peucker(points, tolerance)
+        current.append(simplified if len(simplified) >= 4 and len(simplified) < len(points) else points)
+
+    while True:
+        owners = np.concatenate([np.full(len(points) - 1, i) for i, points in enumerate(current)])
+        starts = np.concatenate([points[:-1] for points in current])
+        ends = np.concatenate([points[1:] for points in current])
+        low, high = np.minimum(starts, ends), np.maximum(starts, ends)
+        reverted = False
+        for i, points in enumerate(current):
+            if points is rings[i]:
+                continue
+            # 경계 상자가 겹치는 다른 링의 변만 검사
+            nearby = ((owners != i) & np.all(low <= points.max(axis=0), axis=1)
+                      & np.all(high >= points.min(axis=0), axis=1))
+            if not _is_simple(points) or _contacts(points[:-1], points[1:], starts[nearby], ends[nearby]).any():
+                current[i] = rings[i]
+                reverted = True
+        if not reverted:
+            return current
+
+
+def polygonize(mask: np.ndarray, georeference: Dict[str, float], simplify: float = 0.0,
+               properties: Dict = None) -> Dict:
+    """연소 마스크를 GeoJSON FeatureCollection(성분별 Polygon)으로 변환
+
+    simplify는 셀 단위 허용 오차이며 0이면 일직선 꼭짓점만 제거합니다.
+    """
+    mask = np.asarray(mask, dtype=bool)
+    labels, count = label_components(mask)
+    features = []
+    if count:
+        areas = np.bincount(labels.ravel(), minlength=count + 1)
+        traced = _trace_rings(mask)
+        rings = [np.asarray(ring, dtype=np.float64) for _, ring in traced]
+        if simplify > 0:
+            rings = _simplify_rings(rings, simplify)
+        rings_by_label: Dict[int, List] = {}
+        for (cell, _), points in zip(traced, rings):
+            rings_by_label.setdefault(int(labels.flat[cell]), []).append(points)
+
+        lat0, lon0 = georeference["lat_origin"], georeference["lon_origin"]
+        dlat, dlon = georeference["lat_step"], georeference["lon_step"]
+        for label in sorted(rings_by_label):
+            # 면적이 가장 큰 링이 외곽, 나머지는 구멍
+            rings = sorted(rings_by_label[label], key=lambda p: -abs(_signed_area(p)))
+            coordinates = []
+            for i, points in enumerate(rings):
+                # 격자 꼭짓점(셀 왼쪽 위 모서리) → 위경도
+                ring = np.column_stack((lon0 + (points[:, 1] - 0.5) * dlon,
+                                        lat0 + (points[:, 0] - 0.5) * dlat))
+                # RFC 7946: 외곽은 반시계, 구멍은 시계 방향
+                area = _signed_area(ring)
+                if (i == 0 and area < 0) or (i > 0 and area > 0):
+                    ring = ring[::-1]
+                coordinates.append(np.round(ring, COORDINATE_DECIMALS).tolist())
+            features.append({
+                "type": "Feature",
+                "geometry": {"type": "Polygon", "coordinates": coordinates},
+                "properties": {"component": label, "burned_cells": int(areas[label])},
+            })
+
+    collection = {"type": "FeatureCollection", "features": features}
+    if properties:
+        collection["properties"] = properties
+    return collection
+
+
+def dumps_geojson(collection: Dict) -> bytes:
+    """GeoJSON을 공백 없는 UTF-8 바이트로 직렬화"""
+    return json.dumps(collection, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
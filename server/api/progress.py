@@ -0,0 +1,78 @@
+"""
+시뮬레이션 진행 상황 스트리밍 (Server-Sent Events)
+
+엔진은 ForestGridNN.csv를 시뮬레이션 도중에 하나씩 기록하므로, 작업 출력 폴더를
+짧은 간격으로 확인해서 새로 완성된 격자를 구독자에게 바로 보냅니다.
+작업이 끝나 결과 폴더로 옮겨진 뒤에도 같은 (시뮬레이션, 단계)는 다시 보내지 않습니다.
+"""
+import os
+import re
+import glob
+import json
+from typing import List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+SSE_MEDIA_TYPE = "text/event-stream"
+SSE_POLL_SECONDS = 0.25       # 출력 폴더 확인 간격
+SSE_KEEPALIVE_SECONDS = 15.0  # 이벤트가 없을 때 연결 유지용 주석 전송 간격
+
+_GRID_FILE_PATTERN = re.compile(r"Grids(\d+)[\\/]ForestGrid(\d+)\.csv$")
+
+
+def format_sse(event: str, data: dict, event_id: Optional[str] = None) -> str:
+    """SSE 이벤트 한 개를 문자열로 직렬화"""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append("data: " + json.dumps(data, ensure_ascii=False, separators=(",", ":")))
+    return "\n".join(lines) + "\n\n"
+
+
+def _read_complete_grid(grid_path: str, rows: int, cols: int) -> Optional[np.ndarray]:
+    """격자 파일이 rows x cols로 다 써졌으면 연소 마스크를, 아직 쓰는 중이면 None 반환"""
+    try:
+        grid = pd.read_csv(grid_path, header=None, dtype=np.int8).to_numpy()
+    except (pd.errors.EmptyDataError, pd.errors.ParserError, ValueError, FileNotFoundError):
+        return None
+    if grid.shape != (rows, cols):
+        return None
+    return np.ascontiguousarray(grid == 1)
+
+
+class GridProgressWatcher:
+    """여러 후보 폴더의 Grids*/ForestGrid*.csv 중 새로 완성된 격자를 찾는 감시자"""
+
+    def __init__(self, result_folders: List[str], rows: int, cols: int):
+        self.result_folders = result_folders
+        self.rows = rows
+        self.cols = cols
+        self._seen: Set[Tuple[int, int]] = set()
+
+    def poll(self) -> List[Tuple[int, int, np.ndarray, float]]:
+        """새로 완성된 (시뮬레이션, 단계, 마스크, 기록 시각) 목록을 순서대로 반환"""
+        found = {}
+        for folder in self.result_folders:
+            for grid_path in glob.glob(os.path.join(folder, "Grids", "Grids*", "ForestGrid*.csv")):
+                match = _GRID_FILE_PATTERN.search(grid_path)
+                if match is None:
+                    continue
+                key = (int(match.group(1)), int(match.group(2)))
+                if key not in self._seen:
+                    found.setdefault(key, grid_path)
+
+        updates = []
+        for key in sorted(found):
+            mask = _read_complete_grid(found[key], self.rows, self.cols)
+            if mask is None:
+                continue
+            try:
+                written_at = os.stat(found[key]).st_mtime
+            except FileNotFoundError:
+                # 결과 폴더로 옮겨지는 중
+                continue
+            self._seen.add(key)
+            updates.append((key[0], key[1], mask, written_at))
+        return updates
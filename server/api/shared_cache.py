@@ -0,0 +1,263 @@
+"""
+워커 프로세스 간 공유 배열 캐시
+
+uvicorn/gunicorn 워커를 여러 개 띄우면 프로세스마다 같은 격자 마스크와 좌표 배열을 따로
+파싱해서 들고 있게 됩니다. 전처리한 배열을 캐시 폴더의 .npy 파일로 한 번만 쓰고, 모든
+워커는 읽기 전용 memmap으로 열어 OS 페이지 캐시의 같은 페이지를 공유합니다.
+
+- 기본 폴더: /dev/shm/cell2fire-cache (없으면 임시 폴더), CELL2FIRE_SHARED_CACHE_DIR로 변경
+- 파일 이름: <종류>-<원본 경로 해시>-<원본 버전(mtime, 크기) 해시>.npy
+- 쓰기: 파일 잠금 안에서 한 워커만 생성, 임시 파일에 쓴 뒤 os.replace (반쯤 쓴 파일을 읽지 않음)
+- 원본이 바뀌면 새 버전 파일을 만들고 같은 원본의 이전 버전 파일은 삭제
+
+사용 예 (server 폴더에서, 워커 시작 전에 미리 채우기):
+    python -m api.shared_cache
+"""
+import os
+import sys
+import glob
+import errno
+import hashlib
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Callable, Hashable, Optional
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: 잠금 없이 원자적 교체만 사용 (중복 생성은 가능)
+    fcntl = None
+
+
+def _default_cache_dir() -> str:
+    """공유 메모리(/dev/shm)가 있으면 그 아래, 없으면 임시 폴더"""
+    base = "/dev/shm" if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK) else tempfile.gettempdir()
+    return os.path.join(base, "cell2fire-cache")
+
+
+SHARED_CACHE_DIR = os.environ.get("CELL2FIRE_SHARED_CACHE_DIR") or _default_cache_dir()
+
+# write 중 이 오류는 원본 문제가 아니라 캐시 폴더 공간 부족
+_CACHE_FULL_ERRNOS = (errno.ENOSPC, errno.EDQUOT)
+
+
+def _digest(value: Hashable) -> str:
+    return hashlib.blake2b(repr(value).encode("utf-8"), digest_size=8).hexdigest()
+
+
+class SharedArrayCache:
+    """원본 파일 버전별로 한 번만 만드는 읽기 전용 memmap 배열 캐시"""
+
+    def __init__(self, cache_dir: str = SHARED_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.mapped = 0  # 다른 워커(또는 이전 실행)가 만든 파일을 연 횟수
+        self.built = 0   # 이 프로세스가 직접 만든 횟수
+        self._lock = threading.Lock()
+        self._disabled = False
+
+    def file_path(self, kind: str, source_path: str, version: Hashable) -> str:
+        """캐시 파일 경로"""
+        return os.path.join(self.cache_dir, f"{kind}-{_digest(source_path)}-{_digest(version)}.npy")
+
+    @staticmethod
+    def source_version(source_path: str) -> Hashable:
+        """원본 버전 (파일/폴더의 mtime과 크기), 없으면 FileNotFoundError"""
+        stat = os.stat(source_path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def load(self, kind: str, source_path: str, builder: Callable[[], np.ndarray],
+             version: Optional[Hashable] = None) -> np.ndarray:
+        """source_path에서 만든 배열을 읽기 전용 memmap으로 반환
+
+        캐시 파일이 없으면 builder()로 만들어 씁니다. 캐시 폴더를 쓸 수 없으면
+        builder() 결과를 그대로 반환합니다. 원본이 없으면 FileNotFoundError를 발생시킵니다.
+        builder()의 오류(원본 읽기 실패)는 그대로 전달하고 캐시를 끄지 않습니다.
+        """
+        if version is None:
+            version = self.source_version(source_path)
+        if self._disabled:
+            return builder()
+        path = self.file_path(kind, source_path, version)
+        array = self._map(path)
+        if array is not None:
+            self._count("mapped")
+            return array
+
+        building = False
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with self._file_lock(path):
+                # 잠금을 기다리는 동안 다른 워커가 만들었을 수 있음
+                array = self._map(path)
+                if array is not None:
+                    self._count("mapped")
+                    return array
+                building = True
+                array = np.ascontiguousarray(builder())
+                building = False
+                if array.size == 0:
+                    return array  # 빈 파일은 mmap할 수 없음
+                self._write(path, array)
+                self._remove_old_versions(kind, source_path, path)
+        except OSError as e:
+            if building:
+                raise
+            self._disable(e)
+            return array if array is not None else builder()
+        self._count("built")
+        return self._map(path)
+
+    def load_file(self, kind: str, source_path: str, write: Callable[[str], object],
+                  version: Hashable) -> np.ndarray:
+        """write(path)가 .npy 파일을 직접 쓰는 큰 배열(앙상블 스택 등)을 읽기 전용 memmap으로 반환
+
+        배열 전체를 메모리에 올리지 않도록 write가 임시 파일에 바로 쓰고, 다 쓴 뒤 교체합니다.
+        캐시 폴더를 쓸 수 없거나 write 중 공간이 부족하면 임시 폴더에 만들어 메모리로 읽은 배열을
+        반환합니다. 그 밖의 write 오류(원본 읽기 실패)는 그대로 전달합니다.
+        """
+        path = self.file_path(kind, source_path, version)
+        if not self._disabled:
+            array = self._map(path)
+            if array is not None:
+                self._count("mapped")
+                return array
+            building = False
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                with self._file_lock(path):
+                    array = self._map(path)
+                    if array is not None:
+                        self._count("mapped")
+                        return array
+                    building = True
+                    self._write_with(path, write)
+                    building = False
+                    self._remove_old_versions(kind, source_path, path)
+                self._count("built")
+                return self._map(path)
+            except OSError as e:
+                if building and e.errno not in _CACHE_FULL_ERRNOS:
+                    raise
+                self._disable(e)
+
+        with tempfile.TemporaryDirectory(prefix="cell2fire-") as tmp_dir:
+            tmp_path = os.path.join(tmp_dir, os.path.basename(path))
+            write(tmp_path)
+            return np.load(tmp_path)
+
+    def _disable(self, error: OSError) -> None:
+        """캐시 폴더 쓰기 실패: 이 프로세스는 이후 프로세스 메모리 사용"""
+        print(f"공유 캐시 쓰기 오류 (프로세스 메모리 사용): {error}")
+        self._disabled = True
+
+    @staticmethod
+    def _map(path: str) -> Optional[np.ndarray]:
+        try:
+            return np.load(path, mmap_mode="r")
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+
+    @staticmethod
+    def _write(path: str, array: np.ndarray) -> None:
+        """임시 파일에 쓴 뒤 원자적으로 교체"""
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                np.save(f, array)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @staticmethod
+    def _write_with(path: str, write: Callable[[str], object]) -> None:
+        """write(임시 경로)로 쓴 뒤 원자적으로 교체"""
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            write(tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _remove_old_versions(self, kind: str, source_path: str, keep: str) -> None:
+        """같은 원본의 이전 버전 파일 삭제 (이미 매핑한 워커는 그대로 읽을 수 있음)"""
+        prefix = os.path.join(self.cache_dir, f"{kind}-{_digest(source_path)}-")
+        for old_path in glob.glob(prefix + "*.npy"):
+            if old_path == keep:
+                continue
+            for stale in (old_path, old_path + ".lock"):
+                try:
+                    os.remove(stale)
+                except FileNotFoundError:
+                    pass
+
+    @contextmanager
+    def _file_lock(self, path: str):
+        """캐시 파일별 프로세스 간 잠금"""
+        if fcntl is None:
+            yield
+            return
+        with open(path + ".lock", "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _count(self, field: str) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def clear(self) -> int:
+        """캐시 폴더의 배열 파일 삭제 (삭제한 파일 수 반환)"""
+        removed = 0
+        for path in glob.glob(os.path.join(self.cache_dir, "*.npy*")):
+            try:
+                os.remove(path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+    def stats(self) -> dict:
+        """캐시 상태 정보"""
+        files = glob.glob(os.path.join(self.cache_dir, "*.npy"))
+        return {
+            "cache_dir": self.cache_dir,
+            "files": len(files),
+            "bytes": sum(os.path.getsize(path) for path in files if os.path.exists(path)),
+            "mapped": self.mapped,
+            "built": self.built,
+            "disabled": self._disabled,
+        }
+
+
+# 프로세스 전역 공유 캐시 (모든 워커가 같은 폴더를 사용)
+shared_arrays = SharedArrayCache()
+
+
+def _warm() -> None:
+    """manifest의 모든 데이터셋 좌표와 ForestGrid 마스크를 공유 캐시에 미리 쓰기"""
+    # python -m 실행 시 이 모듈은 __main__이므로 data_handler가 쓰는 인스턴스를 가져옴
+    from .data_handler import DataHandler, get_results_manifest
+    from .shared_cache import shared_arrays as cache
+
+    if "--clear" in sys.argv[1:]:
+        print(f"삭제: {cache.clear()}개 파일")
+    for entry in get_results_manifest().entries():
+        if DataHandler.get_coordinate_index(entry.name) is None:
+            continue
+        count = 0
+        for simulation, steps in entry.steps.items():
+            for step in steps:
+                DataHandler.load_burned_mask(entry.name, simulation, step)
+                count += 1
+        print(f"{entry.name}: 격자 {count}개")
+    print(cache.stats())
+
+
+if __name__ == "__main__":
+    _warm()
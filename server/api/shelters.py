@@ -0,0 +1,187 @@
+"""
+가장 가까운 안전 대피소 경로 계산
+
+출발 시각(API 시간 단계)마다 화재 도달 셀을 뺀 8방향 격자 그래프를 만들고, 대피소들에서
+시작하는 다중 출발점 Dijkstra(scipy.sparse.csgraph)로 모든 셀에서 가장 가까운 대피소까지의
+거리(m)와 대피소 번호를 계산합니다. 단계별 거리장은 처음 조회할 때 한 번만 계산합니다.
+
+- 격자 인접: ReadDataPrometheus.ForestGrid와 같은 8방향(N, S, E, W, NE, NW, SE, SW)
+- 장애물: 출발 시각 + 안전 여유 시간 안에 화재가 도달하는 셀 (대피소도 같은 기준으로 제외)
+- 조회: 사용자 셀로 단계별 거리장 배열 두 개를 인덱싱하는 O(1) 조회
+"""
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+
+from .alerts import UserStore
+from .coordinates import CoordinateIndex
+
+WALKING_SPEED_M_PER_MIN = 67.0       # 보행 속도 (약 4km/h)
+SHELTER_SAFETY_MARGIN_MINUTES = 30.0  # 출발 후 이 시간(엔진 분) 안에 불이 닿는 셀은 통과 불가
+NO_SHELTER = -1
+
+# ForestGrid 인접 방향 (drow, dcol)
+_NEIGHBOR_OFFSETS = ((-1, 0), (1, 0), (0, 1), (0, -1), (-1, 1), (-1, -1), (1, 1), (1, -1))
+_EARTH_METERS_PER_DEGREE = 111320.0
+
+
+def cell_size_meters(index: CoordinateIndex):
+    """georeference로 행/열 간격(m) 계산"""
+    geo = index.georeference()
+    row_m = abs(geo["lat_step"]) * _EARTH_METERS_PER_DEGREE
+    col_m = abs(geo["lon_step"]) * _EARTH_METERS_PER_DEGREE * np.cos(np.radians(geo["lat_origin"]))
+    return float(row_m), float(col_m)
+
+
+def passable_graph(passable: np.ndarray, row_m: float, col_m: float) -> csr_matrix:
+    """통과 가능한 셀끼리 잇는 8방향 격자 그래프 (셀 번호 = row * cols + col, 간선 가중치 [m])"""
+    rows, cols = passable.shape
+    ncells = rows * cols
+    diagonal_m = float(np.hypot(row_m, col_m))
+    costs = np.array([row_m if dc == 0 else col_m if dr == 0 else diagonal_m for dr, dc in _NEIGHBOR_OFFSETS])
+    offsets = np.array([dr * cols + dc for dr, dc in _NEIGHBOR_OFFSETS], dtype=np.int64)
+
+    # valid[r, c, k]: (r, c)와 k번 방향 이웃이 모두 격자 안이고 통과 가능
+    valid = np.zeros((rows, cols, len(_NEIGHBOR_OFFSETS)), dtype=bool)
+    for k, (dr, dc) in enumerate(_NEIGHBOR_OFFSETS):
+        source = (slice(max(-dr, 0), rows - max(dr, 0)), slice(max(-dc, 0), cols - max(dc, 0)))
+        target = (slice(max(dr, 0), rows - max(-dr, 0)), slice(max(dc, 0), cols - max(-dc, 0)))
+        valid[source + (k,)] = passable[source] & passable[target]
+    valid = valid.reshape(ncells, len(_NEIGHBOR_OFFSETS))
+
+    # 행 우선 순서로 꺼내면 셀별로 정렬된 CSR 간선 목록이 바로 만들어짐
+    cell, direction = np.nonzero(valid)
+    indptr = np.zeros(ncells + 1, dtype=np.int64)
+    np.cumsum(np.count_nonzero(valid, axis=1), out=indptr[1:])
+    return csr_matrix((costs[direction], cell + offsets[direction], indptr), shape=(ncells, ncells))
+
+
+def nearest_shelter_field(rows: int, cols: int, shelter_cells: np.ndarray, blocked: np.ndarray,
+                          row_m: float, col_m: float):
+    """대피소에서 시작하는 다중 출발점 Dijkstra
+
+    blocked 셀은 지나갈 수 없습니다. (셀별 거리 float32 [m], 가장 가까운 대피소 번호 int32) 반환,
+    도달할 수 없는 셀은 거리 inf, 번호 NO_SHELTER입니다.
+    """
+    ncells = rows * cols
+    blocked = np.asarray(blocked, dtype=bool).reshape(rows, cols)
+    shelter_cells = np.asarray(shelter_cells, dtype=np.int64)
+    open_shelters = np.flatnonzero(shelter_cells >= 0)
+    open_shelters = open_shelters[~blocked.ravel()[shelter_cells[open_shelters]]]
+    if open_shelters.size == 0:
+        return np.full(ncells, np.inf, dtype=np.float32), np.full(ncells, NO_SHELTER, dtype=np.int32)
+
+    # 같은 셀에 대피소가 여러 개면 먼저 등록된 대피소
+    sources = shelter_cells[open_shelters]
+    shelter_of_cell = np.full(ncells, NO_SHELTER, dtype=np.int32)
+    shelter_of_cell[sources[::-1]] = open_shelters[::-1]
+    sources = np.unique(sources)
+
+    graph = passable_graph(~blocked, row_m, col_m)
+    distance, _, origin = dijkstra(graph, indices=sources, min_only=True, return_predecessors=True)
+    nearest = np.where(origin >= 0, shelter_of_cell[np.maximum(origin, 0)], NO_SHELTER).astype(np.int32)
+    return distance.astype(np.float32), nearest
+
+
+class ShelterField:
+    """한 출발 단계의 대피소 거리장"""
+
+    def __init__(self, distance: np.ndarray, nearest: np.ndarray):
+        self.distance = distance  # (cells,) float32 [m]
+        self.nearest = nearest    # (cells,) int32 대피소 번호
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.distance.nbytes + self.nearest.nbytes)
+
+
+class ShelterRoutes:
+    """(dataset, simulation)의 출발 시간 단계와 단계별 대피소 거리장 계산"""
+
+    def __init__(self, rows: int, cols: int, row_m: float, col_m: float, arrival: np.ndarray,
+                 shelter_cells: np.ndarray, departure_minutes: np.ndarray,
+                 margin_minutes: float = SHELTER_SAFETY_MARGIN_MINUTES):
+        self.rows, self.cols = rows, cols
+        self.row_m, self.col_m = row_m, col_m
+        self.arrival = arrival                      # (cells,) 화재 도달 시간 (엔진 분)
+        self.shelter_cells = shelter_cells          # 대피소별 셀 번호 (격자 밖이면 -1)
+        self.departure_minutes = departure_minutes  # 단계별 출발 시각 (엔진 분)
+        self.margin_minutes = margin_minutes
+        # 대피소 셀 화재 도달 시간 (엔진 분)
+        self.shelter_arrival = np.where(shelter_cells >= 0, arrival[np.maximum(shelter_cells, 0)], -np.inf)
+
+    @property
+    def nbytes(self) -> int:
+        # 도달 시간 배열은 도달 시간 캐시와 공유하므로 제외
+        return int(self.shelter_cells.nbytes + self.departure_minutes.nbytes + self.shelter_arrival.nbytes)
+
+    @property
+    def steps(self) -> int:
+        return len(self.departure_minutes)
+
+    def step_for(self, simulation_minutes: float) -> int:
+        """출발 시각(엔진 분)을 넘지 않는 가장 가까운 단계"""
+        step = int(np.searchsorted(self.departure_minutes, simulation_minutes, side="right")) - 1
+        return min(max(step, 0), self.steps - 1)
+
+    def field(self, step: int) -> ShelterField:
+        """단계 출발 시각 + 안전 여유 시간 안에 불이 닿는 셀을 장애물로 두고 거리장 계산"""
+        blocked = self.arrival <= self.departure_minutes[step] + self.margin_minutes
+        distance, nearest = nearest_shelter_field(self.rows, self.cols, self.shelter_cells, blocked,
+                                                  self.row_m, self.col_m)
+        return ShelterField(distance, nearest)
+
+    def lookup(self, cell: int, simulation_minutes: float,
+               field: Optional[Callable[[int], ShelterField]] = None) -> Optional[Dict]:
+        """셀/출발 시각의 가장 가까운 대피소 (없거나 격자 밖이면 None)
+
+        field(step)으로 단계별 거리장을 가져옵니다 (기본: 캐시 없이 self.field).
+        """
+        if cell < 0:
+            return None
+        current = (field or self.field)(self.step_for(simulation_minutes))
+        shelter = int(current.nearest[cell])
+        if shelter == NO_SHELTER:
+            return None
+        distance_m = float(current.distance[cell])
+        eta_minutes = distance_m / WALKING_SPEED_M_PER_MIN
+        return {
+            "shelter": shelter,
+            "distance_m": distance_m,
+            "eta_minutes": eta_minutes,
+            # 걸어서 도착하기 전에 대피소에 불이 닿는지
+            "reachable_before_fire": bool(self.shelter_arrival[shelter] > simulation_minutes + eta_minutes),
+        }
+
+
+def build_shelter_routes(index: CoordinateIndex, arrival: np.ndarray, shelter_cells: np.ndarray,
+                         departure_minutes: Sequence[float],
+                         margin_minutes: float = SHELTER_SAFETY_MARGIN_MINUTES) -> ShelterRoutes:
+    """출발 시각 단계와 대피소 셀로 거리장 계산기 생성 (거리장은 단계별로 조회할 때 계산)"""
+    row_m, col_m = cell_size_meters(index)
+    return ShelterRoutes(index.rows, index.cols, row_m, col_m, np.asarray(arrival).ravel(),
+                         np.array(shelter_cells, dtype=np.int64),
+                         np.asarray(departure_minutes, dtype=np.float64), margin_minutes)
+
+
+class ShelterStore(UserStore):
+    """메모리 대피소 저장소 (사용자 저장소와 같은 ID/위경도/셀 맞춤 구조 + 이름)"""
+
+    def __init__(self):
+        super().__init__()
+        self.names: Dict[str, str] = {}
+
+    def add_shelters(self, shelter_ids: Sequence[str], names: Sequence[str],
+                     lat: Sequence[float], lon: Sequence[float]) -> None:
+        """대피소 등록 (이미 있는 ID는 이름/위치 갱신)"""
+        self.add_users(shelter_ids, lat, lon)
+        self.names.update(zip(shelter_ids, names))
+
+    def all_ids(self) -> List[str]:
+        return self.user_ids(np.arange(len(self)))
+
+
+# 프로세스 전역 대피소 저장소
+shelter_store = ShelterStore()
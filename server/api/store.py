@@ -0,0 +1,359 @@
+"""
+내장 SQLite 결과 저장소
+
+Cell2FireC.run이 끝난 결과 폴더(Grids/, Messages/, CellArrival/, Stats/)를 로컬 SQLite 파일 하나로
+적재(ingest)해서, API가 디렉터리를 돌며 CSV를 파싱하는 대신 인덱스 조회로 결과를 읽게 합니다.
+
+테이블 (모두 (dataset, simulation[, step]) 기본 키, WITHOUT ROWID):
+- datasets: 격자 크기, 입력 데이터셋, 원본 폴더 서명, 적재 버전
+- simulations: 점화 셀, 단계 수, 최종 연소 셀 수
+- grids: 단계별 연소 마스크 (np.packbits 비트마스크를 zlib 압축한 BLOB)
+  (ForestGrid CSV가 없고 CellArrivalNN.npy만 있는 시뮬레이션은 도달 시간으로 재구성)
+- arrivals: CellArrivalNN.npy 또는 MessagesFile로 계산한 셀별 도달 시간 (float32를 zlib 압축한 BLOB)
+- hourly_stats / final_stats: Stats/HourlyStats.csv, Stats/FinalStats.csv
+
+기본 위치는 임시 폴더의 cell2fire-results/ (결과 폴더별 파일 하나, 저장소 트리 밖)이고,
+CELL2FIRE_RESULTS_DB로 바꿀 수 있습니다. 원본 결과 폴더에서 언제든 다시 적재할 수 있습니다.
+
+사용 예 (server 폴더에서):
+    python -m api.store Korean40x40 [<dataset> ...]
+"""
+import io
+import os
+import re
+import sys
+import time
+import zlib
+import hashlib
+import sqlite3
+import tempfile
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .arrival import (arrival_snapshots, build_arrival_times, engine_arrival_file_path, messages_file_path,
+                      read_engine_arrival, read_log_info, read_messages, result_simulations)
+from .encoding import decode_bitmask, encode_bitmask
+
+RESULTS_DB_PATH = os.environ.get("CELL2FIRE_RESULTS_DB")  # 설정하지 않으면 default_db_path
+RESULTS_DB_DIR = os.path.join(tempfile.gettempdir(), "cell2fire-results")
+ZLIB_LEVEL = 6
+
+_GRID_FILE_PATTERN = re.compile(r"^ForestGrid(\d+)\.csv$")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS datasets (
+    name TEXT PRIMARY KEY,
+    input_dataset TEXT,
+    rows INTEGER NOT NULL,
+    cols INTEGER NOT NULL,
+    signature TEXT NOT NULL,
+    version INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS simulations (
+    dataset TEXT NOT NULL,
+    simulation INTEGER NOT NULL,
+    ignition_cell INTEGER,
+    steps INTEGER NOT NULL,
+    burned INTEGER NOT NULL,
+    PRIMARY KEY (dataset, simulation)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS grids (
+    dataset TEXT NOT NULL,
+    simulation INTEGER NOT NULL,
+    step INTEGER NOT NULL,
+    burned INTEGER NOT NULL,
+    mask BLOB NOT NULL,
+    PRIMARY KEY (dataset, simulation, step)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS arrivals (
+    dataset TEXT NOT NULL,
+    simulation INTEGER NOT NULL,
+    arrival BLOB NOT NULL,
+    PRIMARY KEY (dataset, simulation)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS hourly_stats (
+    dataset TEXT NOT NULL,
+    simulation INTEGER NOT NULL,
+    hour INTEGER NOT NULL,
+    non_burned INTEGER,
+    burned INTEGER,
+    harvested INTEGER,
+    PRIMARY KEY (dataset, simulation, hour)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS final_stats (
+    dataset TEXT NOT NULL,
+    simulation INTEGER NOT NULL,
+    non_burned INTEGER,
+    burned INTEGER,
+    harvested INTEGER,
+    PRIMARY KEY (dataset, simulation)
+) WITHOUT ROWID;
+"""
+
+_CHILD_TABLES = ("simulations", "grids", "arrivals", "hourly_stats", "final_stats")
+
+
+def parse_grid_csv(data: bytes, rows: int, cols: int) -> np.ndarray:
+    """ForestGrid CSV 바이트를 연소 마스크로 변환 (한 자리 상태값이면 바이트 연산, 아니면 pandas)"""
+    raw = np.frombuffer(data, dtype=np.uint8)
+    values = raw[(raw != ord(",")) & (raw != ord("\n")) & (raw != ord("\r")) & (raw != ord(" "))]
+    if values.size == rows * cols:
+        return (values == ord("1")).reshape(rows, cols)
+    grid = pd.read_csv(io.BytesIO(data), header=None, dtype=np.int8).to_numpy()
+    return grid.reshape(rows, cols) == 1
+
+
+def _grid_shape(grid_path: str) -> Tuple[int, int]:
+    """ForestGrid CSV의 (행, 열) 수"""
+    with open(grid_path, "rb") as f:
+        lines = [line for line in f.read().splitlines() if line.strip()]
+    return len(lines), lines[0].count(b",") + 1
+
+
+def _list_folder(path: str) -> List[str]:
+    """폴더의 파일 이름 목록 (폴더가 없으면 빈 목록)"""
+    try:
+        return os.listdir(path)
+    except FileNotFoundError:
+        return []
+
+
+def _compress_mask(mask: np.ndarray) -> bytes:
+    return zlib.compress(encode_bitmask(mask), ZLIB_LEVEL)
+
+
+def _read_stats(stats_path: str, columns: List[str]) -> Optional[pd.DataFrame]:
+    """Stats CSV (없거나 열이 다르면 None)"""
+    try:
+        df = pd.read_csv(stats_path)
+    except (FileNotFoundError, pd.errors.EmptyDataError):
+        return None
+    if not set(columns) <= set(df.columns):
+        return None
+    return df[columns]
+
+
+class ResultsStore:
+    """결과 폴더 적재와 조회를 담당하는 SQLite 저장소
+
+    연결은 스레드마다 하나씩 열고(WAL 모드, 읽기와 적재가 서로 막지 않음), 격자/도달 시간
+    읽기는 기본 키 조회 한 번으로 끝납니다. 격자 크기와 적재 버전은 manifest 항목에서 받습니다.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._local = threading.local()
+
+    def connect(self) -> sqlite3.Connection:
+        """현재 스레드의 연결 (처음이면 스키마 생성)"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            connection = sqlite3.connect(self.db_path, timeout=30.0, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(_SCHEMA)
+            self._local.connection = connection
+        return connection
+
+    # ---------- 적재 ----------
+
+    @staticmethod
+    def source_signature(result_path: str) -> str:
+        """결과 폴더 서명 (Grids/Messages/CellArrival/Stats 폴더와 LogFile의 mtime)"""
+        parts = []
+        for name in ("Grids", "Messages", "CellArrival", "Stats", "LogFile.txt"):
+            try:
+                parts.append(f"{name}:{os.stat(os.path.join(result_path, name)).st_mtime_ns}")
+            except FileNotFoundError:
+                continue
+        return ";".join(parts)
+
+    def is_current(self, dataset: str, result_path: str) -> bool:
+        """이미 같은 서명으로 적재했는지"""
+        row = self.connect().execute("SELECT signature FROM datasets WHERE name = ?", (dataset,)).fetchone()
+        return row is not None and row[0] == self.source_signature(result_path)
+
+    def ingest(self, dataset: str, result_path: str, input_dataset: Optional[str] = None,
+               grid_interval_minutes: float = 60.0, force: bool = False) -> Dict[str, float]:
+        """결과 폴더 하나를 적재 (같은 서명이면 건너뜀), 적재 통계 반환
+
+        데이터셋 단위로 한 트랜잭션에서 기존 행을 지우고 다시 쓰므로, 읽는 쪽은 항상
+        이전 적재 또는 새 적재 중 하나만 봅니다.
+        """
+        start = time.perf_counter()
+        if not force and self.is_current(dataset, result_path):
+            return {"skipped": 1, "seconds": time.perf_counter() - start}
+
+        signature = self.source_signature(result_path)
+        grids_root = os.path.join(result_path, "Grids")
+        simulations = result_simulations(result_path)
+        rows = cols = None
+        log_info = read_log_info(os.path.join(result_path, "LogFile.txt"))
+        connection = self.connect()
+        counts = {"simulations": 0, "grids": 0, "arrivals": 0, "bytes": 0}
+
+        with connection:
+            for table in _CHILD_TABLES:
+                connection.execute(f"DELETE FROM {table} WHERE dataset = ?", (dataset,))
+            for simulation in simulations:
+                grids_folder = os.path.join(grids_root, f"Grids{simulation}")
+                grid_files = sorted(
+                    (int(match.group(1)), name)
+                    for match, name in ((_GRID_FILE_PATTERN.match(name), name) for name in _list_folder(grids_folder))
+                    if match is not None
+                )
+                engine_path = engine_arrival_file_path(result_path, simulation)
+                engine_arrival = read_engine_arrival(engine_path) if os.path.exists(engine_path) else None
+                if rows is None and grid_files:
+                    rows, cols = _grid_shape(os.path.join(grids_folder, grid_files[0][1]))
+                elif rows is None and engine_arrival is not None:
+                    rows, cols = engine_arrival.shape
+                grid_rows, snapshots = [], []
+                for step, name in grid_files:
+                    with open(os.path.join(grids_folder, name), "rb") as f:
+                        snapshots.append(parse_grid_csv(f.read(), rows, cols).ravel())
+                steps = [step for step, name in grid_files]
+                if not grid_files and engine_arrival is not None:
+                    # --output-arrival만 쓴 시뮬레이션: 엔진과 같은 규칙으로 스냅샷 재구성
+                    snapshots = arrival_snapshots(engine_arrival, grid_interval_minutes)
+                    steps = list(range(len(snapshots)))
+                for step, snapshot in zip(steps, snapshots):
+                    blob = _compress_mask(snapshot.reshape(rows, cols))
+                    grid_rows.append((dataset, simulation, step, int(np.count_nonzero(snapshot)), blob))
+                    counts["bytes"] += len(blob)
+                connection.executemany("INSERT INTO grids VALUES (?, ?, ?, ?, ?)", grid_rows)
+                counts["grids"] += len(grid_rows)
+
+                ignition = log_info["ignitions"].get(simulation)
+                burned = grid_rows[-1][3] if grid_rows else 0
+                connection.execute("INSERT INTO simulations VALUES (?, ?, ?, ?, ?)",
+                                   (dataset, simulation, ignition - 1 if ignition else None, len(grid_rows), burned))
+                counts["simulations"] += 1
+
+                messages_path = messages_file_path(result_path, simulation)
+                arrival = None
+                if engine_arrival is not None:
+                    arrival = engine_arrival.ravel()
+                elif rows is not None and os.path.exists(messages_path):
+                    arrival = build_arrival_times(read_messages(messages_path), rows * cols, ignition,
+                                                  log_info["period_minutes"], snapshots, grid_interval_minutes)
+                if arrival is not None:
+                    blob = zlib.compress(arrival.astype(np.float32).tobytes(), ZLIB_LEVEL)
+                    connection.execute("INSERT INTO arrivals VALUES (?, ?, ?)", (dataset, simulation, blob))
+                    counts["arrivals"] += 1
+                    counts["bytes"] += len(blob)
+
+            self._ingest_stats(connection, dataset, result_path)
+            if rows is None:
+                raise FileNotFoundError(f"ForestGrid/CellArrival 파일이 없습니다: {result_path}")
+            connection.execute(
+                "INSERT OR REPLACE INTO datasets VALUES (?, ?, ?, ?, ?, ?)",
+                (dataset, input_dataset or dataset, rows, cols, signature, time.time_ns())
+            )
+        counts["seconds"] = time.perf_counter() - start
+        return counts
+
+    @staticmethod
+    def _ingest_stats(connection: sqlite3.Connection, dataset: str, result_path: str) -> None:
+        """Stats/HourlyStats.csv, Stats/FinalStats.csv 적재 (없으면 건너뜀)"""
+        stats_folder = os.path.join(result_path, "Stats")
+        hourly = _read_stats(os.path.join(stats_folder, "HourlyStats.csv"),
+                             ["ID", "Hour", "NonBurned", "Burned", "Harvested"])
+        if hourly is not None:
+            connection.executemany("INSERT OR REPLACE INTO hourly_stats VALUES (?, ?, ?, ?, ?, ?)",
+                                   ((dataset, *map(int, row)) for row in hourly.itertuples(index=False)))
+        final = _read_stats(os.path.join(stats_folder, "FinalStats.csv"),
+                            ["ID", "NonBurned", "Burned", "Harvested"])
+        if final is not None:
+            connection.executemany("INSERT OR REPLACE INTO final_stats VALUES (?, ?, ?, ?, ?)",
+                                   ((dataset, *map(int, row)) for row in final.itertuples(index=False)))
+
+    def remove(self, dataset: str) -> None:
+        """데이터셋의 모든 행 삭제"""
+        connection = self.connect()
+        with connection:
+            for table in _CHILD_TABLES:
+                connection.execute(f"DELETE FROM {table} WHERE dataset = ?", (dataset,))
+            connection.execute("DELETE FROM datasets WHERE name = ?", (dataset,))
+
+    # ---------- 조회 ----------
+
+    def version(self, dataset: str) -> Optional[int]:
+        """데이터셋 적재 버전 (적재되지 않았으면 None, 파생 결과 캐시 버전으로 사용)"""
+        row = self.connect().execute("SELECT version FROM datasets WHERE name = ?", (dataset,)).fetchone()
+        return row[0] if row is not None else None
+
+    def dataset_info(self, dataset: str) -> Optional[Dict[str, object]]:
+        """manifest 항목을 만들 데이터셋 정보 (적재되지 않았으면 None)"""
+        connection = self.connect()
+        row = connection.execute(
+            "SELECT input_dataset, rows, cols, version FROM datasets WHERE name = ?", (dataset,)).fetchone()
+        if row is None:
+            return None
+        steps: Dict[int, List[int]] = {}
+        for simulation, step in connection.execute(
+                "SELECT simulation, step FROM grids WHERE dataset = ? ORDER BY simulation, step", (dataset,)):
+            steps.setdefault(simulation, []).append(step)
+        ignition_cells = dict(connection.execute(
+            "SELECT simulation, ignition_cell FROM simulations WHERE dataset = ? AND ignition_cell IS NOT NULL",
+            (dataset,)).fetchall())
+        arrival_simulations = {simulation for (simulation,) in connection.execute(
+            "SELECT simulation FROM arrivals WHERE dataset = ?", (dataset,))}
+        return {
+            "input_dataset": row[0],
+            "rows": row[1],
+            "cols": row[2],
+            "version": row[3],
+            "steps": {simulation: tuple(values) for simulation, values in steps.items()},
+            "ignition_cells": ignition_cells,
+            "arrival_simulations": arrival_simulations,
+        }
+
+    def load_mask(self, dataset: str, simulation: int, step: int, rows: int, cols: int) -> np.ndarray:
+        """연소 마스크 (없으면 FileNotFoundError)"""
+        row = self.connect().execute(
+            "SELECT mask FROM grids WHERE dataset = ? AND simulation = ? AND step = ?",
+            (dataset, simulation, step)).fetchone()
+        if row is None:
+            raise FileNotFoundError(f"저장소에 격자가 없습니다: {dataset}/{simulation}/{step}")
+        return decode_bitmask(zlib.decompress(row[0]), rows, cols)
+
+    def load_arrival(self, dataset: str, simulation: int, rows: int, cols: int) -> Optional[np.ndarray]:
+        """셀별 도달 시간 (rows x cols float32, 엔진 분), 없으면 None"""
+        row = self.connect().execute(
+            "SELECT arrival FROM arrivals WHERE dataset = ? AND simulation = ?", (dataset, simulation)).fetchone()
+        if row is None:
+            return None
+        return np.frombuffer(zlib.decompress(row[0]), dtype=np.float32).reshape(rows, cols)
+
+    def hourly_stats(self, dataset: str, simulation: int) -> List[Tuple[int, int, int, int]]:
+        """(hour, non_burned, burned, harvested) 목록"""
+        return self.connect().execute(
+            "SELECT hour, non_burned, burned, harvested FROM hourly_stats "
+            "WHERE dataset = ? AND simulation = ? ORDER BY hour", (dataset, simulation)).fetchall()
+
+
+def default_db_path(results_path: str) -> str:
+    """CELL2FIRE_RESULTS_DB가 없으면 임시 폴더에 results 폴더 경로별 SQLite 파일 (-wal/-shm 포함 트리 밖)"""
+    if RESULTS_DB_PATH:
+        return RESULTS_DB_PATH
+    digest = hashlib.blake2b(os.path.abspath(results_path).encode("utf-8"), digest_size=8).hexdigest()
+    return os.path.join(RESULTS_DB_DIR, f"results-{digest}.sqlite")
+
+
+if __name__ == "__main__":
+    from .data_handler import RESULTS_BASE_PATH, GRID_INTERVAL_MINUTES, get_results_store, get_results_manifest
+
+    if len(sys.argv) < 2:
+        print("사용법: python -m api.store <dataset> [<dataset> ...]")
+        sys.exit(1)
+
+    for name in sys.argv[1:]:
+        entry = get_results_manifest().get(name)
+        stats = get_results_store().ingest(name, os.path.join(RESULTS_BASE_PATH, name),
+                                     entry.input_dataset if entry else None, GRID_INTERVAL_MINUTES)
+        print(f"{name}: {stats}")
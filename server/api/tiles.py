@@ -0,0 +1,267 @@
+"""
+지도 오버레이용 XYZ 래스터 타일 (PNG)
+
+네이버 지도 등 Web Mercator 타일 좌표(z/x/y)로 연소 마스크나 연소 확률 래스터를 256x256
+PNG로 그립니다. matplotlib 없이 NumPy로 셀 값을 팔레트 번호로 바꾸고, 팔레트 PNG(color
+type 3)를 zlib으로 직접 인코딩합니다.
+
+- 타일 픽셀 중심의 위경도를 격자 georeference로 행/열에 대응 (최근접 셀, 행과 열이 분리되어
+  np.ix_ 한 번으로 샘플링)
+- 격자와 겹치지 않는 타일은 미리 만든 투명 타일 반환
+- 그린 타일은 디스크 LRU 캐시에 (layer, dataset, 격자 버전, z, x, y)로 저장해서 이동/확대 시
+  다시 그리지 않음. 격자 버전은 마스크/확률 내용 해시이므로 내용이 같은 시간대는 타일을 공유
+"""
+import os
+import math
+import hashlib
+import struct
+import tempfile
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+
+PNG_MEDIA_TYPE = "image/png"
+TILE_SIZE = 256
+TILE_MAX_ZOOM = 22
+PNG_ZLIB_LEVEL = 6
+
+TILE_CACHE_DIR = os.environ.get(
+    "CELL2FIRE_TILE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "cell2fire-tiles")
+)
+TILE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# 팔레트 (RGBA): 0번은 투명
+BURN_PALETTE = np.array([
+    (0, 0, 0, 0),
+    (230, 40, 20, 200),
+], dtype=np.uint8)
+
+
+def _probability_palette() -> np.ndarray:
+    """0번 투명, 1~255번은 확률이 높을수록 노랑 -> 빨강 -> 진한 빨강, 불투명도 증가"""
+    ramp = np.linspace(0.0, 1.0, 255)
+    palette = np.zeros((256, 4), dtype=np.uint8)
+    palette[1:, 0] = np.rint(255 - 95 * np.clip(ramp * 2 - 1, 0, 1))
+    palette[1:, 1] = np.rint(230 * np.clip(1 - ramp * 2, 0, 1))
+    palette[1:, 2] = 20
+    palette[1:, 3] = np.rint(96 + 128 * ramp)
+    return palette
+
+
+PROBABILITY_PALETTE = _probability_palette()
+
+
+def _png_chunk(tag: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+
+def encode_png(indices: np.ndarray, palette: np.ndarray) -> bytes:
+    """팔레트 번호 배열(height x width uint8)과 RGBA 팔레트로 8비트 팔레트 PNG 인코딩"""
+    height, width = indices.shape
+    raw = np.zeros((height, width + 1), dtype=np.uint8)  # 행마다 필터 바이트 0(None)
+    raw[:, 1:] = indices
+    alpha = palette[:, 3]
+    opaque_tail = len(alpha) - int(np.argmax(alpha[::-1] != 255)) if (alpha != 255).any() else 0
+    return b"".join((
+        _PNG_SIGNATURE,
+        _png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 3, 0, 0, 0)),
+        _png_chunk(b"PLTE", palette[:, :3].tobytes()),
+        _png_chunk(b"tRNS", alpha[:opaque_tail].tobytes()) if opaque_tail else b"",
+        _png_chunk(b"IDAT", zlib.compress(raw.tobytes(), PNG_ZLIB_LEVEL)),
+        _png_chunk(b"IEND", b""),
+    ))
+
+
+EMPTY_TILE = encode_png(np.zeros((TILE_SIZE, TILE_SIZE), dtype=np.uint8), BURN_PALETTE)
+
+
+def mask_palette_indices(mask: np.ndarray) -> np.ndarray:
+    """연소 마스크 -> BURN_PALETTE 번호"""
+    return np.asarray(mask, dtype=bool).view(np.uint8)
+
+
+def probability_palette_indices(probability: np.ndarray) -> np.ndarray:
+    """연소 확률(0~1) -> PROBABILITY_PALETTE 번호 (0은 투명)"""
+    probability = np.asarray(probability, dtype=np.float64)
+    indices = np.zeros(probability.shape, dtype=np.uint8)
+    burned = probability > 0
+    indices[burned] = 1 + np.rint(np.clip(probability[burned], 0, 1) * 254).astype(np.uint8)
+    return indices
+
+
+def raster_version(indices: np.ndarray) -> str:
+    """팔레트 번호 격자 내용 해시 (타일 캐시 키와 ETag에 사용)"""
+    data = np.ascontiguousarray(indices, dtype=np.uint8)
+    return hashlib.blake2b(data.tobytes() + str(data.shape).encode(), digest_size=16).hexdigest()
+
+
+def valid_tile(z: int, x: int, y: int) -> bool:
+    """z/x/y가 Web Mercator 타일 범위인지"""
+    return 0 <= z <= TILE_MAX_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z
+
+
+def tile_cell_indices(z: int, x: int, y: int, georeference: dict, rows: int, cols: int,
+                      tile_size: int = TILE_SIZE) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """타일 픽셀 행/열마다 대응하는 격자 행/열과 격자 안에 있는지 여부 (row, row_valid, col, col_valid)"""
+    world = float(tile_size * 2 ** z)
+    offsets = np.arange(tile_size, dtype=np.float64) + 0.5
+    lon = (x * tile_size + offsets) / world * 360.0 - 180.0
+    lat = np.degrees(np.arctan(np.sinh(math.pi * (1.0 - 2.0 * (y * tile_size + offsets) / world))))
+
+    def nearest(values, origin, step, count):
+        if step == 0:
+            # 한 줄짜리 격자는 셀 크기를 알 수 없으므로 그리지 않음
+            return np.zeros(tile_size, dtype=np.int64), np.zeros(tile_size, dtype=bool)
+        index = np.rint((values - origin) / step).astype(np.int64)
+        return index, (index >= 0) & (index < count)
+
+    row, row_valid = nearest(lat, georeference["lat_origin"], georeference["lat_step"], rows)
+    col, col_valid = nearest(lon, georeference["lon_origin"], georeference["lon_step"], cols)
+    return row, row_valid, col, col_valid
+
+
+def render_tile(indices: np.ndarray, palette: np.ndarray, georeference: dict,
+                z: int, x: int, y: int) -> Optional[bytes]:
+    """팔레트 번호 격자(rows x cols)를 타일 PNG로 (격자와 겹치지 않거나 빈 타일이면 None)"""
+    rows, cols = indices.shape
+    row, row_valid, col, col_valid = tile_cell_indices(z, x, y, georeference, rows, cols)
+    if not row_valid.any() or not col_valid.any():
+        return None
+    tile = np.zeros((TILE_SIZE, TILE_SIZE), dtype=np.uint8)
+    tile[np.ix_(row_valid, col_valid)] = indices[np.ix_(row[row_valid], col[col_valid])]
+    if not tile.any():
+        return None
+    return encode_png(tile, palette)
+
+
+class TileCache:
+    """디스크 LRU 타일 캐시
+
+    파일은 {cache_dir}/{layer}/{dataset}/{version}/{z}/{x}/{y}.png에 두고, 접근 순서는 프로세스
+    메모리에서 관리합니다(읽을 때 mtime을 갱신해서 재시작 시 mtime 순으로 복원). 전체 크기가 max_bytes를 넘으면
+    가장 오래 쓰지 않은 타일부터 지웁니다. 여러 워커가 같은 폴더를 써도 쓰기는 임시 파일 +
+    os.replace로 원자적이고, 다른 워커가 지운 파일은 캐시 미스로 처리합니다.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = TILE_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, int]" = OrderedDict()  # 상대 경로 -> 크기
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._loaded = False
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def relative_path(layer: str, dataset: str, version: str, z: int, x: int, y: int) -> str:
+        return os.path.join(layer, dataset, version, str(z), str(x), f"{y}.png")
+
+    def _load_index(self) -> None:
+        """기존 캐시 파일을 mtime 순으로 LRU 목록에 등록 (처음 한 번)"""
+        if self._loaded:
+            return
+        found = []
+        for root, _, names in os.walk(self.cache_dir):
+            for name in names:
+                if not name.endswith(".png"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                found.append((stat.st_mtime_ns, os.path.relpath(path, self.cache_dir), stat.st_size))
+        for _, relative, size in sorted(found):
+            self._entries[relative] = size
+            self._bytes += size
+        self._loaded = True
+
+    def get(self, relative: str) -> Optional[bytes]:
+        """캐시된 타일 (없으면 None)"""
+        path = os.path.join(self.cache_dir, relative)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            with self._lock:
+                self._load_index()
+                size = self._entries.pop(relative, None)
+                if size is not None:
+                    self._bytes -= size
+                self.misses += 1
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        with self._lock:
+            self._load_index()
+            if relative not in self._entries:
+                self._entries[relative] = len(data)
+                self._bytes += len(data)
+            self._entries.move_to_end(relative)
+            self.hits += 1
+        return data
+
+    def put(self, relative: str, data: bytes) -> None:
+        """타일 저장 후 용량을 넘으면 오래된 타일 삭제"""
+        path = os.path.join(self.cache_dir, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        evicted = []
+        with self._lock:
+            self._load_index()
+            self._bytes += len(data) - self._entries.pop(relative, 0)
+            self._entries[relative] = len(data)
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                old, size = self._entries.popitem(last=False)
+                self._bytes -= size
+                self.evictions += 1
+                evicted.append(old)
+        for old in evicted:
+            try:
+                os.remove(os.path.join(self.cache_dir, old))
+            except FileNotFoundError:
+                pass
+
+    def get_or_render(self, layer: str, dataset: str, version: str, z: int, x: int, y: int,
+                      render: Callable[[], Optional[bytes]]) -> bytes:
+        """캐시된 타일 또는 render()로 새로 그린 타일 (빈 타일은 저장하지 않고 EMPTY_TILE)"""
+        relative = self.relative_path(layer, dataset, version, z, x, y)
+        data = self.get(relative)
+        if data is not None:
+            return data
+        data = render()
+        if data is None:
+            return EMPTY_TILE
+        try:
+            self.put(relative, data)
+        except OSError as e:
+            print(f"타일 캐시 저장 오류: {e}")
+        return data
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+# 프로세스 전역 타일 캐시
+tile_cache = TileCache(TILE_CACHE_DIR)
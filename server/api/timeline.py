@@ -0,0 +1,62 @@
+"""
+전체 타임라인 응답 (NDJSON 스트림)
+
+프런트엔드 애니메이션이 시간대마다 따로 요청하지 않도록, 시뮬레이션 하나의 전체 타임라인을
+한 번에 보냅니다. 첫 줄은 격자 크기, georeference, 점화점을 한 번만 담은 header이고,
+이어지는 줄은 형식에 따라 다음과 같습니다.
+
+- delta: 시간 단계마다 {"type": "step", "time_minutes", "added", "removed", "total_burned_pixels"}
+  (added/removed는 0-based 셀 번호, 좌표는 header의 georeference로 계산)
+- arrival: 도달 시간 순으로 정렬한 {"type": "arrival", "cells", "arrival_minutes"} 묶음
+
+마지막 줄은 {"type": "end"}입니다. 스트림 도중 스냅샷을 읽지 못하면 {"type": "error", "time_minutes",
+"status_code", "detail"} 줄로 끝나고 end 줄은 없습니다. 한 줄씩 만들어 보내므로 긴 타임라인도 첫 바이트가 바로 나갑니다.
+"""
+import json
+from typing import Iterator, List
+
+import numpy as np
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+TIMELINE_FORMATS = ("delta", "arrival")
+TIMELINE_MAX_STEPS = 2000        # 한 응답의 최대 시간 단계 수
+TIMELINE_CHUNK_CELLS = 65536     # arrival 형식 한 줄의 최대 셀 수
+
+
+def dumps_line(data: dict) -> bytes:
+    """NDJSON 한 줄"""
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def timeline_times(until_minutes: int, step_minutes: int) -> List[int]:
+    """0분부터 until_minutes까지 step_minutes 간격 (마지막 시각 포함)"""
+    times = list(range(0, until_minutes + 1, step_minutes))
+    if times[-1] != until_minutes:
+        times.append(until_minutes)
+    return times
+
+
+def delta_line(time_minutes: int, previous: np.ndarray, mask: np.ndarray) -> bytes:
+    """직전 단계 대비 바뀐 셀 한 줄"""
+    changed = previous ^ mask
+    return dumps_line({
+        "type": "step",
+        "time_minutes": time_minutes,
+        "added": np.flatnonzero(changed & mask).tolist(),
+        "removed": np.flatnonzero(changed & previous).tolist(),
+        "total_burned_pixels": int(np.count_nonzero(mask)),
+    })
+
+
+def arrival_lines(arrival_minutes: np.ndarray, chunk_cells: int = TIMELINE_CHUNK_CELLS) -> Iterator[bytes]:
+    """연소 셀을 도달 시간 순으로 정렬해 chunk_cells개씩 나눈 줄 (도달하지 않은 셀 제외)"""
+    flat = np.asarray(arrival_minutes, dtype=np.float64).ravel()
+    cells = np.flatnonzero(np.isfinite(flat))
+    cells = cells[np.argsort(flat[cells], kind="stable")]
+    for start in range(0, len(cells), chunk_cells):
+        chunk = cells[start:start + chunk_cells]
+        yield dumps_line({
+            "type": "arrival",
+            "cells": chunk.tolist(),
+            "arrival_minutes": np.round(flat[chunk], 3).tolist(),
+        })
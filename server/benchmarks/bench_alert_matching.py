@@ -0,0 +1,89 @@
+"""
+사용자 알림 매칭 벤치마크
+
+합성 사용자 1,000,000명을 Korean40x40 격자에 맞추고(snap), 연소 마스크 매칭과
+도달 시간 타임라인 진행(30분 간격)을 사용자별 점-픽셀 검사와 비교합니다.
+
+사용 예 (server 폴더에서):
+    python -m benchmarks.bench_alert_matching
+"""
+import time
+
+import numpy as np
+
+from api.alerts import ArrivalTimeline, UserStore, match_mask, snap_to_cells
+from api.data_handler import DataHandler
+
+
+def _timeit(func, repeat: int):
+    """최소 실행 시간(초)과 마지막 결과 반환"""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def _synthetic_users(index, count: int, seed: int = 0):
+    """격자 범위보다 조금 넓은 영역에 고르게 흩어진 사용자 위치"""
+    rng = np.random.default_rng(seed)
+    lat_min, lat_max = index.lat.min(), index.lat.max()
+    lon_min, lon_max = index.lon.min(), index.lon.max()
+    lat_margin = (lat_max - lat_min) * 0.05
+    lon_margin = (lon_max - lon_min) * 0.05
+    lat = rng.uniform(lat_min - lat_margin, lat_max + lat_margin, count)
+    lon = rng.uniform(lon_min - lon_margin, lon_max + lon_margin, count)
+    return lat, lon
+
+
+def _naive_match(index, lat, lon, mask, sample: int) -> float:
+    """사용자마다 연소 픽셀 전체와 거리 비교 (sample명으로 측정 후 1명당 시간 반환)"""
+    geo = index.georeference()
+    burned = np.flatnonzero(mask)
+    start = time.perf_counter()
+    for i in range(sample):
+        distance = np.hypot((index.lat[burned] - lat[i]) / geo["lat_step"],
+                            (index.lon[burned] - lon[i]) / geo["lon_step"])
+        bool(distance.size and distance.min() <= 0.5)
+    return (time.perf_counter() - start) / sample
+
+
+def main() -> None:
+    dataset = "Korean40x40"
+    count = 1_000_000
+    index = DataHandler.get_coordinate_index(dataset)
+    arrival = DataHandler.load_simulation_arrival(dataset, 1)
+    mask = DataHandler.load_burned_mask(dataset, 1, 7)
+    lat, lon = _synthetic_users(index, count)
+    user_ids = [f"user{i}" for i in range(count)]
+
+    print(f"== {dataset}: {index.grid_size}, 사용자 {count:,}명, 연소 셀 {int(np.count_nonzero(mask)):,}개 ==")
+
+    seconds, _ = _timeit(lambda: UserStore().add_users(user_ids, lat, lon), 1)
+    print(f"{'register (UserStore.add_users)':<36}{seconds * 1000:>12.1f} ms")
+
+    seconds, cells = _timeit(lambda: snap_to_cells(index, lat, lon), 3)
+    print(f"{'snap to cells (3x3 bucket)':<36}{seconds * 1000:>12.1f} ms  (격자 안 {int(np.count_nonzero(cells >= 0)):,}명)")
+
+    seconds, matched = _timeit(lambda: match_mask(cells, mask), 5)
+    print(f"{'match burn mask':<36}{seconds * 1000:>12.1f} ms  (위협 {len(matched):,}명)")
+
+    seconds, timeline = _timeit(lambda: ArrivalTimeline(cells, arrival), 3)
+    print(f"{'build arrival timeline':<36}{seconds * 1000:>12.1f} ms")
+
+    def step_all():
+        # 단계마다 (직전 시각, 현재 시각] 구간만 조회 (API의 from_minutes/to_minutes와 같은 방식)
+        steps = np.arange(0, 481, 60)
+        return sum(len(timeline.between(start, end)) for start, end in zip(np.r_[-np.inf, steps[:-1]], steps))
+
+    seconds, emitted = _timeit(step_all, 5)
+    print(f"{'timeline between (9 steps)':<36}{seconds * 1000:>12.3f} ms  (알림 {emitted:,}명)")
+
+    per_user = _naive_match(index, lat, lon, mask, sample=2000)
+    print(f"{'naive point-in-pixel (추정)':<36}{per_user * count * 1000:>12.1f} ms  (사용자당 {per_user * 1e6:.1f} us)")
+
+
+if __name__ == "__main__":
+    main()
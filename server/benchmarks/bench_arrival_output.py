@@ -0,0 +1,127 @@
+"""
+엔진 도달 기록(--output-arrival) 벤치마크
+
+같은 작업(seed 고정)을 ForestGrid CSV 스냅샷(--grids --final-grid)과 시뮬레이션별 도달 기록
+(--output-arrival, CellArrival/CellArrivalNN.npy)으로 실행해서 벽시계 시간, 출력 크기와 파일 수,
+모든 스냅샷을 다시 읽는 시간(CSV 파싱 / 도달 기록에서 재구성)을 비교합니다.
+cell2fire.utils.CellArrival로 재구성한 스냅샷이 ForestGridNN.csv와 바이트 단위로 같은지도 확인합니다.
+
+데이터셋은 임시 폴더로 복사해서 사용합니다(Data.csv가 없으면 그곳에 생성).
+
+사용 예 (server 폴더에서):
+    python -m benchmarks.bench_arrival_output [<데이터셋> ...]
+"""
+import os
+import sys
+import glob
+import time
+import shutil
+import tempfile
+import subprocess
+
+import pandas as pd
+
+from api.data_handler import CELL2FIRE_DIR, DATA_BASE_PATH
+
+if CELL2FIRE_DIR not in sys.path:
+    sys.path.insert(0, CELL2FIRE_DIR)
+from cell2fire.utils.CellArrival import CellArrivalFile, CellArrivalSims, ReadCellArrival, ArrivalGrids
+from cell2fire.utils.GridChanges import GridToCSV
+import cell2fire.utils.DataGeneratorC as DataGenerator
+
+ENGINE = os.path.join(CELL2FIRE_DIR, "cell2fire", "Cell2FireC", "Cell2Fire")
+DATASETS = ("Korean40x40", "dogrib")
+NSIMS = {"Korean40x40": 50}
+DEFAULT_NSIMS = 1
+MODES = {
+    "grids": ["--grids", "--final-grid"],
+    "arrival": ["--output-arrival"],
+}
+
+
+def _run(in_folder: str, output_folder: str, nsims: int, mode: str) -> float:
+    command = [
+        ENGINE,
+        "--input-instance-folder", in_folder + os.sep,
+        "--output-folder", output_folder + os.sep,
+        "--ignitions", "--sim-years", "1", "--nsims", str(nsims),
+        "--weather", "rows", "--nweathers", "1", "--Fire-Period-Length", "1.0",
+        "--ROS-CV", "0.5", "--seed", "3", "--IgnitionRad", "0",
+    ] + MODES[mode]
+    start = time.perf_counter()
+    subprocess.run(command, stdout=subprocess.DEVNULL, check=True)
+    return time.perf_counter() - start
+
+
+def _output_files(output_folder: str, mode: str) -> list:
+    if mode == "grids":
+        return sorted(glob.glob(os.path.join(output_folder, "Grids", "Grids*", "ForestGrid*.csv")))
+    return sorted(glob.glob(os.path.join(output_folder, "CellArrival", "CellArrival*.npy")))
+
+
+def _read_grids(output_folder: str, mode: str) -> dict:
+    """시뮬레이션별 스냅샷 목록 (CSV는 pandas로 파싱, 도달 기록은 재구성)"""
+    grids = {}
+    if mode == "grids":
+        for path in _output_files(output_folder, mode):
+            sim = int(os.path.basename(os.path.dirname(path))[len("Grids"):])
+            grids.setdefault(sim, []).append(pd.read_csv(path, delimiter=',', header=None).values)
+    else:
+        for sim in CellArrivalSims(output_folder):
+            grids[sim] = list(ArrivalGrids(ReadCellArrival(CellArrivalFile(output_folder, sim))))
+    return grids
+
+
+def _same_grids(grids_folder: str, arrival_folder: str) -> bool:
+    """도달 기록으로 재구성한 스냅샷이 ForestGridNN.csv와 같은지"""
+    sims = CellArrivalSims(arrival_folder)
+    if len(sims) != len(glob.glob(os.path.join(grids_folder, "Grids", "Grids*"))):
+        return False
+    for sim in sims:
+        grid_files = sorted(glob.glob(os.path.join(grids_folder, "Grids", f"Grids{sim}", "ForestGrid*.csv")))
+        rebuilt = list(ArrivalGrids(ReadCellArrival(CellArrivalFile(arrival_folder, sim))))
+        if len(rebuilt) != len(grid_files):
+            return False
+        for path, status in zip(grid_files, rebuilt):
+            with open(path) as f:
+                if f.read() != GridToCSV(status):
+                    return False
+    return True
+
+
+def bench(dataset: str, workdir: str) -> None:
+    in_folder = os.path.join(workdir, dataset)
+    shutil.copytree(os.path.join(DATA_BASE_PATH, dataset), in_folder)
+    if not os.path.isfile(os.path.join(in_folder, "Data.csv")):
+        DataGenerator.GenDataFile(in_folder + os.sep)
+    nsims = NSIMS.get(dataset, DEFAULT_NSIMS)
+
+    print(f"== {dataset}: nsims={nsims} ==")
+    print(f"{'output':<10}{'seconds':>10}{'files':>8}{'MB':>10}{'read s':>10}{'grids':>8}")
+    for mode in MODES:
+        output_folder = os.path.join(workdir, f"{dataset}_{mode}")
+        seconds = _run(in_folder, output_folder, nsims, mode)
+        files = _output_files(output_folder, mode)
+        size = sum(os.path.getsize(path) for path in files) / 1e6
+        start = time.perf_counter()
+        grids = _read_grids(output_folder, mode)
+        read = time.perf_counter() - start
+        count = sum(len(values) for values in grids.values())
+        print(f"{mode:<10}{seconds:>10.2f}{len(files):>8}{size:>10.2f}{read:>10.2f}{count:>8}")
+
+    same = _same_grids(os.path.join(workdir, f"{dataset}_grids"), os.path.join(workdir, f"{dataset}_arrival"))
+    print(f"재구성한 스냅샷: {'same' if same else 'DIFFERENT'}")
+
+
+def main() -> None:
+    datasets = sys.argv[1:] or DATASETS
+    workdir = tempfile.mkdtemp(prefix="bench-arrival-")
+    try:
+        for dataset in datasets:
+            bench(dataset, workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+엔진 OpenMP 스레드 / 프로세스 샤드 확장성 벤치마크
+
+Korean40x40에서 같은 작업(nsims, seed, ROS-CV 고정)을 --nthreads 1, 2, 4, ... 로 실행하고,
+같은 개수의 엔진 프로세스로 나눠(--nshards, 실행 후 병합) 실행해서 벽시계 시간과 1스레드 대비
+속도 향상을 비교합니다. 반복 실행마다 난수 상태를 미리 나눠 주므로 결과 폴더(Grids, Messages)는
+스레드/샤드 수와 관계없이 같아야 하며, 내용 해시로 함께 확인합니다.
+
+사용 예 (server 폴더에서, 엔진은 Cell2FireC 폴더에서 make로 빌드):
+    python -m benchmarks.bench_engine_threads [<최대 스레드 수>]
+"""
+import os
+import sys
+import time
+import shutil
+import hashlib
+import tempfile
+import subprocess
+
+from api.data_handler import CELL2FIRE_DIR, DATA_BASE_PATH
+
+if CELL2FIRE_DIR not in sys.path:
+    sys.path.insert(0, CELL2FIRE_DIR)
+from cell2fire.utils.Shards import RunShards
+
+ENGINE = os.path.join(CELL2FIRE_DIR, "cell2fire", "Cell2FireC", "Cell2Fire")
+DATASET = "Korean40x40"
+NSIMS = 200
+
+
+def _folder_digest(folder: str) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for root, dirs, names in os.walk(folder):
+        dirs.sort()
+        for name in sorted(names):
+            path = os.path.join(root, name)
+            if name == "LogFile.txt":
+                continue
+            digest.update(os.path.relpath(path, folder).encode())
+            with open(path, "rb") as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _run(output_folder: str, nthreads: int = 1, nshards: int = 1) -> float:
+    command = [
+        ENGINE,
+        "--input-instance-folder", os.path.join(DATA_BASE_PATH, DATASET) + os.sep,
+        "--output-folder", output_folder + os.sep,
+        "--ignitions", "--sim-years", "1", "--nsims", str(NSIMS),
+        "--grids", "--final-grid", "--output-messages",
+        "--weather", "rows", "--nweathers", "1", "--Fire-Period-Length", "1.0",
+        "--ROS-CV", "0.6", "--seed", "7", "--IgnitionRad", "0",
+        "--nthreads", str(nthreads),
+    ]
+    start = time.perf_counter()
+    if nshards > 1:
+        os.makedirs(output_folder)
+        if RunShards(command, output_folder, os.path.join(output_folder, "LogFile.txt"), NSIMS, nshards) != 0:
+            raise RuntimeError(f"샤드 실행 실패: {output_folder}")
+    else:
+        subprocess.run(command, stdout=subprocess.DEVNULL, check=True)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    max_threads = int(sys.argv[1]) if len(sys.argv) > 1 else max(4, os.cpu_count() or 1)
+    thread_counts = sorted({1, *[2 ** i for i in range(1, max_threads.bit_length())], max_threads})
+    workdir = tempfile.mkdtemp(prefix="bench-threads-")
+    try:
+        print(f"== {DATASET}, nsims={NSIMS}, CPU {os.cpu_count()}개 ==")
+        print(f"{'mode':<12}{'seconds':>10}{'sims/s':>10}{'speedup':>10}  output")
+        baseline_seconds = baseline_digest = None
+        runs = [(f"threads={n}", {"nthreads": n}) for n in thread_counts]
+        runs += [(f"shards={n}", {"nshards": n}) for n in thread_counts if n > 1]
+        for label, options in runs:
+            output_folder = os.path.join(workdir, label.replace("=", ""))
+            seconds = _run(output_folder, **options)
+            digest = _folder_digest(output_folder)
+            shutil.rmtree(output_folder)
+            if baseline_seconds is None:
+                baseline_seconds, baseline_digest = seconds, digest
+            same = "same" if digest == baseline_digest else "DIFFERENT"
+            print(f"{label:<12}{seconds:>10.2f}{NSIMS / seconds:>10.1f}{baseline_seconds / seconds:>9.2f}x  {same}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+상주 엔진 워커 벤치마크
+
+같은 지형에서 점화 셀만 바꾼 시나리오(nsims=1)를 연속으로 실행할 때, 시나리오마다 엔진을 새로
+실행하는 경우(프로세스 생성 + Data.csv/Forest.asc/Weather.csv 파싱 + 인접 구조 생성)와
+지형을 한 번 읽어 둔 워커(--worker)에 시나리오만 보내는 경우의 지연 시간을 비교합니다.
+두 방식의 Grids/Messages 결과가 같은지도 확인합니다.
+
+데이터셋은 임시 폴더로 복사해서 사용합니다(Data.csv가 없으면 그곳에 생성).
+
+사용 예 (server 폴더에서):
+    python -m benchmarks.bench_engine_worker [<데이터셋> ...]
+"""
+import os
+import sys
+import time
+import random
+import shutil
+import filecmp
+import tempfile
+import statistics
+import subprocess
+
+from api.data_handler import CELL2FIRE_DIR, DATA_BASE_PATH
+
+if CELL2FIRE_DIR not in sys.path:
+    sys.path.insert(0, CELL2FIRE_DIR)
+from cell2fire.utils.ParseInputs import make_parser
+from cell2fire.Cell2FireC_class import Cell2FireWorker, execArgs
+import cell2fire.utils.DataGeneratorC as DataGenerator
+
+DATASETS = ("Korean40x40", "dogrib")
+SCENARIOS = 10
+
+
+def _args(in_folder: str, out_folder: str):
+    return make_parser().parse_args([
+        "--input-instance-folder", in_folder + os.sep, "--output-folder", out_folder + os.sep,
+        "--ignitions", "--sim-years", "1", "--nsims", "1", "--grids", "--finalGrid", "--output-messages",
+        "--weather", "rows", "--nweathers", "1", "--Fire-Period-Length", "1.0",
+        "--ROS-CV", "0.5", "--seed", "3", "--IgnitionRad", "0",
+    ])
+
+
+def _same_results(a: str, b: str) -> bool:
+    for sub in ("Grids", "Messages"):
+        left, right = os.path.join(a, sub), os.path.join(b, sub)
+        if os.path.isdir(left) != os.path.isdir(right):
+            return False
+        if os.path.isdir(left):
+            comparison = filecmp.dircmp(left, right)
+            pending = [comparison]
+            while pending:
+                current = pending.pop()
+                if current.left_only or current.right_only:
+                    return False
+                _, mismatch, errors = filecmp.cmpfiles(current.left, current.right, current.common_files, shallow=False)
+                if mismatch or errors:
+                    return False
+                pending.extend(current.subdirs.values())
+    return True
+
+
+def _burnable_cells(in_folder: str, count: int) -> list:
+    """연소 가능한 셀(연료 코드가 있는 셀) 중 임의 선택 (1-based)"""
+    with open(os.path.join(in_folder, "Forest.asc")) as f:
+        values = [int(float(v)) for line in f.readlines()[6:] for v in line.split()]
+    candidates = [i + 1 for i, v in enumerate(values) if v > 0 and v not in (101, 102, 103, 104, 105, 106)]
+    return random.Random(0).sample(candidates, count)
+
+
+def bench(dataset: str, workdir: str) -> None:
+    in_folder = os.path.join(workdir, dataset)
+    shutil.copytree(os.path.join(DATA_BASE_PATH, dataset), in_folder)
+    if not os.path.isfile(os.path.join(in_folder, "Data.csv")):
+        DataGenerator.GenDataFile(in_folder + os.sep)
+    cells = _burnable_cells(in_folder, SCENARIOS)
+
+    cold = []
+    for i, cell in enumerate(cells):
+        with open(os.path.join(in_folder, "Ignitions.csv"), "w") as f:
+            f.write(f"Year,Ncell\n1,{cell}\n")
+        out_folder = os.path.join(workdir, f"{dataset}_cold{i}")
+        start = time.perf_counter()
+        subprocess.run(execArgs(_args(in_folder, out_folder), out_folder + os.sep, None),
+                       stdout=subprocess.DEVNULL, check=True)
+        cold.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    worker = Cell2FireWorker(_args(in_folder, os.path.join(workdir, "unused")))
+    startup = (time.perf_counter() - start) * 1000
+    warm = []
+    with worker:
+        for i, cell in enumerate(cells):
+            out_folder = os.path.join(workdir, f"{dataset}_warm{i}")
+            start = time.perf_counter()
+            worker.run(out_folder + os.sep, ignitions=[cell])
+            warm.append((time.perf_counter() - start) * 1000)
+
+    same = all(_same_results(os.path.join(workdir, f"{dataset}_cold{i}"), os.path.join(workdir, f"{dataset}_warm{i}"))
+               for i in range(SCENARIOS))
+    print(f"== {dataset}: 셀 {worker.nCells:,}개, 시나리오 {SCENARIOS}개 (nsims=1) ==")
+    print(f"{'':<22}{'p50 ms':>10}{'mean ms':>10}")
+    print(f"{'new process':<22}{statistics.median(cold):>10.1f}{statistics.mean(cold):>10.1f}")
+    print(f"{'worker':<22}{statistics.median(warm):>10.1f}{statistics.mean(warm):>10.1f}"
+          f"  (시작 {startup:.0f} ms, 결과 {'same' if same else 'DIFFERENT'})")
+
+
+def main() -> None:
+    datasets = sys.argv[1:] or DATASETS
+    workdir = tempfile.mkdtemp(prefix="bench-worker-")
+    try:
+        for dataset in datasets:
+            bench(dataset, workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
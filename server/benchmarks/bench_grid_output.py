@@ -0,0 +1,110 @@
+"""
+엔진 격자 출력 형식 벤치마크
+
+같은 작업(--grids --final-grid, seed 고정)을 --grids-format csv / gzip / binary로 실행해서 벽시계
+시간과 Grids 폴더 크기, 파일 수를 비교합니다. gzip 파일을 풀거나 binary(ForestGrids.bin)를
+cell2fire.utils.GridChanges로 CSV로 펼친 결과가 csv 형식과 바이트 단위로 같은지도 확인합니다.
+
+데이터셋은 임시 폴더로 복사해서 사용합니다(Data.csv가 없으면 그곳에 생성).
+
+사용 예 (server 폴더에서):
+    python -m benchmarks.bench_grid_output [<데이터셋> ...]
+"""
+import os
+import sys
+import glob
+import gzip
+import time
+import shutil
+import tempfile
+import subprocess
+
+from api.data_handler import CELL2FIRE_DIR, DATA_BASE_PATH
+
+if CELL2FIRE_DIR not in sys.path:
+    sys.path.insert(0, CELL2FIRE_DIR)
+from cell2fire.utils.GridChanges import ExpandGridChanges
+import cell2fire.utils.DataGeneratorC as DataGenerator
+
+ENGINE = os.path.join(CELL2FIRE_DIR, "cell2fire", "Cell2FireC", "Cell2Fire")
+DATASETS = ("Korean40x40", "dogrib")
+NSIMS = {"Korean40x40": 50}
+DEFAULT_NSIMS = 1
+FORMATS = ("csv", "gzip", "binary")
+
+
+def _run(in_folder: str, output_folder: str, nsims: int, grids_format: str) -> float:
+    command = [
+        ENGINE,
+        "--input-instance-folder", in_folder + os.sep,
+        "--output-folder", output_folder + os.sep,
+        "--ignitions", "--sim-years", "1", "--nsims", str(nsims),
+        "--grids", "--final-grid",
+        "--weather", "rows", "--nweathers", "1", "--Fire-Period-Length", "1.0",
+        "--ROS-CV", "0.5", "--seed", "3", "--IgnitionRad", "0",
+        "--grids-format", grids_format,
+    ]
+    start = time.perf_counter()
+    subprocess.run(command, stdout=subprocess.DEVNULL, check=True)
+    return time.perf_counter() - start
+
+
+def _grid_files(output_folder: str) -> list:
+    return sorted(glob.glob(os.path.join(output_folder, "Grids", "Grids*", "*")))
+
+
+def _same_grids(csv_folder: str, output_folder: str, grids_format: str) -> bool:
+    """csv 형식의 ForestGridNN.csv와 같은 내용인지 (gzip은 풀어서, binary는 CSV로 펼쳐서 비교)"""
+    if grids_format == "binary":
+        ExpandGridChanges(os.path.join(output_folder, "Grids"))
+    for path in glob.glob(os.path.join(csv_folder, "Grids", "Grids*", "ForestGrid*.csv")):
+        other = os.path.join(output_folder, os.path.relpath(path, csv_folder))
+        with open(path, "rb") as f:
+            expected = f.read()
+        if grids_format == "gzip":
+            other += ".gz"
+            if not os.path.isfile(other):
+                return False
+            with gzip.open(other) as f:
+                found = f.read()
+        else:
+            if not os.path.isfile(other):
+                return False
+            with open(other, "rb") as f:
+                found = f.read()
+        if found != expected:
+            return False
+    return True
+
+
+def bench(dataset: str, workdir: str) -> None:
+    in_folder = os.path.join(workdir, dataset)
+    shutil.copytree(os.path.join(DATA_BASE_PATH, dataset), in_folder)
+    if not os.path.isfile(os.path.join(in_folder, "Data.csv")):
+        DataGenerator.GenDataFile(in_folder + os.sep)
+    nsims = NSIMS.get(dataset, DEFAULT_NSIMS)
+
+    print(f"== {dataset}: nsims={nsims} ==")
+    print(f"{'format':<10}{'seconds':>10}{'files':>8}{'MB':>10}  grids")
+    csv_folder = os.path.join(workdir, f"{dataset}_csv")
+    for grids_format in FORMATS:
+        output_folder = os.path.join(workdir, f"{dataset}_{grids_format}")
+        seconds = _run(in_folder, output_folder, nsims, grids_format)
+        files = _grid_files(output_folder)
+        size = sum(os.path.getsize(path) for path in files) / 1e6
+        same = "same" if _same_grids(csv_folder, output_folder, grids_format) else "DIFFERENT"
+        print(f"{grids_format:<10}{seconds:>10.2f}{len(files):>8}{size:>10.2f}  {same}")
+
+
+def main() -> None:
+    datasets = sys.argv[1:] or DATASETS
+    workdir = tempfile.mkdtemp(prefix="bench-grids-")
+    try:
+        for dataset in datasets:
+            bench(dataset, workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+연소 마스크 응답 직렬화 벤치마크
+
+기존 BurnedPixel 목록 JSON과 압축 마스크(bitmask / rle, base64 JSON / 바이너리)를
+Korean40x40 마지막 스냅샷과 합성 1000x1000 격자에서 비교합니다.
+
+사용 예 (server 폴더에서):
+    python -m benchmarks.bench_mask_encoding
+"""
+import time
+
+import numpy as np
+
+from api.coordinates import CoordinateIndex
+from api.data_handler import DataHandler
+from api.encoding import encode_base64, encode_mask, pack_binary
+from api.models import FireSpreadMaskResponse, FireSpreadResponse
+
+
+def _timeit(func, repeat: int):
+    """최소 실행 시간(초)과 마지막 결과 반환"""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def _synthetic_index(size: int) -> CoordinateIndex:
+    """size x size 규칙 격자 좌표 인덱스"""
+    rows, cols = np.divmod(np.arange(size * size), size)
+    return CoordinateIndex(size, size, 36.0 + rows * 0.00045, 129.0 + cols * 0.00057, ignition_cell=0)
+
+
+def _synthetic_mask(size: int) -> np.ndarray:
+    """격자 중앙의 원형 연소 영역 (반지름 = 격자 크기의 30%)"""
+    rows, cols = np.ogrid[:size, :size]
+    center = size / 2
+    return (rows - center) ** 2 + (cols - center) ** 2 <= (0.3 * size) ** 2
+
+
+def run_case(name: str, index: CoordinateIndex, mask: np.ndarray, repeat: int) -> None:
+    ignition = {"lat": float(index.lat[0]), "lon": float(index.lon[0])}
+    metadata = {"dataset": name, "simulation_number": 1, "grid_size": index.grid_size}
+    georeference = index.georeference()
+
+    def pixel_json():
+        pixels = index.mask_pixels(mask)
+        return FireSpreadResponse(time_minutes=60, total_burned_pixels=len(pixels), burned_coordinates=pixels,
+                                  ignition_point=ignition, metadata=metadata).model_dump_json().encode()
+
+    def mask_json(encoding):
+        def build():
+            return FireSpreadMaskResponse(time_minutes=60, total_burned_pixels=int(np.count_nonzero(mask)),
+                                          rows=index.rows, cols=index.cols, encoding=encoding,
+                                          data=encode_base64(encode_mask(mask, encoding)),
+                                          georeference=georeference, ignition_point=ignition,
+                                          metadata=metadata).model_dump_json().encode()
+        return build
+
+    def mask_binary(encoding):
+        return lambda: pack_binary(mask, encoding, 60, georeference)
+
+    cases = [
+        ("pixel list JSON (기존)", pixel_json),
+        ("bitmask base64 JSON", mask_json("bitmask")),
+        ("rle base64 JSON", mask_json("rle")),
+        ("bitmask octet-stream", mask_binary("bitmask")),
+        ("rle octet-stream", mask_binary("rle")),
+    ]
+
+    print(f"\n== {name}: {index.grid_size}, 연소 셀 {int(np.count_nonzero(mask)):,}개 ==")
+    print(f"{'format':<24}{'time (ms)':>12}{'bytes':>14}")
+    for label, func in cases:
+        seconds, body = _timeit(func, repeat)
+        print(f"{label:<24}{seconds * 1000:>12.3f}{len(body):>14,}")
+
+
+def main() -> None:
+    index = DataHandler.get_coordinate_index("Korean40x40")
+    mask = DataHandler.load_burned_mask("Korean40x40", 1, 7)
+    run_case("Korean40x40", index, mask, repeat=50)
+
+    size = 1000
+    run_case(f"synthetic{size}x{size}", _synthetic_index(size), _synthetic_mask(size), repeat=3)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+동시 요청 묶기(single-flight) 벤치마크
+
+캐시를 비운 상태에서 같은 /korean-fire-spread/{t} 요청 500개를 동시에 보낼 때,
+요청마다 응답을 만드는 경우(기존 방식)와 single-flight + 본문 캐시를 쓰는 경우를 비교하고,
+gzip 본문 크기와 If-None-Match 재검증(304) 응답을 확인합니다.
+
+사용 예 (server 폴더에서):
+    python -m benchmarks.bench_request_coalescing
+"""
+import os
+import time
+import shutil
+import asyncio
+import tempfile
+
+# 공유 배열 캐시도 비어 있는 상태에서 측정 (api 모듈을 가져오기 전에 설정)
+os.environ["CELL2FIRE_SHARED_CACHE_DIR"] = tempfile.mkdtemp(prefix="bench-coalescing-")
+
+import httpx
+
+from main import app
+from api.cache import grid_cache
+from api import data_handler
+from api.dispatcher import alert_dispatcher
+from api.endpoints import FireSpreadAPI, run_blocking
+from api.http_cache import response_flights
+
+DATASET = "Korean40x40"
+MINUTES = 150
+REQUESTS = 500
+
+
+async def _uncoalesced() -> float:
+    """요청마다 마스크 확인과 응답 직렬화를 따로 수행 (기존 방식)"""
+    grid_cache.clear()
+    start = time.perf_counter()
+    responses = await asyncio.gather(*[
+        run_blocking(FireSpreadAPI.build_fire_spread_response, DATASET, 1, MINUTES) for _ in range(REQUESTS)
+    ])
+    [response.model_dump_json() for response in responses]
+    return time.perf_counter() - start
+
+
+async def _coalesced(client: httpx.AsyncClient):
+    grid_cache.clear()
+    leaders = response_flights.leaders
+    start = time.perf_counter()
+    responses = await asyncio.gather(*[client.get(f"/korean-fire-spread/{MINUTES}") for _ in range(REQUESTS)])
+    return time.perf_counter() - start, response_flights.leaders - leaders, responses
+
+
+async def main() -> None:
+    await FireSpreadAPI.preload()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        seconds = await _uncoalesced()
+        print(f"== {DATASET} {MINUTES}분, 동시 요청 {REQUESTS}개 (콜드 캐시) ==")
+        print(f"{'per-request build':<28}{seconds * 1000:>10.1f} ms  (계산 {REQUESTS}회)")
+
+        seconds, computations, responses = await _coalesced(client)
+        print(f"{'single-flight (HTTP 포함)':<28}{seconds * 1000:>10.1f} ms  (계산 {computations}회)")
+
+        identity = await client.get(f"/korean-fire-spread/{MINUTES}", headers={"Accept-Encoding": "identity"})
+        compressed = await client.get(f"/korean-fire-spread/{MINUTES}", headers={"Accept-Encoding": "gzip"})
+        raw_size = int(compressed.headers.get("content-length", 0))
+        print(f"{'body bytes (identity/gzip)':<28}{len(identity.content):>10,} / {raw_size:,}")
+
+        etag = responses[0].headers["etag"]
+        start = time.perf_counter()
+        revalidated = await asyncio.gather(*[
+            client.get(f"/korean-fire-spread/{MINUTES}", headers={"If-None-Match": etag}) for _ in range(REQUESTS)
+        ])
+        seconds = time.perf_counter() - start
+        statuses = {response.status_code for response in revalidated}
+        print(f"{'If-None-Match revalidation':<28}{seconds * 1000:>10.1f} ms  (상태 {sorted(statuses)})")
+    await alert_dispatcher.stop()
+    data_handler.shutdown()
+    shutil.rmtree(os.environ["CELL2FIRE_SHARED_CACHE_DIR"], ignore_errors=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
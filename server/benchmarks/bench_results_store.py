@@ -0,0 +1,106 @@
+"""
+결과 저장소(SQLite) 벤치마크
+
+시뮬레이션 수가 많은 결과 폴더 하나를 저장소에 적재하는 처리량(시뮬레이션/초, 원본 MB/초)과,
+적재 후 조회 지연을 기존 방식(디렉터리 스캔 + CSV 파싱)과 비교합니다.
+
+- manifest: 데이터셋 항목 만들기 (GridsN 폴더 순회 vs 저장소 조회)
+- mask: 임의 (시뮬레이션, 단계) 연소 마스크 1개 (ForestGrid CSV 파싱 vs BLOB 조회)
+- arrival: 시뮬레이션 도달 시간 (MessagesFile + 스냅샷 계산 vs BLOB 조회)
+
+결과 폴더를 주지 않으면 Korean40x40에서 엔진을 nsims=1000으로 임시 폴더에 실행합니다.
+
+사용 예 (server 폴더에서):
+    python -m benchmarks.bench_results_store [<결과 폴더>]
+"""
+import os
+import sys
+import time
+import random
+import shutil
+import tempfile
+import statistics
+
+from api.arrival import build_simulation_arrival
+from api.data_handler import CELL2FIRE_DIR, DATA_BASE_PATH, DataHandler, GRID_INTERVAL_MINUTES
+from api.jobs import run_simulation_job
+from api.manifest import ResultsManifest
+from api.store import ResultsStore
+
+NSIMS = 1000
+QUERIES = 200
+
+
+def _folder_bytes(folder: str) -> int:
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(folder) for name in names)
+
+
+def _latency_ms(func, arguments) -> tuple:
+    """(p50, p95) 밀리초"""
+    samples = []
+    for argument in arguments:
+        start = time.perf_counter()
+        func(*argument)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+
+def main() -> None:
+    workdir = tempfile.mkdtemp(prefix="bench-store-")
+    try:
+        if len(sys.argv) > 1:
+            result_path = os.path.abspath(sys.argv[1])
+        else:
+            result_path = os.path.join(workdir, "Korean40x40_bench")
+            print(f"엔진 실행 중 (nsims={NSIMS}) ...")
+            run_simulation_job(CELL2FIRE_DIR, os.path.join(DATA_BASE_PATH, "Korean40x40"),
+                               os.path.join(workdir, "job"), result_path,
+                               {"ignition_cell": 970, "weather": None, "nsims": NSIMS, "seed": 7, "ros_cv": 0.6})
+        results_root, name = os.path.split(result_path)
+        source_mb = _folder_bytes(result_path) / 2**20
+
+        store = ResultsStore(os.path.join(workdir, "results.sqlite"))
+        stats = store.ingest(name, result_path, grid_interval_minutes=GRID_INTERVAL_MINUTES)
+        db_mb = sum(os.path.getsize(store.db_path + suffix) for suffix in ("", "-wal")
+                    if os.path.exists(store.db_path + suffix)) / 2**20
+        print(f"== {name}: 시뮬레이션 {stats['simulations']}개, 격자 {stats['grids']}개, 원본 {source_mb:.1f} MiB ==")
+        print(f"{'ingest':<22}{stats['seconds']:>10.2f} s  "
+              f"({stats['simulations'] / stats['seconds']:.0f} sims/s, {source_mb / stats['seconds']:.1f} MiB/s, "
+              f"DB {db_mb:.1f} MiB)")
+
+        start = time.perf_counter()
+        scanned = ResultsManifest(results_root).get(name)
+        scan_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        stored = ResultsManifest(results_root, store=store).get(name)
+        store_seconds = time.perf_counter() - start
+        assert stored.stored and stored.steps == scanned.steps
+        print(f"{'manifest (scan/store)':<22}{scan_seconds * 1000:>10.1f} ms / {store_seconds * 1000:.1f} ms")
+
+        rng = random.Random(0)
+        rows, cols = stored.rows, stored.cols
+        picks = []
+        for _ in range(QUERIES):
+            simulation = rng.choice(stored.simulations)
+            picks.append((simulation, rng.choice(stored.steps[simulation])))
+        grid_paths = [(os.path.join(result_path, "Grids", f"Grids{s}", f"ForestGrid{t:02d}.csv"),) for s, t in picks]
+        csv_p50, csv_p95 = _latency_ms(DataHandler.read_grid_mask, grid_paths)
+        db_p50, db_p95 = _latency_ms(store.load_mask, [(name, s, t, rows, cols) for s, t in picks])
+        print(f"{'':<22}{'p50 ms':>10}{'p95 ms':>10}")
+        print(f"{'mask: CSV':<22}{csv_p50:>10.3f}{csv_p95:>10.3f}")
+        print(f"{'mask: store':<22}{db_p50:>10.3f}{db_p95:>10.3f}")
+
+        arrival_sims = [s for s, _ in picks[:QUERIES // 4]]
+        csv_p50, csv_p95 = _latency_ms(
+            lambda s: build_simulation_arrival(result_path, s, rows * cols, GRID_INTERVAL_MINUTES),
+            [(s,) for s in arrival_sims])
+        db_p50, db_p95 = _latency_ms(store.load_arrival, [(name, s, rows, cols) for s in arrival_sims])
+        print(f"{'arrival: Messages':<22}{csv_p50:>10.3f}{csv_p95:>10.3f}")
+        print(f"{'arrival: store':<22}{db_p50:>10.3f}{db_p95:>10.3f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
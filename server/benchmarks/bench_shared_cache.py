@@ -0,0 +1,99 @@
+"""
+워커 간 공유 배열 캐시 벤치마크
+
+합성 1000x1000 ForestGrid 20개를 워커 프로세스 N개가 모두 읽을 때, 워커마다 CSV를 파싱해
+들고 있는 경우와 공유 캐시(memmap)로 여는 경우의 워커 메모리 합계와
+시작(전체 로드) 시간을 비교합니다. 메모리는 모든 워커가 로드를 마친 시점의
+/proc/self/smaps_rollup Pss(공유 페이지를 매핑한 프로세스 수로 나눈 크기) 합계입니다 (Linux).
+
+사용 예 (server 폴더에서):
+    python -m benchmarks.bench_shared_cache
+"""
+import os
+import time
+import shutil
+import tempfile
+import multiprocessing as mp
+
+import numpy as np
+
+from api.data_handler import DataHandler
+from api.shared_cache import SharedArrayCache
+
+GRID_SIZE = 1000
+GRID_COUNT = 20
+WORKER_COUNTS = (1, 2, 4, 8)
+
+
+def _pss_kib() -> int:
+    """현재 프로세스의 비례 메모리(KiB, Pss)"""
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            if line.startswith("Pss:"):
+                return int(line.split()[1])
+    return 0
+
+
+def _write_grids(folder: str):
+    """가운데가 넓어지는 원형 연소 영역 격자 CSV"""
+    rows, cols = np.ogrid[:GRID_SIZE, :GRID_SIZE]
+    distance = np.hypot(rows - GRID_SIZE / 2, cols - GRID_SIZE / 2)
+    paths = []
+    for step in range(GRID_COUNT):
+        path = os.path.join(folder, f"ForestGrid{step:02d}.csv")
+        grid = (distance <= (step + 1) * GRID_SIZE / (2 * GRID_COUNT)).astype(np.int8)
+        np.savetxt(path, grid, fmt="%d", delimiter=",")
+        paths.append(path)
+    return paths
+
+
+def _worker(paths, cache_dir, barrier, results):
+    """모든 격자를 로드해서 들고 있는 워커 (cache_dir가 None이면 프로세스별 파싱)"""
+    barrier.wait()  # 모든 워커가 뜬 뒤 기준값 측정 (부모에서 물려받은 페이지의 Pss 분할 고정)
+    baseline = _pss_kib()
+    start = time.perf_counter()
+    if cache_dir is None:
+        masks = [DataHandler.read_grid_mask(path) for path in paths]
+    else:
+        cache = SharedArrayCache(cache_dir)
+        masks = [cache.load("mask", path, lambda path=path: DataHandler.read_grid_mask(path)) for path in paths]
+    burned = sum(int(np.count_nonzero(mask)) for mask in masks)  # 모든 페이지 접근
+    seconds = time.perf_counter() - start
+    barrier.wait()  # 모든 워커가 매핑을 들고 있는 상태에서 측정
+    results.put((seconds, _pss_kib() - baseline, burned))
+    barrier.wait()
+
+
+def _run(paths, workers: int, cache_dir):
+    results = mp.Queue()
+    barrier = mp.Barrier(workers)
+    processes = [mp.Process(target=_worker, args=(paths, cache_dir, barrier, results)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    measured = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    seconds = max(m[0] for m in measured)
+    pss_mib = sum(m[1] for m in measured) / 1024
+    return seconds, pss_mib
+
+
+def main() -> None:
+    folder = tempfile.mkdtemp(prefix="bench-grids-")
+    cache_dir = tempfile.mkdtemp(prefix="bench-shared-", dir="/dev/shm" if os.path.isdir("/dev/shm") else None)
+    try:
+        paths = _write_grids(folder)
+        print(f"== 격자 {GRID_COUNT}개 x {GRID_SIZE}x{GRID_SIZE} (마스크 {GRID_COUNT * GRID_SIZE * GRID_SIZE / 2**20:.0f} MiB) ==")
+        print(f"{'workers':<10}{'parse: s':>12}{'parse: MiB':>14}{'shared: s':>12}{'shared: MiB':>14}")
+        _run(paths, 1, cache_dir)  # 공유 캐시 채우기 (첫 로더)
+        for workers in WORKER_COUNTS:
+            parse_seconds, parse_mib = _run(paths, workers, None)
+            shared_seconds, shared_mib = _run(paths, workers, cache_dir)
+            print(f"{workers:<10}{parse_seconds:>12.2f}{parse_mib:>14.1f}{shared_seconds:>12.3f}{shared_mib:>14.1f}")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+대피소 경로 거리장 벤치마크
+
+합성 1000x1000 격자(중앙 발화, 바깥으로 번지는 도달 시간)와 대피소 50곳으로 출발 단계 하나의
+거리장 계산 시간을 비교합니다.
+
+- heapq: 셀마다 Python 루프를 도는 다중 출발점 Dijkstra (이전 구현, 모든 단계를 미리 계산)
+- csgraph: 통과 가능한 셀 그래프를 NumPy로 만들고 scipy.sparse.csgraph.dijkstra (조회한 단계만 계산)
+
+작은 격자에서 두 방식의 거리가 같은지도 확인합니다.
+
+사용 예 (server 폴더에서):
+    python -m benchmarks.bench_shelter_routes [<격자 한 변 셀 수>]
+"""
+import sys
+import time
+import heapq
+
+import numpy as np
+
+from api.shelters import (NO_SHELTER, SHELTER_SAFETY_MARGIN_MINUTES, ShelterRoutes,
+                          _NEIGHBOR_OFFSETS, nearest_shelter_field)
+
+ROW_M, COL_M = 30.0, 24.0
+SHELTERS = 50
+STEP_MINUTES = 60.0
+
+
+def _heapq_field(rows: int, cols: int, shelter_cells: np.ndarray, blocked: np.ndarray,
+                 row_m: float, col_m: float):
+    """이전 구현: 순수 Python heapq 다중 출발점 Dijkstra"""
+    ncells = rows * cols
+    distance = np.full(ncells, np.inf, dtype=np.float64)
+    nearest = np.full(ncells, NO_SHELTER, dtype=np.int32)
+    diagonal_m = float(np.hypot(row_m, col_m))
+    steps = [(dr, dc, row_m if dc == 0 else col_m if dr == 0 else diagonal_m) for dr, dc in _NEIGHBOR_OFFSETS]
+    blocked = blocked.ravel().tolist()
+
+    heap = []
+    for shelter, cell in enumerate(shelter_cells.tolist()):
+        if cell < 0 or blocked[cell] or distance[cell] == 0.0:
+            continue
+        distance[cell] = 0.0
+        nearest[cell] = shelter
+        heap.append((0.0, cell))
+    heapq.heapify(heap)
+
+    while heap:
+        d, cell = heapq.heappop(heap)
+        if d > distance[cell]:
+            continue
+        r, c = divmod(cell, cols)
+        source = nearest[cell]
+        for dr, dc, cost in steps:
+            nr, nc = r + dr, c + dc
+            if nr < 0 or nr >= rows or nc < 0 or nc >= cols:
+                continue
+            neighbor = nr * cols + nc
+            nd = d + cost
+            if nd < distance[neighbor] and not blocked[neighbor]:
+                distance[neighbor] = nd
+                nearest[neighbor] = source
+                heapq.heappush(heap, (nd, neighbor))
+    return distance.astype(np.float32), nearest
+
+
+def _synthetic_grid(size: int, seed: int = 0):
+    """중앙 발화 도달 시간 (분, 일부 셀은 타지 않음 = inf)과 무작위 대피소 셀"""
+    rng = np.random.default_rng(seed)
+    r, c = np.mgrid[0:size, 0:size]
+    arrival = np.hypot((r - size / 2) * ROW_M, (c - size / 2) * COL_M) / 20.0  # 분당 20m
+    arrival *= rng.uniform(0.8, 1.2, arrival.shape)
+    arrival[rng.random(arrival.shape) < 0.05] = np.inf
+    shelter_cells = rng.choice(size * size, SHELTERS, replace=False)
+    return arrival.astype(np.float32).ravel(), shelter_cells.astype(np.int64)
+
+
+def _compare_fields(size: int):
+    """(거리가 같은지, 대피소 번호가 다른 셀 수) - 번호는 거리가 같은 대피소 사이에서만 달라질 수 있음"""
+    arrival, shelter_cells = _synthetic_grid(size, seed=1)
+    same, differ = True, 0
+    for departure in (0.0, 120.0, 480.0):
+        blocked = arrival <= departure + SHELTER_SAFETY_MARGIN_MINUTES
+        old = _heapq_field(size, size, shelter_cells, blocked, ROW_M, COL_M)
+        new = nearest_shelter_field(size, size, shelter_cells, blocked, ROW_M, COL_M)
+        same &= bool(np.allclose(old[0], new[0], rtol=1e-6))
+        differ += int(np.count_nonzero(old[1] != new[1]))
+    return same, differ
+
+
+def main() -> None:
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    arrival, shelter_cells = _synthetic_grid(size)
+    last = float(arrival[np.isfinite(arrival)].max())
+    departures = np.arange(0, int(last // STEP_MINUTES) + 2) * STEP_MINUTES
+    routes = ShelterRoutes(size, size, ROW_M, COL_M, arrival, shelter_cells, departures)
+    step = routes.step_for(departures[len(departures) // 4])
+    blocked = arrival <= departures[step] + SHELTER_SAFETY_MARGIN_MINUTES
+
+    print(f"격자 {size}x{size}, 대피소 {SHELTERS}곳, 출발 단계 {routes.steps}개 (단계 {step} 측정)")
+    start = time.perf_counter()
+    _heapq_field(size, size, shelter_cells, blocked, ROW_M, COL_M)
+    heapq_seconds = time.perf_counter() - start
+    print(f"{'heapq (1 step)':<28}{heapq_seconds * 1000:>12.1f} ms")
+    print(f"{'heapq (all steps, 추정)':<28}{heapq_seconds * routes.steps * 1000:>12.1f} ms")
+
+    start = time.perf_counter()
+    field = routes.field(step)
+    csgraph_seconds = time.perf_counter() - start
+    print(f"{'csgraph (1 step)':<28}{csgraph_seconds * 1000:>12.1f} ms  ({heapq_seconds / csgraph_seconds:.1f}x)")
+
+    cells = np.random.default_rng(2).integers(0, size * size, 10000)
+    start = time.perf_counter()
+    for cell in cells.tolist():
+        routes.lookup(cell, departures[step], lambda _: field)
+    per_lookup = (time.perf_counter() - start) / len(cells)
+    print(f"{'lookup (cached field)':<28}{per_lookup * 1e6:>12.1f} us")
+    same, differ = _compare_fields(200)
+    print(f"작은 격자(200x200) 거리: {'same' if same else 'DIFFERENT'} (같은 거리 대피소 중 다른 번호 선택 {differ}셀)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,20 @@
 """
 Cell2Fire Korean Forest Demo API - 한국 산림 화재 확산 시뮬레이션 데모 API
 """
-from fastapi import FastAPI
+from typing import List, Optional
+from fastapi import FastAPI, Path, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from api.models import FireSpreadResponse, AvailableSimulations, ServerStatus
+from fastapi.responses import StreamingResponse
+from api.models import (FireSpreadResponse, FireSpreadDeltaResponse, BurnProbabilityResponse,
+                        AvailableSimulations, ServerStatus, SimulationRequest, SimulationJobResponse,
+                        AlertUserRegistration, AlertUserRegistrationResponse, AlertMatchResponse,
+                        ShelterRegistration, ShelterRegistrationResponse, NearestShelterResponse)
 from api.endpoints import FireSpreadAPI
+from api import data_handler
+from api.dispatcher import alert_dispatcher
+from api.encoding import negotiate_mask_format
+from api.progress import SSE_MEDIA_TYPE
+from api.timeline import NDJSON_MEDIA_TYPE
 
 # FastAPI 앱 초기화
 app = FastAPI(
@@ -20,8 +30,20 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
+@app.on_event("startup")
+async def preload_results():
+    """결과 목록 스캔 및 좌표 인덱스 미리 로드"""
+    await FireSpreadAPI.preload()
+
+@app.on_event("shutdown")
+async def shutdown_background_workers():
+    """남은 알림 전송 후 시뮬레이션 작업 프로세스와 결과 목록 감시자 종료"""
+    await alert_dispatcher.stop()
+    data_handler.shutdown()
+
 # ============== 기본 엔드포인트 ==============
 
 @app.get("/", response_model=ServerStatus)
@@ -34,47 +56,164 @@ async def get_available_simulations():
     """사용 가능한 시뮬레이션 목록 반환"""
     return await FireSpreadAPI.get_available_simulations()
 
-# ============== 한국 산림 데모 API ==============
-
-@app.get("/korean-fire-spread/0", response_model=FireSpreadResponse)
-async def get_korean_0min():
-    """한국 산림 - 발화 시점"""
-    return await FireSpreadAPI.get_korean_fire_spread(0)
-
-@app.get("/korean-fire-spread/30", response_model=FireSpreadResponse)
-async def get_korean_30min():
-    """한국 산림 - 발화 후 30분 시점"""
-    return await FireSpreadAPI.get_korean_fire_spread(30)
-
-@app.get("/korean-fire-spread/60", response_model=FireSpreadResponse)
-async def get_korean_60min():
-    """한국 산림 - 발화 후 1시간 시점"""
-    return await FireSpreadAPI.get_korean_fire_spread(60)
-
-@app.get("/korean-fire-spread/90", response_model=FireSpreadResponse)
-async def get_korean_90min():
-    """한국 산림 - 발화 후 1시간 30분 시점"""
-    return await FireSpreadAPI.get_korean_fire_spread(90)
-
-@app.get("/korean-fire-spread/120", response_model=FireSpreadResponse)
-async def get_korean_120min():
-    """한국 산림 - 발화 후 2시간 시점"""
-    return await FireSpreadAPI.get_korean_fire_spread(120)
-
-@app.get("/korean-fire-spread/150", response_model=FireSpreadResponse)
-async def get_korean_150min():
-    """한국 산림 - 발화 후 2시간 30분 시점"""
-    return await FireSpreadAPI.get_korean_fire_spread(150)
-
-@app.get("/korean-fire-spread/180", response_model=FireSpreadResponse)
-async def get_korean_180min():
-    """한국 산림 - 발화 후 3시간 시점"""
-    return await FireSpreadAPI.get_korean_fire_spread(180)
-
-@app.get("/korean-fire-spread/210", response_model=FireSpreadResponse)
-async def get_korean_210min():
-    """한국 산림 - 발화 후 3시간 30분 시점"""
-    return await FireSpreadAPI.get_korean_fire_spread(210)
+# ============== 온디맨드 시뮬레이션 ==============
+
+@app.post("/simulations", response_model=SimulationJobResponse, status_code=202)
+async def submit_simulation(request: SimulationRequest):
+    """점화 셀/기상 행/nsims로 Cell2Fire 시뮬레이션 실행 (작업 ID 반환, 같은 입력은 재사용)"""
+    return await FireSpreadAPI.submit_simulation(request)
+
+@app.get("/simulations/{job_id}", response_model=SimulationJobResponse)
+async def get_simulation_job(job_id: str):
+    """시뮬레이션 작업 상태 조회 (done이면 result_dataset으로 화재 확산 API 사용)"""
+    return await FireSpreadAPI.get_simulation_job(job_id)
+
+@app.get("/simulations/{job_id}/events")
+async def stream_simulation_progress(job_id: str):
+    """엔진이 ForestGrid를 기록할 때마다 SSE grid 이벤트로 전송 (작업이 끝나면 status 이벤트 후 종료)"""
+    events = FireSpreadAPI.open_progress_stream(job_id)
+    return StreamingResponse(events, media_type=SSE_MEDIA_TYPE,
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+# ============== 화재 확산 API ==============
+
+@app.get("/fire-spread/{dataset}/probability/{minutes}", response_model=BurnProbabilityResponse)
+async def get_burn_probability(
+    dataset: str,
+    minutes: int = Path(..., ge=0),
+    contour: List[float] = Query([], description="확률 경계를 GeoJSON으로 받을 임계값 (예: ?contour=0.5&contour=0.9)"),
+):
+    """전체 시뮬레이션(GridsN) 중 해당 시각까지 연소된 비율 (셀별 연소 확률)"""
+    return await FireSpreadAPI.get_burn_probability(dataset, minutes, contour)
+
+@app.get("/fire-spread/{dataset}/{simulation}/delta", response_model=FireSpreadDeltaResponse)
+async def get_fire_spread_delta(
+    dataset: str,
+    simulation: int = Path(..., ge=1),
+    from_minutes: int = Query(..., alias="from", ge=0),
+    to_minutes: int = Query(..., alias="to", ge=0),
+):
+    """두 시점 사이에 상태가 바뀐 셀만 반환 (폴링 시 전체 재전송 대신 사용)"""
+    return await FireSpreadAPI.get_fire_spread_delta(dataset, simulation, from_minutes, to_minutes)
+
+@app.get("/fire-spread/{dataset}/{simulation}/timeline")
+async def get_fire_spread_timeline(
+    dataset: str,
+    simulation: int = Path(..., ge=1),
+    timeline_format: str = Query("delta", alias="format", description="delta (단계별 변경 셀) | arrival (셀별 도달 시간)"),
+    step: Optional[int] = Query(None, ge=1, description="delta 단계 간격(분), 기본값은 스냅샷 간격"),
+    until: Optional[int] = Query(None, ge=0, description="마지막 시각(분), 기본값은 마지막 스냅샷"),
+):
+    """전체 타임라인을 한 번에 - header(georeference, 점화점) 한 줄 뒤에 단계별 줄을 NDJSON으로 스트리밍"""
+    lines = await FireSpreadAPI.open_fire_spread_timeline(dataset, simulation, timeline_format, step, until)
+    return StreamingResponse(lines, media_type=NDJSON_MEDIA_TYPE)
+
+@app.get("/fire-spread/{dataset}/{simulation}/{minutes}/perimeter")
+async def get_fire_spread_perimeter(
+    dataset: str,
+    simulation: int = Path(..., ge=1),
+    minutes: int = Path(..., ge=0),
+    simplify: float = Query(0.0, ge=0, description="Douglas-Peucker 단순화 허용 오차 (셀 단위, 0이면 단순화 안 함)"),
+):
+    """화재 경계(perimeter) GeoJSON - 픽셀 목록 대신 연결된 연소 영역의 폴리곤"""
+    return await FireSpreadAPI.get_fire_spread_perimeter(dataset, simulation, minutes, simplify)
+
+@app.get("/fire-spread/{dataset}/{simulation}/{minutes}", response_model=FireSpreadResponse)
+async def get_fire_spread(
+    request: Request,
+    dataset: str,
+    simulation: int = Path(..., ge=1),
+    minutes: int = Path(..., ge=0),
+    encoding: str = Query("bitmask", description="압축 마스크 응답 인코딩 (bitmask | rle)"),
+):
+    """데이터셋/시뮬레이션/시간(분)별 화재 확산 데이터
+
+    Accept 헤더가 application/vnd.cell2fire.mask+json 또는 application/octet-stream이면
+    픽셀 목록 대신 압축 마스크를 반환합니다.
+    """
+    media_type = negotiate_mask_format(request.headers.get("accept"))
+    if media_type is not None:
+        return await FireSpreadAPI.get_fire_spread_mask(request, dataset, simulation, minutes, media_type, encoding)
+    return await FireSpreadAPI.get_fire_spread_body(request, dataset, simulation, minutes)
+
+@app.get("/korean-fire-spread/{minutes}", response_model=FireSpreadResponse)
+async def get_korean_fire_spread(
+    request: Request,
+    minutes: int = Path(..., ge=0),
+    encoding: str = Query("bitmask", description="압축 마스크 응답 인코딩 (bitmask | rle)"),
+):
+    """한국 산림 - 발화 후 지정 시간(분) 시점 (임의의 분, 30분 스냅샷 사이도 도달 시간으로 계산)"""
+    media_type = negotiate_mask_format(request.headers.get("accept"))
+    if media_type is not None:
+        return await FireSpreadAPI.get_fire_spread_mask(request, "Korean40x40", 1, minutes, media_type, encoding)
+    return await FireSpreadAPI.get_korean_fire_spread(request, minutes)
+
+# ============== 지도 타일 ==============
+
+@app.get("/tiles/{dataset}/probability/{minutes}/{z}/{x}/{y}.png")
+async def get_burn_probability_tile(
+    request: Request,
+    dataset: str,
+    minutes: int = Path(..., ge=0),
+    z: int = Path(..., ge=0),
+    x: int = Path(..., ge=0),
+    y: int = Path(..., ge=0),
+):
+    """연소 확률 XYZ 타일 (256x256 PNG, 확률이 높을수록 진한 빨강)"""
+    return await FireSpreadAPI.get_burn_probability_tile(request, dataset, minutes, z, x, y)
+
+@app.get("/tiles/{dataset}/{simulation}/{minutes}/{z}/{x}/{y}.png")
+async def get_fire_spread_tile(
+    request: Request,
+    dataset: str,
+    simulation: int = Path(..., ge=1),
+    minutes: int = Path(..., ge=0),
+    z: int = Path(..., ge=0),
+    x: int = Path(..., ge=0),
+    y: int = Path(..., ge=0),
+):
+    """연소 영역 XYZ 타일 (256x256 PNG, 네이버 지도 등 오버레이용)"""
+    return await FireSpreadAPI.get_fire_spread_tile(request, dataset, simulation, minutes, z, x, y)
+
+# ============== 사용자 알림 ==============
+
+@app.post("/alerts/users", response_model=AlertUserRegistrationResponse)
+async def register_alert_users(registration: AlertUserRegistration):
+    """알림 대상 사용자(가족 등) 위치 등록 - 같은 user_id는 위치만 갱신"""
+    return await FireSpreadAPI.register_alert_users(registration)
+
+@app.get("/alerts/metrics")
+async def get_alert_metrics():
+    """알림 발송기 지표 - 큐 길이, 전송/중복/버림 건수, 격자 기록 → 전송 지연(초)"""
+    return await FireSpreadAPI.get_alert_metrics()
+
+@app.get("/alerts/{dataset}/{simulation}", response_model=AlertMatchResponse)
+async def get_threatened_users(
+    dataset: str,
+    simulation: int = Path(..., ge=1),
+    from_minutes: Optional[int] = Query(None, alias="from", ge=0),
+    to_minutes: int = Query(..., alias="to", ge=0),
+):
+    """(from, to] 구간에 화재가 도달하는 사용자 - 타임라인을 진행하며 새로 위협받는 사용자만 조회"""
+    return await FireSpreadAPI.get_threatened_users(dataset, simulation, from_minutes, to_minutes)
+
+# ============== 대피소 안내 ==============
+
+@app.post("/shelters", response_model=ShelterRegistrationResponse)
+async def register_shelters(registration: ShelterRegistration):
+    """대피소 위치 등록 - 같은 shelter_id는 이름/위치만 갱신"""
+    return await FireSpreadAPI.register_shelters(registration)
+
+@app.get("/shelters/{dataset}/{simulation}/nearest", response_model=NearestShelterResponse)
+async def get_nearest_shelter(
+    dataset: str,
+    simulation: int = Path(..., ge=1),
+    lat: float = Query(...),
+    lon: float = Query(...),
+    minutes: int = Query(0, ge=0, description="출발 시각 (발화 후 분)"),
+):
+    """출발 시각에 화재를 피해 갈 수 있는 가장 가까운 대피소"""
+    return await FireSpreadAPI.get_nearest_shelter(dataset, simulation, lat, lon, minutes)
 
 if __name__ == "__main__":
     import uvicorn
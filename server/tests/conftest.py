@@ -0,0 +1,7 @@
+"""server 폴더를 import 경로에 추가 (main, api 패키지)"""
+import os
+import sys
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SERVER_DIR not in sys.path:
+    sys.path.insert(0, SERVER_DIR)
@@ -0,0 +1,48 @@
+"""
+API 테스트 공통 도우미 (Korean40x40 시뮬레이션 1 결과 사용)
+"""
+import os
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from main import app
+from api.data_handler import RESULTS_BASE_PATH
+
+DATASET = "Korean40x40"
+SIMULATION = 1
+ROWS, COLS = 40, 40
+# 스냅샷 시각(분): 연소 셀 수 (30분 간격 스냅샷 ForestGrid01, 02, 03, 07)
+SNAPSHOT_COUNTS = {30: 2, 60: 5, 90: 12, 210: 350}
+SUB_PERIOD_MINUTES, SUB_PERIOD_COUNT = 45, 4
+MINUTES = (30, 45, 60, 90, 210)
+
+client = TestClient(app)
+
+
+def fire_spread_url(minutes: int) -> str:
+    return f"/fire-spread/{DATASET}/{SIMULATION}/{minutes}"
+
+
+def snapshot_mask(minutes: int) -> np.ndarray:
+    """ForestGrid CSV를 직접 읽은 연소 마스크"""
+    path = os.path.join(RESULTS_BASE_PATH, DATASET, "Grids", f"Grids{SIMULATION}", f"ForestGrid{minutes // 30:02d}.csv")
+    return np.loadtxt(path, delimiter=",", dtype=np.int64).astype(bool)
+
+
+def pixels_mask(pixels) -> np.ndarray:
+    """BurnedPixel 목록 -> 연소 마스크"""
+    mask = np.zeros((ROWS, COLS), dtype=bool)
+    for pixel in pixels:
+        mask[pixel["row"], pixel["col"]] = True
+    return mask
+
+
+def json_mask(minutes: int) -> np.ndarray:
+    """기본 JSON 응답(픽셀 목록)의 연소 마스크"""
+    response = client.get(fire_spread_url(minutes))
+    assert response.status_code == 200, response.text
+    body = response.json()
+    mask = pixels_mask(body["burned_coordinates"])
+    assert body["total_burned_pixels"] == np.count_nonzero(mask)
+    return mask
@@ -0,0 +1,42 @@
+"""
+도달 시간 임계값 테스트
+
+- 도달 시간(MessagesFile01.csv로 계산) 임계값이 ForestGrid 스냅샷과 같은지
+- 스냅샷 사이 시간(45분)이 이웃 스냅샷 사이에 있는지
+
+사용 예 (server 폴더에서):
+    python -m pytest -q tests
+"""
+import unittest
+
+import numpy as np
+
+from support import (SNAPSHOT_COUNTS, SUB_PERIOD_COUNT, SUB_PERIOD_MINUTES, client, fire_spread_url, json_mask,
+                     snapshot_mask)
+
+
+class TestArrivalThresholds(unittest.TestCase):
+
+    def test_snapshot_minutes_match_forest_grids(self):
+        for minutes, count in SNAPSHOT_COUNTS.items():
+            with self.subTest(minutes=minutes):
+                expected = snapshot_mask(minutes)
+                self.assertEqual(np.count_nonzero(expected), count)
+                np.testing.assert_array_equal(json_mask(minutes), expected)
+
+    def test_metadata_reports_snapshot_and_source(self):
+        metadata = client.get(fire_spread_url(45)).json()["metadata"]
+        self.assertEqual(metadata["grid_file"], "ForestGrid01.csv")
+        self.assertEqual(metadata["source"], "MessagesFile01.csv")
+
+    def test_sub_period_minute_between_snapshots(self):
+        before, middle, after = json_mask(30), json_mask(SUB_PERIOD_MINUTES), json_mask(60)
+        self.assertEqual(np.count_nonzero(middle), SUB_PERIOD_COUNT)
+        self.assertTrue((before <= middle).all())
+        self.assertTrue((middle <= after).all())
+        self.assertLess(np.count_nonzero(before), SUB_PERIOD_COUNT)
+        self.assertGreater(np.count_nonzero(after), SUB_PERIOD_COUNT)
+
+
+if __name__ == "__main__":
+    unittest.main()
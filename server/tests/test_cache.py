@@ -0,0 +1,69 @@
+"""
+격자 캐시 테스트
+
+- nbytes가 없는 파생 결과(튜플, 일반 객체)도 바이트 한도에 포함되는지
+- 바이트 한도를 넘으면 오래된 항목부터 제거하는지
+
+사용 예 (server 폴더에서):
+    python -m pytest -q tests
+"""
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from api.cache import GridCache, _sizeof
+
+
+class Holder:
+    """nbytes가 없는 파생 결과"""
+
+    def __init__(self, array: np.ndarray):
+        self.array = array
+        self.name = "holder"
+
+
+class TestSizeof(unittest.TestCase):
+
+    def test_derived_values_are_counted(self):
+        indices = np.zeros(1000, dtype=np.uint8)
+        self.assertGreaterEqual(_sizeof((indices, "version")), 1000)
+        self.assertGreaterEqual(_sizeof(Holder(np.zeros(500, dtype=np.float64))), 4000)
+        self.assertGreaterEqual(_sizeof({"mask": indices}), 1000)
+        self.assertGreaterEqual(_sizeof(b"x" * 100), 100)
+
+    def test_memmap_is_not_counted(self):
+        with tempfile.TemporaryDirectory() as workdir:
+            memmap = np.memmap(os.path.join(workdir, "mask.bin"), dtype=np.uint8, mode="w+", shape=(1000,))
+            self.assertEqual(_sizeof(memmap), 0)
+            del memmap
+
+    def test_cycle(self):
+        holder = Holder(np.zeros(10))
+        holder.self = holder
+        self.assertGreater(_sizeof(holder), 80)
+
+
+class TestByteBudget(unittest.TestCase):
+
+    def test_derived_entries_are_evicted(self):
+        cache = GridCache(max_bytes=10_000)
+        for i in range(5):
+            cache.get_derived(("tile-raster", i), "v", lambda: (np.zeros(3000, dtype=np.uint8), "v"))
+        stats = cache.stats()
+        self.assertEqual(stats["entries"], 3)
+        self.assertGreater(stats["bytes"], 9000)
+        self.assertLessEqual(stats["bytes"], 10_000)
+        self.assertIsNone(cache.peek(("tile-raster", 0)))
+        self.assertIsNotNone(cache.peek(("tile-raster", 4)))
+
+    def test_oversized_derived_entry_is_not_cached(self):
+        cache = GridCache(max_bytes=1000)
+        value = cache.get_derived("holder", "v", lambda: Holder(np.zeros(1000)))
+        self.assertIsInstance(value, Holder)
+        self.assertEqual(cache.stats()["entries"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
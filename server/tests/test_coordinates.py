@@ -0,0 +1,94 @@
+"""
+좌표 인덱스 캐시 테스트 (Korean40x40 입력 파일 사본 사용)
+
+- Data.csv, Forest.asc, IgnitionPoints.csv 중 하나만 바뀌어도 인덱스를 다시 만드는지
+- 결과 폴더 이름(_full)이 입력 데이터셋 폴더로 이어지는지
+
+사용 예 (server 폴더에서):
+    python -m pytest -q tests
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from api import data_handler
+from api.cache import grid_cache
+from api.coordinates import COORDINATE_SOURCES
+from api.data_handler import DataHandler
+
+DATASET = "Korean40x40"
+
+
+def touch(path: str) -> None:
+    """mtime을 1초 뒤로 (파일 시스템 시각 해상도와 관계없이 버전이 바뀌도록)"""
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+class TestCoordinateIndexVersion(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp(prefix="c2f-coordinates-")
+        self.data_folder = os.path.join(self.workdir, DATASET)
+        os.makedirs(self.data_folder)
+        for name in COORDINATE_SOURCES:
+            shutil.copy(os.path.join(data_handler.DATA_BASE_PATH, DATASET, name), self.data_folder)
+        patches = [mock.patch.object(data_handler, "DATA_BASE_PATH", self.workdir),
+                   mock.patch.object(grid_cache, "revalidate_seconds", 0.0)]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        grid_cache.invalidate(("coordinates", self.data_folder))
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def _write(self, name: str, text: str) -> None:
+        path = os.path.join(self.data_folder, name)
+        with open(path, "w") as f:
+            f.write(text)
+        touch(path)
+
+    def test_input_dataset_folder(self):
+        self.assertEqual(DataHandler.get_data_folder(DATASET + "_full"), self.data_folder)
+
+    def test_unchanged_inputs_reuse_index(self):
+        index = DataHandler.get_coordinate_index(DATASET)
+        self.assertEqual((index.rows, index.cols, index.ignition_cell), (40, 40, 969))
+        self.assertIs(DataHandler.get_coordinate_index(DATASET + "_full"), index)
+
+    def test_ignition_points_change(self):
+        index = DataHandler.get_coordinate_index(DATASET)
+        self._write("IgnitionPoints.csv", "Year,Ncell\n1,5\n")
+        changed = DataHandler.get_coordinate_index(DATASET)
+        self.assertIsNot(changed, index)
+        self.assertEqual(changed.ignition_cell, 4)
+
+    def test_forest_change(self):
+        self.assertEqual(DataHandler.get_coordinate_index(DATASET).grid_size, "40x40")
+        # 헤더가 격자 수와 맞지 않으면 정사각형으로 가정하므로 20x80으로 바꿔 확인
+        path = os.path.join(self.data_folder, "Forest.asc")
+        with open(path) as f:
+            lines = f.readlines()
+        self._write("Forest.asc", "ncols 80\nnrows 20\n" + "".join(lines[2:]))
+        self.assertEqual(DataHandler.get_coordinate_index(DATASET).grid_size, "20x80")
+
+    def test_data_change(self):
+        index = DataHandler.get_coordinate_index(DATASET)
+        path = os.path.join(self.data_folder, "Data.csv")
+        with open(path) as f:
+            text = f.read()
+        self._write("Data.csv", text.replace("36.066012045635965", "37.5", 1))
+        changed = DataHandler.get_coordinate_index(DATASET)
+        self.assertEqual(changed.lat[0], 37.5)
+        self.assertEqual(changed.lat[1:].tolist(), index.lat[1:].tolist())
+
+    def test_missing_data_csv(self):
+        os.remove(os.path.join(self.data_folder, "Data.csv"))
+        self.assertIsNone(DataHandler.get_coordinate_index(DATASET))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,30 @@
+"""
+delta 응답 테스트: from 마스크에 added를 더하고 removed를 빼면 to 마스크가 되는지
+
+사용 예 (server 폴더에서):
+    python -m pytest -q tests
+"""
+import unittest
+
+import numpy as np
+
+from support import DATASET, SIMULATION, client, json_mask, pixels_mask
+
+
+class TestDelta(unittest.TestCase):
+
+    def test_delta(self):
+        for from_minutes, to_minutes in ((30, 45), (45, 90), (90, 30), (30, 210)):
+            with self.subTest(from_minutes=from_minutes, to_minutes=to_minutes):
+                response = client.get(f"/fire-spread/{DATASET}/{SIMULATION}/delta",
+                                      params={"from": from_minutes, "to": to_minutes})
+                self.assertEqual(response.status_code, 200, response.text)
+                body = response.json()
+                mask = json_mask(from_minutes)
+                mask |= pixels_mask(body["added_coordinates"])
+                mask &= ~pixels_mask(body["removed_coordinates"])
+                np.testing.assert_array_equal(mask, json_mask(to_minutes))
+
+
+if __name__ == "__main__":
+    unittest.main()
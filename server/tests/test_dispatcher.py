@@ -0,0 +1,105 @@
+"""
+알림 발송기 테스트
+
+- 같은 사건의 같은 수신자는 중복 제거 기간 동안 한 번만 보내는지
+- 큐가 가득 차거나 시작 전이면 블로킹 없이 버리는지
+- 배치 창/최대 배치 크기로 모아서 보내는지
+
+사용 예 (server 폴더에서):
+    python -m pytest -q tests
+"""
+import time
+import asyncio
+import unittest
+
+from api.dispatcher import AlertDispatcher, AlertEvent
+
+
+class RecordingSink:
+    """받은 배치를 기록하는 싱크 (fail이면 전송 오류)"""
+
+    def __init__(self, fail: bool = False):
+        self.batches = []
+        self.fail = fail
+
+    async def send_batch(self, alerts):
+        if self.fail:
+            raise RuntimeError("sink down")
+        self.batches.append([alert.recipient for alert in alerts])
+
+
+def event(recipient: str, dataset: str = "Korean40x40") -> AlertEvent:
+    return AlertEvent(recipient, dataset, 1, 30.0, time.time())
+
+
+class TestAlertDispatcher(unittest.TestCase):
+
+    def _run(self, dispatcher, scenario):
+        async def main():
+            await dispatcher.start()
+            try:
+                return await scenario()
+            finally:
+                await dispatcher.stop()
+        return asyncio.run(main())
+
+    def test_dedupe(self):
+        sink = RecordingSink()
+        dispatcher = AlertDispatcher(sink, batch_window_seconds=0.01, dedupe_seconds=0.2)
+
+        async def scenario():
+            accepted = [dispatcher.submit(event("u1")), dispatcher.submit(event("u1")),
+                        dispatcher.submit(event("u1", "Sub40x40")), dispatcher.submit(event("u2"))]
+            await asyncio.sleep(0.25)
+            accepted.append(dispatcher.submit(event("u1")))  # 중복 제거 기간이 지나면 다시 보냄
+            return accepted
+
+        self.assertEqual(self._run(dispatcher, scenario), [True, False, True, True, True])
+        self.assertEqual(sorted(sum(sink.batches, [])), ["u1", "u1", "u1", "u2"])
+        metrics = dispatcher.metrics()
+        self.assertEqual((metrics["enqueued"], metrics["deduplicated"], metrics["sent"]), (4, 1, 4))
+
+    def test_drop_when_full(self):
+        sink = RecordingSink()
+        dispatcher = AlertDispatcher(sink, queue_size=2, batch_window_seconds=0.01)
+        self.assertFalse(dispatcher.submit(event("before-start")))
+
+        async def scenario():
+            # 발송 작업이 돌기 전에 연달아 등록하면 큐 크기를 넘는 알림은 버림
+            return [dispatcher.submit(event(f"u{i}")) for i in range(5)]
+
+        self.assertEqual(self._run(dispatcher, scenario), [True, True, False, False, False])
+        self.assertEqual(sum(sink.batches, []), ["u0", "u1"])
+        metrics = dispatcher.metrics()
+        self.assertEqual((metrics["dropped"], metrics["sent"], metrics["queue_depth"]), (4, 2, 0))
+
+    def test_batching(self):
+        sink = RecordingSink()
+        dispatcher = AlertDispatcher(sink, batch_window_seconds=0.2, max_batch=3)
+
+        async def scenario():
+            for i in range(7):
+                dispatcher.submit(event(f"u{i}"))
+            await asyncio.sleep(0.05)
+            dispatcher.submit(event("late"))  # 마지막 배치 창 안에 도착
+
+        self._run(dispatcher, scenario)
+        self.assertEqual(sink.batches, [["u0", "u1", "u2"], ["u3", "u4", "u5"], ["u6", "late"]])
+        metrics = dispatcher.metrics()
+        self.assertEqual((metrics["batches"], metrics["sent"]), (3, 8))
+        self.assertGreaterEqual(metrics["latency_max_seconds"], 0.0)
+
+    def test_sink_error_counts_failed(self):
+        dispatcher = AlertDispatcher(RecordingSink(fail=True), batch_window_seconds=0.01)
+
+        async def scenario():
+            dispatcher.submit(event("u1"))
+            dispatcher.submit(event("u2"))
+
+        self._run(dispatcher, scenario)
+        metrics = dispatcher.metrics()
+        self.assertEqual((metrics["failed"], metrics["sent"], metrics["batches"]), (2, 0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+"""
+응답 단위 캐시 테스트
+
+- SingleFlight가 같은 키의 동시 요청을 계산 한 번으로 묶는지
+- If-None-Match가 맞으면 304를 반환하는지
+- Accept-Encoding이 허용할 때만 gzip 본문을 반환하는지
+
+사용 예 (server 폴더에서):
+    python -m pytest -q tests
+"""
+import asyncio
+import unittest
+
+from api.http_cache import SingleFlight, accepts_gzip
+from support import client
+
+URL = "/korean-fire-spread/150"
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def test_concurrent_calls_share_one_computation(self):
+        flights = SingleFlight()
+        calls = []
+
+        async def compute(key):
+            calls.append(key)
+            await asyncio.sleep(0.01)
+            return f"result-{key}"
+
+        async def main():
+            return await asyncio.gather(*[flights.do(key, lambda key=key: compute(key))
+                                          for key in ["a"] * 10 + ["b"] * 5])
+
+        results = asyncio.run(main())
+        self.assertEqual(results, ["result-a"] * 10 + ["result-b"] * 5)
+        self.assertEqual(sorted(calls), ["a", "b"])
+        self.assertEqual(flights.stats(), {"inflight": 0, "leaders": 2, "followers": 13})
+
+    def test_error_reaches_every_waiter_and_is_not_cached(self):
+        flights = SingleFlight()
+        calls = []
+
+        async def fail():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            raise ValueError("build failed")
+
+        async def main():
+            results = await asyncio.gather(*[flights.do("key", fail) for _ in range(3)], return_exceptions=True)
+            again = await flights.do("key", lambda: asyncio.sleep(0, result="ok"))
+            return results, again
+
+        results, again = asyncio.run(main())
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(again, "ok")
+
+
+class TestCachedResponse(unittest.TestCase):
+
+    def test_if_none_match_returns_304(self):
+        response = client.get(URL)
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers["etag"]
+        self.assertTrue(etag.startswith('W/"'))
+
+        for if_none_match in (etag, etag[2:], f'"other", {etag}', "*"):
+            with self.subTest(if_none_match=if_none_match):
+                revalidated = client.get(URL, headers={"If-None-Match": if_none_match})
+                self.assertEqual(revalidated.status_code, 304)
+                self.assertEqual(revalidated.content, b"")
+                self.assertEqual(revalidated.headers["etag"], etag)
+
+        self.assertEqual(client.get(URL, headers={"If-None-Match": '"other"'}).status_code, 200)
+
+    def test_gzip_only_when_accepted(self):
+        identity = client.get(URL, headers={"Accept-Encoding": "identity"})
+        self.assertNotIn("content-encoding", identity.headers)
+
+        for accept_encoding in ("gzip", "br, gzip;q=0.5", "*"):
+            with self.subTest(accept_encoding=accept_encoding):
+                compressed = client.get(URL, headers={"Accept-Encoding": accept_encoding})
+                self.assertEqual(compressed.headers["content-encoding"], "gzip")
+                self.assertEqual(compressed.content, identity.content)
+                self.assertLess(int(compressed.headers["content-length"]), len(identity.content))
+                self.assertEqual(compressed.headers["etag"], identity.headers["etag"])
+
+        for accept_encoding in ("gzip;q=0", "br", "deflate"):
+            with self.subTest(accept_encoding=accept_encoding):
+                response = client.get(URL, headers={"Accept-Encoding": accept_encoding})
+                self.assertNotIn("content-encoding", response.headers)
+                self.assertEqual(response.content, identity.content)
+
+    def test_accepts_gzip(self):
+        cases = {None: False, "": False, "gzip": True, "GZIP": True, "gzip; q=0.8": True,
+                 "gzip;q=0": False, "deflate, gzip": True, "*;q=0": False, "gzip;q=x": False}
+        for accept_encoding, expected in cases.items():
+            with self.subTest(accept_encoding=accept_encoding):
+                self.assertEqual(accepts_gzip(accept_encoding), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,187 @@
+"""
+시뮬레이션 작업 큐 테스트 (엔진 호출은 대체)
+
+- 작업 ID가 요청 내용과 입력 폴더의 모든 파일 버전을 반영하는지
+- 같은 입력은 엔진을 한 번만 실행하고, 실패한 작업은 다시 실행하는지
+- 완료된 결과 폴더가 results로 옮겨지고 결과 저장소에 적재되는지
+
+사용 예 (server 폴더에서):
+    python -m pytest -q tests
+"""
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import numpy as np
+
+from api import jobs
+from api.data_handler import CELL2FIRE_DIR, DATA_BASE_PATH, RESULTS_BASE_PATH
+from api.store import ResultsStore
+
+DATASET = "Korean40x40"
+SPEC = {"ignition_cell": 820, "weather": None, "nsims": 1, "ros_cv": 0.0, "seed": 123}
+
+
+class JobsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp(prefix="c2f-jobs-")
+        self.data_path = os.path.join(self.workdir, "data")
+        self.results_path = os.path.join(self.workdir, "results")
+        self.jobs_path = os.path.join(self.workdir, "jobs")
+        self.base_folder = os.path.join(self.data_path, DATASET)
+        shutil.copytree(os.path.join(DATA_BASE_PATH, DATASET), self.base_folder)
+        os.makedirs(self.results_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+
+class TestComputeJobId(JobsTestCase):
+
+    def test_same_input_same_id(self):
+        job_id = jobs.compute_job_id(SPEC, self.base_folder)
+        self.assertEqual(len(job_id), jobs.JOB_ID_LENGTH)
+        self.assertEqual(jobs.compute_job_id(dict(SPEC), self.base_folder), job_id)
+        self.assertNotEqual(jobs.compute_job_id({**SPEC, "seed": 124}, self.base_folder), job_id)
+
+    def test_any_input_file_changes_id(self):
+        job_id = jobs.compute_job_id(SPEC, self.base_folder)
+        for name in ("Forest.asc", "Weather.csv", os.path.join("Weathers", sorted(os.listdir(
+                os.path.join(self.base_folder, "Weathers")))[0])):
+            with self.subTest(name=name):
+                path = os.path.join(self.base_folder, name)
+                stat = os.stat(path)
+                os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+                changed = jobs.compute_job_id(SPEC, self.base_folder)
+                self.assertNotEqual(changed, job_id)
+                job_id = changed
+
+
+class TestSimulationJobQueue(JobsTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.completed = 0
+        self.queue = jobs.SimulationJobQueue(self.data_path, self.results_path, self.jobs_path, CELL2FIRE_DIR,
+                                             on_complete=self._on_complete, max_pending=2)
+        # 작업 프로세스 대신 스레드에서 실행해 대체한 엔진 호출이 보이도록 함
+        self.queue._executor = ThreadPoolExecutor(max_workers=1)
+        self.release = threading.Event()
+        self.calls = []
+
+    def tearDown(self):
+        self.release.set()
+        self.queue._executor.shutdown(wait=True)
+        super().tearDown()
+
+    def _on_complete(self):
+        self.completed += 1
+
+    def _run(self, cell2fire_dir, base_folder, job_folder, result_folder, spec, results_db):
+        self.calls.append(spec)
+        self.release.wait(5)
+        if spec.get("fail"):
+            raise RuntimeError("engine failed")
+        os.makedirs(os.path.join(result_folder, "Grids"))
+        return result_folder
+
+    def _wait(self, job):
+        self.release.set()
+        self.queue._executor.submit(lambda: None).result(5)  # 작업 스레드가 하나이므로 앞 작업이 끝남
+        return job
+
+    def test_duplicate_submit_runs_once(self):
+        with mock.patch.object(jobs, "run_simulation_job", self._run):
+            job, started = self.queue.submit(DATASET, SPEC)
+            again, started_again = self.queue.submit(DATASET, dict(SPEC))
+            self._wait(job)
+        self.assertTrue(started)
+        self.assertFalse(started_again)
+        self.assertIs(again, job)
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual((job.status, self.completed), ("done", 1))
+        self.assertEqual(job.result_dataset, jobs.job_dataset_name(DATASET, job.job_id))
+
+    def test_result_on_disk_is_reused(self):
+        job_id = jobs.compute_job_id({"dataset": DATASET, **SPEC}, self.base_folder)
+        os.makedirs(os.path.join(self.results_path, jobs.job_dataset_name(DATASET, job_id), "Grids"))
+        with mock.patch.object(jobs, "run_simulation_job", self._run):
+            job, started = self.queue.submit(DATASET, SPEC)
+        self.assertFalse(started)
+        self.assertTrue(job.cached)
+        self.assertEqual(job.status, "done")
+        self.assertEqual(self.calls, [])
+
+    def test_failed_job_is_resubmitted(self):
+        spec = {**SPEC, "fail": True}
+        with mock.patch.object(jobs, "run_simulation_job", self._run):
+            job, _ = self.queue.submit(DATASET, spec)
+            self._wait(job)
+            self.assertEqual(job.status, "failed")
+            self.assertIn("engine failed", job.error)
+            self.assertEqual(self.completed, 0)
+
+            retry, started = self.queue.submit(DATASET, spec)
+            self._wait(retry)
+        self.assertTrue(started)
+        self.assertIsNot(retry, job)
+        self.assertEqual(len(self.calls), 2)
+
+    def test_queue_full(self):
+        with mock.patch.object(jobs, "run_simulation_job", self._run):
+            self.queue.submit(DATASET, SPEC)
+            self.queue.submit(DATASET, {**SPEC, "seed": 1})
+            with self.assertRaises(jobs.JobQueueFullError):
+                self.queue.submit(DATASET, {**SPEC, "seed": 2})
+
+
+class FakeEngineWorkers:
+    """엔진 워커 풀 대체: 저장된 Korean40x40 결과를 출력 폴더에 복사"""
+
+    def __init__(self):
+        self.ignitions = None
+
+    def run(self, args, output_folder, ignitions=None, weather=None):
+        self.ignitions = ignitions
+        shutil.copytree(os.path.join(RESULTS_BASE_PATH, DATASET), output_folder,
+                        ignore=shutil.ignore_patterns("*.png", "*.py"))
+
+
+class TestRunSimulationJob(JobsTestCase):
+
+    def test_result_is_moved_and_ingested(self):
+        job_folder = os.path.join(self.jobs_path, "job")
+        result_dataset = jobs.job_dataset_name(DATASET, "0" * jobs.JOB_ID_LENGTH)
+        result_folder = os.path.join(self.results_path, result_dataset)
+        os.makedirs(os.path.join(result_folder, "stale"))  # 이전 실행의 남은 폴더는 교체
+        results_db = os.path.join(self.workdir, "results.sqlite")
+        engine = FakeEngineWorkers()
+
+        with mock.patch.object(jobs, "USE_ENGINE_WORKERS", True), \
+                mock.patch.object(jobs, "_engine_worker_pool", lambda: engine):
+            path = jobs.run_simulation_job(CELL2FIRE_DIR, self.base_folder, job_folder, result_folder, SPEC,
+                                           results_db)
+
+        self.assertEqual(path, result_folder)
+        self.assertEqual(engine.ignitions, [SPEC["ignition_cell"]])
+        self.assertFalse(os.path.exists(os.path.join(job_folder, "output")))
+        self.assertFalse(os.path.exists(os.path.join(result_folder, "stale")))
+        with open(os.path.join(job_folder, "input", "Ignitions.csv")) as f:
+            self.assertEqual(f.read(), f"Year,Ncell\n1,{SPEC['ignition_cell']}\n")
+
+        store = ResultsStore(results_db)
+        info = store.dataset_info(result_dataset)
+        self.assertEqual((info["input_dataset"], info["rows"], info["cols"]), (DATASET, 40, 40))
+        self.assertEqual(info["steps"][1], tuple(range(8)))
+        expected = np.loadtxt(os.path.join(result_folder, "Grids", "Grids1", "ForestGrid07.csv"),
+                              delimiter=",").astype(bool)
+        np.testing.assert_array_equal(store.load_mask(result_dataset, 1, 7, 40, 40), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+"""
+결과 목록 테스트 (Korean40x40 결과 폴더 사본 사용)
+
+- 서명이 같은 데이터셋은 다시 스캔하지 않고, 폴더가 바뀐 데이터셋만 다시 스캔하는지
+- 결과 저장소에 적재한 데이터셋의 도달 시간 출처(저장소, MessagesFile, CellArrival)가 맞는지
+
+사용 예 (server 폴더에서):
+    python -m pytest -q tests
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from api.data_handler import RESULTS_BASE_PATH
+from api.manifest import ResultsManifest
+from api.store import ResultsStore
+
+DATASET = "Korean40x40"
+
+
+def scanned_names(manifest: ResultsManifest):
+    """refresh 중 다시 스캔한 데이터셋 이름"""
+    with mock.patch.object(manifest, "_scan_dataset", wraps=manifest._scan_dataset) as scan:
+        manifest.refresh()
+    return sorted(call.args[0] for call in scan.call_args_list)
+
+
+def touch(path: str) -> None:
+    """mtime을 1초 뒤로 (파일 시스템 시각 해상도와 관계없이 서명이 바뀌도록)"""
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+class ManifestTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp(prefix="c2f-manifest-")
+        self.results_path = os.path.join(self.workdir, "results")
+        self.result_path = os.path.join(self.results_path, DATASET)
+        shutil.copytree(os.path.join(RESULTS_BASE_PATH, DATASET), self.result_path,
+                        ignore=shutil.ignore_patterns("*.png", "*.py"))
+
+    def tearDown(self):
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+
+class TestRescan(ManifestTestCase):
+
+    def test_unchanged_dataset_is_not_rescanned(self):
+        manifest = ResultsManifest(self.results_path)
+        entry = manifest.get(DATASET)
+        self.assertEqual(entry.steps, {1: tuple(range(8))})
+        self.assertEqual((entry.rows, entry.cols), (40, 40))
+        self.assertEqual(entry.messages_simulations, {1})
+
+        self.assertEqual(scanned_names(manifest), [])
+        self.assertIs(manifest.get(DATASET), entry)
+
+    def test_changed_dataset_is_rescanned(self):
+        manifest = ResultsManifest(self.results_path)
+        entry = manifest.get(DATASET)
+        other = os.path.join(self.results_path, "Other")
+        shutil.copytree(self.result_path, other)
+
+        grids = os.path.join(self.result_path, "Grids", "Grids1")
+        shutil.copy(os.path.join(grids, "ForestGrid07.csv"), os.path.join(grids, "ForestGrid08.csv"))
+        touch(grids)
+        self.assertEqual(scanned_names(manifest), [DATASET, "Other"])
+        self.assertIsNot(manifest.get(DATASET), entry)
+        self.assertEqual(manifest.get(DATASET).steps, {1: tuple(range(9))})
+
+        shutil.rmtree(other)
+        manifest.refresh()
+        self.assertEqual(manifest.dataset_names(), [DATASET])
+
+    def test_store_ingest_triggers_rescan(self):
+        store = ResultsStore(os.path.join(self.workdir, "results.sqlite"))
+        manifest = ResultsManifest(self.results_path, store=store)
+        self.assertFalse(manifest.get(DATASET).stored)
+
+        store.ingest(DATASET, self.result_path, DATASET)
+        manifest.refresh()
+        self.assertTrue(manifest.get(DATASET).stored)
+
+
+class TestStoredEntry(ManifestTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.store = ResultsStore(os.path.join(self.workdir, "results.sqlite"))
+
+    def _entry(self):
+        self.store.ingest(DATASET, self.result_path, DATASET)
+        return ResultsManifest(self.results_path, store=self.store).get(DATASET)
+
+    def test_messages_arrival(self):
+        entry = self._entry()
+        self.assertEqual(entry.store_version, self.store.version(DATASET))
+        self.assertTrue(entry.has_store_arrival(1))
+        self.assertTrue(entry.has_messages(1))
+        self.assertFalse(entry.has_engine_arrival(1))
+        self.assertFalse(entry.has_store_arrival(2))
+
+    def test_engine_arrival(self):
+        os.remove(os.path.join(self.result_path, "Messages", "MessagesFile01.csv"))
+        cells = np.zeros((40, 40), dtype=[("period", "<i4"), ("time", "<f4")])
+        cells["period"] = -1
+        cells[20, 20] = (0, 0.0)
+        os.makedirs(os.path.join(self.result_path, "CellArrival"))
+        np.save(os.path.join(self.result_path, "CellArrival", "CellArrival01.npy"), cells)
+
+        entry = self._entry()
+        self.assertTrue(entry.has_store_arrival(1))
+        self.assertTrue(entry.has_engine_arrival(1))
+        self.assertFalse(entry.has_messages(1))
+        arrival = self.store.load_arrival(DATASET, 1, 40, 40)
+        self.assertEqual(np.isfinite(arrival).sum(), 1)
+
+    def test_no_arrival(self):
+        os.remove(os.path.join(self.result_path, "Messages", "MessagesFile01.csv"))
+        entry = self._entry()
+        self.assertTrue(entry.stored)
+        self.assertFalse(entry.has_store_arrival(1))
+        self.assertFalse(entry.has_messages(1))
+
+
+if __name__ == "__main__":
+    unittest.main()
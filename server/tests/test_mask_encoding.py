@@ -0,0 +1,64 @@
+"""
+압축 마스크 응답 테스트
+
+- mask+json / octet-stream 응답(bitmask, rle)이 JSON 픽셀 응답과 같은 셀을 나타내는지
+- Accept 헤더의 q 값으로 형식을 고르는지
+
+사용 예 (server 폴더에서):
+    python -m pytest -q tests
+"""
+import base64
+import unittest
+
+import numpy as np
+
+from api.encoding import (MASK_BINARY_MEDIA_TYPE, MASK_JSON_MEDIA_TYPE, decode_mask, negotiate_mask_format,
+                          unpack_binary)
+from support import MINUTES, client, fire_spread_url, json_mask
+
+
+class TestMaskEncoding(unittest.TestCase):
+
+    def test_mask_json(self):
+        for minutes in MINUTES:
+            for encoding in ("bitmask", "rle"):
+                with self.subTest(minutes=minutes, encoding=encoding):
+                    response = client.get(fire_spread_url(minutes), params={"encoding": encoding},
+                                          headers={"Accept": MASK_JSON_MEDIA_TYPE})
+                    self.assertEqual(response.headers["content-type"], MASK_JSON_MEDIA_TYPE)
+                    body = response.json()
+                    mask = decode_mask(base64.b64decode(body["data"]), encoding, body["rows"], body["cols"])
+                    np.testing.assert_array_equal(mask, json_mask(minutes))
+                    self.assertEqual(body["total_burned_pixels"], np.count_nonzero(mask))
+
+    def test_mask_binary(self):
+        for minutes in MINUTES:
+            for encoding in ("bitmask", "rle"):
+                with self.subTest(minutes=minutes, encoding=encoding):
+                    response = client.get(fire_spread_url(minutes), params={"encoding": encoding},
+                                          headers={"Accept": MASK_BINARY_MEDIA_TYPE})
+                    self.assertEqual(response.headers["content-type"], MASK_BINARY_MEDIA_TYPE)
+                    header, mask = unpack_binary(response.content)
+                    self.assertEqual((header["encoding"], header["time_minutes"]), (encoding, minutes))
+                    np.testing.assert_array_equal(mask, json_mask(minutes))
+
+
+class TestNegotiateMaskFormat(unittest.TestCase):
+
+    def test_q_values(self):
+        cases = {
+            None: None,
+            "*/*": None,
+            "application/octet-stream;q=0, application/json": None,
+            "application/json, application/octet-stream;q=0.5": None,
+            "application/octet-stream, application/json;q=0.9": MASK_BINARY_MEDIA_TYPE,
+            f"{MASK_JSON_MEDIA_TYPE};q=0.2, {MASK_BINARY_MEDIA_TYPE};q=0.8": MASK_BINARY_MEDIA_TYPE,
+            f"{MASK_BINARY_MEDIA_TYPE}, {MASK_JSON_MEDIA_TYPE}": MASK_JSON_MEDIA_TYPE,
+        }
+        for accept, expected in cases.items():
+            with self.subTest(accept=accept):
+                self.assertEqual(negotiate_mask_format(accept), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+"""
+perimeter 응답 테스트
+
+- GeoJSON 폴리곤 안의 셀 중심이 JSON 픽셀 응답과 같은 셀인지
+- 단순화한 링이 자기 자신이나 다른 링과 교차하지 않는지 (링별 Douglas-Peucker만으로는 교차하는 마스크)
+
+사용 예 (server 폴더에서):
+    python -m pytest -q tests
+"""
+import unittest
+
+import numpy as np
+
+from api.encoding import MASK_JSON_MEDIA_TYPE
+from api.perimeter import _douglas_peucker, _trace_rings, label_components, polygonize
+from support import COLS, MINUTES, ROWS, client, fire_spread_url, json_mask
+
+
+def polygon_mask(collection: dict, georeference: dict) -> np.ndarray:
+    """GeoJSON 폴리곤 안에 셀 중심이 있는 셀 (모든 링에 대해 even-odd 규칙)"""
+    rows, cols = np.mgrid[0:ROWS, 0:COLS]
+    x = (georeference["lon_origin"] + cols * georeference["lon_step"]).ravel()
+    y = (georeference["lat_origin"] + rows * georeference["lat_step"]).ravel()
+    inside = np.zeros(x.size, dtype=bool)
+    for feature in collection["features"]:
+        for ring in feature["geometry"]["coordinates"]:
+            ring = np.asarray(ring, dtype=np.float64)
+            x1, y1, x2, y2 = ring[:-1, 0], ring[:-1, 1], ring[1:, 0], ring[1:, 1]
+            crosses = (y1[None, :] > y[:, None]) != (y2[None, :] > y[:, None])
+            with np.errstate(divide="ignore", invalid="ignore"):
+                x_cross = x1 + (y[:, None] - y1) * (x2 - x1) / (y2 - y1)
+            inside ^= (np.count_nonzero(crosses & (x[:, None] < x_cross), axis=1) % 2).astype(bool)
+    return inside.reshape(ROWS, COLS)
+
+
+# 링별 Douglas-Peucker(허용 오차 1셀)로 단순화하면 두 링이 교차하는 마스크
+CROSSING_MASK = np.array([[1, 0, 1, 1, 0, 1],
+                          [1, 1, 1, 0, 0, 1],
+                          [1, 0, 0, 0, 0, 1],
+                          [1, 1, 0, 1, 0, 0],
+                          [0, 1, 1, 1, 0, 1],
+                          [0, 1, 0, 1, 1, 1]], dtype=bool)
+# 위경도 = 격자 꼭짓점 (경도 = 열, 위도 = 행)
+GRID_GEOREFERENCE = {"lat_origin": 0.5, "lon_origin": 0.5, "lat_step": 1.0, "lon_step": 1.0}
+
+
+def segments_touch(a, b, c, d) -> bool:
+    """선분 ab와 cd가 교차하거나 닿는지"""
+    def orient(p, q, r):
+        value = float((q[0] - p[0]) * (r[1] - p[1]) - (q[1] - p[1]) * (r[0] - p[0]))
+        return (value > 0) - (value < 0)
+
+    def between(p, q, r):
+        return min(p[0], q[0]) <= r[0] <= max(p[0], q[0]) and min(p[1], q[1]) <= r[1] <= max(p[1], q[1])
+
+    o1, o2, o3, o4 = orient(c, d, a), orient(c, d, b), orient(a, b, c), orient(a, b, d)
+    if o1 * o2 < 0 and o3 * o4 < 0:
+        return True
+    return ((o1 == 0 and between(c, d, a)) or (o2 == 0 and between(c, d, b))
+            or (o3 == 0 and between(a, b, c)) or (o4 == 0 and between(a, b, d)))
+
+
+def ring_contacts(rings) -> int:
+    """서로 다른 링의 변끼리, 같은 링의 이웃하지 않는 변끼리 닿는 쌍의 수"""
+    edges = [(i, k, ring[k], ring[k + 1]) for i, ring in enumerate(rings) for k in range(len(ring) - 1)]
+    count = 0
+    for x, (i, k, a, b) in enumerate(edges):
+        for j, m, c, d in edges[x + 1:]:
+            n = len(rings[i]) - 1
+            if i == j and (m - k == 1 or (k == 0 and m == n - 1)):
+                continue
+            count += segments_touch(a, b, c, d)
+    return count
+
+
+class TestPerimeter(unittest.TestCase):
+
+    def test_perimeter(self):
+        georeference = client.get(fire_spread_url(30), headers={"Accept": MASK_JSON_MEDIA_TYPE}).json()["georeference"]
+        for minutes in MINUTES:
+            with self.subTest(minutes=minutes):
+                response = client.get(f"{fire_spread_url(minutes)}/perimeter")
+                self.assertEqual(response.status_code, 200, response.text)
+                collection = response.json()
+                expected = json_mask(minutes)
+                np.testing.assert_array_equal(polygon_mask(collection, georeference), expected)
+                burned = sum(feature["properties"]["burned_cells"] for feature in collection["features"])
+                self.assertEqual(burned, np.count_nonzero(expected))
+
+    def test_labels(self):
+        labels, count = label_components(CROSSING_MASK)
+        self.assertEqual(count, 2)
+        self.assertEqual(labels[0, 0], labels[5, 3])  # 4-연결로 이어진 셀
+        self.assertEqual(labels[0, 5], labels[2, 5])
+        self.assertNotEqual(labels[0, 0], labels[0, 5])
+        self.assertEqual(labels[4, 5], labels[5, 3])
+        self.assertEqual(labels[0, 1], 0)
+
+    def test_simplified_rings_do_not_cross(self):
+        rings = [np.asarray(ring, dtype=np.float64) for _, ring in _trace_rings(CROSSING_MASK)]
+        self.assertEqual(ring_contacts(rings), 0)
+        naive = [_douglas_peucker(ring, 1.0) for ring in rings]
+        self.assertGreater(ring_contacts(naive), 0)
+
+        collection = polygonize(CROSSING_MASK, GRID_GEOREFERENCE, simplify=1.0)
+        output = [ring for feature in collection["features"] for ring in feature["geometry"]["coordinates"]]
+        self.assertEqual(len(output), len(rings))
+        self.assertEqual(ring_contacts(output), 0)
+        self.assertEqual(sum(feature["properties"]["burned_cells"] for feature in collection["features"]),
+                         int(CROSSING_MASK.sum()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+"""
+공유 배열 캐시 테스트
+
+- 원본 읽기 오류는 그대로 전달하고 캐시를 끄지 않는지
+- 캐시 폴더를 쓸 수 없을 때만 캐시를 끄고 builder 결과를 반환하는지
+
+사용 예 (server 폴더에서):
+    python -m pytest -q tests
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from api.shared_cache import SharedArrayCache
+
+
+class TestSharedArrayCache(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp(prefix="c2f-shared-")
+        self.source = os.path.join(self.workdir, "source.csv")
+        with open(self.source, "w") as f:
+            f.write("1,2,3\n")
+        self.cache = SharedArrayCache(os.path.join(self.workdir, "cache"))
+
+    def tearDown(self):
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    @staticmethod
+    def _missing_source(*args):
+        raise FileNotFoundError("missing.csv")
+
+    @staticmethod
+    def _save(array):
+        """load_file용 write: 주어진 경로에 그대로 저장 (np.save(path)는 .npy를 덧붙임)"""
+        def write(path):
+            with open(path, "wb") as f:
+                np.save(f, array)
+        return write
+
+    def test_builder_error_does_not_disable(self):
+        with self.assertRaises(FileNotFoundError):
+            self.cache.load("test", self.source, self._missing_source)
+        self.assertFalse(self.cache.stats()["disabled"])
+
+        array = self.cache.load("test", self.source, lambda: np.arange(3))
+        self.assertIsInstance(array, np.memmap)
+        np.testing.assert_array_equal(array, [0, 1, 2])
+        self.assertEqual(self.cache.stats()["built"], 1)
+
+    def test_write_error_does_not_disable(self):
+        with self.assertRaises(FileNotFoundError):
+            self.cache.load_file("test", self.source, self._missing_source, version=1)
+        self.assertFalse(self.cache.stats()["disabled"])
+        self.assertFalse(any(name.endswith(".tmp") for name in os.listdir(self.cache.cache_dir)))
+
+        array = self.cache.load_file("test", self.source, self._save(np.arange(3)), version=1)
+        self.assertIsInstance(array, np.memmap)
+        np.testing.assert_array_equal(array, [0, 1, 2])
+
+    def test_unwritable_cache_dir_disables(self):
+        # 캐시 폴더 자리에 일반 파일이 있으면 makedirs 실패
+        blocked = SharedArrayCache(self.source)
+        array = blocked.load("test", self.source, lambda: np.arange(3))
+        np.testing.assert_array_equal(array, [0, 1, 2])
+        self.assertTrue(blocked.stats()["disabled"])
+
+        array = blocked.load_file("test", self.source, self._save(np.arange(4)), version=1)
+        self.assertNotIsInstance(array, np.memmap)
+        np.testing.assert_array_equal(array, [0, 1, 2, 3])
+
+
+if __name__ == "__main__":
+    unittest.main()
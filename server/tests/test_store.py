@@ -0,0 +1,87 @@
+"""
+결과 저장소 테스트 (Korean40x40 결과 폴더 사본 사용)
+
+- 적재한 격자/도달 시간이 ForestGrid CSV와 같은 셀을 나타내는지
+- 원본 서명이 같으면 다시 적재하지 않고, 결과 폴더가 바뀌면 다시 적재하는지
+
+사용 예 (server 폴더에서):
+    python -m pytest -q tests
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from api.data_handler import RESULTS_BASE_PATH
+from api.manifest import step_minutes_for
+from api.store import ResultsStore
+
+DATASET = "Korean40x40"
+ROWS, COLS = 40, 40
+
+
+class TestResultsStore(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp(prefix="c2f-store-")
+        self.result_path = os.path.join(self.workdir, DATASET)
+        shutil.copytree(os.path.join(RESULTS_BASE_PATH, DATASET), self.result_path,
+                        ignore=shutil.ignore_patterns("*.png", "*.py"))
+        self.grids_folder = os.path.join(self.result_path, "Grids", "Grids1")
+        self.store = ResultsStore(os.path.join(self.workdir, "results.sqlite"))
+        self.step_minutes = step_minutes_for(DATASET)
+
+    def tearDown(self):
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def _ingest(self):
+        return self.store.ingest(DATASET, self.result_path, DATASET, self.step_minutes)
+
+    def _snapshot(self, step):
+        path = os.path.join(self.grids_folder, f"ForestGrid{step:02d}.csv")
+        return np.loadtxt(path, delimiter=",").astype(bool)
+
+    def test_round_trip(self):
+        counts = self._ingest()
+        self.assertEqual((counts["simulations"], counts["grids"], counts["arrivals"]), (1, 8, 1))
+
+        info = self.store.dataset_info(DATASET)
+        self.assertEqual((info["rows"], info["cols"]), (ROWS, COLS))
+        self.assertEqual(info["steps"], {1: tuple(range(8))})
+        self.assertEqual(info["arrival_simulations"], {1})
+
+        arrival = self.store.load_arrival(DATASET, 1, ROWS, COLS)
+        self.assertEqual(arrival.dtype, np.float32)
+        for step in range(1, 8):
+            with self.subTest(step=step):
+                expected = self._snapshot(step)
+                np.testing.assert_array_equal(self.store.load_mask(DATASET, 1, step, ROWS, COLS), expected)
+                np.testing.assert_array_equal(arrival <= step * self.step_minutes, expected)
+
+        with self.assertRaises(FileNotFoundError):
+            self.store.load_mask(DATASET, 1, 8, ROWS, COLS)
+        self.assertIsNone(self.store.load_arrival(DATASET, 2, ROWS, COLS))
+
+    def test_unchanged_signature_skips_ingest(self):
+        self._ingest()
+        version = self.store.version(DATASET)
+        self.assertTrue(self.store.is_current(DATASET, self.result_path))
+        self.assertEqual(self._ingest()["skipped"], 1)
+        self.assertEqual(self.store.version(DATASET), version)
+
+        # 결과 폴더가 바뀌면 (엔진을 다시 실행한 경우) 새로 적재
+        os.remove(os.path.join(self.grids_folder, "ForestGrid07.csv"))
+        grids = os.path.join(self.result_path, "Grids")
+        stat = os.stat(grids)
+        os.utime(grids, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        self.assertFalse(self.store.is_current(DATASET, self.result_path))
+        counts = self._ingest()
+        self.assertNotIn("skipped", counts)
+        self.assertNotEqual(self.store.version(DATASET), version)
+        self.assertEqual(self.store.dataset_info(DATASET)["steps"], {1: tuple(range(7))})
+
+
+if __name__ == "__main__":
+    unittest.main()
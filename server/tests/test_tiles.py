@@ -0,0 +1,170 @@
+"""
+지도 타일 테스트
+
+- 인코딩한 PNG가 올바른 팔레트 PNG이고 픽셀이 입력 번호와 같은지
+- 격자와 겹치지 않는 타일은 투명 타일이고 캐시에 저장하지 않는지
+- 디스크 캐시가 용량을 넘으면 가장 오래 쓰지 않은 타일부터 지우는지
+
+사용 예 (server 폴더에서):
+    python -m pytest -q tests
+"""
+import os
+import math
+import struct
+import shutil
+import tempfile
+import unittest
+import zlib
+
+import numpy as np
+
+from api.encoding import MASK_JSON_MEDIA_TYPE
+from api.tiles import (BURN_PALETTE, EMPTY_TILE, PNG_MEDIA_TYPE, PROBABILITY_PALETTE, TILE_SIZE, TileCache,
+                       encode_png, probability_palette_indices, render_tile)
+from support import DATASET, SIMULATION, client, fire_spread_url, json_mask
+
+
+def decode_png(data: bytes):
+    """팔레트 PNG -> (번호 배열, RGB 팔레트, 알파), 청크 CRC와 헤더를 확인"""
+    assert data[:8] == b"\x89PNG\r\n\x1a\n"
+    chunks, offset = {}, 8
+    while offset < len(data):
+        length, tag = struct.unpack(">I4s", data[offset:offset + 8])
+        body = data[offset + 8:offset + 8 + length]
+        crc, = struct.unpack(">I", data[offset + 8 + length:offset + 12 + length])
+        assert crc == zlib.crc32(tag + body) & 0xFFFFFFFF, tag
+        chunks[tag] = chunks.get(tag, b"") + body
+        offset += 12 + length
+    assert offset == len(data) and b"IEND" in chunks
+    width, height, depth, color_type, compression, filtering, interlace = struct.unpack(">IIBBBBB", chunks[b"IHDR"])
+    assert (depth, color_type, compression, filtering, interlace) == (8, 3, 0, 0, 0)
+    raw = np.frombuffer(zlib.decompress(chunks[b"IDAT"]), dtype=np.uint8).reshape(height, width + 1)
+    assert not raw[:, 0].any()  # 필터 없음
+    palette = np.frombuffer(chunks[b"PLTE"], dtype=np.uint8).reshape(-1, 3)
+    alpha = np.frombuffer(chunks.get(b"tRNS", b""), dtype=np.uint8)
+    return raw[:, 1:], palette, alpha
+
+
+def tile_xy(lon: float, lat: float, z: int):
+    """위경도를 포함하는 Web Mercator 타일 x, y"""
+    n = 2 ** z
+    x = int((lon + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n)
+    return x, y
+
+
+class TestEncodePng(unittest.TestCase):
+
+    def test_palette_png(self):
+        indices = np.random.default_rng(0).integers(0, 256, size=(7, 13)).astype(np.uint8)
+        decoded, palette, alpha = decode_png(encode_png(indices, PROBABILITY_PALETTE))
+        np.testing.assert_array_equal(decoded, indices)
+        np.testing.assert_array_equal(palette, PROBABILITY_PALETTE[:, :3])
+        np.testing.assert_array_equal(alpha, PROBABILITY_PALETTE[:len(alpha), 3])
+
+    def test_empty_tile(self):
+        decoded, palette, alpha = decode_png(EMPTY_TILE)
+        self.assertEqual(decoded.shape, (TILE_SIZE, TILE_SIZE))
+        self.assertFalse(decoded.any())
+        self.assertEqual(alpha[0], 0)
+
+    def test_probability_indices(self):
+        indices = probability_palette_indices(np.array([0.0, 1e-9, 0.5, 1.0, 2.0]))
+        self.assertEqual(indices.tolist(), [0, 1, 128, 255, 255])
+
+
+class TestRenderTile(unittest.TestCase):
+
+    def setUp(self):
+        self.georeference = {"lat_origin": 37.5, "lat_step": -0.001, "lon_origin": 127.0, "lon_step": 0.001}
+        self.indices = np.ones((10, 10), dtype=np.uint8)
+
+    def test_out_of_grid_tile_is_none(self):
+        z = 14
+        x, y = tile_xy(0.0, 0.0, z)
+        self.assertIsNone(render_tile(self.indices, BURN_PALETTE, self.georeference, z, x, y))
+
+    def test_tile_over_grid(self):
+        z = 14
+        x, y = tile_xy(127.005, 37.495, z)
+        decoded, _, _ = decode_png(render_tile(self.indices, BURN_PALETTE, self.georeference, z, x, y))
+        self.assertTrue(decoded.any())
+        self.assertLess(np.count_nonzero(decoded), TILE_SIZE * TILE_SIZE)  # 격자 밖 픽셀은 투명
+
+        # 연소 셀이 없으면 그리지 않음
+        self.assertIsNone(render_tile(np.zeros_like(self.indices), BURN_PALETTE, self.georeference, z, x, y))
+
+
+class TestTileCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp(prefix="c2f-tiles-")
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_lru_eviction(self):
+        cache = TileCache(self.cache_dir, max_bytes=250)
+        paths = [cache.relative_path("burn", "demo", "v1", 1, 0, y) for y in range(3)]
+        cache.put(paths[0], b"a" * 100)
+        cache.put(paths[1], b"b" * 100)
+        self.assertEqual(cache.get(paths[0]), b"a" * 100)  # 0번을 최근에 사용
+        cache.put(paths[2], b"c" * 100)
+
+        self.assertIsNone(cache.get(paths[1]))
+        self.assertFalse(os.path.exists(os.path.join(self.cache_dir, paths[1])))
+        self.assertEqual(cache.get(paths[0]), b"a" * 100)
+        self.assertEqual(cache.get(paths[2]), b"c" * 100)
+        stats = cache.stats()
+        self.assertEqual((stats["entries"], stats["bytes"], stats["evictions"]), (2, 200, 1))
+
+        # 재시작하면 디스크의 파일로 목록을 복원
+        reopened = TileCache(self.cache_dir, max_bytes=250)
+        self.assertEqual(reopened.get(paths[2]), b"c" * 100)
+        self.assertEqual(reopened.stats()["bytes"], 200)
+
+    def test_empty_render_is_not_stored(self):
+        cache = TileCache(self.cache_dir)
+        self.assertIs(cache.get_or_render("burn", "demo", "v1", 1, 0, 0, lambda: None), EMPTY_TILE)
+        self.assertEqual(cache.stats()["entries"], 0)
+
+        renders = []
+
+        def render():
+            renders.append(1)
+            return b"png"
+
+        for _ in range(2):
+            self.assertEqual(cache.get_or_render("burn", "demo", "v1", 1, 0, 1, render), b"png")
+        self.assertEqual(len(renders), 1)
+
+
+class TestTileEndpoint(unittest.TestCase):
+
+    def test_fire_spread_tile(self):
+        minutes, z = 210, 16
+        georeference = client.get(fire_spread_url(minutes), headers={"Accept": MASK_JSON_MEDIA_TYPE}).json()["georeference"]
+        rows, cols = np.nonzero(json_mask(minutes))
+        lon = georeference["lon_origin"] + cols.mean() * georeference["lon_step"]
+        lat = georeference["lat_origin"] + rows.mean() * georeference["lat_step"]
+        x, y = tile_xy(lon, lat, z)
+
+        response = client.get(f"/tiles/{DATASET}/{SIMULATION}/{minutes}/{z}/{x}/{y}.png")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["content-type"], PNG_MEDIA_TYPE)
+        decoded, _, _ = decode_png(response.content)
+        self.assertTrue(decoded.any())
+        etag = response.headers["etag"]
+        revalidated = client.get(f"/tiles/{DATASET}/{SIMULATION}/{minutes}/{z}/{x}/{y}.png",
+                                 headers={"If-None-Match": etag})
+        self.assertEqual(revalidated.status_code, 304)
+
+        far = client.get(f"/tiles/{DATASET}/{SIMULATION}/{minutes}/{z}/0/0.png")
+        self.assertEqual(far.status_code, 200)
+        self.assertEqual(far.content, EMPTY_TILE)
+
+        self.assertEqual(client.get(f"/tiles/{DATASET}/{SIMULATION}/{minutes}/1/2/0.png").status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
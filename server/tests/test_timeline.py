@@ -0,0 +1,38 @@
+"""
+타임라인 스트림 테스트
+
+- 줄마다 added/removed를 적용한 마스크가 JSON 픽셀 응답과 같은 셀을 나타내는지
+- 없는 데이터셋은 스트림을 시작하기 전에 404인지
+
+사용 예 (server 폴더에서):
+    python -m pytest -q tests
+"""
+import json
+import unittest
+
+import numpy as np
+
+from support import COLS, DATASET, MINUTES, ROWS, SIMULATION, client, json_mask
+
+
+class TestTimeline(unittest.TestCase):
+
+    def test_timeline_delta(self):
+        response = client.get(f"/fire-spread/{DATASET}/{SIMULATION}/timeline", params={"step": 15, "until": 210})
+        self.assertEqual(response.status_code, 200, response.text)
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        self.assertEqual((lines[0]["type"], lines[-1]["type"]), ("header", "end"))
+        mask = np.zeros(ROWS * COLS, dtype=bool)
+        for line in lines[1:-1]:
+            mask[line["added"]] = True
+            mask[line["removed"]] = False
+            if line["time_minutes"] in MINUTES:
+                np.testing.assert_array_equal(mask.reshape(ROWS, COLS), json_mask(line["time_minutes"]))
+
+    def test_timeline_unknown_dataset_is_404(self):
+        response = client.get(f"/fire-spread/{DATASET}_missing/{SIMULATION}/timeline")
+        self.assertEqual(response.status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()